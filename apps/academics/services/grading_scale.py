@@ -0,0 +1,129 @@
+# apps/academics/services/grading_scale.py
+import threading
+import time
+from bisect import bisect_right
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+
+class GradingScale:
+    """
+    Grade bands of one grading system sorted by ``min_percentage``.
+
+    Bands do not overlap (``Grade.clean`` rejects that), so the band for a
+    percentage is the last one starting at or below it, if it also ends at
+    or above it.
+    """
+
+    def __init__(self, grades):
+        self.grades = sorted(grades, key=lambda grade: grade.min_percentage)
+        self.boundaries = [grade.min_percentage for grade in self.grades]
+
+    def __len__(self):
+        return len(self.grades)
+
+    def grade_for(self, percentage):
+        """``Grade`` whose band contains ``percentage``, or None"""
+        if percentage is None:
+            return None
+        index = bisect_right(self.boundaries, percentage) - 1
+        if index >= 0 and percentage <= self.grades[index].max_percentage:
+            return self.grades[index]
+        return None
+
+
+class GradingScaleCache:
+    """
+    In-process cache of grading scales per tenant schema and grading system,
+    so grade assignment is a bisect instead of two queries per saved result.
+
+    Grade/GradingSystem signals drop the local entries of the schema and
+    bump a shared generation number; other processes notice the new
+    generation on their next check, at most ``check_interval`` seconds
+    later. Entries are reloaded after ``max_age`` seconds whatever the
+    generation, so a bump that never reaches a process (a per-process cache
+    backend such as ``LocMemCache``) is still picked up within that time.
+    """
+
+    DEFAULT = 'default'
+
+    def __init__(self, check_interval=30, max_age=300):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'GRADING_SCALE_CACHE', {})
+        return cls(
+            check_interval=config.get('CHECK_INTERVAL', 30),
+            max_age=config.get('MAX_AGE', 300),
+        )
+
+    @staticmethod
+    def _schema(schema_name=None):
+        return schema_name or getattr(connection, 'schema_name', 'public')
+
+    @staticmethod
+    def _generation_key(schema_name):
+        return f'grading_scale:{schema_name}:gen'
+
+    def _generation(self, schema_name):
+        try:
+            return cache.get_or_set(self._generation_key(schema_name), 1, None)
+        except Exception:
+            return 0
+
+    def _load(self, grading_system_id):
+        from apps.academics.models import Grade, GradingSystem
+
+        if grading_system_id is None:
+            grading_system = GradingSystem.objects.filter(is_default=True).first()
+            if not grading_system:
+                return GradingScale([])
+            grading_system_id = grading_system.id
+        return GradingScale(Grade.objects.filter(grading_system_id=grading_system_id))
+
+    def get(self, grading_system_id=None, schema_name=None):
+        """Scale of ``grading_system_id`` (the default system when None)"""
+        schema_name = self._schema(schema_name)
+        key = (schema_name, str(grading_system_id) if grading_system_id else self.DEFAULT)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and now - entry[1] < self.max_age:
+            checked_at, loaded_at, generation, scale = entry
+            if now - checked_at < self.check_interval:
+                return scale
+            if self._generation(schema_name) == generation:
+                with self._lock:
+                    self._entries[key] = (now, loaded_at, generation, scale)
+                return scale
+
+        generation = self._generation(schema_name)
+        scale = self._load(grading_system_id)
+        with self._lock:
+            self._entries[key] = (now, now, generation, scale)
+        return scale
+
+    def grade_for(self, percentage, grading_system_id=None, schema_name=None):
+        return self.get(grading_system_id, schema_name).grade_for(percentage)
+
+    def invalidate(self, schema_name=None):
+        schema_name = self._schema(schema_name)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == schema_name]:
+                del self._entries[key]
+        try:
+            cache.incr(self._generation_key(schema_name))
+        except ValueError:
+            cache.set(self._generation_key(schema_name), 2, None)
+        except Exception:
+            pass
+
+
+grading_scales = GradingScaleCache.from_settings()
@@ -0,0 +1,77 @@
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.academics.services.grading_scale import GradingScale, GradingScaleCache
+
+
+def band(grade, low, high):
+    return SimpleNamespace(grade=grade, min_percentage=Decimal(low), max_percentage=Decimal(high))
+
+
+class GradingScaleTests(SimpleTestCase):
+    def setUp(self):
+        self.scale = GradingScale([band('A', '80', '100'), band('C', '33', '59.99'), band('B', '60', '79.99')])
+
+    def test_bands_are_inclusive(self):
+        self.assertEqual(self.scale.grade_for(Decimal('80')).grade, 'A')
+        self.assertEqual(self.scale.grade_for(Decimal('79.99')).grade, 'B')
+        self.assertEqual(self.scale.grade_for(Decimal('60')).grade, 'B')
+        self.assertEqual(self.scale.grade_for(Decimal('33')).grade, 'C')
+
+    def test_gaps_and_out_of_range(self):
+        self.assertIsNone(self.scale.grade_for(Decimal('79.995')))
+        self.assertIsNone(self.scale.grade_for(Decimal('20')))
+        self.assertIsNone(self.scale.grade_for(None))
+        self.assertIsNone(GradingScale([]).grade_for(Decimal('50')))
+
+
+class GradingScaleCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.cache = GradingScaleCache(check_interval=0)
+        self.loads = 0
+
+        def load(grading_system_id):
+            self.loads += 1
+            return GradingScale([band('A', '0', '100')])
+
+        patcher = mock.patch.object(self.cache, '_load', side_effect=load)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_scale_is_reused_until_invalidated(self):
+        self.assertEqual(self.cache.grade_for(Decimal('50'), schema_name='alpha').grade, 'A')
+        self.cache.grade_for(Decimal('60'), schema_name='alpha')
+        self.assertEqual(self.loads, 1)
+
+        self.cache.invalidate('alpha')
+        self.cache.grade_for(Decimal('60'), schema_name='alpha')
+        self.assertEqual(self.loads, 2)
+
+    def test_invalidation_is_per_schema(self):
+        self.cache.get(schema_name='alpha')
+        self.cache.get(schema_name='beta')
+        self.cache.invalidate('alpha')
+        self.cache.get(schema_name='beta')
+        self.assertEqual(self.loads, 2)
+
+    def test_other_process_invalidation_seen_through_generation(self):
+        self.cache.get(schema_name='alpha')
+        other = GradingScaleCache(check_interval=0)
+        other.invalidate('alpha')
+        self.cache.get(schema_name='alpha')
+        self.assertEqual(self.loads, 2)
+
+    def test_scale_is_reloaded_after_max_age(self):
+        scales = GradingScaleCache(check_interval=30, max_age=60)
+        with mock.patch.object(scales, '_load', side_effect=lambda grading_system_id: GradingScale([])) as load:
+            scales.get(schema_name='alpha')
+            scales.get(schema_name='alpha')
+            with mock.patch('apps.academics.services.grading_scale.time.monotonic', return_value=time.monotonic() + 61):
+                scales.get(schema_name='alpha')
+        self.assertEqual(load.call_count, 2)
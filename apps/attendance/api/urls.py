@@ -33,6 +33,7 @@ urlpatterns = [
     
     # Dashboard & Reporting
     path('stats/', views.AttendanceStatsAPIView.as_view(), name='attendance-stats'),
+    path('summary/', views.AttendanceSummaryAPIView.as_view(), name='attendance-summary'),
     path('history/', views.AttendanceHistoryListAPIView.as_view(), name='attendance-history'),
     path('export/', views.AttendanceExportAPIView.as_view(), name='attendance-export'),
     path('dashboard/', views.AttendanceDashboardAPIView.as_view(), name='attendance-dashboard'),
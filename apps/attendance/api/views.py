@@ -3,19 +3,15 @@ Complete Attendance API Views for School Management System
 Includes: QR Scanning, DeepFace Face Recognition, Manual Attendance, and Dashboard
 """
 
-import base64
-import io
-import tempfile
 import os
 import re
-import csv
 from datetime import datetime, timedelta
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
 
 from django.utils import timezone
 from django.db import transaction
 from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
 
 from rest_framework import status
 from rest_framework.response import Response
@@ -34,6 +30,8 @@ from apps.attendance.api.serializers import (
     HostelAttendanceSerializer, TransportAttendanceSerializer
 )
 from apps.students.models import Student
+from apps.attendance.services.attendance_stats import attendance_stats_service, percentage
+from apps.attendance.services.attendance_marking import BulkAttendanceMarker
 
 # Optional imports for DeepFace
 try:
@@ -50,10 +48,12 @@ except ImportError:
 # Import DeepFace service
 try:
     from apps.attendance.services.face_recognition_service import deepface_service
+    from apps.attendance.services.frame_decoder import frame_decoder
     DEEPFACE_AVAILABLE = True
 except ImportError:
     DEEPFACE_AVAILABLE = False
     deepface_service = None
+    frame_decoder = None
 
 import logging
 
@@ -368,100 +368,15 @@ class DeepFaceBaseView(APIView):
         return True
     
     def process_image(self, image_data, image_file):
-        """Process image input and return file path"""
-        temp_file_path = None
-        
+        """Decode image input in memory and return it as a BGR NumPy array"""
         try:
             if image_file:
                 # Handle uploaded file
-                temp_file_path = self._save_uploaded_file(image_file)
-            elif image_data:
-                # Handle base64 image
-                temp_file_path = self._process_base64_image(image_data)
-            
-            # Verify image is valid
-            self._verify_image(temp_file_path)
-            
-            return temp_file_path
-            
-        except Exception as e:
-            # Cleanup on error
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-            raise
-    
-    def _save_uploaded_file(self, uploaded_file):
-        """Save uploaded file to temporary location"""
-        temp_dir = tempfile.gettempdir()
-        filename = f"deepface_{int(timezone.now().timestamp())}_{uploaded_file.name}"
-        temp_path = os.path.join(temp_dir, filename)
-        
-        with open(temp_path, 'wb') as f:
-            for chunk in uploaded_file.chunks():
-                f.write(chunk)
-        
-        return temp_path
-    
-    def _process_base64_image(self, image_data):
-        """Process base64 image data"""
-        # Extract base64 data
-        if 'base64,' in image_data:
-            image_data = image_data.split('base64,')[1]
-        
-        try:
-            # Decode base64
-            image_bytes = base64.b64decode(image_data)
-            
-            # Verify it's a valid image
-            image = Image.open(io.BytesIO(image_bytes))
-            image.verify()
-            
-            # Re-open for processing
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Save to temporary file
-            temp_dir = tempfile.gettempdir()
-            temp_path = os.path.join(temp_dir, f"deepface_{int(timezone.now().timestamp())}.jpg")
-            
-            image.save(temp_path, 'JPEG', quality=85)
-            
-            return temp_path
-            
-        except Exception as e:
-            raise ValueError(f"Invalid base64 image: {str(e)}")
-    
-    def _verify_image(self, image_path):
-        """Verify image is valid and readable"""
-        try:
-            # Try to read with OpenCV
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError("Could not read image file")
-            
-            # Check image dimensions
-            height, width = img.shape[:2]
-            if height < 50 or width < 50:
-                raise ValueError("Image dimensions too small (min 50x50)")
-            
-            if height > 4000 or width > 4000:
-                raise ValueError("Image dimensions too large (max 4000x4000)")
-            
-            return True
-            
-        except Exception as e:
+                return frame_decoder.decode_upload(image_file)
+            # Handle base64 image
+            return frame_decoder.decode_base64(image_data)
+        except ValueError as e:
             raise ValueError(f"Invalid image: {str(e)}")
-    
-    def cleanup_temp_file(self, file_path):
-        """Clean up temporary file"""
-        try:
-            if file_path and os.path.exists(file_path):
-                os.unlink(file_path)
-        except Exception as e:
-            logger.warning(f"Failed to cleanup temp file {file_path}: {e}")
 
 
 class MarkDeepFaceAttendanceAPIView(DeepFaceBaseView):
@@ -518,15 +433,19 @@ class MarkDeepFaceAttendanceAPIView(DeepFaceBaseView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        temp_file_path = None
-        
         try:
-            # Process image
-            temp_file_path = self.process_image(image_data, image_file)
+            # Decode image (in memory, no temp files)
+            try:
+                image_array = self.process_image(image_data, image_file)
+            except ValueError as e:
+                return Response(
+                    {"error": "Invalid input", "detail": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             # Perform face recognition
             recognition_result, message, confidence, distance = deepface_service.recognize_face(
-                image_path=temp_file_path,
+                image_array=image_array,
                 min_confidence=min_confidence
             )
             
@@ -574,11 +493,6 @@ class MarkDeepFaceAttendanceAPIView(DeepFaceBaseView):
                 "error": "Internal server error",
                 "detail": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-        finally:
-            # Cleanup temp file
-            if temp_file_path:
-                self.cleanup_temp_file(temp_file_path)
     
     @transaction.atomic
     def mark_attendance(self, request, person_data, att_type, trip_type, confidence, distance):
@@ -848,21 +762,15 @@ class DeepFaceBatchRecognitionAPIView(DeepFaceBaseView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        temp_file_path = None
-        
         try:
-            # Process image
-            temp_file_path = self.process_image(None, image_file)
-            
-            # Recognize multiple faces
-            recognized_faces, message = deepface_service.recognize_multiple_faces(temp_file_path)
+            # Decode image (in memory, no temp files)
+            image_array = self.process_image(None, image_file)
             
-            # Filter by class if specified
-            if class_id and recognized_faces:
-                recognized_faces = [
-                    f for f in recognized_faces 
-                    if f.get('class_id') == class_id
-                ]
+            # Recognize multiple faces (only against the class when specified)
+            recognized_faces, message = deepface_service.recognize_multiple_faces(
+                image_array=image_array,
+                partition=f'class_id:{class_id}' if class_id else 'type:student'
+            )
             
             # Mark attendance for each recognized face
             results = []
@@ -904,9 +812,6 @@ class DeepFaceBatchRecognitionAPIView(DeepFaceBaseView):
                 "error": "Batch processing failed",
                 "message": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        finally:
-            if temp_file_path:
-                self.cleanup_temp_file(temp_file_path)
     
     def mark_single_attendance(self, request, face_data):
         """Mark attendance for single recognized face"""
@@ -1000,21 +905,16 @@ class StudentListByClassAPIView(APIView):
 
 class BulkAttendanceUpdateAPIView(APIView):
     """
-    Update attendance for a specific student or bulk.
-    Payload: { "student_id": "uuid", "status": "PRESENT" }
+    Mark attendance for a single student or a whole class/section roster.
+    Single:  { "student_id": "uuid", "status": "PRESENT", "date": "YYYY-MM-DD" }
+    Roster:  { "date": "YYYY-MM-DD", "class_id": "uuid", "section_id": "uuid",
+               "session": "FULL_DAY",
+               "records": [{"student_id": "uuid", "status": "PRESENT", "remarks": ""}, ...] }
+    A roster is validated in one query and upserted in one statement.
     """
     
     def post(self, request):
-        student_id = request.data.get('student_id')
-        new_status = request.data.get('status')  # PRESENT, ABSENT
         date_str = request.data.get('date')
-        
-        if not student_id or not new_status:
-            return Response(
-                {"error": "student_id and status required"}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
         today = timezone.now().date()
         if date_str:
             try:
@@ -1024,6 +924,18 @@ class BulkAttendanceUpdateAPIView(APIView):
                     {"error": "Invalid date format (YYYY-MM-DD)"}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
+        
+        if 'records' in request.data:
+            return self.mark_roster(request, today)
+        
+        student_id = request.data.get('student_id')
+        new_status = request.data.get('status')  # PRESENT, ABSENT
+        
+        if not student_id or not new_status:
+            return Response(
+                {"error": "student_id and status required"}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         student = get_object_or_404(Student, id=student_id)
         
@@ -1046,6 +958,42 @@ class BulkAttendanceUpdateAPIView(APIView):
             "created": created,
             "attendance_id": str(attendance.id)
         })
+    
+    def mark_roster(self, request, target_date):
+        records = request.data.get('records')
+        if not isinstance(records, list):
+            return Response(
+                {"error": "records must be a list"}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        marker = BulkAttendanceMarker(
+            user=request.user,
+            tenant=getattr(request, 'tenant', None),
+            request=request
+        )
+        try:
+            result = marker.mark(
+                target_date,
+                records,
+                class_id=request.data.get('class_id'),
+                section_id=request.data.get('section_id'),
+                session=request.data.get('session') or 'FULL_DAY'
+            )
+        except DjangoValidationError as e:
+            return Response(
+                {"error": "Invalid attendance records", "details": e.message_dict},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            "success": True,
+            "message": f"Attendance marked for {result['marked']} student(s)",
+            "date": result['date'],
+            "session": result['session'],
+            "marked": result['marked'],
+            "status_counts": result['status_counts'],
+        })
 
 
 # ============================================================================
@@ -1075,33 +1023,78 @@ class AttendanceStatsAPIView(APIView):
         class_id = request.query_params.get('class_id')
         section_id = request.query_params.get('section_id')
         
-        # Base Query
-        queryset = StudentAttendance.objects.filter(date=target_date)
-        
-        # Tenant Filter
-        if hasattr(request, 'tenant') and request.tenant:
-            queryset = queryset.filter(tenant=request.tenant)
-            
-        if class_id:
-            queryset = queryset.filter(class_name_id=class_id)
-        if section_id:
-            queryset = queryset.filter(section_id=section_id)
-            
-        # Aggregation
-        total = queryset.count()
-        present = queryset.filter(status='PRESENT').count()
-        absent = queryset.filter(status='ABSENT').count()
-        late = queryset.filter(status='LATE').count()
-        half_day = queryset.filter(status='HALFDAY').count()
+        counts = attendance_stats_service.daily_stats(
+            target_date,
+            class_id=class_id,
+            section_id=section_id
+        )
         
         return Response({
             "date": target_date,
-            "total_marked": total,
-            "present": present,
-            "absent": absent,
-            "late": late,
-            "half_day": half_day,
-            "attendance_percentage": round((present / total * 100), 1) if total > 0 else 0.0
+            "total_marked": counts['total'],
+            "present": counts['present'],
+            "absent": counts['absent'],
+            "late": counts['late'],
+            "half_day": counts['half_day'],
+            "attendance_percentage": percentage(counts['present'], counts['total'])
+        })
+
+
+class AttendanceSummaryAPIView(APIView):
+    """
+    GET /api/v1/attendance/summary/
+    Attendance counts and percentage over a period (month/term), read from
+    the daily rollup. Defaults to the current month.
+    Filters: start_date, end_date, type (student/staff/hostel/transport),
+    class_id, section_id
+    """
+    
+    def get(self, request):
+        today = timezone.now().date()
+        try:
+            start_date = datetime.strptime(
+                request.query_params.get('start_date') or today.replace(day=1).isoformat(), '%Y-%m-%d'
+            ).date()
+            end_date = datetime.strptime(
+                request.query_params.get('end_date') or today.isoformat(), '%Y-%m-%d'
+            ).date()
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format (YYYY-MM-DD)'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if start_date > end_date:
+            return Response(
+                {'error': 'start_date must be on or before end_date'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        attendance_type = request.query_params.get('type', 'student')
+        if attendance_type not in ('student', 'staff', 'hostel', 'transport'):
+            return Response(
+                {'error': 'type must be one of student, staff, hostel, transport'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        counts = attendance_stats_service.period_stats(
+            start_date,
+            end_date,
+            attendance_type=attendance_type,
+            class_id=request.query_params.get('class_id'),
+            section_id=request.query_params.get('section_id')
+        )
+        
+        return Response({
+            "start_date": start_date,
+            "end_date": end_date,
+            "type": attendance_type,
+            "total_marked": counts['total'],
+            "present": counts['present'],
+            "absent": counts['absent'],
+            "late": counts['late'],
+            "half_day": counts['half_day'],
+            "leave": counts['leave'],
+            "attendance_percentage": counts['percentage']
         })
 
 
@@ -1142,44 +1135,20 @@ class AttendanceHistoryListAPIView(BaseListCreateAPIView):
 class AttendanceExportAPIView(APIView):
     """
     GET /api/v1/attendance/export/
-    Export attendance records to CSV.
+    Export attendance records to CSV as a background job.
+
+    Returns the export job (HTTP 202); poll its ``status_url`` and fetch
+    the file from ``download_url``. Identical requests share one job.
     """
     
     def get(self, request):
-        # Reuse filter logic (simplified)
-        queryset = StudentAttendance.objects.all()
-        if hasattr(request, 'tenant') and request.tenant:
-            queryset = queryset.filter(tenant=request.tenant)
-            
-        # Apply filters
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        class_id = request.query_params.get('class_id')
-        
-        if start_date: 
-            queryset = queryset.filter(date__gte=start_date)
-        if end_date: 
-            queryset = queryset.filter(date__lte=end_date)
-        if class_id: 
-            queryset = queryset.filter(class_name_id=class_id)
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="attendance_report_{timezone.now().date()}.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(['Date', 'Student Name', 'Admission No', 'Class', 'Status', 'Remarks'])
+        from apps.core.api.views import export_job_response
 
-        for att in queryset.select_related('student', 'class_name'):
-            writer.writerow([
-                att.date,
-                att.student.full_name if att.student else 'N/A',
-                att.student.admission_number if att.student else 'N/A',
-                f"{att.class_name.name} {att.section.name}" if att.class_name else 'N/A',
-                att.status,
-                att.remarks
-            ])
-
-        return response
+        filters = {
+            key: request.query_params.get(key)
+            for key in ('start_date', 'end_date', 'class_id')
+        }
+        return export_job_response(request, 'attendance', request.query_params.get('format', 'csv'), filters)
 
 
 # ============================================================================
@@ -1198,61 +1167,12 @@ class AttendanceDashboardAPIView(APIView):
         from django.urls import reverse
         today = timezone.now().date()
         
-        # Student Stats
-        student_total = Student.objects.filter(status='ACTIVE').count()
-        student_present = StudentAttendance.objects.filter(
-            date=today, status='PRESENT'
-        ).count()
-        student_absent = StudentAttendance.objects.filter(
-            date=today, status='ABSENT'
-        ).count()
-        student_late = StudentAttendance.objects.filter(
-            date=today, status='LATE'
-        ).count()
-        student_percentage = (student_present / student_total * 100) if student_total > 0 else 0
-        
-        # Staff Stats
-        staff_total = Staff.objects.filter(employment_status='ACTIVE').count()
-        staff_present = StaffAttendance.objects.filter(
-            date=today, status='PRESENT'
-        ).count()
-        staff_absent = StaffAttendance.objects.filter(
-            date=today, status='ABSENT'
-        ).count()
-        staff_late = StaffAttendance.objects.filter(
-            date=today, status='LATE'
-        ).count()
-        staff_percentage = (staff_present / staff_total * 100) if staff_total > 0 else 0
-        
-        # Hostel Stats (students with hostel allocation)
-        hostel_total = Student.objects.filter(status='ACTIVE', hostel_allocation__isnull=False).count()
-        hostel_present = HostelAttendance.objects.filter(
-            date=today, status='PRESENT'
-        ).count()
-        hostel_absent = HostelAttendance.objects.filter(
-            date=today, status='ABSENT'
-        ).count()
-        hostel_late = HostelAttendance.objects.filter(
-            date=today, status='LATE'
-        ).count()
-        hostel_percentage = (hostel_present / hostel_total * 100) if hostel_total > 0 else 0
-        
-        # Transport Stats (students with transport allocation)
-        transport_total = Student.objects.filter(status='ACTIVE', transport_allocation__isnull=False).count()
-        transport_present = TransportAttendance.objects.filter(
-            date=today, status='PRESENT'
-        ).count()
-        transport_absent = TransportAttendance.objects.filter(
-            date=today, status='ABSENT'
-        ).count()
-        transport_late = TransportAttendance.objects.filter(
-            date=today, status='LATE'
-        ).count()
-        transport_percentage = (transport_present / transport_total * 100) if transport_total > 0 else 0
+        # Roster totals and status counts for every attendance type (cached)
+        stats = attendance_stats_service.dashboard_stats(today)
         
         # Recent Attendance (last 10 records across all types)
-        recent_student = list(StudentAttendance.objects.filter(date=today).select_related('student')[:5])
-        recent_staff = list(StaffAttendance.objects.filter(date=today).select_related('staff')[:5])
+        recent_student = list(StudentAttendance.objects.filter(date=today).select_related('student', 'class_name')[:5])
+        recent_staff = list(StaffAttendance.objects.filter(date=today).select_related('staff__department')[:5])
         
         recent_records = []
         for att in recent_student:
@@ -1301,34 +1221,14 @@ class AttendanceDashboardAPIView(APIView):
         
         return Response({
             'stats': {
-                'student': {
-                    'total': student_total,
-                    'present': student_present,
-                    'absent': student_absent,
-                    'late': student_late,
-                    'percentage': round(student_percentage, 1),
-                },
-                'staff': {
-                    'total': staff_total,
-                    'present': staff_present,
-                    'absent': staff_absent,
-                    'late': staff_late,
-                    'percentage': round(staff_percentage, 1),
-                },
-                'hostel': {
-                    'total': hostel_total,
-                    'present': hostel_present,
-                    'absent': hostel_absent,
-                    'late': hostel_late,
-                    'percentage': round(hostel_percentage, 1),
-                },
-                'transport': {
-                    'total': transport_total,
-                    'present': transport_present,
-                    'absent': transport_absent,
-                    'late': transport_late,
-                    'percentage': round(transport_percentage, 1),
-                },
+                attendance_type: {
+                    'total': counts['total'],
+                    'present': counts['present'],
+                    'absent': counts['absent'],
+                    'late': counts['late'],
+                    'percentage': counts['percentage'],
+                }
+                for attendance_type, counts in stats.items()
             },
             'quick_actions': {
                 'qr_scan': {
@@ -1,129 +1,174 @@
 import json
-import base64
-import numpy as np
-import cv2
-from channels.generic.websocket import AsyncWebsocketConsumer
-from apps.attendance.services.face_recognition_service import face_service
-from apps.students.models import Student
-from apps.hr.models import Staff
 import asyncio
 import logging
 
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django_tenants.utils import get_public_schema_name
+
+from apps.attendance.services.recognition_executor import recognition_executor
+
 logger = logging.getLogger(__name__)
 
+# Permission needed to recognise (and so mark) each kind of attendance
+RECOGNITION_PERMISSIONS = {
+    'student': 'attendance.add_studentattendance',
+    'staff': 'attendance.add_staffattendance',
+}
+
+
 class FaceRecognitionConsumer(AsyncWebsocketConsumer):
-    """WebSocket consumer for real-time face recognition"""
-    
+    """
+    WebSocket consumer for real-time face recognition.
+
+    Frames are handed to the shared ``recognition_executor`` so decoding,
+    detection and embedding never run on the event loop. Only the newest
+    frame per camera is kept while the executor is busy; stale frames are
+    dropped and reported back to the client together with the queue depth.
+    """
+
     async def connect(self):
+        self.user = self.scope.get('user')
+        tenant = self.scope.get('tenant')
+        self.schema_name = getattr(tenant, 'schema_name', None) or get_public_schema_name()
+
+        # Only authenticated users of this (non-public) tenant who may mark
+        # attendance get recognition results back
+        if self.user is None or not self.user.is_authenticated:
+            await self.close()
+            return
+        if tenant is None or self.schema_name == get_public_schema_name():
+            await self.close()
+            return
+        if not self.user.is_superuser and self.user.tenant_id != tenant.id:
+            await self.close()
+            return
+        if not await self.has_any_permission(RECOGNITION_PERMISSIONS.values()):
+            await self.close()
+            return
+
         await self.accept()
         self.recognition_active = False
         self.camera_id = None
-    
+        self.min_confidence = 0.5
+        self.partition = None
+        self.attendance_type = 'student'
+
+    @database_sync_to_async
+    def has_any_permission(self, permissions):
+        return any(self.user.has_perm(permission) for permission in permissions)
+
     async def disconnect(self, close_code):
         self.recognition_active = False
-    
+
+    @property
+    def camera_key(self):
+        # Unique per tenant + camera so two schools' "gate-1" never collide
+        return f"{self.schema_name}:{self.camera_id or self.channel_name}"
+
     async def receive(self, text_data):
         """Receive messages from WebSocket client"""
         try:
             data = json.loads(text_data)
             message_type = data.get('type')
-            
+
             if message_type == 'start_recognition':
+                att_type = data.get('attendance_type', 'student')
+                permission = RECOGNITION_PERMISSIONS['staff' if att_type == 'staff' else 'student']
+                if not await self.has_any_permission([permission]):
+                    await self.send(json.dumps({
+                        'type': 'error',
+                        'message': 'Permission denied'
+                    }))
+                    return
                 self.recognition_active = True
                 self.camera_id = data.get('camera_id')
-                att_type = data.get('attendance_type', 'student')
+                self.min_confidence = float(data.get('min_confidence', 0.5))
+                self.attendance_type = 'staff' if att_type == 'staff' else 'student'
+                self.partition = f"type:{self.attendance_type}"
+                # Sections narrow student recognition only
+                if self.attendance_type == 'student' and data.get('section_id'):
+                    self.partition = f"section_id:{data['section_id']}"
                 await self.send(json.dumps({
                     'type': 'status',
                     'message': 'Face recognition started',
                     'camera_id': self.camera_id
                 }))
-                
+
             elif message_type == 'stop_recognition':
                 self.recognition_active = False
                 await self.send(json.dumps({
                     'type': 'status',
                     'message': 'Face recognition stopped'
                 }))
-                
+
             elif message_type == 'frame' and self.recognition_active:
                 # Process frame from client
                 frame_data = data.get('frame')
-                await self.process_frame(frame_data, data.get('attendance_type', 'student'))
-                
+                await self.process_frame(frame_data, self.attendance_type)
+
         except Exception as e:
             logger.error(f"WebSocket error: {str(e)}")
             await self.send(json.dumps({
                 'type': 'error',
                 'message': str(e)
             }))
-    
+
     async def process_frame(self, frame_data, att_type):
-        """Process a single frame for face recognition"""
+        """Queue a frame on the recognition executor and report the result"""
+        if not frame_data:
+            return
+
         try:
-            # Decode base64 frame
-            if 'base64,' in frame_data:
-                frame_data = frame_data.split('base64,')[1]
-            
-            image_bytes = base64.b64decode(frame_data)
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if image is None:
+            future = recognition_executor.submit(
+                self.camera_key,
+                frame_data,
+                self.schema_name,
+                min_confidence=self.min_confidence,
+                partition=self.partition
+            )
+            result = await asyncio.wrap_future(future)
+
+            if result['status'] in ('dropped', 'busy'):
+                await self.send(json.dumps({
+                    'type': 'frame_skipped',
+                    'reason': result['status'],
+                    'queue_depth': result['queue_depth']
+                }))
                 return
-            
-            # Convert to RGB (face_recognition uses RGB)
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            # Find faces
-            face_locations = face_recognition.face_locations(rgb_image)
-            
-            if face_locations:
-                # Get face encodings
-                face_encodings = face_recognition.face_encodings(rgb_image, face_locations)
-                
-                recognition_results = []
-                
-                for face_encoding, face_location in zip(face_encodings, face_locations):
-                    # Compare with known faces
-                    matches = face_recognition.compare_faces(
-                        face_service.known_face_encodings,
-                        face_encoding,
-                        tolerance=face_service.tolerance
-                    )
-                    
-                    if True in matches:
-                        first_match_index = matches.index(True)
-                        metadata = face_service.known_face_metadata[first_match_index]
-                        
-                        recognition_results.append({
-                            'type': metadata['type'],
-                            'name': metadata['name'],
-                            'id': metadata['id'],
-                            'location': face_location,
-                            'attendance_type': att_type
-                        })
-                
-                # Send recognition results
-                if recognition_results:
-                    await self.send(json.dumps({
-                        'type': 'recognition_result',
-                        'results': recognition_results,
-                        'timestamp': asyncio.get_event_loop().time()
-                    }))
-            
-            # Draw rectangles on faces (for visualization)
-            for (top, right, bottom, left) in face_locations:
-                cv2.rectangle(image, (left, top), (right, bottom), (0, 255, 0), 2)
-            
-            # Convert back to base64 for sending
-            _, buffer = cv2.imencode('.jpg', image)
-            processed_frame = base64.b64encode(buffer).decode('utf-8')
-            
+
+            if result['status'] != 'ok':
+                logger.error(f"Frame processing error: {result.get('message')}")
+                return
+
+            recognition_results = [
+                {
+                    'type': face['type'],
+                    'name': face['name'],
+                    'id': face['id'],
+                    'location': face['location'],
+                    'confidence': face['confidence'],
+                    'attendance_type': att_type
+                }
+                for face in result['faces'] if face['recognized']
+            ]
+
+            # Send recognition results
+            if recognition_results:
+                await self.send(json.dumps({
+                    'type': 'recognition_result',
+                    'results': recognition_results,
+                    'timestamp': asyncio.get_event_loop().time()
+                }))
+
+            # Face boxes for client-side drawing (no JPEG re-encode on the server)
             await self.send(json.dumps({
                 'type': 'processed_frame',
-                'frame': f"data:image/jpeg;base64,{processed_frame}",
-                'face_count': len(face_locations)
+                'faces': [face['location'] for face in result['faces']],
+                'face_count': result['face_count'],
+                'latency_ms': result['latency_ms'],
+                'queue_depth': result['queue_depth']
             }))
-            
+
         except Exception as e:
-            logger.error(f"Frame processing error: {str(e)}")
\ No newline at end of file
+            logger.error(f"Frame processing error: {str(e)}")
@@ -0,0 +1,39 @@
+"""
+Background export definitions for attendance (see ExportJobService)
+"""
+
+from apps.academics.models import StudentAttendance
+from apps.core.services.export_jobs import ExportDefinition
+
+
+def _student_name(student_id, first_name, middle_name, last_name):
+    if not student_id:
+        return 'N/A'
+    return " ".join(filter(None, (first_name, middle_name, last_name)))
+
+
+def _class_section(class_name, section_name):
+    return f"{class_name} {section_name or ''}".strip() if class_name else 'N/A'
+
+
+class StudentAttendanceExport(ExportDefinition):
+    title = "Attendance Report"
+    filter_keys = ('start_date', 'end_date', 'class_id')
+    columns = [
+        ('Date', 'date'),
+        ('Student Name', ('student', 'student__first_name', 'student__middle_name', 'student__last_name'), _student_name),
+        ('Admission No', 'student__admission_number', lambda value: value or 'N/A'),
+        ('Class', ('class_name__name', 'section__name'), _class_section),
+        ('Status', 'status'),
+        ('Remarks', 'remarks'),
+    ]
+
+    def get_queryset(self, filters):
+        queryset = StudentAttendance.objects.filter(tenant=self.tenant)
+        if filters.get('start_date'):
+            queryset = queryset.filter(date__gte=filters['start_date'])
+        if filters.get('end_date'):
+            queryset = queryset.filter(date__lte=filters['end_date'])
+        if filters.get('class_id'):
+            queryset = queryset.filter(class_name_id=filters['class_id'])
+        return queryset.order_by('date')
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+from apps.core.utils.tenant import tenant_context
+from apps.tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily attendance rollup from the raw attendance tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schema',
+            dest='schema_name',
+            type=str,
+            help='Tenant schema to rebuild (default: every tenant)'
+        )
+        parser.add_argument(
+            '--from',
+            dest='start_date',
+            type=str,
+            help='First date to rebuild (YYYY-MM-DD, default: earliest attendance)'
+        )
+        parser.add_argument(
+            '--to',
+            dest='end_date',
+            type=str,
+            help='Last date to rebuild (YYYY-MM-DD, default: today)'
+        )
+        parser.add_argument(
+            '--type',
+            dest='attendance_types',
+            action='append',
+            choices=['student', 'staff', 'hostel', 'transport'],
+            help='Attendance type to rebuild (repeatable, default: all)'
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help='Days rebuilt per transaction'
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.exclude(schema_name='public')
+        if options['schema_name']:
+            tenants = tenants.filter(schema_name=options['schema_name'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant schema '{options['schema_name']}' not found")
+
+        for tenant in tenants:
+            with schema_context(tenant.schema_name), tenant_context(tenant):
+                self.rebuild_tenant(tenant, options)
+
+    def parse_date(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}' (expected YYYY-MM-DD)")
+
+    def rebuild_tenant(self, tenant, options):
+        from apps.attendance.services.attendance_rollup import attendance_rollup_service, ATTENDANCE_MODELS
+
+        attendance_types = options['attendance_types'] or list(ATTENDANCE_MODELS)
+        start_date = self.parse_date(options['start_date']) if options['start_date'] else None
+        end_date = self.parse_date(options['end_date']) if options['end_date'] else timezone.now().date()
+
+        if start_date is None:
+            earliest = [
+                ATTENDANCE_MODELS[attendance_type].objects.aggregate(first=Min('date'))['first']
+                for attendance_type in attendance_types
+            ]
+            earliest = [day for day in earliest if day]
+            if not earliest:
+                self.stdout.write(f"{tenant.schema_name}: no attendance recorded")
+                return
+            start_date = min(earliest)
+
+        # Rows dated in the future (pre-marked leave etc.) are included too
+        latest = [
+            ATTENDANCE_MODELS[attendance_type].objects.aggregate(last=Max('date'))['last']
+            for attendance_type in attendance_types
+        ] if not options['end_date'] else []
+        end_date = max([end_date] + [day for day in latest if day])
+
+        written = 0
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            chunk_end = min(chunk_start + timedelta(days=options['chunk_days'] - 1), end_date)
+            written += attendance_rollup_service.rebuild(chunk_start, chunk_end, attendance_types)
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{tenant.schema_name}: rebuilt {written} rollup rows for {start_date}..{end_date}"
+        ))
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('academics', '0003_alter_classteacher_start_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('attendance_type', models.CharField(choices=[('student', 'Student'), ('staff', 'Staff'), ('hostel', 'Hostel'), ('transport', 'Transport')], max_length=20, verbose_name='Attendance Type')),
+                ('scope', models.CharField(default=':', max_length=80, verbose_name='Scope')),
+                ('status', models.CharField(max_length=20, verbose_name='Status')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('class_name', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='academics.schoolclass', verbose_name='Class')),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='academics.section', verbose_name='Section')),
+            ],
+            options={
+                'verbose_name': 'Daily Attendance Rollup',
+                'verbose_name_plural': 'Daily Attendance Rollups',
+                'db_table': 'attendance_daily_rollup',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailyattendancerollup',
+            index=models.Index(fields=['attendance_type', 'date'], name='att_rollup_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyattendancerollup',
+            index=models.Index(fields=['class_name', 'date'], name='att_rollup_class_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyattendancerollup',
+            index=models.Index(fields=['section', 'date'], name='att_rollup_section_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyattendancerollup',
+            constraint=models.UniqueConstraint(fields=('date', 'attendance_type', 'scope', 'status'), name='unique_attendance_rollup_bucket'),
+        ),
+    ]
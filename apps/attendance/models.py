@@ -1,2 +1,70 @@
-
 from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class DailyAttendanceRollup(models.Model):
+    """
+    Materialized attendance counts per date x type x class/section x status.
+
+    Maintained incrementally by the attendance signals and rebuildable with
+    ``manage.py rebuild_attendance_rollups``; stats and summary endpoints
+    read these rows instead of scanning the raw attendance tables.
+    Tenancy comes from the schema, so there is no tenant column.
+    """
+    ATTENDANCE_TYPE_CHOICES = (
+        ("student", _("Student")),
+        ("staff", _("Staff")),
+        ("hostel", _("Hostel")),
+        ("transport", _("Transport")),
+    )
+
+    date = models.DateField(verbose_name=_("Date"))
+    attendance_type = models.CharField(
+        max_length=20,
+        choices=ATTENDANCE_TYPE_CHOICES,
+        verbose_name=_("Attendance Type")
+    )
+    class_name = models.ForeignKey(
+        "academics.SchoolClass",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="attendance_rollups",
+        verbose_name=_("Class")
+    )
+    section = models.ForeignKey(
+        "academics.Section",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="attendance_rollups",
+        verbose_name=_("Section")
+    )
+    # "<class_id>:<section_id>" ("" parts for none) so the unique key has no NULLs
+    scope = models.CharField(max_length=80, default=":", verbose_name=_("Scope"))
+    status = models.CharField(max_length=20, verbose_name=_("Status"))
+    count = models.PositiveIntegerField(default=0, verbose_name=_("Count"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
+
+    class Meta:
+        db_table = "attendance_daily_rollup"
+        verbose_name = _("Daily Attendance Rollup")
+        verbose_name_plural = _("Daily Attendance Rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "attendance_type", "scope", "status"],
+                name="unique_attendance_rollup_bucket",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["attendance_type", "date"], name="att_rollup_type_date_idx"),
+            models.Index(fields=["class_name", "date"], name="att_rollup_class_date_idx"),
+            models.Index(fields=["section", "date"], name="att_rollup_section_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.attendance_type} {self.status}: {self.count}"
+
+    @staticmethod
+    def make_scope(class_id, section_id):
+        return f"{class_id or ''}:{section_id or ''}"
@@ -0,0 +1,150 @@
+"""
+Set-based marking of a whole class/section roster in a handful of queries
+"""
+
+import logging
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.academics.models import StudentAttendance
+from apps.attendance.services.attendance_rollup import attendance_rollup_service
+from apps.attendance.services.attendance_stats import attendance_stats_service
+from apps.core.services.audit_service import AuditService
+from apps.students.models import Student
+
+logger = logging.getLogger(__name__)
+
+
+VALID_STATUSES = {choice for choice, _ in StudentAttendance.ATTENDANCE_STATUS}
+VALID_SESSIONS = {choice for choice, _ in StudentAttendance.SESSION_CHOICES}
+
+
+class BulkAttendanceMarker:
+    """
+    Marks attendance for many students of one date in one pass.
+
+    1. The roster is validated with a single query (active students, and
+       optionally only those of ``class_id``/``section_id``).
+    2. Rows are upserted with ``bulk_create(update_conflicts=True)`` on the
+       ``(student, date, session)`` unique key. Data signatures are set by
+       the manager; per-row ``full_clean`` is replaced by the roster and
+       choice checks done here.
+    3. The affected rollup buckets are recounted and one audit entry per
+       student is written in bulk.
+
+    Model signals do not fire for bulk upserts, which is why the rollup and
+    cached statistics are refreshed explicitly.
+    """
+
+    UPDATE_FIELDS = [
+        'status', 'remarks', 'marked_by', 'class_name', 'section',
+        'updated_by', 'updated_at', 'data_signature', 'is_active',
+    ]
+
+    def __init__(self, user=None, tenant=None, request=None):
+        self.user = user if user is not None and user.is_authenticated else None
+        self.tenant = tenant
+        self.request = request
+
+    def validate(self, records, class_id=None, section_id=None, session='FULL_DAY'):
+        """Return ``{student_id: (class_id, section_id, tenant_id)}`` or raise ValidationError"""
+        errors = {}
+        if session not in VALID_SESSIONS:
+            errors['session'] = f"Invalid session '{session}'"
+        if not records:
+            errors['records'] = "At least one record is required"
+
+        seen = set()
+        for index, record in enumerate(records):
+            student_id = str(record.get('student_id') or '')
+            if not student_id:
+                errors[f'records[{index}]'] = "student_id is required"
+            elif student_id in seen:
+                errors[f'records[{index}]'] = f"Duplicate student {student_id}"
+            elif record.get('status') not in VALID_STATUSES:
+                errors[f'records[{index}]'] = f"Invalid status '{record.get('status')}'"
+            seen.add(student_id)
+        if errors:
+            raise ValidationError(errors)
+
+        roster = Student.objects.filter(id__in=seen, status='ACTIVE')
+        if class_id:
+            roster = roster.filter(current_class_id=class_id)
+        if section_id:
+            roster = roster.filter(section_id=section_id)
+        roster = {
+            str(student_id): (current_class_id, current_section_id, tenant_id)
+            for student_id, current_class_id, current_section_id, tenant_id in roster.values_list(
+                'id', 'current_class_id', 'section_id', 'tenant_id'
+            )
+        }
+
+        missing = sorted(seen - set(roster))
+        if missing:
+            raise ValidationError({'students': [f"Not an active student of this class/section: {sid}" for sid in missing]})
+        unplaced = sorted(sid for sid, (cid, sec, _) in roster.items() if not cid or not sec)
+        if unplaced:
+            raise ValidationError({'students': [f"Student has no class/section assigned: {sid}" for sid in unplaced]})
+        return roster
+
+    def mark(self, target_date, records, class_id=None, section_id=None, session='FULL_DAY'):
+        """Upsert ``records`` (``[{'student_id', 'status', 'remarks'?}]``); returns a summary"""
+        roster = self.validate(records, class_id, section_id, session)
+
+        rows = []
+        for record in records:
+            student_id = str(record['student_id'])
+            current_class_id, current_section_id, tenant_id = roster[student_id]
+            rows.append(StudentAttendance(
+                student_id=student_id,
+                date=target_date,
+                session=session,
+                status=record['status'],
+                remarks=record.get('remarks') or '',
+                class_name_id=current_class_id,
+                section_id=current_section_id,
+                marked_by=self.user,
+                created_by=self.user,
+                updated_by=self.user,
+                tenant_id=getattr(self.tenant, 'id', None) or tenant_id,
+            ))
+
+        scopes = {(row.class_name_id, row.section_id) for row in rows}
+        with transaction.atomic():
+            StudentAttendance.objects.bulk_create(
+                rows,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['student', 'date', 'session'],
+                update_fields=self.UPDATE_FIELDS,
+            )
+            attendance_rollup_service.refresh_scopes(target_date, 'student', scopes, VALID_STATUSES)
+            transaction.on_commit(lambda: attendance_stats_service.invalidate(target_date))
+
+        AuditService.submit_audit_entries([
+            {
+                'action': 'BULK_OPERATION',
+                'resource_type': 'StudentAttendance',
+                'resource_id': str(row.student_id),
+                'resource_name': f"{row.student_id} {target_date} {session}",
+                'user': self.user,
+                'request': self.request,
+                'tenant': self.tenant,
+                'new_state': {'status': row.status, 'date': str(target_date), 'session': session},
+            }
+            for row in rows
+        ])
+
+        counts = {}
+        for row in rows:
+            counts[row.status] = counts.get(row.status, 0) + 1
+        logger.info(f"Marked attendance for {len(rows)} students on {target_date}")
+        return {
+            'date': target_date,
+            'session': session,
+            'marked': len(rows),
+            'status_counts': counts,
+            'marked_at': timezone.now(),
+        }
@@ -0,0 +1,227 @@
+"""
+Incremental maintenance and rebuilding of the daily attendance rollup
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from apps.academics.models import StudentAttendance
+from apps.attendance.models import DailyAttendanceRollup
+from apps.hr.models import StaffAttendance
+from apps.hostel.models import HostelAttendance
+from apps.transportation.models import TransportAttendance
+
+logger = logging.getLogger(__name__)
+
+
+ATTENDANCE_MODELS = {
+    'student': StudentAttendance,
+    'staff': StaffAttendance,
+    'hostel': HostelAttendance,
+    'transport': TransportAttendance,
+}
+
+# Raw-table lookups that place a row in a class/section bucket (hostel and
+# transport rows store the student's class and section when marked)
+SCOPE_FIELDS = {
+    'student': ('class_name', 'section'),
+    'staff': (None, None),
+    'hostel': ('class_name', 'section'),
+    'transport': ('class_name', 'section'),
+}
+
+SNAPSHOT_FIELDS = ('date', 'status', 'is_active', 'class_name_id', 'section_id')
+
+
+class AttendanceRollupService:
+    """
+    Keeps ``DailyAttendanceRollup`` in step with the raw attendance tables.
+
+    Every attendance instance remembers the bucket it was loaded in
+    (``snapshot``); on save the old bucket is decremented and the new one
+    incremented with ``F()`` updates inside the writing transaction, so
+    concurrent markers never lose counts. Bulk writes that bypass model
+    signals (``bulk_create``, ``QuerySet.update``) should call ``rebuild``
+    for the affected dates afterwards.
+    """
+
+    def __init__(self):
+        self.types_by_model = {model: attendance_type for attendance_type, model in ATTENDANCE_MODELS.items()}
+
+    # ------------------------------------------------------------------
+    # Buckets
+    # ------------------------------------------------------------------
+    @staticmethod
+    def snapshot(instance):
+        """Bucket-relevant field values as currently held by ``instance``"""
+        return {field: instance.__dict__.get(field) for field in SNAPSHOT_FIELDS}
+
+    def bucket(self, attendance_type, values):
+        """``(date, type, class_id, section_id, status)`` or None when not counted"""
+        if not values.get('date') or not values.get('status') or values.get('is_active') is False:
+            return None
+        if SCOPE_FIELDS[attendance_type][0]:
+            class_id, section_id = values.get('class_name_id'), values.get('section_id')
+        else:
+            class_id = section_id = None
+        return (values['date'], attendance_type, class_id, section_id, values['status'])
+
+    def apply(self, bucket, delta):
+        """Add ``delta`` to one rollup bucket, creating it on first use"""
+        day, attendance_type, class_id, section_id, status = bucket
+        lookup = {
+            'date': day,
+            'attendance_type': attendance_type,
+            'scope': DailyAttendanceRollup.make_scope(class_id, section_id),
+            'status': status,
+        }
+        if DailyAttendanceRollup.objects.filter(**lookup).update(count=F('count') + delta) or delta < 0:
+            return
+        try:
+            with transaction.atomic():
+                DailyAttendanceRollup.objects.create(
+                    class_name_id=class_id, section_id=section_id, count=delta, **lookup
+                )
+        except IntegrityError:
+            # Another writer created the bucket first
+            DailyAttendanceRollup.objects.filter(**lookup).update(count=F('count') + delta)
+
+    # ------------------------------------------------------------------
+    # Signal entry points
+    # ------------------------------------------------------------------
+    def record_save(self, instance, created):
+        attendance_type = self.types_by_model[type(instance)]
+        old_values = getattr(instance, '_rollup_snapshot', None)
+        new_values = self.snapshot(instance)
+
+        old = None if created or old_values is None else self.bucket(attendance_type, old_values)
+        new = self.bucket(attendance_type, new_values)
+        if old != new:
+            if old:
+                self.apply(old, -1)
+            if new:
+                self.apply(new, 1)
+        instance._rollup_snapshot = new_values
+        return old, new
+
+    def record_delete(self, instance):
+        attendance_type = self.types_by_model[type(instance)]
+        values = getattr(instance, '_rollup_snapshot', None) or self.snapshot(instance)
+        bucket = self.bucket(attendance_type, values)
+        if bucket:
+            self.apply(bucket, -1)
+        return bucket
+
+    # ------------------------------------------------------------------
+    # Rebuilding
+    # ------------------------------------------------------------------
+    def rebuild(self, start_date, end_date=None, attendance_types=None):
+        """Recompute the rollup for a date range from the raw tables; returns rows written"""
+        from apps.attendance.services.attendance_stats import attendance_stats_service
+
+        end_date = end_date or start_date
+        attendance_types = attendance_types or list(ATTENDANCE_MODELS)
+        written = 0
+
+        with transaction.atomic():
+            DailyAttendanceRollup.objects.filter(
+                date__gte=start_date, date__lte=end_date, attendance_type__in=attendance_types
+            ).delete()
+
+            for attendance_type in attendance_types:
+                model = ATTENDANCE_MODELS[attendance_type]
+                class_field, section_field = SCOPE_FIELDS[attendance_type]
+                group_by = ['date', 'status'] + [field for field in (class_field, section_field) if field]
+
+                rows = model.objects.filter(
+                    date__gte=start_date, date__lte=end_date
+                ).order_by().values(*group_by).annotate(total=Count('id'))
+
+                buckets = []
+                for row in rows:
+                    class_id = row.get(class_field) if class_field else None
+                    section_id = row.get(section_field) if section_field else None
+                    buckets.append(DailyAttendanceRollup(
+                        date=row['date'],
+                        attendance_type=attendance_type,
+                        class_name_id=class_id,
+                        section_id=section_id,
+                        scope=DailyAttendanceRollup.make_scope(class_id, section_id),
+                        status=row['status'],
+                        count=row['total'],
+                    ))
+                DailyAttendanceRollup.objects.bulk_create(buckets, batch_size=1000)
+                written += len(buckets)
+
+        day = start_date
+        while day <= end_date:
+            attendance_stats_service.invalidate(day)
+            day += timedelta(days=1)
+
+        logger.info(f"Rebuilt {written} attendance rollup rows for {start_date}..{end_date}")
+        return written
+
+    def refresh_scopes(self, day, attendance_type, scopes, statuses):
+        """
+        Recount ``day`` for the given ``(class_id, section_id)`` scopes after a
+        bulk write: one grouped query plus one upsert of absolute counts
+        (statuses that vanished are written as 0).
+        """
+        if not scopes:
+            return 0
+        model = ATTENDANCE_MODELS[attendance_type]
+        class_field, section_field = SCOPE_FIELDS[attendance_type]
+
+        counts = {(class_id, section_id, status): 0 for class_id, section_id in scopes for status in statuses}
+        scope_filter = Q()
+        for class_id, section_id in scopes:
+            scope_filter |= Q(**{class_field: class_id, section_field: section_id})
+        rows = model.objects.filter(scope_filter, date=day).order_by().values(
+            class_field, section_field, 'status'
+        ).annotate(total=Count('id'))
+        for row in rows:
+            counts[(row[class_field], row[section_field], row['status'])] = row['total']
+
+        DailyAttendanceRollup.objects.bulk_create(
+            [
+                DailyAttendanceRollup(
+                    date=day,
+                    attendance_type=attendance_type,
+                    class_name_id=class_id,
+                    section_id=section_id,
+                    scope=DailyAttendanceRollup.make_scope(class_id, section_id),
+                    status=status,
+                    count=total,
+                )
+                for (class_id, section_id, status), total in counts.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['date', 'attendance_type', 'scope', 'status'],
+            update_fields=['count', 'updated_at'],
+        )
+        return len(counts)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    @staticmethod
+    def rollups(attendance_type=None, class_id=None, section_id=None, **date_filters):
+        queryset = DailyAttendanceRollup.objects.filter(**date_filters)
+        if attendance_type:
+            queryset = queryset.filter(attendance_type=attendance_type)
+        if class_id:
+            queryset = queryset.filter(class_name_id=class_id)
+        if section_id:
+            queryset = queryset.filter(section_id=section_id)
+        return queryset
+
+    @classmethod
+    def status_totals(cls, group_by=(), **filters):
+        """``Sum(count)`` per status (and per ``group_by`` fields) over matching rollups"""
+        return cls.rollups(**filters).order_by().values(*group_by, 'status').annotate(total=Sum('count'))
+
+
+attendance_rollup_service = AttendanceRollupService()
@@ -0,0 +1,174 @@
+"""
+Aggregated attendance statistics for dashboards and reports
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+
+from apps.attendance.services.attendance_rollup import attendance_rollup_service, ATTENDANCE_MODELS
+from apps.hr.models import Staff
+from apps.students.models import Student
+
+logger = logging.getLogger(__name__)
+
+
+# Statuses always present in count dicts (ON_LEAVE is folded into LEAVE)
+TRACKED_STATUSES = ('PRESENT', 'ABSENT', 'LATE', 'HALF_DAY', 'LEAVE')
+
+
+def percentage(part, total):
+    return round(part / total * 100, 1) if total > 0 else 0.0
+
+
+class AttendanceStatsService:
+    """
+    Attendance status counts for dashboards and reports, summed from the
+    ``DailyAttendanceRollup`` buckets rather than the raw attendance rows.
+
+    Results are cached per tenant schema and date. Every cache key embeds a
+    generation number for that tenant/date, so ``invalidate()`` (called from
+    the attendance ``post_save``/``post_delete`` signals and after bulk
+    writes) makes all cached variants - dashboard and filtered stats - stale
+    at once without having to enumerate them.
+    """
+
+    def __init__(self, timeout=None):
+        config = getattr(settings, 'ATTENDANCE_STATS_CACHE', {})
+        self.timeout = timeout if timeout is not None else config.get('TIMEOUT', 300)
+
+    # ------------------------------------------------------------------
+    # Cache keys
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _schema():
+        return getattr(connection, 'schema_name', None) or 'public'
+
+    def _generation_key(self, target_date, schema_name=None):
+        return f"attendance_stats:{schema_name or self._schema()}:{target_date}:gen"
+
+    def _key(self, target_date, *parts):
+        generation = cache.get(self._generation_key(target_date)) or 1
+        suffix = ':'.join(str(part or '-') for part in parts)
+        return f"attendance_stats:{self._schema()}:{target_date}:{generation}:{suffix}"
+
+    def invalidate(self, target_date, schema_name=None):
+        """Drop every cached statistic of a tenant for ``target_date``"""
+        key = self._generation_key(target_date, schema_name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+        except Exception as e:
+            logger.warning(f"Could not invalidate attendance stats {key}: {str(e)}")
+
+    def _cached(self, key, compute):
+        stats = cache.get(key)
+        if stats is None:
+            stats = compute()
+            cache.set(key, stats, self.timeout)
+        return stats
+
+    # ------------------------------------------------------------------
+    # Aggregation (reads DailyAttendanceRollup, never the raw tables)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def empty_counts():
+        counts = {'total': 0}
+        counts.update({status.lower(): 0 for status in TRACKED_STATUSES})
+        return counts
+
+    @classmethod
+    def fold(cls, rows, counts=None):
+        """Fold ``{'status': s, 'total': n}`` rollup rows into a status-count dict"""
+        counts = counts if counts is not None else cls.empty_counts()
+        for row in rows:
+            # LEAVE and ON_LEAVE are the same thing spelled per table
+            key = 'leave' if row['status'] == 'ON_LEAVE' else row['status'].lower()
+            counts[key] = counts.get(key, 0) + row['total']
+            counts['total'] += row['total']
+        return counts
+
+    @staticmethod
+    def roster_totals():
+        """Active students, hostel boarders, transport users and staff (two queries)"""
+        totals = Student.objects.filter(status='ACTIVE').aggregate(
+            student=Count('id', distinct=True),
+            hostel=Count('id', filter=Q(hostel_allocation__isnull=False), distinct=True),
+            transport=Count('id', filter=Q(transport_allocation__isnull=False), distinct=True),
+        )
+        totals['staff'] = Staff.objects.filter(employment_status='ACTIVE').count()
+        return totals
+
+    def dashboard_stats(self, target_date):
+        """Per-type roster size and status counts for the attendance dashboard"""
+        def compute():
+            totals = self.roster_totals()
+            by_type = {attendance_type: self.empty_counts() for attendance_type in ATTENDANCE_MODELS}
+            rows = attendance_rollup_service.status_totals(group_by=('attendance_type',), date=target_date)
+            for row in rows:
+                self.fold([row], by_type[row['attendance_type']])
+
+            stats = {}
+            for attendance_type, counts in by_type.items():
+                stats[attendance_type] = {
+                    'total': totals[attendance_type],
+                    'marked': counts['total'],
+                    'present': counts['present'],
+                    'absent': counts['absent'],
+                    'late': counts['late'],
+                    'percentage': percentage(counts['present'], totals[attendance_type]),
+                }
+            return stats
+
+        return self._cached(self._key(target_date, 'dashboard'), compute)
+
+    def student_trend(self, dates):
+        """
+        Student status counts for each of ``dates``; days missing from the
+        cache are computed together in one grouped query.
+        """
+        keys = {day: self._key(day, 'student_counts') for day in dates}
+        cached = cache.get_many(list(keys.values()))
+        trend = {day: cached[key] for day, key in keys.items() if key in cached}
+
+        missing = [day for day in dates if day not in trend]
+        if missing:
+            for day in missing:
+                trend[day] = self.empty_counts()
+            rows = attendance_rollup_service.status_totals(
+                group_by=('date',), attendance_type='student', date__in=missing
+            )
+            for row in rows:
+                self.fold([row], trend[row['date']])
+            cache.set_many({keys[day]: trend[day] for day in missing}, self.timeout)
+
+        return [(day, trend[day]) for day in dates]
+
+    def daily_stats(self, target_date, class_id=None, section_id=None):
+        """Student attendance counts for one date, optionally for a class/section"""
+        def compute():
+            return self.fold(attendance_rollup_service.status_totals(
+                attendance_type='student', class_id=class_id, section_id=section_id, date=target_date
+            ))
+
+        return self._cached(self._key(target_date, 'daily', class_id, section_id), compute)
+
+    def period_stats(self, start_date, end_date, attendance_type='student', class_id=None, section_id=None):
+        """
+        Status counts and attendance percentage over a month/term, summed
+        from at most (days x classes x statuses) rollup rows.
+        """
+        counts = self.fold(attendance_rollup_service.status_totals(
+            attendance_type=attendance_type, class_id=class_id, section_id=section_id,
+            date__gte=start_date, date__lte=end_date
+        ))
+        attended = counts['present'] + counts['late'] + counts['half_day'] / 2
+        counts['percentage'] = percentage(attended, counts['total'])
+        return counts
+
+
+attendance_stats_service = AttendanceStatsService()
@@ -0,0 +1,249 @@
+"""
+Per-tenant, memory-mapped storage for face embeddings
+"""
+
+import os
+import re
+import json
+import fcntl
+import logging
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from apps.attendance.services.face_matcher import FaceMatcher
+
+logger = logging.getLogger(__name__)
+
+
+class FaceEmbeddingStore:
+    """
+    Versioned on-disk embedding snapshot for one tenant schema and model.
+
+    Layout (under ``DEEPFACE_SETTINGS['EMBEDDING_STORE_ROOT']``)::
+
+        <schema>/<model>/CURRENT              -> "7"
+        <schema>/<model>/embeddings.v7.npy    (N x D float32, L2-normalized rows)
+        <schema>/<model>/norms.v7.npy         (N float32, original row norms)
+        <schema>/<model>/index.v7.json        (metadata per row)
+
+    Readers open the ``.npy`` files with ``mmap_mode='r'`` so every worker
+    process shares the same pages through the OS page cache. Writers build a
+    complete new version next to the old one and publish it by atomically
+    replacing ``CURRENT``; readers that still map an older version keep
+    working until they notice the new one.
+    """
+
+    KEEP_VERSIONS = 2
+
+    def __init__(self, schema_name, model_name, root=None):
+        self.schema_name = schema_name
+        self.model_name = model_name
+        root = root or getattr(settings, 'DEEPFACE_SETTINGS', {}).get(
+            'EMBEDDING_STORE_ROOT', os.path.join(str(settings.BASE_DIR), 'face_embeddings')
+        )
+        self.path = os.path.join(str(root), self._safe(schema_name), self._safe(model_name))
+
+    @staticmethod
+    def _safe(name):
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', str(name))
+
+    def _file(self, kind, version):
+        extension = 'json' if kind == 'index' else 'npy'
+        return os.path.join(self.path, f'{kind}.v{version}.{extension}')
+
+    @property
+    def current_file(self):
+        return os.path.join(self.path, 'CURRENT')
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+    def current_version(self):
+        """Published version number, or 0 when nothing has been written yet"""
+        try:
+            with open(self.current_file) as fh:
+                return int(fh.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def exists(self):
+        return self.current_version() > 0
+
+    def load(self):
+        """
+        Return ``(normalized, norms, index, version)`` for the current
+        version; the arrays are read-only memory maps.
+        """
+        version = self.current_version()
+        if not version:
+            return None
+        try:
+            normalized = np.load(self._file('embeddings', version), mmap_mode='r')
+            norms = np.load(self._file('norms', version), mmap_mode='r')
+            with open(self._file('index', version)) as fh:
+                index = json.load(fh)
+        except (FileNotFoundError, ValueError) as e:
+            logger.error(f"Embedding store {self.path} v{version} is unreadable: {str(e)}")
+            return None
+
+        if normalized.shape[0] != len(index['rows']) or norms.shape[0] != normalized.shape[0]:
+            logger.error(f"Embedding store {self.path} v{version} is inconsistent")
+            return None
+        return normalized, norms, index, version
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _write_lock(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, '.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def write(self, encodings, metadata):
+        """Publish a complete new snapshot; returns the new version number"""
+        normalized, norms = FaceMatcher.normalize(encodings) if len(encodings) else (
+            np.empty((0, 0), dtype=np.float32), np.empty(0, dtype=np.float32)
+        )
+        with self._write_lock():
+            return self._publish(normalized, norms, list(metadata))
+
+    def upsert(self, person_id, encoding, metadata):
+        """
+        Add or replace one person's embedding without retraining; copies the
+        current snapshot plus the changed row into a new version.
+        """
+        row, norm = FaceMatcher.normalize([encoding])
+        with self._write_lock():
+            current = self.load()
+            if current is None:
+                return self._publish(row, norm, [metadata])
+
+            normalized, norms, index, _ = current
+            rows = list(index['rows'])
+            existing = next((i for i, item in enumerate(rows) if item.get('id') == str(person_id)), None)
+            if existing is None:
+                normalized = np.vstack([normalized, row])
+                norms = np.concatenate([norms, norm])
+                rows.append(metadata)
+            else:
+                normalized, norms = np.array(normalized), np.array(norms)
+                normalized[existing], norms[existing] = row[0], norm[0]
+                rows[existing] = {**rows[existing], **metadata}
+            return self._publish(normalized, norms, rows)
+
+    def _publish(self, normalized, norms, rows):
+        version = self.current_version() + 1
+        tmp_suffix = f'.tmp{os.getpid()}'
+
+        for kind, array in (('embeddings', normalized), ('norms', norms)):
+            target = self._file(kind, version)
+            with open(target + tmp_suffix, 'wb') as fh:
+                np.save(fh, np.ascontiguousarray(array, dtype=np.float32))
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(target + tmp_suffix, target)
+
+        index = {
+            'version': version,
+            'model': self.model_name,
+            'dimension': int(normalized.shape[1]) if normalized.ndim == 2 else 0,
+            'trained_at': timezone.now().isoformat(),
+            'rows': rows,
+        }
+        target = self._file('index', version)
+        with open(target + tmp_suffix, 'w') as fh:
+            json.dump(index, fh, separators=(',', ':'))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(target + tmp_suffix, target)
+
+        # Atomic swap: readers see either the old or the new version
+        with open(self.current_file + tmp_suffix, 'w') as fh:
+            fh.write(str(version))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(self.current_file + tmp_suffix, self.current_file)
+
+        self._prune(version)
+        logger.info(f"Published {len(rows)} face embeddings to {self.path} (v{version})")
+        return version
+
+    # ------------------------------------------------------------------
+    # Training checkpoint
+    # ------------------------------------------------------------------
+    @property
+    def checkpoint_file(self):
+        return self.checkpoint_part_file(None)
+
+    def checkpoint_part_file(self, part):
+        """Checkpoint file of one chunk; parallel chunks never share a file"""
+        name = 'checkpoint.jsonl' if part is None else f'checkpoint.{self._safe(part)}.jsonl'
+        return os.path.join(self.path, name)
+
+    def _checkpoint_files(self):
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.path, name) for name in sorted(names)
+            if name.startswith('checkpoint.') and name.endswith('.jsonl')
+        ]
+
+    def append_checkpoint(self, entries, part=None):
+        """Record ``(person_id, photo_hash, embedding)`` tuples of a finished chunk"""
+        if not entries:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.checkpoint_part_file(part), 'a') as fh:
+            for person_id, photo_hash, embedding in entries:
+                fh.write(json.dumps({
+                    'id': person_id,
+                    'photo_hash': photo_hash,
+                    'embedding': np.asarray(embedding, dtype=np.float32).tolist(),
+                }) + '\n')
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def load_checkpoint(self):
+        """``(person_id, photo_hash) -> embedding`` from every chunk checkpointed so far"""
+        entries = {}
+        for path in self._checkpoint_files():
+            try:
+                with open(path) as fh:
+                    for line in fh:
+                        try:
+                            item = json.loads(line)
+                        except ValueError:
+                            # A crash mid-write leaves at most one torn line
+                            continue
+                        entries[(item['id'], item['photo_hash'])] = np.asarray(item['embedding'], dtype=np.float32)
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def clear_checkpoint(self):
+        for path in self._checkpoint_files():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _prune(self, version):
+        # Unlinking is safe for readers still mapping an old version (POSIX)
+        old = version - self.KEEP_VERSIONS
+        if old < 1:
+            return
+        for kind in ('embeddings', 'norms', 'index'):
+            try:
+                os.remove(self._file(kind, old))
+            except FileNotFoundError:
+                pass
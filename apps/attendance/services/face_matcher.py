@@ -0,0 +1,197 @@
+"""
+Vectorized nearest-neighbour matching for face embeddings
+"""
+
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+
+class FaceMatcher:
+    """
+    Keeps known face embeddings as one contiguous float32 matrix and finds the
+    closest matches with a single matrix-vector product.
+
+    Rows are stored L2-normalized together with their original norms, so
+    cosine and euclidean_l2 distances reduce to a dot product and plain
+    euclidean distance is recovered from the norms. The arrays can be
+    read-only memory maps (see ``FaceEmbeddingStore``); nothing is copied
+    until the matcher is modified. An optional partition index (per person
+    type, class, section or department) restricts the candidate rows.
+    """
+
+    METRICS = ('cosine', 'euclidean', 'euclidean_l2')
+
+    # Metadata keys that get their own partition, e.g. "class_id:<uuid>"
+    PARTITION_KEYS = ('type', 'class_id', 'section_id', 'department_id')
+
+    def __init__(self, metric='cosine'):
+        if metric not in self.METRICS:
+            raise ValueError(f"Unsupported distance metric: {metric}")
+        self.metric = metric
+        self._lock = threading.RLock()
+        self._reset(0)
+
+    def _reset(self, dimension):
+        self.normalized = np.empty((0, dimension), dtype=np.float32)
+        self.norms = np.empty(0, dtype=np.float32)
+        self.partitions = {}
+
+    def __len__(self):
+        return self.normalized.shape[0]
+
+    @property
+    def dimension(self):
+        return self.normalized.shape[1]
+
+    def embeddings(self):
+        """Original (un-normalized) embeddings as a new float32 array"""
+        return self.normalized * self.norms[:, None]
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def build(self, encodings, metadata=None):
+        """(Re)build the matrix from a sequence of embeddings"""
+        with self._lock:
+            if len(encodings) == 0:
+                self._reset(0)
+                return self
+            self.normalized, self.norms = self.normalize(encodings)
+            self.partitions = self._build_partitions(metadata or [])
+        return self
+
+    def attach(self, normalized, norms, metadata=None):
+        """Use already-normalized arrays (e.g. memory maps) without copying them"""
+        with self._lock:
+            self.normalized = normalized
+            self.norms = norms
+            self.partitions = self._build_partitions(metadata or [])
+        return self
+
+    @staticmethod
+    def normalize(encodings):
+        """Split embeddings into a contiguous unit-row matrix and a norm vector"""
+        raw = np.asarray(encodings, dtype=np.float32)
+        raw = raw.reshape(raw.shape[0], -1)
+        norms = np.linalg.norm(raw, axis=1).astype(np.float32)
+        safe_norms = np.where(norms == 0, 1.0, norms).astype(np.float32)
+        normalized = np.ascontiguousarray(raw / safe_norms[:, None], dtype=np.float32)
+        return normalized, norms
+
+    def _build_partitions(self, metadata):
+        buckets = defaultdict(list)
+        for idx, item in enumerate(metadata):
+            for key in self.PARTITION_KEYS:
+                value = item.get(key)
+                if value:
+                    buckets[f'{key}:{value}'].append(idx)
+        return {key: np.asarray(rows, dtype=np.intp) for key, rows in buckets.items()}
+
+    def upsert(self, idx, encoding, metadata=None):
+        """Replace row ``idx`` or append a new row when ``idx`` == len(self)"""
+        with self._lock:
+            row, norm = self.normalize([encoding])
+            if idx < len(self):
+                normalized, norms = np.array(self.normalized), np.array(self.norms)
+                normalized[idx], norms[idx] = row[0], norm[0]
+            elif idx == len(self):
+                normalized = row if len(self) == 0 else np.vstack([self.normalized, row])
+                norms = np.concatenate([self.norms, norm])
+            else:
+                raise IndexError(f"Row {idx} is out of range for {len(self)} encodings")
+            self.normalized, self.norms = np.ascontiguousarray(normalized), norms
+            if metadata is not None:
+                self._add_to_partitions(idx, metadata)
+
+    def _add_to_partitions(self, idx, metadata):
+        for key in self.PARTITION_KEYS:
+            value = metadata.get(key)
+            if not value:
+                continue
+            name = f'{key}:{value}'
+            rows = self.partitions.get(name)
+            if rows is None:
+                self.partitions[name] = np.asarray([idx], dtype=np.intp)
+            elif idx not in rows:
+                self.partitions[name] = np.append(rows, idx)
+
+    # ------------------------------------------------------------------
+    # Searching
+    # ------------------------------------------------------------------
+    def candidate_rows(self, partition=None):
+        """Row indices for one partition key, a list of keys (union) or None (all rows)"""
+        if partition is None:
+            return None
+        keys = [partition] if isinstance(partition, str) else list(partition)
+        rows = [self.partitions[key] for key in keys if key in self.partitions]
+        if not rows:
+            return np.empty(0, dtype=np.intp)
+        return rows[0] if len(rows) == 1 else np.unique(np.concatenate(rows))
+
+    def distances(self, embedding, rows=None):
+        """Distances from ``embedding`` to every (candidate) row"""
+        query = np.asarray(embedding, dtype=np.float32).ravel()
+        matrix = self.normalized if rows is None else self.normalized[rows]
+        if self.metric == 'euclidean':
+            # |r - q|^2 = |r|^2 + |q|^2 - 2 |r| (r_hat . q)
+            norms = self.norms if rows is None else self.norms[rows]
+            squared = norms * norms + np.dot(query, query) - 2.0 * norms * (matrix @ query)
+            return np.sqrt(np.maximum(squared, 0.0))
+
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        similarity = matrix @ query
+        if self.metric == 'cosine':
+            return 1.0 - similarity
+        return np.sqrt(np.maximum(2.0 - 2.0 * similarity, 0.0))
+
+    def search(self, embedding, k=1, partition=None):
+        """
+        Return up to ``k`` ``(row_index, distance)`` pairs, closest first
+        """
+        with self._lock:
+            if len(self) == 0:
+                return []
+            rows = self.candidate_rows(partition)
+            if rows is not None and len(rows) == 0:
+                return []
+            distances = self.distances(embedding, rows)
+
+        k = min(k, distances.shape[0])
+        if k < distances.shape[0]:
+            top = np.argpartition(distances, k - 1)[:k]
+            top = top[np.argsort(distances[top])]
+        else:
+            top = np.argsort(distances)
+        indices = top if rows is None else rows[top]
+        return [(int(i), float(d)) for i, d in zip(indices, distances[top])]
+
+    def search_batch(self, embeddings, k=1):
+        """
+        Top-k matches for several query embeddings with one matrix-matrix product
+        """
+        with self._lock:
+            if len(self) == 0 or len(embeddings) == 0:
+                return [[] for _ in range(len(embeddings))]
+            queries = np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+            if self.metric == 'euclidean':
+                q_sq = np.einsum('ij,ij->i', queries, queries)
+                dots = (queries @ self.normalized.T) * self.norms[None, :]
+                squared = (self.norms * self.norms)[None, :] + q_sq[:, None] - 2.0 * dots
+                distances = np.sqrt(np.maximum(squared, 0.0))
+            else:
+                norms = np.linalg.norm(queries, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                similarity = (queries / norms) @ self.normalized.T
+                distances = 1.0 - similarity if self.metric == 'cosine' else np.sqrt(np.maximum(2.0 - 2.0 * similarity, 0.0))
+
+        k = min(k, distances.shape[1])
+        results = []
+        for row in distances:
+            top = np.argpartition(row, k - 1)[:k] if k < row.shape[0] else np.arange(row.shape[0])
+            top = top[np.argsort(row[top])]
+            results.append([(int(i), float(row[i])) for i in top])
+        return results
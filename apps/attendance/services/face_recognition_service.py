@@ -16,20 +16,52 @@ import numpy as np
 import cv2
 import pickle
 from deepface import DeepFace
-from deepface.commons import functions, distance as dst
+from deepface.commons import functions
 from django.conf import settings
-from django.core.cache import cache
-from django.db import transaction
+from django.db import transaction, connection
 from django.utils import timezone
 from apps.students.models import Student
 from apps.hr.models import Staff
+from apps.attendance.services.face_matcher import FaceMatcher
+from apps.attendance.services.embedding_store import FaceEmbeddingStore
+from apps.core.services import job_lock
 import logging
-from datetime import datetime, timedelta
+import threading
+import time
 import hashlib
 
 logger = logging.getLogger(__name__)
 
 
+class TenantFaceIndex:
+    """Known faces of one tenant schema, backed by a FaceEmbeddingStore"""
+    
+    def __init__(self, store, metric):
+        self.store = store
+        self.matcher = FaceMatcher(metric)
+        self.metadata = []
+        self.encoding_cache = {}
+        self.version = 0
+        self.trained_at = None
+        self.checked_at = 0.0
+    
+    def refresh(self):
+        """Attach the store's current version if it changed; returns True when loaded"""
+        self.checked_at = time.monotonic()
+        if self.store.current_version() == self.version:
+            return self.version > 0
+        loaded = self.store.load()
+        if loaded is None:
+            return False
+        normalized, norms, index, version = loaded
+        self.metadata = index['rows']
+        self.encoding_cache = {item.get('id'): idx for idx, item in enumerate(self.metadata) if item.get('id')}
+        self.matcher.attach(normalized, norms, self.metadata)
+        self.version = version
+        self.trained_at = index.get('trained_at')
+        return True
+
+
 class DeepFaceRecognitionService:
     """Advanced face recognition service using DeepFace with multiple model support"""
     
@@ -62,15 +94,11 @@ class DeepFaceRecognitionService:
             self.distance_metric = getattr(settings, 'DEEPFACE_METRIC', 'cosine')
             self.threshold = getattr(settings, 'DEEPFACE_THRESHOLD', 0.4)
             
-            # Cache keys
-            self.encodings_cache_key = f'deepface_encodings_{self.model_name}'
-            self.metadata_cache_key = f'deepface_metadata_{self.model_name}'
-            self.last_trained_key = 'deepface_last_trained'
+            self.store_refresh_interval = getattr(settings, 'DEEPFACE_SETTINGS', {}).get('STORE_REFRESH_INTERVAL', 5)
             
-            # Initialize
-            self.known_face_encodings = []
-            self.known_face_metadata = []
-            self.encoding_cache = {}  # For quick lookup
+            # Known faces per tenant schema (see TenantFaceIndex)
+            self._tenant_indexes = {}
+            self._index_lock = threading.Lock()
             
             # Load pre-trained model
             try:
@@ -84,7 +112,6 @@ class DeepFaceRecognitionService:
                 self.model = None
             
             self._lock = True
-            self.load_or_train_encodings()
     
     def get_model_info(self):
         """Get information about the current model"""
@@ -97,114 +124,106 @@ class DeepFaceRecognitionService:
             'available_metrics': self.AVAILABLE_METRICS
         }
     
-    @transaction.atomic
-    def load_or_train_encodings(self):
+    # ------------------------------------------------------------------
+    # Per-tenant face index
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _current_schema():
+        return getattr(connection, 'schema_name', None) or 'public'
+    
+    def _matcher_metric(self):
+        return self.distance_metric if self.distance_metric in FaceMatcher.METRICS else 'cosine'
+    
+    def get_store(self, schema_name=None):
+        return FaceEmbeddingStore(schema_name or self._current_schema(), self.model_name)
+    
+    def _index(self, schema_name=None):
+        """Face index for ``schema_name`` (default: schema of the current connection)"""
+        schema_name = schema_name or self._current_schema()
+        index = self._tenant_indexes.get(schema_name)
+        if index is None:
+            with self._index_lock:
+                index = self._tenant_indexes.get(schema_name)
+                if index is None:
+                    index = TenantFaceIndex(self.get_store(schema_name), self._matcher_metric())
+                    self._tenant_indexes[schema_name] = index
+                    self.load_or_train_encodings(index)
+                    return index
+        if time.monotonic() - index.checked_at > self.store_refresh_interval:
+            index.refresh()
+        return index
+    
+    @property
+    def matcher(self):
+        return self._index().matcher
+    
+    @property
+    def known_face_metadata(self):
+        return self._index().metadata
+    
+    @property
+    def encoding_cache(self):
+        return self._index().encoding_cache
+    
+    @property
+    def known_face_encodings(self):
+        """Known embeddings of the current tenant as an (N x D) array"""
+        return self._index().matcher.embeddings()
+    
+    def load_or_train_encodings(self, index=None):
         """Load existing encodings or train new ones"""
-        cached_data = cache.get(self.encodings_cache_key)
-        cached_metadata = cache.get(self.metadata_cache_key)
-        
-        if cached_data and cached_metadata and self._validate_cache_data(cached_data, cached_metadata):
-            self.known_face_encodings = cached_data
-            self.known_face_metadata = cached_metadata
-            self._build_encoding_cache()
-            
-            logger.info(f"Loaded {len(self.known_face_encodings)} face encodings from cache")
+        index = index or self._index()
+        if index.refresh():
+            logger.info(f"Loaded {len(index.matcher)} face encodings for {index.store.schema_name} (v{index.version})")
             logger.info(f"Model: {self.model_name}, Threshold: {self.threshold}")
         else:
-            logger.info("Cache invalid or expired, training new encodings")
-            self.train_all_faces()
+            # Training embeds every photo of the tenant; never do it inline,
+            # and queue it once across all processes (the task drops the lock)
+            from apps.attendance.tasks import train_face_encodings_task, face_training_lock_key
+            schema_name = index.store.schema_name
+            lock_key = face_training_lock_key(schema_name)
+            lock_timeout = getattr(settings, 'DEEPFACE_SETTINGS', {}).get('TRAINING', {}).get('LOCK_TIMEOUT', 6 * 60 * 60)
+            if not job_lock.acquire(lock_key, lock_timeout):
+                logger.info(f"No embedding store for {schema_name}, training already queued")
+                return
+            logger.info(f"No embedding store for {schema_name}, queueing training")
+            try:
+                train_face_encodings_task.delay(schema_name)
+            except Exception as e:
+                job_lock.release(lock_key)
+                logger.error(f"Could not queue face training for {schema_name}: {str(e)}")
     
-    def _validate_cache_data(self, encodings, metadata):
-        """Validate cache data integrity"""
-        if not isinstance(encodings, list) or not isinstance(metadata, list):
-            return False
-        
-        if len(encodings) != len(metadata):
-            return False
-        
-        # Check if cache is too old (max 30 days)
-        last_trained = cache.get(self.last_trained_key)
-        if last_trained:
-            if timezone.now() - last_trained > timedelta(days=30):
-                return False
-        
-        return True
+    def _publish(self, encodings, metadata):
+        """Write a new store version for the current tenant and attach it"""
+        index = self._index() if self._current_schema() in self._tenant_indexes else None
+        store = index.store if index else self.get_store()
+        store.write(encodings, metadata)
+        if index:
+            index.refresh()
     
-    def _build_encoding_cache(self):
-        """Build quick lookup cache for encodings"""
-        self.encoding_cache = {}
-        for idx, metadata in enumerate(self.known_face_metadata):
-            person_id = metadata.get('id')
-            if person_id:
-                self.encoding_cache[person_id] = idx
-    
-    def train_all_faces(self):
-        """Train face encodings for all students and staff with photos"""
-        self.known_face_encodings = []
-        self.known_face_metadata = []
-        
-        logger.info(f"Starting face encoding training with model: {self.model_name}")
-        
-        # Train student faces
-        students = Student.objects.filter(
-            status='ACTIVE'
-        ).select_related('current_class', 'section')
+    def train_all_faces(self, full=False, progress_callback=None):
+        """
+        Train face encodings for all students and staff with photos of the
+        current tenant. Unchanged photos reuse their stored embedding unless
+        ``full`` is set; see ``FaceTrainer``.
+        """
+        from apps.attendance.services.face_training import FaceTrainer
         
-        student_count = 0
-        for student in students:
-            encoding = self._get_face_encoding_for_student(student)
-            if encoding is not None:
-                self.known_face_encodings.append(encoding)
-                self.known_face_metadata.append({
-                    'id': str(student.id),
-                    'type': 'student',
-                    'name': student.full_name,
-                    'admission_number': student.admission_number,
-                    'class_id': str(student.current_class.id) if student.current_class else None,
-                    'section_id': str(student.section.id) if student.section else None,
-                    'added_at': timezone.now().isoformat(),
-                    'encoding_hash': self._generate_encoding_hash(encoding)
-                })
-                student_count += 1
+        schema_name = self._current_schema()
+        logger.info(f"Starting face encoding training for {schema_name} with model: {self.model_name}")
         
-        # Train staff faces
-        staff_members = Staff.objects.filter(
-            employment_status='ACTIVE'
-        ).select_related('user', 'department')
+        summary = FaceTrainer(self, schema_name, progress_callback=progress_callback).run(full=full)
         
-        staff_count = 0
-        for staff in staff_members:
-            encoding = self._get_face_encoding_for_staff(staff)
-            if encoding is not None:
-                self.known_face_encodings.append(encoding)
-                self.known_face_metadata.append({
-                    'id': str(staff.id),
-                    'type': 'staff',
-                    'name': staff.full_name,
-                    'employee_id': staff.employee_id,
-                    'department_id': str(staff.department.id) if staff.department else None,
-                    'designation': staff.designation.name if staff.designation else None,
-                    'added_at': timezone.now().isoformat(),
-                    'encoding_hash': self._generate_encoding_hash(encoding)
-                })
-                staff_count += 1
+        index = self._tenant_indexes.get(schema_name)
+        if index:
+            index.refresh()
         
-        # Cache encodings and metadata
-        if self.known_face_encodings:
-            # Convert numpy arrays to lists for JSON serialization
-            encodings_list = [enc.tolist() if isinstance(enc, np.ndarray) else enc 
-                             for enc in self.known_face_encodings]
-            
-            cache.set(self.encodings_cache_key, encodings_list, timeout=86400 * 7)  # 7 days
-            cache.set(self.metadata_cache_key, self.known_face_metadata, timeout=86400 * 7)
-            cache.set(self.last_trained_key, timezone.now(), timeout=None)
-            
-            self._build_encoding_cache()
-            
-            logger.info(f"Trained {student_count} student faces and {staff_count} staff faces")
-            logger.info(f"Total encodings: {len(self.known_face_encodings)}")
+        if summary['encodings']:
+            logger.info(f"Trained {summary['students']} student faces and {summary['staff']} staff faces")
+            logger.info(f"Total encodings: {summary['encodings']} ({summary['reused']} unchanged, {summary['embedded']} embedded)")
         else:
             logger.warning("No face encodings were generated during training")
+        return summary
     
     def _generate_encoding_hash(self, encoding):
         """Generate hash for encoding for quick comparison"""
@@ -213,132 +232,84 @@ class DeepFaceRecognitionService:
             return hashlib.md5(encoding.tobytes()).hexdigest()
         return None
     
-    def _get_face_encoding_for_student(self, student):
-        """Extract face encoding from student's photo using DeepFace"""
-        try:
-            photo_doc = student.get_photo()
-            if not photo_doc or not photo_doc.file:
-                logger.debug(f"No photo for student {student.id}")
-                return None
-            
-            # Check if file exists
-            if not os.path.exists(photo_doc.file.path):
-                logger.warning(f"Photo file not found: {photo_doc.file.path}")
-                return None
-            
-            # Use DeepFace to extract embedding
-            try:
-                # Preprocess image
-                img = functions.preprocess_face(
-                    img=photo_doc.file.path,
-                    target_size=self.input_shape[:2],
-                    enforce_detection=True,
-                    detector_backend='opencv',  # or 'mtcnn', 'retinaface', etc.
-                    grayscale=False,
-                    align=True
-                )
-                
-                # Get embedding
-                embedding = self.model.predict(img)[0]
-                
-                # Normalize if needed (for cosine distance)
-                if self.distance_metric == 'cosine':
-                    embedding = embedding / np.linalg.norm(embedding)
-                
-                logger.debug(f"Generated embedding for student {student.id}")
-                return embedding
-                
-            except ValueError as e:
-                if "Face could not be detected" in str(e):
-                    logger.warning(f"No face detected in student {student.id} photo")
-                else:
-                    logger.error(f"DeepFace error for student {student.id}: {str(e)}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error encoding face for student {student.id}: {str(e)}")
-            return None
-    
-    def _get_face_encoding_for_staff(self, staff):
-        """Extract face encoding from staff's profile photo"""
-        try:
-            # First check for verified photo usage
-            photo_path = None
-            
-            # Check documents first (preferred)
-            photo_doc = staff.documents.filter(document_type='PHOTOGRAPH').first()
-            if photo_doc and photo_doc.file:
-                photo_path = photo_doc.file.path
-            
-            # Fallback to profile image
-            if not photo_path and staff.profile_image:
-                photo_path = staff.profile_image.path
-                
-            # Check if user has avatar
-            if not photo_path and hasattr(staff, 'user') and staff.user and hasattr(staff.user, 'avatar') and staff.user.avatar:
-                photo_path = staff.user.avatar.path
-
-            if not photo_path or not os.path.exists(photo_path):
-                logger.debug(f"No profile image for staff {staff.id}")
-                return None
-            
-            # Use DeepFace to extract embedding
-            try:
-                img = functions.preprocess_face(
-                    img=photo_path,
-                    target_size=self.input_shape[:2],
-                    enforce_detection=True,
-                    detector_backend='opencv',
-                    grayscale=False,
-                    align=True
-                )
-                
-                embedding = self.model.predict(img)[0]
-                
-                if self.distance_metric == 'cosine':
-                    embedding = embedding / np.linalg.norm(embedding)
-                
-                logger.debug(f"Generated embedding for staff {staff.id}")
-                return embedding
-                
-            except ValueError as e:
-                if "Face could not be detected" in str(e):
-                    logger.warning(f"No face detected in staff {staff.id} photo")
-                else:
-                    logger.error(f"DeepFace error for staff {staff.id}: {str(e)}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error encoding face for staff {staff.id}: {str(e)}")
-            return None
-    
-    def _process_image(self, image_path, enforce_detection=True):
-        """Process image for face detection and alignment"""
+    def _preprocess(self, img, enforce_detection=True):
+        """
+        Detect and align a face; ``img`` is a file path or a BGR NumPy array
+        (arrays are passed straight through, nothing is written to disk)
+        """
         try:
-            # Preprocess face
-            img = functions.preprocess_face(
-                img=image_path,
+            return functions.preprocess_face(
+                img=img,
                 target_size=self.input_shape[:2],
                 enforce_detection=enforce_detection,
                 detector_backend='opencv',
                 grayscale=False,
                 align=True
             )
-            
-            # Get embedding
-            embedding = self.model.predict(img)[0]
-            
-            if self.distance_metric == 'cosine':
-                embedding = embedding / np.linalg.norm(embedding)
-            
-            return embedding, True
-            
         except ValueError as e:
             if not enforce_detection and "Face could not be detected" in str(e):
-                return None, False
+                return None
             raise e
     
-    def recognize_face(self, image_path=None, image_array=None, min_confidence=0.5):
+    def _embed(self, faces):
+        """Embed one or more preprocessed faces with a single model call"""
+        embeddings = self.model.predict(np.vstack(faces))
+        
+        if self.distance_metric == 'cosine':
+            embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        
+        return embeddings
+    
+    def _process_image(self, img, enforce_detection=True):
+        """Process image (path or BGR array) for face detection and alignment"""
+        face = self._preprocess(img, enforce_detection=enforce_detection)
+        if face is None:
+            return None, False
+        
+        # Get embedding
+        return self._embed([face])[0], True
+    
+    def match_embedding(self, embedding, min_confidence=0.5, partition=None, top_k=1, schema_name=None):
+        """
+        Match an embedding against the known faces.
+
+        ``partition`` narrows the candidates, e.g. ``'type:student'`` or
+        ``['section_id:<uuid>', 'type:staff']``. ``schema_name`` selects the
+        tenant explicitly (worker threads have no tenant connection).
+        Returns: (metadata, message, confidence, distance)
+        """
+        index = self._index(schema_name)
+        
+        # Check if we have any known faces
+        if not len(index.matcher):
+            return None, "No faces trained in the system", 0.0, 0.0
+        
+        matches = index.matcher.search(embedding, k=top_k, partition=partition)
+        if not matches:
+            return None, "No matching face found in database", 0.0, 0.0
+        
+        best_match_idx, best_distance = matches[0]
+        
+        # Convert distance to confidence
+        confidence = max(0.0, min(1.0, 1.0 - (best_distance / self.threshold)))
+        
+        # Check if match meets threshold
+        if best_distance <= self.threshold and confidence >= min_confidence:
+            metadata = index.metadata[best_match_idx].copy()
+            metadata['confidence'] = float(confidence)
+            metadata['distance'] = float(best_distance)
+            metadata['threshold'] = float(self.threshold)
+            if top_k > 1:
+                metadata['candidates'] = [
+                    {'id': index.metadata[idx].get('id'), 'distance': distance}
+                    for idx, distance in matches
+                ]
+            
+            return metadata, "Face recognized successfully", confidence, best_distance
+        
+        return None, "No matching face found in database", confidence, best_distance
+    
+    def recognize_face(self, image_path=None, image_array=None, min_confidence=0.5, partition=None):
         """
         Recognize a face from an image using DeepFace
         Returns: (metadata, message, confidence, distance)
@@ -348,127 +319,76 @@ class DeepFaceRecognitionService:
             if image_path:
                 embedding, detected = self._process_image(image_path, enforce_detection=True)
             elif image_array is not None:
-                # Save temporary image for processing
-                import tempfile
-                temp_file = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-                cv2.imwrite(temp_file.name, image_array)
-                temp_file.close()
-                
-                try:
-                    embedding, detected = self._process_image(temp_file.name, enforce_detection=True)
-                finally:
-                    os.unlink(temp_file.name)
+                # Decoded frame goes straight to the detector
+                embedding, detected = self._process_image(image_array, enforce_detection=True)
             else:
                 raise ValueError("Either image_path or image_array must be provided")
             
             if not detected or embedding is None:
                 return None, "No face detected in image", 0.0, 0.0
             
-            # Check if we have any known faces
-            if not self.known_face_encodings:
-                return None, "No faces trained in the system", 0.0, 0.0
-            
-            # Find best match
-            best_match_idx = -1
-            best_distance = float('inf')
-            
-            for idx, known_encoding in enumerate(self.known_face_encodings):
-                # Calculate distance
-                if self.distance_metric == 'cosine':
-                    distance = dst.findCosineDistance(embedding, known_encoding)
-                elif self.distance_metric == 'euclidean':
-                    distance = dst.findEuclideanDistance(embedding, known_encoding)
-                elif self.distance_metric == 'euclidean_l2':
-                    distance = dst.findEuclideanDistance(
-                        dst.l2_normalize(embedding),
-                        dst.l2_normalize(known_encoding)
-                    )
-                else:
-                    distance = dst.findCosineDistance(embedding, known_encoding)
-                
-                if distance < best_distance:
-                    best_distance = distance
-                    best_match_idx = idx
-            
-            # Convert distance to confidence
-            confidence = max(0.0, min(1.0, 1.0 - (best_distance / self.threshold)))
-            
-            # Check if match meets threshold
-            if best_match_idx != -1 and best_distance <= self.threshold and confidence >= min_confidence:
-                metadata = self.known_face_metadata[best_match_idx].copy()
-                metadata['confidence'] = float(confidence)
-                metadata['distance'] = float(best_distance)
-                metadata['threshold'] = float(self.threshold)
-                
-                return metadata, "Face recognized successfully", confidence, best_distance
-            else:
-                return None, "No matching face found in database", confidence, best_distance
+            return self.match_embedding(embedding, min_confidence=min_confidence, partition=partition)
             
         except Exception as e:
             logger.error(f"Face recognition error: {str(e)}", exc_info=True)
             return None, f"Recognition error: {str(e)}", 0.0, 0.0
     
-    def recognize_multiple_faces(self, image_path, min_confidence=0.5):
-        """Recognize multiple faces in a single image"""
-        try:
-            # Use DeepFace's built-in multi-face recognition
-            results = DeepFace.find(
-                img_path=image_path,
-                db_path=None,  # We'll handle our own database
-                model_name=self.model_name,
-                distance_metric=self.distance_metric,
-                enforce_detection=True,
-                detector_backend='opencv',
-                align=True,
-                silent=True
+    _face_cascade = None
+    
+    @classmethod
+    def _get_face_cascade(cls):
+        """Haar cascade is loaded once per process"""
+        if cls._face_cascade is None:
+            cls._face_cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
             )
-            
-            # Since we can't pass our custom db, we'll implement custom logic
-            # Load image and detect faces
-            img = cv2.imread(image_path)
+        return cls._face_cascade
+    
+    def detect_faces(self, img):
+        """Face boxes ``(x, y, w, h)`` in a BGR array"""
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return self._get_face_cascade().detectMultiScale(gray, 1.1, 4)
+    
+    def prepare_faces(self, img):
+        """
+        Detect and align every face in a BGR array.
+        Returns: (preprocessed faces, locations as {'x', 'y', 'w', 'h'})
+        """
+        prepared, locations = [], []
+        for (x, y, w, h) in self.detect_faces(img):
+            try:
+                face = self._preprocess(img[y:y+h, x:x+w], enforce_detection=True)
+            except Exception as e:
+                logger.error(f"Error processing face: {str(e)}")
+                continue
+            prepared.append(face)
+            locations.append({'x': int(x), 'y': int(y), 'w': int(w), 'h': int(h)})
+        return prepared, locations
+    
+    def recognize_multiple_faces(self, image_path=None, min_confidence=0.5, image_array=None, partition=None):
+        """Recognize multiple faces in a single image (path or BGR array)"""
+        try:
+            img = image_array if image_array is not None else cv2.imread(image_path)
             if img is None:
                 return [], "Could not read image"
             
-            # Detect faces using OpenCV cascade
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            face_cascade = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            )
-            faces = face_cascade.detectMultiScale(gray, 1.1, 4)
+            prepared, locations = self.prepare_faces(img)
             
-            if len(faces) == 0:
+            if not locations:
                 return [], "No faces detected in image"
             
+            # Embed every aligned face in one batch
             recognized_faces = []
-            
-            # Process each face
-            for (x, y, w, h) in faces:
-                try:
-                    # Extract face region
-                    face_img = img[y:y+h, x:x+w]
-                    
-                    # Save temporary face image
-                    import tempfile
-                    temp_face = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-                    cv2.imwrite(temp_face.name, face_img)
-                    temp_face.close()
-                    
-                    # Recognize this face
-                    metadata, message, confidence, distance = self.recognize_face(
-                        image_path=temp_face.name,
-                        min_confidence=min_confidence
+            if prepared:
+                for embedding, location in zip(self._embed(prepared), locations):
+                    metadata, message, confidence, distance = self.match_embedding(
+                        embedding,
+                        min_confidence=min_confidence,
+                        partition=partition
                     )
-                    
-                    # Cleanup
-                    os.unlink(temp_face.name)
-                    
                     if metadata:
-                        metadata['face_location'] = {'x': int(x), 'y': int(y), 'w': int(w), 'h': int(h)}
+                        metadata['face_location'] = location
                         recognized_faces.append(metadata)
-                        
-                except Exception as e:
-                    logger.error(f"Error processing face: {str(e)}")
-                    continue
             
             return recognized_faces, f"Found {len(recognized_faces)} recognized faces"
             
@@ -521,45 +441,34 @@ class DeepFaceRecognitionService:
                 return False, "No face found in the provided image"
             
             # Check if person already has encoding
-            existing_idx = self.encoding_cache.get(str(person_id))
-            
-            if existing_idx is not None:
-                # Update existing encoding
-                self.known_face_encodings[existing_idx] = embedding
-                self.known_face_metadata[existing_idx]['encoding_hash'] = self._generate_encoding_hash(embedding)
-                self.known_face_metadata[existing_idx]['updated_at'] = timezone.now().isoformat()
-                action = "updated"
+            action = "updated" if str(person_id) in self.encoding_cache else "added"
+            
+            metadata = {
+                'id': str(person_id),
+                'type': person_type,
+                'name': person.full_name,
+                'admission_number': getattr(person, 'admission_number', None),
+                'employee_id': getattr(person, 'employee_id', None),
+                'encoding_hash': self._generate_encoding_hash(embedding),
+                'updated_at' if action == "updated" else 'added_at': timezone.now().isoformat(),
+            }
+            
+            # Add additional fields
+            if person_type == 'student':
+                metadata.update({
+                    'class_id': str(person.current_class.id) if person.current_class else None,
+                    'section_id': str(person.section.id) if person.section else None
+                })
             else:
-                # Add new encoding
-                metadata = {
-                    'id': str(person_id),
-                    'type': person_type,
-                    'name': person.full_name,
-                    'admission_number': getattr(person, 'admission_number', None),
-                    'employee_id': getattr(person, 'employee_id', None),
-                    'added_at': timezone.now().isoformat(),
-                    'encoding_hash': self._generate_encoding_hash(embedding)
-                }
-                
-                # Add additional fields
-                if person_type == 'student':
-                    metadata.update({
-                        'class_id': str(person.current_class.id) if person.current_class else None,
-                        'section_id': str(person.section.id) if person.section else None
-                    })
-                else:
-                    metadata.update({
-                        'department_id': str(person.department.id) if person.department else None,
-                        'designation': person.designation.name if person.designation else None
-                    })
-                
-                self.known_face_encodings.append(embedding)
-                self.known_face_metadata.append(metadata)
-                self.encoding_cache[str(person_id)] = len(self.known_face_encodings) - 1
-                action = "added"
+                metadata.update({
+                    'department_id': str(person.department.id) if person.department else None,
+                    'designation': person.designation.name if person.designation else None
+                })
             
-            # Update cache
-            self._update_cache()
+            # Append/replace in a new store version - no full retrain needed
+            index = self._index()
+            index.store.upsert(person_id, embedding, metadata)
+            index.refresh()
             
             return True, f"Face {action} successfully"
             
@@ -567,16 +476,6 @@ class DeepFaceRecognitionService:
             logger.error(f"Error adding new face: {str(e)}")
             return False, f"Error: {str(e)}"
     
-    def _update_cache(self):
-        """Update cache with current encodings"""
-        # Convert numpy arrays to lists
-        encodings_list = [enc.tolist() if isinstance(enc, np.ndarray) else enc 
-                         for enc in self.known_face_encodings]
-        
-        cache.set(self.encodings_cache_key, encodings_list, timeout=86400 * 7)
-        cache.set(self.metadata_cache_key, self.known_face_metadata, timeout=86400 * 7)
-        cache.set(self.last_trained_key, timezone.now(), timeout=None)
-    
     def retrain_model(self, model_name=None, metric=None):
         """Retrain model with optional new configuration"""
         try:
@@ -589,18 +488,14 @@ class DeepFaceRecognitionService:
             if metric and metric in self.AVAILABLE_METRICS:
                 self.distance_metric = metric
             
-            # Update cache keys
-            self.encodings_cache_key = f'deepface_encodings_{self.model_name}'
-            self.metadata_cache_key = f'deepface_metadata_{self.model_name}'
-            
-            # Clear old cache
-            cache.delete(f'deepface_encodings_*')
-            cache.delete(f'deepface_metadata_*')
+            # Stores are per model, so drop every loaded tenant index
+            with self._index_lock:
+                self._tenant_indexes = {}
             
-            # Retrain
-            self.train_all_faces()
+            # Retrain (a new model cannot reuse embeddings of the old one)
+            self.train_all_faces(full=True)
             
-            return True, f"Model retrained with {len(self.known_face_encodings)} encodings"
+            return True, f"Model retrained with {len(self.matcher)} encodings"
             
         except Exception as e:
             logger.error(f"Retraining error: {str(e)}")
@@ -608,16 +503,18 @@ class DeepFaceRecognitionService:
     
     def get_stats(self):
         """Get statistics about the face recognition system"""
+        index = self._index()
         stats = {
             'system_status': 'active',
             'model': self.get_model_info(),
-            'total_encodings': len(self.known_face_encodings),
-            'student_encodings': len([m for m in self.known_face_metadata if m['type'] == 'student']),
-            'staff_encodings': len([m for m in self.known_face_metadata if m['type'] == 'staff']),
-            'cache_timestamp': cache.get(self.last_trained_key),
+            'total_encodings': len(index.matcher),
+            'student_encodings': len([m for m in index.metadata if m['type'] == 'student']),
+            'staff_encodings': len([m for m in index.metadata if m['type'] == 'staff']),
+            'cache_timestamp': index.trained_at,
+            'store_version': index.version,
             'cache_size_mb': self._estimate_cache_size(),
             'threshold': self.threshold,
-            'encoding_dimension': self.known_face_encodings[0].shape[0] if self.known_face_encodings else 0
+            'encoding_dimension': index.matcher.dimension if len(index.matcher) else 0
         }
         
         return stats
@@ -626,15 +523,14 @@ class DeepFaceRecognitionService:
         """Estimate cache size in MB"""
         try:
             import sys
-            total_size = 0
+            index = self._index()
             
-            # Estimate size of encodings
-            for enc in self.known_face_encodings:
-                total_size += enc.nbytes if isinstance(enc, np.ndarray) else sys.getsizeof(enc)
+            # Estimate size of encodings (memory-mapped, shared between workers)
+            total_size = index.matcher.normalized.nbytes + index.matcher.norms.nbytes
             
             # Estimate size of metadata
             import json
-            metadata_json = json.dumps(self.known_face_metadata)
+            metadata_json = json.dumps(index.metadata)
             total_size += sys.getsizeof(metadata_json)
             
             return round(total_size / (1024 * 1024), 2)  # Convert to MB
@@ -644,19 +540,20 @@ class DeepFaceRecognitionService:
     
     def health_check(self):
         """Perform health check on the service"""
+        index = self._index()
         health = {
             'status': 'healthy',
             'model_loaded': self.model is not None,
-            'encodings_loaded': len(self.known_face_encodings) > 0,
-            'cache_valid': bool(cache.get(self.encodings_cache_key)),
+            'encodings_loaded': len(index.matcher) > 0,
+            'cache_valid': index.store.exists(),
             'timestamp': timezone.now().isoformat()
         }
         
         # Test with a sample if available
-        if self.known_face_encodings:
+        if len(index.matcher):
             try:
                 # Create a dummy test
-                test_embedding = np.random.randn(*self.known_face_encodings[0].shape)
+                test_embedding = np.random.randn(index.matcher.dimension)
                 test_embedding = test_embedding / np.linalg.norm(test_embedding)
                 
                 health['test_embedding_generated'] = True
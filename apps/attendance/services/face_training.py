@@ -0,0 +1,216 @@
+"""
+Parallel, incremental and resumable face enrollment training
+"""
+
+import os
+import hashlib
+import logging
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from apps.students.models import Student, StudentDocument
+from apps.hr.models import Staff, StaffDocument
+
+logger = logging.getLogger(__name__)
+
+
+def photo_fingerprint(path):
+    """SHA-1 of the photo's bytes; unchanged photos keep their embedding"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FaceTrainer:
+    """
+    Builds a tenant's face embedding store.
+
+    * Incremental: each person's photo is fingerprinted; if the current store
+      already has an embedding for the same person and photo it is reused.
+    * Parallel: ``prepare`` splits the photos still to embed into chunks,
+      which ``train_face_encodings_task`` embeds as one Celery subtask each,
+      so chunks run in separate worker processes, each with its own model.
+      ``run`` embeds them one after another in the calling process.
+    * Resumable: every finished chunk is appended to a checkpoint (one file
+      per chunk) next to the store, so a restarted run only embeds what is
+      still missing.
+    """
+
+    def __init__(self, service, schema_name, chunk_size=None, progress_callback=None):
+        config = getattr(settings, 'DEEPFACE_SETTINGS', {}).get('TRAINING', {})
+        self.service = service
+        self.schema_name = schema_name
+        self.store = service.get_store(schema_name)
+        self.chunk_size = chunk_size or config.get('CHUNK_SIZE', 32)
+        self.progress_callback = progress_callback
+
+    # ------------------------------------------------------------------
+    # Candidates
+    # ------------------------------------------------------------------
+    def collect_candidates(self):
+        """All ACTIVE students and staff with a readable photo, in two queries each"""
+        candidates = []
+
+        students = Student.objects.filter(status='ACTIVE').select_related(
+            'current_class', 'section'
+        ).prefetch_related(
+            Prefetch('documents', queryset=StudentDocument.objects.filter(doc_type='PHOTO'), to_attr='photo_documents')
+        )
+        for student in students:
+            photo = student.photo_documents[0] if student.photo_documents else None
+            path = photo.file.path if photo and photo.file else None
+            candidates.append((path, {
+                'id': str(student.id),
+                'type': 'student',
+                'name': student.full_name,
+                'admission_number': student.admission_number,
+                'class_id': str(student.current_class.id) if student.current_class else None,
+                'section_id': str(student.section.id) if student.section else None,
+            }))
+
+        staff_members = Staff.objects.filter(employment_status='ACTIVE').select_related(
+            'user', 'department', 'designation'
+        ).prefetch_related(
+            Prefetch('documents', queryset=StaffDocument.objects.filter(document_type='PHOTOGRAPH'), to_attr='photo_documents')
+        )
+        for staff in staff_members:
+            path = None
+            if staff.photo_documents and staff.photo_documents[0].file:
+                path = staff.photo_documents[0].file.path
+            elif staff.user and getattr(staff.user, 'avatar', None):
+                path = staff.user.avatar.path
+            candidates.append((path, {
+                'id': str(staff.id),
+                'type': 'staff',
+                'name': staff.full_name,
+                'employee_id': staff.employee_id,
+                'department_id': str(staff.department.id) if staff.department else None,
+                'designation': staff.designation.name if staff.designation else None,
+            }))
+
+        ready = []
+        for path, metadata in candidates:
+            if not path or not os.path.exists(path):
+                logger.debug(f"No photo for {metadata['type']} {metadata['id']}")
+                continue
+            metadata['photo_hash'] = photo_fingerprint(path)
+            ready.append((path, metadata))
+        return ready
+
+    def _known_embeddings(self):
+        """(person_id, photo_hash) -> embedding from the current store and checkpoint"""
+        known = {}
+        current = self.store.load()
+        if current is not None:
+            normalized, norms, index, _ = current
+            for row, item in enumerate(index['rows']):
+                if item.get('photo_hash'):
+                    known[(item['id'], item['photo_hash'])] = normalized[row] * norms[row]
+        known.update(self.store.load_checkpoint())
+        return known
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+    def _report(self, done, total, embedded, reused):
+        if self.progress_callback:
+            self.progress_callback(done=done, total=total, embedded=embedded, reused=reused)
+
+    def prepare(self, full=False):
+        """
+        ``(reused, chunks, total)``: metadata of the people whose embedding
+        is reused, chunks of ``(path, metadata)`` still to embed and the
+        number of candidates
+        """
+        candidates = self.collect_candidates()
+        if full:
+            self.store.clear_checkpoint()
+            known = {}
+        else:
+            known = self._known_embeddings()
+
+        reused, pending = [], []
+        for path, item in candidates:
+            if (item['id'], item['photo_hash']) in known:
+                reused.append(item)
+            else:
+                pending.append((path, item))
+        chunks = [pending[i:i + self.chunk_size] for i in range(0, len(pending), self.chunk_size)]
+        logger.info(f"Training {self.schema_name}: {len(reused)} unchanged, {len(pending)} to embed")
+        return reused, chunks, len(candidates)
+
+    def _embed(self, paths):
+        faces, positions = [], []
+        for position, path in enumerate(paths):
+            try:
+                faces.append(self.service._preprocess(path, enforce_detection=True))
+                positions.append(position)
+            except Exception:
+                continue
+        results = [None] * len(paths)
+        if faces:
+            for position, embedding in zip(positions, self.service._embed(faces)):
+                results[position] = np.asarray(embedding, dtype=np.float32)
+        return results
+
+    def embed_chunk(self, chunk, part=None):
+        """
+        Embed one chunk with the service's model and checkpoint it; returns
+        the metadata of the people whose face was found
+        """
+        results = self._embed([path for path, _ in chunk])
+        now = timezone.now().isoformat()
+        embedded, finished = [], []
+        for (path, item), embedding in zip(chunk, results):
+            if embedding is None:
+                logger.warning(f"No face detected in {item['type']} {item['id']} photo")
+                continue
+            item['added_at'] = now
+            item['encoding_hash'] = self.service._generate_encoding_hash(embedding)
+            embedded.append(item)
+            finished.append((item['id'], item['photo_hash'], embedding))
+        self.store.append_checkpoint(finished, part=part)
+        return embedded
+
+    def finish(self, reused, embedded, total):
+        """Publish the store of the reused and newly embedded people; returns a summary dict"""
+        known = self._known_embeddings()
+        encodings, metadata = [], []
+        for item in list(reused) + list(embedded):
+            embedding = known.get((item['id'], item['photo_hash']))
+            if embedding is None:
+                logger.warning(f"Embedding of {item['type']} {item['id']} is gone, skipping")
+                continue
+            encodings.append(np.asarray(embedding, dtype=np.float32))
+            metadata.append(item)
+
+        self.store.write(encodings, metadata)
+        self.store.clear_checkpoint()
+
+        return {
+            'schema_name': self.schema_name,
+            'total_candidates': total,
+            'reused': len(reused),
+            'embedded': len(embedded),
+            'failed': total - len(reused) - len(embedded),
+            'encodings': len(encodings),
+            'students': sum(1 for item in metadata if item['type'] == 'student'),
+            'staff': sum(1 for item in metadata if item['type'] == 'staff'),
+        }
+
+    def run(self, full=False):
+        """Train (or refresh) the store in this process; returns a summary dict"""
+        reused, chunks, total = self.prepare(full)
+        embedded = []
+        processed = len(reused)
+        self._report(processed, total, 0, len(reused))
+        for chunk in chunks:
+            embedded.extend(self.embed_chunk(chunk))
+            processed += len(chunk)
+            self._report(processed, total, len(embedded), len(reused))
+        return self.finish(reused, embedded, total)
@@ -0,0 +1,81 @@
+"""
+In-memory decoding of camera frames and uploaded photos for face recognition
+"""
+
+import base64
+import binascii
+import threading
+
+import cv2
+import numpy as np
+
+
+class FrameDecoder:
+    """
+    Decodes JPEG/PNG/WebP bytes straight into BGR NumPy arrays that can be
+    handed to the detector and embedder without touching the disk.
+
+    Uploaded files are read into one reusable byte buffer per worker thread,
+    which only grows when a larger file arrives, so steady-state decoding
+    allocates nothing but the decoded image itself.
+    """
+
+    MIN_DIMENSION = 50
+    MAX_DIMENSION = 4000
+    MAX_BYTES = 10 * 1024 * 1024
+    INITIAL_BUFFER_SIZE = 512 * 1024
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _buffer(self, size):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None or len(buffer) < size:
+            buffer = bytearray(max(size, self.INITIAL_BUFFER_SIZE, len(buffer or b'') * 2))
+            self._local.buffer = buffer
+        return buffer
+
+    def decode_bytes(self, data):
+        """Decode an encoded image held in any bytes-like object"""
+        if len(data) > self.MAX_BYTES:
+            raise ValueError(f"Maximum size is {self.MAX_BYTES / 1024 / 1024}MB")
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("Could not decode image")
+        self.validate_dimensions(image)
+        return image
+
+    def decode_base64(self, image_data):
+        """Decode a (data-URL or plain) base64 string"""
+        if 'base64,' in image_data:
+            image_data = image_data.split('base64,', 1)[1]
+        try:
+            raw = base64.b64decode(image_data)
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(f"Invalid base64 image: {str(e)}")
+        return self.decode_bytes(raw)
+
+    def decode_upload(self, uploaded_file):
+        """Decode a Django UploadedFile through the per-thread buffer"""
+        size = uploaded_file.size
+        if size > self.MAX_BYTES:
+            raise ValueError(f"Maximum size is {self.MAX_BYTES / 1024 / 1024}MB")
+
+        view = memoryview(self._buffer(size))[:size]
+        uploaded_file.seek(0)
+        read = 0
+        for chunk in uploaded_file.chunks():
+            view[read:read + len(chunk)] = chunk
+            read += len(chunk)
+        return self.decode_bytes(view[:read])
+
+    def validate_dimensions(self, image):
+        height, width = image.shape[:2]
+        if height < self.MIN_DIMENSION or width < self.MIN_DIMENSION:
+            raise ValueError(f"Image dimensions too small (min {self.MIN_DIMENSION}x{self.MIN_DIMENSION})")
+        if height > self.MAX_DIMENSION or width > self.MAX_DIMENSION:
+            raise ValueError(f"Image dimensions too large (max {self.MAX_DIMENSION}x{self.MAX_DIMENSION})")
+        return True
+
+
+frame_decoder = FrameDecoder()
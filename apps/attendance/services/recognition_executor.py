@@ -0,0 +1,199 @@
+"""
+Shared, micro-batching face recognition executor for real-time camera feeds
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FrameJob:
+    """One camera frame waiting for recognition"""
+
+    __slots__ = ('camera_key', 'frame_data', 'schema_name', 'min_confidence', 'partition', 'future', 'queued_at')
+
+    def __init__(self, camera_key, frame_data, schema_name, min_confidence, partition):
+        self.camera_key = camera_key
+        self.frame_data = frame_data
+        self.schema_name = schema_name
+        self.min_confidence = min_confidence
+        self.partition = partition
+        self.future = Future()
+        self.queued_at = time.monotonic()
+
+
+class RecognitionExecutor:
+    """
+    Runs face recognition for every connected camera off the event loop.
+
+    * Frames are decoded, detected and aligned on a small thread pool (the
+      DeepFace model lives once per process in ``deepface_service``).
+    * All faces found in one dispatch round, across cameras, are embedded
+      with a single model call and matched with the vectorized matcher.
+    * Each camera has at most one waiting frame: a newer frame replaces a
+      stale one, and when ``MAX_PENDING`` cameras are already waiting new
+      frames are rejected instead of queued.
+
+    Futures resolve to a dict with ``status`` ``ok``, ``dropped`` (replaced
+    by a newer frame), ``busy`` (executor saturated) or ``error``.
+    """
+
+    def __init__(self, workers=2, max_batch=16, batch_window=0.03, max_pending=64):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        self._pool = None
+        self._dispatcher = None
+        self._stats = {'submitted': 0, 'processed': 0, 'dropped': 0, 'rejected': 0, 'batches': 0, 'faces': 0}
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'DEEPFACE_SETTINGS', {}).get('REALTIME', {})
+        return cls(
+            workers=config.get('WORKERS', 2),
+            max_batch=config.get('MAX_BATCH', 16),
+            batch_window=config.get('BATCH_WINDOW', 0.03),
+            max_pending=config.get('MAX_PENDING', 64),
+        )
+
+    # ------------------------------------------------------------------
+    # Producer side (called from consumers)
+    # ------------------------------------------------------------------
+    def submit(self, camera_key, frame_data, schema_name, min_confidence=0.5, partition=None):
+        """Queue the latest frame of a camera; returns a concurrent Future"""
+        self._ensure_started()
+        job = FrameJob(camera_key, frame_data, schema_name, min_confidence, partition)
+
+        with self._condition:
+            self._stats['submitted'] += 1
+            stale = self._pending.pop(camera_key, None)
+            if stale is not None:
+                self._stats['dropped'] += 1
+                stale.future.set_result({'status': 'dropped', 'queue_depth': len(self._pending)})
+            elif len(self._pending) >= self.max_pending:
+                self._stats['rejected'] += 1
+                job.future.set_result({'status': 'busy', 'queue_depth': len(self._pending)})
+                return job.future
+            self._pending[camera_key] = job
+            self._condition.notify()
+        return job.future
+
+    @property
+    def queue_depth(self):
+        return len(self._pending)
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            stats['queue_depth'] = len(self._pending)
+        return stats
+
+    def _ensure_started(self):
+        if self._dispatcher is not None and self._dispatcher.is_alive():
+            return
+        with self._condition:
+            if self._dispatcher is not None and self._dispatcher.is_alive():
+                return
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='face-recognition')
+            self._dispatcher = threading.Thread(target=self._run, name='face-recognition-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    # ------------------------------------------------------------------
+    # Consumer side (dispatcher thread)
+    # ------------------------------------------------------------------
+    def _next_batch(self):
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            # Give other cameras a moment to join this batch
+            deadline = time.monotonic() + self.batch_window
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                batch.append(self._pending.popitem(last=False)[1])
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._process(batch)
+            except Exception as e:
+                logger.error(f"Face recognition batch failed: {str(e)}", exc_info=True)
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_result({'status': 'error', 'message': str(e)})
+
+    def _prepare(self, job):
+        from apps.attendance.services.face_recognition_service import deepface_service
+        from apps.attendance.services.frame_decoder import frame_decoder
+
+        image = frame_decoder.decode_base64(job.frame_data)
+        return deepface_service.prepare_faces(image)
+
+    def _process(self, batch):
+        from apps.attendance.services.face_recognition_service import deepface_service
+
+        # Decode + detect + align in parallel
+        prepared = []
+        for job, future in [(job, self._pool.submit(self._prepare, job)) for job in batch]:
+            try:
+                faces, locations = future.result()
+            except Exception as e:
+                job.future.set_result({'status': 'error', 'message': str(e)})
+                continue
+            prepared.append((job, faces, locations))
+
+        # One embedding call for every face of every camera in this batch
+        all_faces = [face for _, faces, _ in prepared for face in faces]
+        embeddings = deepface_service._embed(all_faces) if all_faces else []
+
+        offset = 0
+        for job, faces, locations in prepared:
+            results = []
+            for embedding, location in zip(embeddings[offset:offset + len(faces)], locations):
+                metadata, message, confidence, distance = deepface_service.match_embedding(
+                    embedding,
+                    min_confidence=job.min_confidence,
+                    partition=job.partition,
+                    schema_name=job.schema_name
+                )
+                results.append({
+                    'location': location,
+                    'recognized': metadata is not None,
+                    'id': metadata['id'] if metadata else None,
+                    'type': metadata['type'] if metadata else None,
+                    'name': metadata['name'] if metadata else None,
+                    'confidence': float(confidence),
+                    'distance': float(distance),
+                })
+            offset += len(faces)
+            job.future.set_result({
+                'status': 'ok',
+                'faces': results,
+                'face_count': len(locations),
+                'latency_ms': round((time.monotonic() - job.queued_at) * 1000, 1),
+                'queue_depth': len(self._pending),
+            })
+
+        with self._condition:
+            self._stats['processed'] += len(prepared)
+            self._stats['faces'] += len(all_faces)
+            self._stats['batches'] += 1
+
+
+recognition_executor = RecognitionExecutor.from_settings()
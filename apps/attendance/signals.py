@@ -0,0 +1,44 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.attendance.services.attendance_rollup import attendance_rollup_service, ATTENDANCE_MODELS
+from apps.attendance.services.attendance_stats import attendance_stats_service
+from apps.hr.models import Staff
+from apps.students.models import Student
+
+
+# ---------------------------------------------------------
+# Maintain the daily rollup and cached statistics
+# ---------------------------------------------------------
+def remember_rollup_bucket(sender, instance, **kwargs):
+    """Snapshot the loaded values so a later save can move the row between buckets"""
+    instance._rollup_snapshot = attendance_rollup_service.snapshot(instance)
+
+
+def update_rollup_on_save(sender, instance, created, **kwargs):
+    old, new = attendance_rollup_service.record_save(instance, created)
+    for bucket in {old, new} - {None}:
+        attendance_stats_service.invalidate(bucket[0])
+
+
+def update_rollup_on_delete(sender, instance, **kwargs):
+    bucket = attendance_rollup_service.record_delete(instance)
+    if bucket:
+        attendance_stats_service.invalidate(bucket[0])
+
+
+for attendance_model in ATTENDANCE_MODELS.values():
+    uid = f'attendance_rollup_{attendance_model.__name__}'
+    post_init.connect(remember_rollup_bucket, sender=attendance_model, dispatch_uid=f'{uid}_init')
+    post_save.connect(update_rollup_on_save, sender=attendance_model, dispatch_uid=f'{uid}_save')
+    post_delete.connect(update_rollup_on_delete, sender=attendance_model, dispatch_uid=f'{uid}_delete')
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Staff)
+@receiver(post_delete, sender=Staff)
+def invalidate_attendance_roster(sender, instance, **kwargs):
+    """Roster changes alter today's totals and percentages"""
+    attendance_stats_service.invalidate(timezone.now().date())
@@ -0,0 +1,110 @@
+"""
+Background tasks for attendance operations using Celery
+"""
+
+import logging
+from celery import chord, shared_task
+from django_tenants.utils import schema_context
+
+from apps.core.services import job_lock
+
+logger = logging.getLogger(__name__)
+
+
+def face_training_lock_key(schema_name):
+    return f"attendance:face_training:{schema_name}"
+
+
+def _face_trainer(schema_name):
+    from apps.attendance.services.face_recognition_service import deepface_service
+    from apps.attendance.services.face_training import FaceTrainer
+
+    return FaceTrainer(deepface_service, schema_name)
+
+
+@shared_task(bind=True)
+def train_face_encodings_task(self, schema_name, full=False):
+    """
+    Train (or incrementally refresh) a tenant's face embedding store
+
+    Photos still to embed are split into chunks; the task replaces itself
+    with a chord of one ``embed_face_chunk_task`` per chunk and
+    ``finish_face_training_task``, so chunks are embedded in parallel by
+    separate worker processes and the summary becomes this task's result.
+
+    Args:
+        schema_name: Tenant schema whose students and staff are enrolled
+        full: Re-embed every photo instead of reusing unchanged ones
+
+    Returns:
+        Training summary from FaceTrainer
+    """
+    try:
+        with schema_context(schema_name):
+            trainer = _face_trainer(schema_name)
+            reused, chunks, total = trainer.prepare(full=full)
+            if not chunks:
+                summary = trainer.finish(reused, [], total)
+                job_lock.release(face_training_lock_key(schema_name))
+                logger.info(f"Face training finished for {schema_name}: {summary}")
+                return summary
+    except Exception:
+        job_lock.release(face_training_lock_key(schema_name))
+        raise
+
+    self.update_state(
+        state='PROGRESS',
+        meta={
+            'current': len(reused),
+            'total': total,
+            'embedded': 0,
+            'reused': len(reused),
+            'status': f'Embedding {total - len(reused)} photos in {len(chunks)} chunks'
+        }
+    )
+    header = [
+        embed_face_chunk_task.s(schema_name, chunk, part=part)
+        for part, chunk in enumerate(chunks)
+    ]
+    body = finish_face_training_task.s(schema_name=schema_name, reused=reused, total=total).on_error(
+        face_training_failed.s(schema_name=schema_name)
+    )
+    return self.replace(chord(header, body))
+
+
+@shared_task(acks_late=True)
+def embed_face_chunk_task(schema_name, chunk, part=None):
+    """
+    Embed one chunk of ``(photo path, metadata)`` pairs into the training checkpoint
+
+    Returns:
+        Metadata of the people whose face was found
+    """
+    with schema_context(schema_name):
+        return _face_trainer(schema_name).embed_chunk(chunk, part=part)
+
+
+@shared_task
+def finish_face_training_task(embedded_chunks, schema_name, reused, total):
+    """
+    Chord callback of a face training run: publish the new embedding store
+
+    Returns:
+        Training summary from FaceTrainer
+    """
+    try:
+        embedded = [item for chunk in embedded_chunks for item in chunk]
+        with schema_context(schema_name):
+            summary = _face_trainer(schema_name).finish(reused, embedded, total)
+    finally:
+        job_lock.release(face_training_lock_key(schema_name))
+
+    logger.info(f"Face training finished for {schema_name}: {summary}")
+    return summary
+
+
+@shared_task
+def face_training_failed(request, exc, traceback, schema_name):
+    """Errback of a face training run whose chunks failed: release its lock"""
+    logger.error(f"Face training {request.id} failed for {schema_name}: {exc}")
+    job_lock.release(face_training_lock_key(schema_name))
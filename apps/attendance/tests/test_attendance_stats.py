@@ -0,0 +1,78 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.attendance.services.attendance_rollup import AttendanceRollupService
+from apps.attendance.services.attendance_stats import AttendanceStatsService, percentage
+
+
+class AttendanceStatsCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = AttendanceStatsService(timeout=60)
+        self.day = date(2024, 6, 3)
+        self.calls = 0
+
+    def _compute(self):
+        self.calls += 1
+        return {'total': self.calls}
+
+    def test_cached_until_date_is_invalidated(self):
+        key = self.service._key(self.day, 'dashboard')
+        self.assertEqual(self.service._cached(key, self._compute), {'total': 1})
+        self.assertEqual(self.service._cached(self.service._key(self.day, 'dashboard'), self._compute), {'total': 1})
+
+        self.service.invalidate(self.day)
+        self.assertEqual(self.service._cached(self.service._key(self.day, 'dashboard'), self._compute), {'total': 2})
+
+    def test_invalidation_is_scoped_to_the_date(self):
+        other_day = date(2024, 6, 4)
+        key = self.service._key(other_day, 'dashboard')
+        self.service._cached(key, self._compute)
+        self.service.invalidate(self.day)
+        self.assertEqual(self.service._key(other_day, 'dashboard'), key)
+
+    def test_percentage_handles_empty_roster(self):
+        self.assertEqual(percentage(0, 0), 0.0)
+        self.assertEqual(percentage(1, 3), 33.3)
+
+
+class AttendanceRollupBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.service = AttendanceRollupService()
+        self.values = {
+            'date': date(2024, 6, 3), 'status': 'PRESENT', 'is_active': True,
+            'class_name_id': 'c1', 'section_id': 's1',
+        }
+
+    def test_student_rows_bucket_by_class_and_section(self):
+        self.assertEqual(
+            self.service.bucket('student', self.values),
+            (date(2024, 6, 3), 'student', 'c1', 's1', 'PRESENT')
+        )
+
+    def test_hostel_rows_bucket_by_class_stored_on_the_row(self):
+        self.assertEqual(
+            self.service.bucket('hostel', self.values),
+            (date(2024, 6, 3), 'hostel', 'c1', 's1', 'PRESENT')
+        )
+
+    def test_soft_deleted_rows_are_not_counted(self):
+        self.assertIsNone(self.service.bucket('student', {**self.values, 'is_active': False}))
+
+    def test_staff_rows_have_no_class_scope(self):
+        self.assertEqual(
+            self.service.bucket('staff', self.values),
+            (date(2024, 6, 3), 'staff', None, None, 'PRESENT')
+        )
+
+    def test_fold_merges_leave_spellings(self):
+        counts = AttendanceStatsService.fold([
+            {'status': 'PRESENT', 'total': 20},
+            {'status': 'LEAVE', 'total': 2},
+            {'status': 'ON_LEAVE', 'total': 3},
+        ])
+        self.assertEqual(counts['total'], 25)
+        self.assertEqual(counts['leave'], 5)
+        self.assertEqual(counts['absent'], 0)
@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.attendance.services.embedding_store import FaceEmbeddingStore
+from apps.attendance.services.face_matcher import FaceMatcher
+
+
+class FaceEmbeddingStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = FaceEmbeddingStore('school_a', 'Facenet', root=self.root)
+        self.encodings = np.random.default_rng(1).normal(size=(4, 8)).astype(np.float32)
+        self.metadata = [{'id': str(i), 'type': 'student'} for i in range(4)]
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_write_and_load_round_trip(self):
+        self.assertIsNone(self.store.load())
+        self.assertEqual(self.store.write(self.encodings, self.metadata), 1)
+
+        normalized, norms, index, version = self.store.load()
+        self.assertEqual(version, 1)
+        self.assertIsInstance(normalized, np.memmap)
+        self.assertEqual(len(index['rows']), 4)
+        np.testing.assert_allclose(normalized * norms[:, None], self.encodings, rtol=1e-5)
+
+    def test_upsert_appends_and_replaces_without_retraining(self):
+        self.store.write(self.encodings, self.metadata)
+        self.store.upsert('9', self.encodings[0] * 2, {'id': '9', 'type': 'staff'})
+        self.store.upsert('1', self.encodings[3], {'id': '1', 'type': 'student'})
+
+        normalized, norms, index, version = self.store.load()
+        self.assertEqual(version, 3)
+        self.assertEqual([row['id'] for row in index['rows']], ['0', '1', '2', '3', '9'])
+        matcher = FaceMatcher('euclidean').attach(normalized, norms, index['rows'])
+        self.assertEqual(matcher.search(self.encodings[0] * 2)[0][0], 4)
+        self.assertEqual(matcher.search(self.encodings[3], k=2)[0][1], 0.0)
+
+    def test_tenants_are_isolated(self):
+        self.store.write(self.encodings, self.metadata)
+        other = FaceEmbeddingStore('school_b', 'Facenet', root=self.root)
+        self.assertFalse(other.exists())
+
+    def test_old_versions_are_pruned(self):
+        for _ in range(4):
+            self.store.write(self.encodings, self.metadata)
+        self.assertEqual(self.store.current_version(), 4)
+        self.assertIsNotNone(self.store.load())
+        import os
+        self.assertFalse(os.path.exists(self.store._file('embeddings', 1)))
+        self.assertTrue(os.path.exists(self.store._file('embeddings', 3)))
+
+    def test_checkpoint_round_trip_skips_torn_line(self):
+        self.store.append_checkpoint([('1', 'abc', self.encodings[1])])
+        with open(self.store.checkpoint_file, 'a') as fh:
+            fh.write('{"id": "2", "photo_ha')
+        entries = self.store.load_checkpoint()
+        self.assertEqual(list(entries), [('1', 'abc')])
+        np.testing.assert_allclose(entries[('1', 'abc')], self.encodings[1], rtol=1e-6)
+        self.store.clear_checkpoint()
+        self.assertEqual(self.store.load_checkpoint(), {})
+
+    def test_checkpoint_parts_are_loaded_and_cleared_together(self):
+        self.store.append_checkpoint([('1', 'abc', self.encodings[1])], part=0)
+        self.store.append_checkpoint([('2', 'def', self.encodings[2])], part=1)
+        self.assertNotEqual(self.store.checkpoint_part_file(0), self.store.checkpoint_part_file(1))
+        self.assertEqual(sorted(self.store.load_checkpoint()), [('1', 'abc'), ('2', 'def')])
+        self.store.clear_checkpoint()
+        self.assertEqual(self.store.load_checkpoint(), {})
@@ -0,0 +1,61 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.attendance.services.face_matcher import FaceMatcher
+
+
+class FaceMatcherTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        self.encodings = rng.normal(size=(50, 128)).astype(np.float32)
+        self.metadata = [
+            {'id': str(i), 'type': 'student' if i % 2 else 'staff', 'section_id': 'A' if i < 25 else 'B'}
+            for i in range(50)
+        ]
+
+    def _brute_force(self, query, metric):
+        if metric == 'euclidean':
+            return np.linalg.norm(self.encodings - query, axis=1)
+        a = self.encodings / np.linalg.norm(self.encodings, axis=1, keepdims=True)
+        b = query / np.linalg.norm(query)
+        if metric == 'cosine':
+            return 1.0 - a @ b
+        return np.linalg.norm(a - b, axis=1)
+
+    def test_matches_brute_force_for_every_metric(self):
+        query = self.encodings[7] + 0.01
+        for metric in FaceMatcher.METRICS:
+            matcher = FaceMatcher(metric).build(self.encodings, self.metadata)
+            expected = self._brute_force(query, metric)
+            (idx, distance), = matcher.search(query, k=1)
+            self.assertEqual(idx, int(np.argmin(expected)))
+            self.assertAlmostEqual(distance, float(expected.min()), delta=1e-3)
+
+    def test_top_k_is_sorted(self):
+        matcher = FaceMatcher('cosine').build(self.encodings, self.metadata)
+        results = matcher.search(self.encodings[3], k=5)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0][0], 3)
+        distances = [d for _, d in results]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_partition_restricts_candidates(self):
+        matcher = FaceMatcher('cosine').build(self.encodings, self.metadata)
+        results = matcher.search(self.encodings[3], k=50, partition='section_id:B')
+        self.assertEqual(len(results), 25)
+        self.assertTrue(all(idx >= 25 for idx, _ in results))
+        self.assertEqual(matcher.search(self.encodings[3], partition='section_id:Z'), [])
+
+    def test_upsert_appends_and_replaces(self):
+        matcher = FaceMatcher('cosine').build(self.encodings[:10], self.metadata[:10])
+        matcher.upsert(10, self.encodings[20], {'type': 'staff'})
+        self.assertEqual(len(matcher), 11)
+        self.assertEqual(matcher.search(self.encodings[20])[0][0], 10)
+        matcher.upsert(0, self.encodings[30])
+        self.assertEqual(matcher.search(self.encodings[30])[0][0], 0)
+
+    def test_search_batch_agrees_with_search(self):
+        matcher = FaceMatcher('euclidean_l2').build(self.encodings, self.metadata)
+        batch = matcher.search_batch(self.encodings[:4], k=2)
+        for i, result in enumerate(batch):
+            self.assertEqual(result[0][0], matcher.search(self.encodings[i], k=2)[0][0])
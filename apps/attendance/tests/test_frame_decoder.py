@@ -0,0 +1,34 @@
+import base64
+
+import cv2
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from apps.attendance.services.frame_decoder import FrameDecoder
+
+
+class FrameDecoderTests(SimpleTestCase):
+    def setUp(self):
+        self.decoder = FrameDecoder()
+        self.image = np.full((120, 160, 3), 200, dtype=np.uint8)
+        self.png = cv2.imencode('.png', self.image)[1].tobytes()
+
+    def test_decode_base64_data_url(self):
+        data_url = 'data:image/png;base64,' + base64.b64encode(self.png).decode()
+        decoded = self.decoder.decode_base64(data_url)
+        np.testing.assert_array_equal(decoded, self.image)
+
+    def test_decode_upload_reuses_buffer(self):
+        upload = SimpleUploadedFile('face.png', self.png, content_type='image/png')
+        np.testing.assert_array_equal(self.decoder.decode_upload(upload), self.image)
+        buffer = self.decoder._local.buffer
+        self.decoder.decode_upload(SimpleUploadedFile('face.png', self.png, content_type='image/png'))
+        self.assertIs(self.decoder._local.buffer, buffer)
+
+    def test_rejects_invalid_and_tiny_images(self):
+        with self.assertRaises(ValueError):
+            self.decoder.decode_bytes(b'not an image')
+        tiny = cv2.imencode('.png', np.zeros((10, 10, 3), dtype=np.uint8))[1].tobytes()
+        with self.assertRaises(ValueError):
+            self.decoder.decode_bytes(tiny)
@@ -15,6 +15,7 @@ from apps.academics.models import StudentAttendance
 from apps.hr.models import StaffAttendance
 from apps.hostel.models import HostelAttendance
 from apps.transportation.models import TransportAttendance
+from apps.attendance.services.attendance_stats import attendance_stats_service
 
 from apps.attendance.forms import (
     StudentAttendanceForm, StaffAttendanceForm, 
@@ -43,31 +44,27 @@ class AttendanceDashboardView(BaseTemplateView):
         last_7_days = today - timedelta(days=6)
 
         # 1. Summary Cards (Today)
-        context['student_stats'] = {
-            'total': StudentAttendance.objects.filter(date=today).count(),
-            'present': StudentAttendance.objects.filter(date=today, status='PRESENT').count(),
-            'absent': StudentAttendance.objects.filter(date=today, status='ABSENT').count(),
-            'late': StudentAttendance.objects.filter(date=today, status='LATE').count(),
-        }
-        context['staff_stats'] = {
-            'total': StaffAttendance.objects.filter(date=today).count(),
-            'present': StaffAttendance.objects.filter(date=today, status='PRESENT').count(),
-            'absent': StaffAttendance.objects.filter(date=today, status='ABSENT').count(),
-            'late': StaffAttendance.objects.filter(date=today, status='LATE').count(),
-        }
+        stats = attendance_stats_service.dashboard_stats(today)
+        for attendance_type in ('student', 'staff'):
+            counts = stats[attendance_type]
+            context[f'{attendance_type}_stats'] = {
+                'total': counts['marked'],
+                'present': counts['present'],
+                'absent': counts['absent'],
+                'late': counts['late'],
+            }
 
         # 2. Charts Data (Last 7 Days Trend)
-        trend_data = []
-        for i in range(7):
-            day = last_7_days + timedelta(days=i)
-            s_present = StudentAttendance.objects.filter(date=day, status='PRESENT').count()
-            s_absent = StudentAttendance.objects.filter(date=day, status='ABSENT').count()
-            
-            trend_data.append({
+        trend_data = [
+            {
                 'date': day.strftime("%d %b"),
-                'present': s_present,
-                'absent': s_absent
-            })
+                'present': counts['present'],
+                'absent': counts['absent']
+            }
+            for day, counts in attendance_stats_service.student_trend(
+                [last_7_days + timedelta(days=i) for i in range(7)]
+            )
+        ]
         
         context['trend_data'] = trend_data
         context['recent_attendance'] = StudentAttendance.objects.select_related('student', 'class_name').order_by('-created_at')[:5]
@@ -337,7 +334,7 @@ class AttendanceReportExportView(View):
             if section_id: queryset = queryset.filter(section_id=section_id)
             if month and year: queryset = queryset.filter(date__month=month, date__year=year)
             
-            data = queryset.values('student__first_name', 'student__last_name', 'student__admission_number', 'class_name__name', 'section__name', 'date', 'status')
+            fields = ['student__first_name', 'student__last_name', 'student__admission_number', 'class_name__name', 'section__name', 'date', 'status']
             columns = ['First Name', 'Last Name', 'Admission No', 'Class', 'Section', 'Date', 'Status']
             title = "Student Attendance Report"
             
@@ -349,7 +346,7 @@ class AttendanceReportExportView(View):
             if desig_id: queryset = queryset.filter(staff__designation_id=desig_id)
             if month and year: queryset = queryset.filter(date__month=month, date__year=year)
             
-            data = queryset.values('staff__user__first_name', 'staff__user__last_name', 'staff__employee_id', 'staff__department__name', 'date', 'status', 'check_in', 'check_out')
+            fields = ['staff__user__first_name', 'staff__user__last_name', 'staff__employee_id', 'staff__department__name', 'date', 'status', 'check_in', 'check_out']
             columns = ['First Name', 'Last Name', 'Employee ID', 'Department', 'Date', 'Status', 'In', 'Out']
             title = "Staff Attendance Report"
 
@@ -359,7 +356,7 @@ class AttendanceReportExportView(View):
             if hostel_id: queryset = queryset.filter(student__hostel_allocation__hostel_id=hostel_id)
             if month and year: queryset = queryset.filter(date__month=month, date__year=year)
             
-            data = queryset.values('student__first_name', 'student__last_name', 'student__hostel_allocation__hostel__name', 'date', 'status')
+            fields = ['student__first_name', 'student__last_name', 'student__hostel_allocation__hostel__name', 'date', 'status']
             columns = ['First Name', 'Last Name', 'Hostel', 'Date', 'Status']
             title = "Hostel Attendance Report"
 
@@ -371,7 +368,7 @@ class AttendanceReportExportView(View):
             if trip_type: queryset = queryset.filter(trip_type=trip_type)
             if month and year: queryset = queryset.filter(date__month=month, date__year=year)
             
-            data = queryset.values('student__first_name', 'student__last_name', 'trip_type', 'date', 'status')
+            fields = ['student__first_name', 'student__last_name', 'trip_type', 'date', 'status']
             columns = ['First Name', 'Last Name', 'Trip', 'Date', 'Status']
             title = "Transport Attendance Report"
         
@@ -382,8 +379,8 @@ class AttendanceReportExportView(View):
         filename = f"{source}_attendance_{timezone.now().strftime('%Y%m%d')}"
         
         if format_type == 'csv':
-            return ReportGenerator.generate_csv(list(data), columns, filename=filename)
+            return ReportGenerator.generate_csv(queryset, columns, filename=filename, fields=fields)
         elif format_type == 'excel':
-            return ReportGenerator.generate_excel(list(data), columns, filename=filename)
+            return ReportGenerator.generate_excel(queryset, columns, filename=filename, fields=fields)
         else:
-            return ReportGenerator.generate_pdf(list(data), columns, filename=filename, title=title)
\ No newline at end of file
+            return ReportGenerator.generate_pdf(queryset, columns, filename=filename, title=title, fields=fields)
\ No newline at end of file
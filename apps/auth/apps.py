@@ -5,3 +5,6 @@ class AuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.auth'
     label = 'apps_auth'
+
+    def ready(self):
+        import apps.auth.signals
@@ -3,6 +3,7 @@ from django.core.exceptions import PermissionDenied
 from django.utils import timezone
 from apps.users.models import User
 from .models import LoginAttempt, SecurityEvent
+from .permission_cache import role_permissions
 
 
 class TenantAwareAuthenticationBackend(ModelBackend):
@@ -144,37 +145,22 @@ class TenantAwareAuthenticationBackend(ModelBackend):
         """
         Get all permissions for the user, including role-based permissions
         from apps.auth.models.RolePermission
+
+        Both parts come from ``role_permissions`` (process-local and shared
+        caches), so after the first request for a role no query runs.
+        ``_perm_cache`` is also what ``ModelBackend`` reads, so the second
+        configured backend does not query either.
         """
         if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
             return set()
 
         if not hasattr(user_obj, '_perm_cache'):
             # Start with standard permissions (if any mixed in)
-            perms = super().get_all_permissions(user_obj, obj)
-            
+            direct = role_permissions.user_permissions(
+                user_obj, lambda: super(TenantAwareAuthenticationBackend, self).get_all_permissions(user_obj, obj)
+            )
             # Add role-based permissions
-            try:
-                # Use get_model to avoid circular imports
-                from django.apps import apps
-                RolePermission = apps.get_model('apps_auth', 'RolePermission')
-                
-                # Fetch query set values to minimize DB overhead
-                # We use string matching for role because user_obj.role is a string
-                role_perms = RolePermission.objects.filter(
-                    role=user_obj.role,
-                    tenant=user_obj.tenant
-                ).values_list('permission__content_type__app_label', 'permission__codename')
-                
-                # Format as "app_label.codename"
-                for app_label, codename in role_perms:
-                    perms.add(f"{app_label}.{codename}")
-                    
-            except Exception as e:
-                # Log error
-                print(f"DEBUG: Error fetching role permissions: {e}")
-                pass
-            
-            user_obj._perm_cache = perms
+            user_obj._perm_cache = direct | role_permissions.get(user_obj.tenant_id, user_obj.role)
             
         return user_obj._perm_cache
 
@@ -75,7 +75,7 @@ class RolePermission(BaseModel):
         else:
             permissions = queryset.filter(tenant_specific=False)
             
-        return [rp.permission.codename for rp in permissions.distinct()]
+        return list(permissions.values_list('permission__codename', flat=True).distinct())
 
     @classmethod
     def get_permissions_with_modules(cls, role, tenant=None):
@@ -0,0 +1,164 @@
+# apps/auth/permission_cache.py
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class RolePermissionCache:
+    """
+    Permission strings (``app_label.codename``) granted to each role of a
+    tenant, kept as frozensets so ``has_perm`` is a set lookup.
+
+    Entries live in-process, with the shared Django cache as the second
+    level, under a per-tenant version. ``RolePermission`` signals bump the
+    version; other processes notice it on their next check, at most
+    ``check_interval`` seconds later. In-process entries are reloaded from
+    the database after ``shared_ttl`` seconds whatever the version, so a
+    bump that never reaches a process (a per-process cache backend such as
+    ``LocMemCache``) is still picked up within that time. A user's own and group permissions
+    (what ``ModelBackend`` adds) are cached in the shared cache only, under
+    a global version bumped when those relations change.
+    """
+
+    USER_VERSION_KEY = 'role_permissions:user_permissions:version'
+
+    def __init__(self, check_interval=30, shared_ttl=3600):
+        self.check_interval = check_interval
+        self.shared_ttl = shared_ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'ROLE_PERMISSION_CACHE', {})
+        return cls(
+            check_interval=config.get('CHECK_INTERVAL', 30),
+            shared_ttl=config.get('SHARED_TTL', 3600),
+        )
+
+    @staticmethod
+    def _schema(schema_name=None):
+        return schema_name or getattr(connection, 'schema_name', 'public')
+
+    @staticmethod
+    def _version_key(schema_name, tenant_id):
+        return f'role_permissions:{schema_name}:{tenant_id}:version'
+
+    def _version(self, key):
+        try:
+            return cache.get_or_set(key, 1, None)
+        except Exception:
+            return 0
+
+    @staticmethod
+    def _bump(key):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # Role permissions
+    # ------------------------------------------------------------------
+    def _load(self, tenant_id, role):
+        from apps.auth.models import RolePermission
+
+        return frozenset(
+            f"{app_label}.{codename}"
+            for app_label, codename in RolePermission.objects.for_tenant(tenant_id).filter(
+                role=role
+            ).values_list('permission__content_type__app_label', 'permission__codename')
+        )
+
+    def _fetch(self, schema_name, tenant_id, role, version, refresh=False):
+        shared_key = f'role_permissions:{schema_name}:{tenant_id}:{version}:{role}'
+        permissions = None if refresh else cache.get(shared_key)
+        if permissions is None:
+            permissions = self._load(tenant_id, role)
+            cache.set(shared_key, permissions, self.shared_ttl)
+        return permissions
+
+    def get(self, tenant_id, role, schema_name=None):
+        """Frozenset of the permissions ``role`` has in tenant ``tenant_id``"""
+        if not tenant_id or not role:
+            return frozenset()
+        schema_name = self._schema(schema_name)
+        key = (schema_name, str(tenant_id), role)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+        expired = entry is not None and now - entry[1] >= self.shared_ttl
+        if entry is not None and not expired:
+            checked_at, loaded_at, version, permissions = entry
+            if now - checked_at < self.check_interval:
+                return permissions
+            if self._version(self._version_key(schema_name, tenant_id)) == version:
+                with self._lock:
+                    self._entries[key] = (now, loaded_at, version, permissions)
+                return permissions
+
+        version = self._version(self._version_key(schema_name, tenant_id))
+        try:
+            permissions = self._fetch(schema_name, tenant_id, role, version, refresh=expired)
+        except Exception as exc:
+            logger.warning(f"Could not load permissions of role '{role}': {exc}")
+            return frozenset()
+        with self._lock:
+            self._entries[key] = (now, now, version, permissions)
+        return permissions
+
+    def has(self, tenant_id, role, perm):
+        """
+        Whether ``role`` grants ``perm``; a bare codename matches the
+        permission of any app
+        """
+        permissions = self.get(tenant_id, role)
+        if '.' in perm:
+            return perm in permissions
+        return any(granted.split('.', 1)[1] == perm for granted in permissions)
+
+    def invalidate(self, tenant_id, schema_name=None):
+        schema_name = self._schema(schema_name)
+        with self._lock:
+            for key in [key for key in self._entries if key[:2] == (schema_name, str(tenant_id))]:
+                del self._entries[key]
+        self._bump(self._version_key(schema_name, tenant_id))
+
+    # ------------------------------------------------------------------
+    # User and group permissions
+    # ------------------------------------------------------------------
+    def user_permissions(self, user_obj, loader):
+        """
+        ``loader()`` (the user's own and group permissions) cached per user
+        until ``invalidate_user_permissions``. ``ModelBackend`` grants
+        everything to active superusers, so those flags are part of the key
+        and revoking them takes effect immediately.
+        """
+        flags = ''.join(
+            '1' if getattr(user_obj, flag, False) else '0'
+            for flag in ('is_active', 'is_superuser', 'is_staff')
+        )
+        key = (
+            f'role_permissions:user:{self._schema()}:{user_obj.pk}:{flags}:'
+            f'{self._version(self.USER_VERSION_KEY)}'
+        )
+        permissions = cache.get(key)
+        if permissions is None:
+            permissions = frozenset(loader())
+            cache.set(key, permissions, self.shared_ttl)
+        return permissions
+
+    def invalidate_user_permissions(self):
+        self._bump(self.USER_VERSION_KEY)
+
+
+role_permissions = RolePermissionCache.from_settings()
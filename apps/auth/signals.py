@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import RolePermission
+from .permission_cache import role_permissions
+
+User = get_user_model()
+
+
+# ---------------------------------------------------------
+# Invalidate cached permissions
+# ---------------------------------------------------------
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+def invalidate_role_permissions(sender, instance, **kwargs):
+    """Bump the tenant's role permission version once the change commits"""
+    tenant_id = instance.tenant_id
+    transaction.on_commit(lambda: role_permissions.invalidate(tenant_id))
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_user_permissions(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(role_permissions.invalidate_user_permissions)
@@ -0,0 +1,67 @@
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.auth.permission_cache import RolePermissionCache
+
+
+class CountingCache(RolePermissionCache):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.loads = 0
+        self.granted = {'teacher': {'exams.view_exam', 'attendance.add_studentattendance'}}
+
+    def _load(self, tenant_id, role):
+        self.loads += 1
+        return frozenset(self.granted.get(role, ()))
+
+
+class RolePermissionCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.permissions = CountingCache(check_interval=30)
+
+    def test_role_lookups_hit_memory(self):
+        self.assertTrue(self.permissions.has('t1', 'teacher', 'exams.view_exam'))
+        self.assertTrue(self.permissions.has('t1', 'teacher', 'add_studentattendance'))
+        self.assertFalse(self.permissions.has('t1', 'teacher', 'finance.view_invoice'))
+        self.assertEqual(self.permissions.loads, 1)
+
+    def test_other_processes_share_the_loaded_set(self):
+        self.permissions.get('t1', 'teacher')
+        other = CountingCache(check_interval=30)
+        self.assertIn('exams.view_exam', other.get('t1', 'teacher'))
+        self.assertEqual(other.loads, 0)
+
+    def test_invalidate_reloads_role_permissions(self):
+        other = CountingCache(check_interval=0)
+        other.get('t1', 'teacher')
+        self.permissions.granted['teacher'] = {'exams.change_exam'}
+        self.permissions.invalidate('t1')
+        self.assertEqual(self.permissions.get('t1', 'teacher'), frozenset({'exams.change_exam'}))
+        # A process checking the version sees the bump
+        other.granted = self.permissions.granted
+        self.assertEqual(other.get('t1', 'teacher'), frozenset({'exams.change_exam'}))
+
+    def test_local_entries_expire_without_a_version_bump(self):
+        permissions = CountingCache(check_interval=30, shared_ttl=60)
+        permissions.get('t1', 'teacher')
+        # A revocation whose version bump only reached another process
+        permissions.granted['teacher'] = {'exams.view_exam'}
+        self.assertIn('attendance.add_studentattendance', permissions.get('t1', 'teacher'))
+        with mock.patch('apps.auth.permission_cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(permissions.get('t1', 'teacher'), frozenset({'exams.view_exam'}))
+        self.assertEqual(permissions.loads, 2)
+
+    def test_missing_role_has_no_permissions(self):
+        self.assertEqual(self.permissions.get('t1', None), frozenset())
+        self.assertEqual(self.permissions.loads, 0)
+
+    def test_revoking_superuser_drops_cached_user_permissions(self):
+        user = SimpleNamespace(pk='u1', is_active=True, is_superuser=True, is_staff=False)
+        self.assertEqual(self.permissions.user_permissions(user, lambda: {'everything'}), {'everything'})
+        user.is_superuser = False
+        self.assertEqual(self.permissions.user_permissions(user, lambda: set()), frozenset())
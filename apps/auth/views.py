@@ -690,14 +690,14 @@ class SystemAdminDashboardView(BaseDashboardView):
             role_data.append(entry['count'])
             
         # Attendance Trend (Last 30 Days)
-        from apps.academics.models import StudentAttendance
+        from apps.attendance.models import DailyAttendanceRollup
         from apps.finance.models import Invoice
         
         thirty_days_ago = timezone.now() - datetime.timedelta(days=30)
-        attendance_trend = StudentAttendance.objects.filter(date__gte=thirty_days_ago)\
+        attendance_trend = DailyAttendanceRollup.objects.filter(attendance_type='student', date__gte=thirty_days_ago)\
             .values('date')\
-            .annotate(present=Count('id', filter=Q(status='PRESENT')),
-                     absent=Count('id', filter=Q(status='ABSENT')))\
+            .annotate(present=Sum('count', filter=Q(status='PRESENT')),
+                     absent=Sum('count', filter=Q(status='ABSENT')))\
             .order_by('date')
             
         attendance_labels = []
@@ -705,8 +705,8 @@ class SystemAdminDashboardView(BaseDashboardView):
         attendance_absent = []
         for entry in attendance_trend:
             attendance_labels.append(entry['date'].strftime('%d %b'))
-            attendance_present.append(entry['present'])
-            attendance_absent.append(entry['absent'])
+            attendance_present.append(entry['present'] or 0)
+            attendance_absent.append(entry['absent'] or 0)
             
         # Financial Overview
         financial_summary = Invoice.objects.aggregate(
@@ -1399,9 +1399,9 @@ class ExportReportView(LoginRequiredMixin, UserPassesTestMixin, View):
         if report_type == 'csv':
             return ReportGenerator.generate_csv(queryset, columns)
         elif report_type == 'excel':
-            return ReportGenerator.generate_excel(list(queryset), columns)
+            return ReportGenerator.generate_excel(queryset, columns)
         elif report_type == 'pdf':
-            return ReportGenerator.generate_pdf(list(queryset), columns, title=title)
+            return ReportGenerator.generate_pdf(queryset, columns, title=title)
         
         return HttpResponse("Invalid report type", status=400)
 
@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from apps.core.api.views import (
     BaseListCreateAPIView, BaseRetrieveUpdateDestroyAPIView
 )
+from apps.core.services.chrome_context import invalidate_user
 from apps.communications.models import (
     CommunicationChannel, CommunicationTemplate, CommunicationCampaign,
     Communication, CommunicationAttachment
@@ -206,4 +207,5 @@ class MarkAllNotificationsReadAPIView(views.APIView):
         Notification.objects.filter(
             recipient=request.user, is_read=False
         ).update(is_read=True, read_at=timezone.now())
+        invalidate_user(request.user.pk)
         return Response({'status': 'success'})
@@ -1,8 +1,11 @@
-from .models import Notification
+from apps.core.services.chrome_context import ChromeContext
 
 def unread_count(request):
     """
     Context processor to add unread notification count
+
+    Both values are lazy and cached per user (see ``ChromeContext``), so
+    pages that do not show the header run no notification queries.
     """
     # Avoid querying tenant-specific tables on public schema
     if hasattr(request, 'tenant') and request.tenant.schema_name == 'public':
@@ -12,13 +15,10 @@ def unread_count(request):
         }
 
     if request.user.is_authenticated:
-        qs = Notification.objects.filter(recipient=request.user)
-        count = qs.filter(is_read=False).count()
-        latest = qs.order_by('-created_at')[:5]
-        
+        chrome = ChromeContext.for_request(request)
         return {
-            'unread_notification_count': count,
-            'header_notifications': latest
+            'unread_notification_count': chrome.lazy('unread_notification_count', fallback=0),
+            'header_notifications': chrome.lazy('header_notifications', fallback=[])
         }
     return {
         'unread_notification_count': 0, 
@@ -1,9 +1,10 @@
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
-from .models import Notification, MessageRecipient
+from apps.core.services.chrome_context import invalidate_user
+from .models import Communication, Notification, MessageRecipient
 
 @receiver(post_save, sender=Notification)
 def send_notification_socket(sender, instance, created, **kwargs):
@@ -48,3 +49,15 @@ def send_message_socket(sender, instance, created, **kwargs):
             print(f"DEBUG: Message sent to group {group_name}")
         except Exception as e:
             print(f"DEBUG: Error sending message to socket: {e}")
+
+
+@receiver([post_save, post_delete], sender=Notification)
+def invalidate_notification_chrome(sender, instance, **kwargs):
+    """Header counts and lists are cached per user; drop the recipient's"""
+    invalidate_user(instance.recipient_id)
+
+
+@receiver([post_save, post_delete], sender=Communication)
+def invalidate_communication_chrome(sender, instance, **kwargs):
+    if instance.recipient_id:
+        invalidate_user(instance.recipient_id)
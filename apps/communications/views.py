@@ -17,6 +17,7 @@ from .forms import (
     CommunicationChannelForm, CommunicationTemplateForm, 
     CommunicationCampaignForm, CommunicationComposeForm
 )
+from apps.core.services.chrome_context import invalidate_user
 from apps.core.utils.tenant import get_current_tenant
 
 logger = logging.getLogger(__name__)
@@ -479,6 +480,7 @@ class MarkAllNotificationsReadView(LoginRequiredMixin, View):
         Notification.objects.filter(
             recipient=request.user, is_read=False
         ).update(is_read=True, read_at=timezone.now())
+        invalidate_user(request.user.pk)
         return JsonResponse({'status': 'success'})
 
 # ============================================================================
@@ -1,10 +1,16 @@
 from django.urls import path
 from apps.core.api.views import (
     DashboardAPIView,
-    GlobalSearchAPIView
+    GlobalSearchAPIView,
+    ExportJobAPIView,
+    ExportJobDetailAPIView,
+    ExportJobDownloadAPIView,
 )
 
 urlpatterns = [
     path('dashboard/', DashboardAPIView.as_view(), name='dashboard'),
     path('search/', GlobalSearchAPIView.as_view(), name='global-search'),
+    path('export-jobs/', ExportJobAPIView.as_view(), name='export-job-create'),
+    path('export-jobs/<str:job_id>/', ExportJobDetailAPIView.as_view(), name='export-job-detail'),
+    path('export-jobs/<str:job_id>/download/', ExportJobDownloadAPIView.as_view(), name='export-job-download'),
 ]
@@ -603,13 +603,20 @@ class BulkOperationAPIView(BaseAPIView):
 class ExportAPIView(BaseListAPIView):
     """
     API view for exporting data
+
+    With ``export_type`` set (a key of ``EXPORT_JOBS['TYPES']``), CSV and
+    Excel exports run as background jobs and the response is the job
+    (HTTP 202); otherwise they are streamed from the queryset.
     """
     export_formats = ['csv', 'excel', 'json']
+    export_type = None
     
     def get(self, request, *args, **kwargs):
         """Handle export request"""
         export_format = request.query_params.get('format', 'json')
         
+        if export_format in ('csv', 'excel') and self.export_type:
+            return self.export_job(export_format)
         if export_format == 'csv':
             return self.export_csv()
         elif export_format == 'excel':
@@ -622,55 +629,28 @@ class ExportAPIView(BaseListAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
+    def export_job(self, export_format):
+        """Queue (or reuse) a background export job"""
+        filters = {key: value for key, value in self.request.query_params.items() if key != 'format'}
+        return export_job_response(self.request, self.export_type, export_format, filters)
+    
     def export_csv(self):
-        """Export data as CSV"""
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="export.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write headers
-        headers = self.get_export_headers()
-        writer.writerow(headers)
+        """Export data as a streamed CSV"""
+        from apps.core.services.export_service import ExportService
         
-        # Write data
-        queryset = self.get_queryset()
-        for obj in queryset:
-            writer.writerow(self.get_export_row(obj))
-        
-        return response
+        return ExportService.export_to_csv(
+            self.get_queryset(), self.get_export_filename(), self.get_export_headers(),
+            row_callback=self.get_export_row
+        )
     
     def export_excel(self):
         """Export data as Excel"""
-        import openpyxl
-        from django.http import HttpResponse
-        
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Export"
+        from apps.core.services.export_service import ExportService
         
-        # Write headers
-        headers = self.get_export_headers()
-        for col_idx, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col_idx, value=header)
-        
-        # Write data
-        queryset = self.get_queryset()
-        for row_idx, obj in enumerate(queryset, 2):
-            row_data = self.get_export_row(obj)
-            for col_idx, value in enumerate(row_data, 1):
-                ws.cell(row=row_idx, column=col_idx, value=value)
-        
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return ExportService.export_to_excel(
+            self.get_queryset(), self.get_export_filename(), self.get_export_headers(),
+            row_callback=self.get_export_row
         )
-        response['Content-Disposition'] = 'attachment; filename="export.xlsx"'
-        wb.save(response)
-        
-        return response
     
     def export_json(self):
         """Export data as JSON"""
@@ -681,6 +661,10 @@ class ExportAPIView(BaseListAPIView):
         response['Content-Disposition'] = 'attachment; filename="export.json"'
         return response
     
+    def get_export_filename(self):
+        """Override to name the exported file (without extension)"""
+        return "export"
+    
     def get_export_headers(self):
         """Override to provide export headers"""
         raise NotImplementedError("Subclasses must implement get_export_headers")
@@ -690,6 +674,76 @@ class ExportAPIView(BaseListAPIView):
         raise NotImplementedError("Subclasses must implement get_export_row")
 
 
+def export_job_payload(request, job):
+    """Public view of an export job, with its status and download URLs"""
+    from django.urls import reverse
+    
+    data = {
+        key: job.get(key)
+        for key in ('job_id', 'type', 'format', 'filters', 'status', 'filename', 'rows',
+                    'error', 'requested_at', 'finished_at', 'reused')
+        if key in job
+    }
+    data['status_url'] = request.build_absolute_uri(reverse('export-job-detail', args=[job['job_id']]))
+    if job['status'] == 'SUCCESS':
+        data['download_url'] = request.build_absolute_uri(reverse('export-job-download', args=[job['job_id']]))
+    return data
+
+
+def export_job_response(request, export_type, export_format, filters):
+    """Request an export job and answer with it (HTTP 202)"""
+    from apps.core.services.export_jobs import ExportJobService
+    
+    try:
+        job = ExportJobService.request(get_current_tenant(), export_type, export_format, filters, request.user)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(export_job_payload(request, job), status=status.HTTP_202_ACCEPTED)
+
+
+class ExportJobAPIView(BaseAPIView):
+    """
+    Request a background export: ``{"type", "format", "filters"}``
+    """
+    def post(self, request, *args, **kwargs):
+        export_type = request.data.get('type')
+        export_format = request.data.get('format', 'csv')
+        filters = request.data.get('filters') or {}
+        if not isinstance(filters, dict):
+            return Response({'error': 'filters must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+        return export_job_response(request, export_type, export_format, filters)
+
+
+class ExportJobDetailAPIView(BaseAPIView):
+    """
+    Status of an export job the current user requested
+    """
+    def get_job(self, job_id):
+        from apps.core.services.export_jobs import ExportJobService
+        
+        job = ExportJobService.get_for(job_id, get_current_tenant(), self.request.user)
+        if not job:
+            raise Http404
+        return job
+    
+    def get(self, request, job_id, *args, **kwargs):
+        return Response(export_job_payload(request, self.get_job(job_id)))
+
+
+class ExportJobDownloadAPIView(ExportJobDetailAPIView):
+    """
+    Stream the file of a finished export job
+    """
+    def get(self, request, job_id, *args, **kwargs):
+        from django.core.files.storage import default_storage
+        from django.http import FileResponse
+        
+        job = self.get_job(job_id)
+        if job['status'] != 'SUCCESS' or not default_storage.exists(job['file']):
+            raise Http404
+        return FileResponse(default_storage.open(job['file'], 'rb'), as_attachment=True, filename=job['filename'])
+
+
 class DashboardAPIView(BaseAPIView):
     """
     API view for dashboard statistics
@@ -1,8 +1,10 @@
 
 from django.core.cache import cache
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 from django_tenants.utils import get_public_schema_name
 from apps.core.middleware import get_dynamic_tenant
+from apps.core.services.chrome_context import ChromeContext
 from apps.core.utils.tenant import get_current_tenant
 
 
@@ -21,11 +23,25 @@ def tenant_context(request):
     
     # Cache key for tenant data
     cache_key = f"tenant_context_{tenant.schema_name}_{tenant.id}"
-    cached_data = cache.get(cache_key)
-    
-    if cached_data:
-        return cached_data
-    
+    tenant_data = cache.get(cache_key)
+    if not tenant_data:
+        tenant_data = _build_tenant_data(tenant)
+        # Cache for 1 hour (3600 seconds)
+        cache.set(cache_key, tenant_data, 3600)
+
+    # Counts and broadcasts change more often than tenant settings; they are
+    # loaded (and cached briefly) only when a template uses them
+    chrome = ChromeContext.for_request(request)
+    return dict(
+        tenant_data,
+        current_users=chrome.lazy('user_count', 'tenant', fallback=0)
+        if hasattr(tenant, 'get_user_count') else 0,
+        system_broadcasts=chrome.lazy('system_broadcasts', 'tenant', fallback=[]),
+    )
+
+
+def _build_tenant_data(tenant):
+    """Tenant settings shown by templates (cached by ``tenant_context``)"""
     # Build comprehensive tenant context based on your model
     tenant_data = {
         # Basic tenant info
@@ -69,9 +85,6 @@ def tenant_context(request):
         'primary_color': '#3B82F6',
         'secondary_color': '#1E40AF',
         
-        # User count
-        'current_users': tenant.get_user_count() if hasattr(tenant, 'get_user_count') else 0,
-        
         # Public flag
         'is_public_tenant': False,
     }
@@ -125,31 +138,16 @@ def tenant_context(request):
     #     'youtube': getattr(tenant, 'youtube_url', None),
     # }
     
-    # Add system broadcasts from public schema
-    try:
-        from apps.tenants.models import SystemNotification
-        from django.db.models import Q
-        from django.utils import timezone
-        with schema_context(get_public_schema_name()):
-            broadcasts = SystemNotification.objects.filter(
-                Q(target_tenant=tenant) | Q(target_tenant__isnull=True),
-                is_active=True
-            ).filter(
-                Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
-            )
-            tenant_data['system_broadcasts'] = list(broadcasts)
-    except Exception:
-        tenant_data['system_broadcasts'] = []
-
-    # Cache for 1 hour (3600 seconds)
-    cache.set(cache_key, tenant_data, 3600)
-    
     return tenant_data
 
 
 def user_permissions(request):
     """
     Add user permissions to template context
+
+    Permissions, counts and header notifications are lazy: they cost no
+    query until a template reads them (see ``ChromeContext``). Permissions
+    come from the auth backend's role permission cache.
     """
     context = {}
     
@@ -163,24 +161,10 @@ def user_permissions(request):
         'user_display_name': request.user.get_full_name() or request.user.username,
     })
     
-    # Add permissions
-    try:
-        context['user_permissions'] = request.user.get_all_permissions()
-        
-        # Module access permissions
-        context['can_access'] = {
-            'academics': request.user.has_perm('academics.view_course'),
-            'finance': request.user.has_perm('finance.view_finance'),
-            'library': request.user.has_perm('library.view_book'),
-            'reports': request.user.has_perm('reports.view_report'),
-            'settings': request.user.has_perm('settings.change_settings'),
-            'inventory': request.user.has_perm('inventory.view_item'),
-        }
-        
-    except Exception as e:
-        # Fallback if permissions aren't available
-        context['user_permissions'] = set()
-        context['can_access'] = {}
+    chrome = ChromeContext.for_request(request)
+    context['user_permissions'] = chrome.lazy('permissions', 'request', fallback=set())
+    # Module access permissions
+    context['can_access'] = chrome.lazy('can_access', 'request', fallback={})
     
     # Add tenant-specific user data if tenant exists
     tenant = getattr(request, 'tenant', None)
@@ -188,53 +172,19 @@ def user_permissions(request):
         
         # Check user count against limits
         if hasattr(tenant, 'get_user_count') and hasattr(tenant, 'max_users'):
-            context['user_count'] = tenant.get_user_count()
+            user_count = chrome.lazy('user_count', 'tenant', fallback=0)
+            context['user_count'] = user_count
             context['user_limit'] = tenant.max_users
-            context['can_add_users'] = tenant.get_user_count() < tenant.max_users
+            context['can_add_users'] = SimpleLazyObject(lambda: user_count < tenant.max_users)
         
-        # Add notifications count if notifications app exists
         # Add notifications count if communications app exists
-        try:
-            from django.contrib.contenttypes.models import ContentType
-            from apps.communications.models import Communication
-            from django.db.models import Q
-            
-            user_type = ContentType.objects.get_for_model(request.user)
-            
-            # Base query for user notifications
-            user_notifications = Communication.objects.filter(
-                recipient_type=user_type,
-                recipient_id=request.user.id,
-                channel__channel_type__in=['IN_APP', 'PUSH'] # Include PUSH as they often appear in-app too
-            )
-            
-            # Count unread (not READ status)
-            unread_count = user_notifications.exclude(status='READ').count()
-            context['unread_notifications_count'] = unread_count
-            
-            # Get latest 5 unread/recent notifications for header
-            # Prioritize unread, then recent
-            header_notifications = user_notifications.order_by(
-                'status', # 'DELIVERED/SENT' comes before 'READ'? No, depends on alpha. 
-                # Better to just order bycreated_at desc
-                '-created_at'
-            )[:5]
-            context['header_notifications'] = header_notifications
-            
-        except (ImportError, Exception) as e:
-            # print(f"Error fetching notifications: {e}") # Debug only
-            context['unread_notifications_count'] = 0
-            context['header_notifications'] = []
+        context['unread_notifications_count'] = chrome.lazy('unread_communication_count', fallback=0)
+        # Latest in-app/push communications for the header
+        context['header_notifications'] = chrome.lazy('header_communications', fallback=[])
         
         # Add cart items count if store module is enabled
-        if tenant.configuration and hasattr(tenant.configuration, 'enable_store'):
-            if tenant.configuration.enable_store:
-                try:
-                    from apps.store.models import Cart
-                    cart_items_count = Cart.objects.filter(user=request.user).count()
-                    context['cart_items_count'] = cart_items_count
-                except (ImportError, Exception):
-                    context['cart_items_count'] = 0
+        if tenant.configuration and getattr(tenant.configuration, 'enable_store', False):
+            context['cart_items_count'] = chrome.lazy('cart_items_count', 'request', fallback=0)
     
     return context
 
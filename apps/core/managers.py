@@ -1,5 +1,5 @@
 # apps/core/managers.py (updated)
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
 from django.utils import timezone
 from django.core.exceptions import FieldError
@@ -10,9 +10,11 @@ class AuditManager(models.Manager):
     Custom manager for models with audit trail functionality
     (Also aliased as AuditTrailManager)
     """
-    def create(self, **kwargs):
+    def create(self, validate=False, **kwargs):
         """
-        Override create to set created_by/created_at if available
+        Override create to set created_by/created_at if available.
+        ``validate`` runs ``full_clean()`` before the insert; pass it for
+        input no form or serializer has validated (see ``TenantAwareModel.save``).
         """
         # Import inside method to avoid circular imports
         try:
@@ -26,11 +28,36 @@ class AuditManager(models.Manager):
         if 'created_at' not in kwargs:
             kwargs['created_at'] = timezone.now()
             
-        return super().create(**kwargs)
+        if not validate:
+            return super().create(**kwargs)
+        obj = self.model(**kwargs)
+        obj.save(force_insert=True, using=self.db, validate=True)
+        return obj
+
+    def update_or_create(self, defaults=None, validate=False, **kwargs):
+        """
+        ``update_or_create`` whose save runs ``full_clean()`` when
+        ``validate`` is set
+        """
+        if not validate:
+            return super().update_or_create(defaults=defaults, **kwargs)
+        defaults = defaults or {}
+        with transaction.atomic(using=self.db):
+            obj = self.select_for_update().filter(**kwargs).first()
+            if obj is None:
+                params = {key: value for key, value in kwargs.items() if '__' not in key}
+                params.update(defaults)
+                return self.create(validate=True, **params), True
+            for field, value in defaults.items():
+                setattr(obj, field, value)
+            obj.save(using=self.db, validate=True)
+            return obj, False
     
-    def bulk_create(self, objs, **kwargs):
+    def bulk_create(self, objs, validate=False, **kwargs):
         """
-        Override bulk_create to set audit fields
+        Override bulk_create to set audit fields and, for signed models,
+        missing data signatures. ``validate`` runs ``full_clean()`` on each
+        object first (off by default, as with the fast ``save`` path).
         """
         # Import inside method to avoid circular imports
         from django.utils import timezone
@@ -41,15 +68,26 @@ class AuditManager(models.Manager):
             user = get_current_user()
         except ImportError:
             user = None
-        
+        if not (user and user.is_authenticated):
+            user = None
+
+        objs = list(objs)
         for obj in objs:
             if hasattr(obj, 'created_at') and not obj.created_at:
                 obj.created_at = current_time
-            if hasattr(obj, 'created_by') and not obj.created_by and user and user.is_authenticated:
+            # Compare ids: reading the relation would fetch the user per row
+            if user and hasattr(obj, 'created_by_id') and not obj.created_by_id:
                 obj.created_by = user
-                
+            if user and hasattr(obj, 'updated_by_id') and not obj.updated_by_id:
+                obj.updated_by = user
+            if validate:
+                obj.full_clean()
+
+        if hasattr(self.model, 'calculate_signatures'):
+            self.model.calculate_signatures([obj for obj in objs if not obj.data_signature])
+
         return super().bulk_create(objs, **kwargs)
-    
+
     def update(self, **kwargs):
         """
         Override update to set updated_by/updated_at
@@ -141,6 +179,29 @@ class TenantManager(AuditManager):  # Inherit from AuditManager
             return queryset.filter(tenant=current_tenant)
         return queryset
 
+    def bulk_create(self, objs, **kwargs):
+        """
+        Set the current tenant on objects created without one, and refuse
+        objects of another tenant (the checks ``save`` runs per row)
+        """
+        from django.core.exceptions import ValidationError
+        from apps.core.utils.tenant import get_current_tenant
+
+        current_tenant = get_current_tenant()
+        objs = list(objs)
+        for obj in objs:
+            if not obj.tenant_id:
+                if not current_tenant:
+                    raise ValidationError(
+                        "Tenant context missing. Ensure tenant middleware is configured."
+                    )
+                obj.tenant = current_tenant
+            elif current_tenant and obj.tenant_id != current_tenant.id:
+                raise ValidationError(
+                    'Tenant mismatch detected. Potential security violation.'
+                )
+        return super().bulk_create(objs, **kwargs)
+
     def for_tenant(self, tenant):
         """
         Explicitly filter for a specific tenant
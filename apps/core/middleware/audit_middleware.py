@@ -61,12 +61,13 @@ class SafeAuditMiddleware(MiddlewareMixin):
                     severity = AuditLog.AuditSeverity.WARNING
                     status = 'FAILED'
                 
-                # Safely create audit entry
-                AuditService.create_audit_entry(
+                # Safely record audit entry (queued when the async sink is enabled)
+                AuditService.submit_audit_entry(
                     action=AuditLog.AuditAction.API_CALL,
                     resource_type='API',
                     user=request.user if request.user.is_authenticated else None,
                     request=request,
+                    tenant=getattr(request, 'tenant', None),
                     severity=severity,
                     status=status,
                     duration_ms=duration_ms,
@@ -92,11 +93,12 @@ class SafeAuditMiddleware(MiddlewareMixin):
     def process_exception(self, request, exception):
         """Log exceptions separately"""
         try:
-            AuditService.create_audit_entry(
+            AuditService.submit_audit_entry(
                 action=AuditLog.AuditAction.API_CALL,
                 resource_type='API',
                 user=request.user if hasattr(request, 'user') and request.user.is_authenticated else None,
                 request=request,
+                tenant=getattr(request, 'tenant', None),
                 severity=AuditLog.AuditSeverity.ERROR,
                 status='FAILED',
                 error_message=str(exception),
@@ -2,7 +2,9 @@
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django_tenants.utils import get_public_schema_name
+import uuid
 import jwt
 
 from apps.core.utils.tenant import (
@@ -13,6 +15,7 @@ from apps.core.utils.tenant import (
     clear_user,
     get_current_user
 )
+from apps.core.services.tenant_cache import tenant_resolution_cache
 from apps.tenants.models import Tenant, Domain
 
 User = get_user_model()
@@ -47,13 +50,14 @@ class TenantMiddleware(MiddlewareMixin):
             # Attach tenant to request object
             request.tenant = tenant
             
-            # Store in session for consistency
-            if hasattr(request, 'session'):
+            # Store in session for consistency (only write when it changes,
+            # otherwise every request marks the session dirty)
+            if hasattr(request, 'session') and request.session.get('tenant_id') != str(tenant.id):
                 request.session['tenant_id'] = str(tenant.id)
         else:
             # If no tenant found, set to public schema
             request.tenant = None
-            if hasattr(request, 'session'):
+            if hasattr(request, 'session') and 'tenant_id' in request.session:
                 request.session.pop('tenant_id', None)
         
         # Set current user in thread-local storage if user is authenticated
@@ -89,10 +93,9 @@ class TenantMiddleware(MiddlewareMixin):
         # Strategy 1: Direct session/header override (for debugging/API)
         tenant_id = self._get_tenant_from_debug_header(request)
         if tenant_id:
-            try:
-                return Tenant.objects.get(id=tenant_id, is_active=True)
-            except (Tenant.DoesNotExist, ValueError):
-                pass
+            tenant = self._get_tenant_by_id(tenant_id)
+            if tenant:
+                return tenant
 
         # Strategy 2: Subdomain-based tenant identification (primary method)
         tenant = self._get_tenant_from_subdomain(request)
@@ -122,6 +125,38 @@ class TenantMiddleware(MiddlewareMixin):
         # No tenant found - will use public schema
         return None
 
+    def _get_tenant_by_id(self, tenant_id):
+        """
+        Cached lookup of an active tenant by primary key
+        """
+        def load():
+            try:
+                return Tenant.objects.get(id=tenant_id, is_active=True)
+            except (Tenant.DoesNotExist, ValueError, ValidationError):
+                return None
+
+        return tenant_resolution_cache.resolve('id', str(tenant_id), load)
+
+    def _get_tenant_by_slug(self, slug):
+        """
+        Cached lookup of an active tenant by slug
+        """
+        def load():
+            try:
+                return Tenant.objects.get(slug=slug, is_active=True)
+            except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
+                return None
+
+        return tenant_resolution_cache.resolve('slug', slug, load)
+
+    @staticmethod
+    def _is_uuid(value):
+        try:
+            uuid.UUID(str(value))
+            return True
+        except ValueError:
+            return False
+
     def _get_tenant_from_debug_header(self, request):
         """
         Get tenant from debug header (for development/testing)
@@ -156,22 +191,25 @@ class TenantMiddleware(MiddlewareMixin):
                 return None
             
             # Check if this is a valid tenant domain
-            try:
-                # First, try to get by domain name
-                domain = Domain.objects.select_related('tenant').get(
-                    domain=host,
-                    tenant__is_active=True
-                )
-                return domain.tenant
-            except Domain.DoesNotExist:
-                # Fallback to tenant slug/schema name
+            def load():
                 try:
-                    return Tenant.objects.get(
-                        slug=subdomain,
-                        is_active=True
+                    # First, try to get by domain name
+                    domain = Domain.objects.select_related('tenant').get(
+                        domain=host,
+                        tenant__is_active=True
                     )
-                except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
-                    pass
+                    return domain.tenant
+                except Domain.DoesNotExist:
+                    # Fallback to tenant slug/schema name
+                    try:
+                        return Tenant.objects.get(
+                            slug=subdomain,
+                            is_active=True
+                        )
+                    except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
+                        return None
+
+            return tenant_resolution_cache.resolve('host', host, load)
         
         return None
 
@@ -184,20 +222,12 @@ class TenantMiddleware(MiddlewareMixin):
             tenant_header = request.headers.get('Tenant-ID')
         
         if tenant_header:
-            try:
-                return Tenant.objects.get(
-                    id=tenant_header,
-                    is_active=True
-                )
-            except (Tenant.DoesNotExist, ValueError):
-                # Try slug if ID doesn't work
-                try:
-                    return Tenant.objects.get(
-                        slug=tenant_header,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
-                    pass
+            # IDs are UUIDs; anything else can only be a slug
+            if self._is_uuid(tenant_header):
+                tenant = self._get_tenant_by_id(tenant_header)
+                if tenant:
+                    return tenant
+            return self._get_tenant_by_slug(tenant_header)
         
         return None
 
@@ -209,13 +239,9 @@ class TenantMiddleware(MiddlewareMixin):
             # Method 1: Direct user attribute
             tenant_id = getattr(request.user, 'tenant_id', None)
             if tenant_id:
-                try:
-                    return Tenant.objects.get(
-                        id=tenant_id,
-                        is_active=True
-                    )
-                except Tenant.DoesNotExist:
-                    pass
+                tenant = self._get_tenant_by_id(tenant_id)
+                if tenant:
+                    return tenant
             
             # Method 2: JWT token in Authorization header
             auth_header = request.headers.get('Authorization', '')
@@ -227,11 +253,8 @@ class TenantMiddleware(MiddlewareMixin):
                     decoded = jwt.decode(token, options={"verify_signature": False})
                     tenant_id = decoded.get('tenant_id')
                     if tenant_id:
-                        return Tenant.objects.get(
-                            id=tenant_id,
-                            is_active=True
-                        )
-                except (jwt.DecodeError, jwt.InvalidTokenError, Tenant.DoesNotExist):
+                        return self._get_tenant_by_id(tenant_id)
+                except (jwt.DecodeError, jwt.InvalidTokenError):
                     pass
         
         return None
@@ -243,13 +266,10 @@ class TenantMiddleware(MiddlewareMixin):
         if hasattr(request, 'session'):
             tenant_id = request.session.get('tenant_id')
             if tenant_id:
-                try:
-                    return Tenant.objects.get(
-                        id=tenant_id,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, ValueError):
-                    request.session.pop('tenant_id', None)
+                tenant = self._get_tenant_by_id(tenant_id)
+                if tenant:
+                    return tenant
+                request.session.pop('tenant_id', None)
         
         return None
 
@@ -270,13 +290,7 @@ class TenantMiddleware(MiddlewareMixin):
             
             # Check if this looks like a tenant slug
             if tenant_slug and tenant_slug not in ['static', 'media', 'auth', 'login', 'logout']:
-                try:
-                    return Tenant.objects.get(
-                        slug=tenant_slug,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
-                    pass
+                return self._get_tenant_by_slug(tenant_slug)
         
         return None
 
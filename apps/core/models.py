@@ -1,6 +1,7 @@
 import uuid
 import json
 import hashlib
+import operator
 
 from django.db import models
 from django.conf import settings
@@ -20,6 +21,18 @@ from apps.core.managers import (
     TenantSoftDeleteManager,
 )
 
+# Fields left out of ``data_signature``: the signature itself and the
+# timestamps only known once the row is written
+SIGNATURE_EXCLUDED_FIELDS = frozenset({'data_signature', 'created_at', 'updated_at'})
+
+_signature_readers = {}
+
+
+def model_save_options():
+    config = getattr(settings, 'MODEL_SAVE', {})
+    return {
+        'validate': config.get('VALIDATE', False),
+    }
 
 
 class UUIDModel(models.Model):
@@ -63,13 +76,44 @@ class CryptographicModel(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def signature_reader(cls):
+        """
+        ``(attnames, getter)`` hashed into ``data_signature``, resolved once
+        per model: every concrete field except the signature itself and the
+        timestamps Django fills in during the INSERT
+        """
+        reader = _signature_readers.get(cls)
+        if reader is None:
+            attnames = tuple(
+                field.attname for field in cls._meta.concrete_fields
+                if field.name not in SIGNATURE_EXCLUDED_FIELDS
+            )
+            getter = operator.attrgetter(*attnames) if len(attnames) > 1 else (
+                lambda instance: (getattr(instance, attnames[0]),)
+            )
+            reader = _signature_readers[cls] = (attnames, getter)
+        return reader
+
+    @classmethod
+    def _signature_digest(cls, values):
+        payload = json.dumps([cls._meta.label, values], default=str, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
     def calculate_signature(self):
         """Calculate SHA-256 signature for data integrity"""
-        import json
-        from django.core import serializers
-        
-        data = serializers.serialize('json', [self])
-        return hashlib.sha256(data.encode()).hexdigest()
+        return self._signature_digest(self.signature_reader()[1](self))
+
+    @classmethod
+    def calculate_signatures(cls, instances):
+        """
+        Set ``data_signature`` on many unsaved instances (e.g. before
+        ``bulk_create``); matches ``calculate_signature``
+        """
+        getter = cls.signature_reader()[1]
+        for instance in instances:
+            instance.data_signature = cls._signature_digest(getter(instance))
+        return instances
 
     def verify_integrity(self):
         """Verify data hasn't been tampered with"""
@@ -300,8 +344,7 @@ class TenantAwareModel(models.Model):
             return
 
         from apps.tenants.models import Tenant
-        from apps.core.utils.tenant import get_current_tenant
-        
+
         if not self.tenant_id:
             raise ValidationError(
                 'Tenant context is required for all tenant-aware models.'
@@ -319,16 +362,30 @@ class TenantAwareModel(models.Model):
                 'Referenced tenant does not exist.'
             )
 
-        # Ensure tenant matches current context (security check)
+        self.check_tenant_context()
+
+    def check_tenant_context(self):
+        """
+        Ensure tenant matches current context (security check). Needs no
+        query, so it also runs on saves that skip ``full_clean``.
+        """
+        from apps.core.utils.tenant import get_current_tenant
+
         current_tenant = get_current_tenant()
         if current_tenant and self.tenant_id != current_tenant.id:
             raise ValidationError(
                 'Tenant mismatch detected. Potential security violation.'
             )
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, validate=None, **kwargs):
         """
-        Auto-set tenant from context with security validation
+        Auto-set tenant from context with security validation.
+
+        ``validate`` runs ``full_clean()`` (field, tenant and unique checks,
+        the latter costing queries); it defaults to ``MODEL_SAVE['VALIDATE']``
+        (off). Without it only the tenant context check runs, so call sites
+        whose input was not already validated by a form or serializer pass
+        ``True`` (the manager's ``create``/``update_or_create`` accept it too).
         """
         from apps.core.utils.tenant import get_current_tenant
         
@@ -345,11 +402,17 @@ class TenantAwareModel(models.Model):
                     )
                 self.tenant = current_tenant
 
+        if validate is None:
+            validate = model_save_options()['validate']
+
         # Only run full validation if tenant is set
         # This allows forms to set tenant before validation
         if self.tenant_id:
-            self.full_clean()
-        
+            if validate:
+                self.full_clean()
+            elif not (hasattr(self, 'is_superuser') and self.is_superuser):
+                self.check_tenant_context()
+
         super().save(*args, **kwargs)
 
 
@@ -418,7 +481,9 @@ class BaseSharedModel(UUIDModel, CryptographicModel, TimeStampedModel,
     def __str__(self):
         return f"{self.__class__.__name__}[{self.short_id}]"
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, validate=False, **kwargs):
+        if validate:
+            self.full_clean()
         if not self.data_signature:
             self.data_signature = self.calculate_signature()
         super().save(*args, **kwargs)
@@ -551,7 +616,8 @@ class AuditLog(models.Model):
     
     # Basic Information
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # When the action happened; queued and replayed rows keep it at insert
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
     
     # User Information (as strings, not foreign keys)
     user_id = models.CharField(max_length=100, null=True, blank=True, db_index=True)
@@ -614,3 +680,108 @@ class AuditLog(models.Model):
     
     def __str__(self):
         return f"{self.timestamp} - {self.user_email or 'System'} - {self.action} - {self.resource_type}"
+
+
+class DocumentSequence(models.Model):
+    """
+    Per-tenant counter behind generated document numbers (invoice, payment,
+    admission, ...). ``series`` is the number prefix, e.g. ``INV-2025-``;
+    ``last_value`` is the highest number handed out. Rows are locked while
+    allocating, see ``apps.core.services.sequence_service``.
+    """
+    tenant_id = models.CharField(max_length=100, blank=True, default='')
+    series = models.CharField(max_length=150)
+    last_value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'document_sequences'
+        constraints = [
+            models.UniqueConstraint(fields=['tenant_id', 'series'], name='unique_document_sequence'),
+        ]
+
+    def __str__(self):
+        return f"{self.tenant_id or 'global'} {self.series}{self.last_value}"
+
+
+class ExportJob(models.Model):
+    """
+    A background export requested through ``ExportJobService``; the row is
+    the record of the job shared by the web process and the Celery worker.
+    At most one job per ``dedupe_key`` is pending or running at a time.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        SUCCESS = 'SUCCESS', 'Success'
+        FAILURE = 'FAILURE', 'Failure'
+
+    ACTIVE_STATUSES = (Status.PENDING, Status.RUNNING)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant_id = models.CharField(max_length=100, db_index=True)
+    user_id = models.CharField(max_length=100, null=True, blank=True)
+    export_type = models.CharField(max_length=100)
+    export_format = models.CharField(max_length=20)
+    filters = models.JSONField(default=dict, blank=True)
+    dedupe_key = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    file = models.CharField(max_length=500, null=True, blank=True)
+    filename = models.CharField(max_length=255, null=True, blank=True)
+    rows = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    requested_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'export_jobs'
+        indexes = [
+            models.Index(fields=['dedupe_key', 'requested_at'], name='export_job_dedupe_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING']),
+                name='unique_active_export_job',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.export_type} ({self.export_format}) {self.id} - {self.status}"
+
+    def as_dict(self):
+        """The job as plain data (API payloads and Celery results)"""
+        return {
+            'job_id': self.id.hex,
+            'tenant_id': self.tenant_id,
+            'type': self.export_type,
+            'format': self.export_format,
+            'filters': self.filters,
+            'user_id': self.user_id,
+            'status': self.status,
+            'file': self.file,
+            'filename': self.filename,
+            'rows': self.rows,
+            'error': self.error,
+            'requested_at': self.requested_at.isoformat() if self.requested_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobLock(models.Model):
+    """
+    A named lock held by a background job across processes: the web process
+    takes it before queuing the job and the worker releases it when the job
+    ends. ``expires_at`` bounds how long a lost worker can hold it. See
+    ``apps.core.services.job_lock``.
+    """
+    key = models.CharField(max_length=255, unique=True)
+    acquired_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'job_locks'
+
+    def __str__(self):
+        return f"{self.key} (until {self.expires_at})"
@@ -46,11 +46,9 @@ def check_user_permission(user, permission_codename, obj=None):
     if user.has_perm(permission_codename):
         return True
     
-    # Check role permission
-    from apps.auth.models import RolePermission
-    role_perms = RolePermission.get_permissions_for_role(user.role, user.tenant)
-    
-    if permission_codename in role_perms:
+    # Check role permission (cached per tenant and role)
+    from apps.auth.permission_cache import role_permissions
+    if role_permissions.has(user.tenant_id, user.role, permission_codename):
         return True
     
     # Check object-level permission if object is provided
@@ -2,7 +2,7 @@
 import uuid
 import json
 import traceback
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -67,8 +67,15 @@ class AuditService:
             }
     
     @classmethod
-    def get_tenant_info(cls, tenant_id: Optional[str] = None) -> Dict[str, Any]:
+    def get_tenant_info(cls, tenant_id: Optional[str] = None, tenant=None) -> Dict[str, Any]:
         """Get tenant information matching AuditLog model fields"""
+        if tenant is not None:
+            # Already resolved (e.g. request.tenant) - no lookup needed
+            return {
+                'tenant_id': str(tenant.id),
+                'tenant_name': (tenant.name or '')[:200]
+            }
+
         if not tenant_id:
             return {'tenant_id': None, 'tenant_name': None}
         
@@ -88,7 +95,7 @@ class AuditService:
         }
     
     @classmethod
-    def create_audit_entry(
+    def build_audit_data(
         cls,
         action: str,
         resource_type: str,
@@ -104,101 +111,194 @@ class AuditService:
         status: str = 'SUCCESS',
         error_message: Optional[str] = None,
         tenant_id: Optional[str] = None,
+        tenant=None,
         duration_ms: Optional[float] = None,
         extra_data: Optional[Dict] = None,
         **kwargs
-    ) -> Optional[AuditLog]:
+    ) -> Dict[str, Any]:
         """
-        Create an audit log entry - UPDATED to match AuditLog model fields exactly
+        Build the AuditLog field values for an entry without saving it
         """
-        try:
-            # Generate unique request ID if not provided
-            request_id = getattr(request, 'request_id', None) or str(uuid.uuid4())[:32]
-            
-            # Get session ID
-            session_id = None
-            if request and hasattr(request, 'session'):
-                session_id = request.session.session_key
-            
-            # Get user information (matching model field names)
-            user_info = cls.get_user_info(user)
+        # Generate unique request ID if not provided
+        request_id = getattr(request, 'request_id', None) or str(uuid.uuid4())[:32]
+        
+        # Get session ID
+        session_id = None
+        if request and hasattr(request, 'session'):
+            session_id = request.session.session_key
+        
+        # Get user information (matching model field names)
+        user_info = cls.get_user_info(user)
+        
+        # Get tenant information (matching model field names)
+        tenant_info = cls.get_tenant_info(tenant_id, tenant=tenant)
+        
+        # Prepare request information
+        request_path = None
+        request_method = None
+        user_ip = None
+        user_agent = None
+        
+        if request:
+            request_path = request.path[:500]  # Match model max_length
+            request_method = request.method[:10]  # Match model max_length
+            user_ip = cls.get_client_ip(request)
+            user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]  # Match model max_length
+        
+        # Get resource information from instance
+        if instance and not resource_id:
+            resource_id = str(getattr(instance, 'id', ''))[:100]  # Match model max_length
+        
+        if instance and not resource_name:
+            resource_name = str(instance)[:500]  # Match model max_length
+        
+        # Calculate changes if not provided
+        if changes is None and previous_state and new_state:
+            changes = cls._calculate_changes(previous_state, new_state)
+        
+        # Prepare audit data - EXACTLY matching AuditLog model fields
+        audit_data = {
+            # Event time, kept when the row is written later in bulk
+            'timestamp': timezone.now(),
             
-            # Get tenant information (matching model field names)
-            tenant_info = cls.get_tenant_info(tenant_id)
+            # User information - EXACT model field names
+            'user_id': user_info['user_id'],
+            'user_email': user_info['user_email'],
+            'user_display_name': user_info['user_display_name'],
             
-            # Prepare request information
-            request_path = None
-            request_method = None
-            user_ip = None
-            user_agent = None
+            # Action information - EXACT model field names
+            'action': action,
+            'severity': severity,
+            'status': status,
             
-            if request:
-                request_path = request.path[:500]  # Match model max_length
-                request_method = request.method[:10]  # Match model max_length
-                user_ip = cls.get_client_ip(request)
-                user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]  # Match model max_length
+            # Resource information - EXACT model field names
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'resource_name': resource_name,
             
-            # Get resource information from instance
-            if instance and not resource_id:
-                resource_id = str(getattr(instance, 'id', ''))[:100]  # Match model max_length
+            # State changes - EXACT model field names
+            'changes': changes,
+            'previous_state': previous_state,
+            'new_state': new_state,
             
-            if instance and not resource_name:
-                resource_name = str(instance)[:500]  # Match model max_length
+            # Request information - EXACT model field names
+            'request_id': request_id,
+            'session_id': session_id,
+            'user_ip': user_ip,
+            'user_agent': user_agent,
+            'request_method': request_method,
+            'request_path': request_path,
             
-            # Calculate changes if not provided
-            if changes is None and previous_state and new_state:
-                changes = cls._calculate_changes(previous_state, new_state)
+            # Error information - EXACT model field names
+            'error_message': error_message,
             
-            # Prepare audit data - EXACTLY matching AuditLog model fields
-            audit_data = {
-                # User information - EXACT model field names
-                'user_id': user_info['user_id'],
-                'user_email': user_info['user_email'],
-                'user_display_name': user_info['user_display_name'],
-                
-                # Action information - EXACT model field names
-                'action': action,
-                'severity': severity,
-                'status': status,
-                
-                # Resource information - EXACT model field names
-                'resource_type': resource_type,
-                'resource_id': resource_id,
-                'resource_name': resource_name,
-                
-                # State changes - EXACT model field names
-                'changes': changes,
-                'previous_state': previous_state,
-                'new_state': new_state,
-                
-                # Request information - EXACT model field names
-                'request_id': request_id,
-                'session_id': session_id,
-                'user_ip': user_ip,
-                'user_agent': user_agent,
-                'request_method': request_method,
-                'request_path': request_path,
-                
-                # Error information - EXACT model field names
-                'error_message': error_message,
-                
-                # Tenant information - EXACT model field names
-                'tenant_id': tenant_info['tenant_id'],
-                'tenant_name': tenant_info['tenant_name'],
-                
-                # Performance - EXACT model field names
-                'duration_ms': duration_ms,
-                
-                # Extra data - EXACT model field names
-                'extra_data': extra_data or {},
-            }
+            # Tenant information - EXACT model field names
+            'tenant_id': tenant_info['tenant_id'],
+            'tenant_name': tenant_info['tenant_name'],
             
-            # Add stack trace if there's an error
-            if error_message:
-                audit_data['stack_trace'] = traceback.format_exc()[:10000]  # Limit length
+            # Performance - EXACT model field names
+            'duration_ms': duration_ms,
             
-            # Remove None values (except for fields that can legitimately be None)
-            audit_data = {k: v for k, v in audit_data.items() if v is not None}
+            # Extra data - EXACT model field names
+            'extra_data': extra_data or {},
+        }
+        
+        # Add stack trace if there's an error
+        if error_message:
+            audit_data['stack_trace'] = traceback.format_exc()[:10000]  # Limit length
+        
+        # Remove None values (except for fields that can legitimately be None)
+        return {k: v for k, v in audit_data.items() if v is not None}
+    
+    @classmethod
+    def submit_audit_entry(cls, action: str, resource_type: str, **kwargs) -> None:
+        """
+        Record an audit entry using the configured sink.
+
+        In ``async`` mode the row is queued and written in bulk by a background
+        flusher (see ``apps.core.services.audit_sink``); in ``sync`` mode this
+        is the same as ``create_audit_entry``. Entries linked to a model
+        instance are always written synchronously.
+        """
+        sink_mode = getattr(settings, 'AUDIT_LOG_SETTINGS', {}).get('SINK', {}).get('MODE', 'sync')
+        if sink_mode != 'async' or kwargs.get('instance') is not None:
+            cls.create_audit_entry(action=action, resource_type=resource_type, **kwargs)
+            return
+        
+        try:
+            from apps.core.services.audit_sink import audit_sink
+            audit_sink.submit(cls.build_audit_data(action=action, resource_type=resource_type, **kwargs))
+        except Exception:
+            import logging
+            logging.getLogger('audit_service').error("Failed to queue audit entry", exc_info=True)
+    
+    @classmethod
+    def submit_audit_entries(cls, entries: List[Dict[str, Any]]) -> int:
+        """
+        Record many audit entries at once; each item holds the keyword
+        arguments of ``build_audit_data``. Queued on the sink in ``async``
+        mode, otherwise written with a single ``bulk_create``.
+        """
+        try:
+            rows = [cls.build_audit_data(**entry) for entry in entries]
+            sink_mode = getattr(settings, 'AUDIT_LOG_SETTINGS', {}).get('SINK', {}).get('MODE', 'sync')
+            if sink_mode == 'async':
+                from apps.core.services.audit_sink import audit_sink
+                for row in rows:
+                    audit_sink.submit(row)
+            else:
+                AuditLog.objects.bulk_create([AuditLog(**row) for row in rows], batch_size=500)
+            return len(rows)
+        except Exception:
+            import logging
+            logging.getLogger('audit_service').error("Failed to record audit entries", exc_info=True)
+            return 0
+
+    @classmethod
+    def create_audit_entry(
+        cls,
+        action: str,
+        resource_type: str,
+        user=None,
+        request: Optional[HttpRequest] = None,
+        instance=None,
+        resource_id: Optional[str] = None,
+        resource_name: Optional[str] = None,
+        changes: Optional[Dict] = None,
+        previous_state: Optional[Dict] = None,
+        new_state: Optional[Dict] = None,
+        severity: str = 'INFO',
+        status: str = 'SUCCESS',
+        error_message: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        tenant=None,
+        duration_ms: Optional[float] = None,
+        extra_data: Optional[Dict] = None,
+        **kwargs
+    ) -> Optional[AuditLog]:
+        """
+        Create an audit log entry - UPDATED to match AuditLog model fields exactly
+        """
+        try:
+            audit_data = cls.build_audit_data(
+                action=action,
+                resource_type=resource_type,
+                user=user,
+                request=request,
+                instance=instance,
+                resource_id=resource_id,
+                resource_name=resource_name,
+                changes=changes,
+                previous_state=previous_state,
+                new_state=new_state,
+                severity=severity,
+                status=status,
+                error_message=error_message,
+                tenant_id=tenant_id,
+                tenant=tenant,
+                duration_ms=duration_ms,
+                extra_data=extra_data,
+            )
             
             # Create the audit entry
             with transaction.atomic():
@@ -0,0 +1,232 @@
+# apps/core/services/audit_sink.py
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from apps.core.models import AuditLog
+
+logger = logging.getLogger('audit_service')
+
+
+class AuditSink:
+    """
+    Bounded in-memory queue of audit rows flushed by a background thread
+    with ``bulk_create``.
+
+    Rows are flushed when ``BATCH_SIZE`` entries are waiting or every
+    ``FLUSH_INTERVAL`` seconds, whichever comes first. When the queue is full
+    the ``OVERFLOW`` policy decides what happens:
+
+    * ``block`` - the request thread waits (up to ``BLOCK_TIMEOUT``) for room
+    * ``drop_oldest`` - the oldest queued row is discarded
+    * ``spill`` - the row is appended as JSON to ``SPILL_PATH`` and replayed
+      by the flusher once the queue drains
+    """
+
+    OVERFLOW_BLOCK = 'block'
+    OVERFLOW_DROP_OLDEST = 'drop_oldest'
+    OVERFLOW_SPILL = 'spill'
+
+    def __init__(self, queue_size=10000, batch_size=200, flush_interval=2.0,
+                 overflow=OVERFLOW_SPILL, spill_path=None, block_timeout=1.0):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.spill_path = spill_path or os.path.join(str(settings.BASE_DIR), 'logs', 'audit_spill.jsonl')
+        self.block_timeout = block_timeout
+
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'spilled': 0, 'failed': 0}
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'AUDIT_LOG_SETTINGS', {}).get('SINK', {})
+        return cls(
+            queue_size=config.get('QUEUE_SIZE', 10000),
+            batch_size=config.get('BATCH_SIZE', 200),
+            flush_interval=config.get('FLUSH_INTERVAL', 2.0),
+            overflow=config.get('OVERFLOW', cls.OVERFLOW_SPILL),
+            spill_path=config.get('SPILL_PATH'),
+            block_timeout=config.get('BLOCK_TIMEOUT', 1.0),
+        )
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(self, audit_data: Dict[str, Any]):
+        """Queue one AuditLog row (as a dict of model field values)"""
+        # Stamp the event now; the row may be written (or replayed) much later
+        audit_data.setdefault('timestamp', timezone.now())
+        self._ensure_started()
+        self._stats['enqueued'] += 1
+
+        if self.overflow == self.OVERFLOW_BLOCK:
+            try:
+                self._queue.put(audit_data, timeout=self.block_timeout)
+            except queue.Full:
+                self._stats['dropped'] += 1
+                logger.warning("Audit queue full, dropping entry after %.1fs", self.block_timeout)
+            return
+
+        try:
+            self._queue.put_nowait(audit_data)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == self.OVERFLOW_DROP_OLDEST:
+            try:
+                self._queue.get_nowait()
+                self._stats['dropped'] += 1
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(audit_data)
+            except queue.Full:
+                self._stats['dropped'] += 1
+        else:
+            self._spill([audit_data])
+
+    def _ensure_started(self):
+        # Re-create the queue and flusher after a fork (gunicorn --preload)
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-sink-flusher', daemon=True)
+            self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._write(batch)
+            elif self.overflow == self.OVERFLOW_SPILL:
+                self._replay_spill()
+        self._drain()
+        connection.close()
+
+    def _collect_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        if self._queue is None:
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        close_old_connections()
+        try:
+            AuditLog.objects.bulk_create([AuditLog(**row) for row in batch], batch_size=self.batch_size)
+            self._stats['written'] += len(batch)
+        except Exception:
+            self._stats['failed'] += len(batch)
+            logger.error("Failed to flush %d audit entries", len(batch), exc_info=True)
+            if self.overflow == self.OVERFLOW_SPILL:
+                self._spill(batch)
+
+    # ------------------------------------------------------------------
+    # Spill file
+    # ------------------------------------------------------------------
+    def _spill(self, rows: List[Dict[str, Any]]):
+        try:
+            with self._spill_lock:
+                os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+                with open(self.spill_path, 'a', encoding='utf-8') as fh:
+                    for row in rows:
+                        fh.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            self._stats['spilled'] += len(rows)
+        except Exception:
+            self._stats['dropped'] += len(rows)
+            logger.error("Failed to spill %d audit entries", len(rows), exc_info=True)
+
+    def _replay_spill(self):
+        if not os.path.exists(self.spill_path):
+            return
+        replay_path = f"{self.spill_path}.{os.getpid()}.replay"
+        with self._spill_lock:
+            try:
+                os.replace(self.spill_path, replay_path)
+            except OSError:
+                return
+        with open(replay_path, encoding='utf-8') as fh:
+            rows = [json.loads(line) for line in fh if line.strip()]
+        os.remove(replay_path)
+        for start in range(0, len(rows), self.batch_size):
+            self._write(rows[start:start + self.batch_size])
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been written"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        deadline = time.monotonic() + timeout if timeout else None
+        while not self._queue.empty():
+            if deadline and time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+
+    def shutdown(self, timeout=10.0):
+        """Stop the flusher and write out everything still queued"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            # Flusher is stuck; make sure nothing queued is lost
+            self._spill(list(self._queue.queue))
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize() if self._queue is not None else 0
+        return stats
+
+
+audit_sink = AuditSink.from_settings()
+atexit.register(audit_sink.shutdown)
@@ -0,0 +1,359 @@
+"""
+Bulk broadcast fan-out
+
+Recipients are resolved with two flat queries, in-app notifications are
+bulk-inserted, and email/SMS/socket delivery is handed to Celery in
+batches, so a school-wide announcement returns as soon as it is queued.
+"""
+
+import logging
+import time
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.communications.models import CommunicationPreference, Notification
+from apps.core.services.chrome_context import invalidate_users
+from apps.students.models import Guardian, Student
+
+logger = logging.getLogger(__name__)
+
+
+def broadcast_options():
+    config = getattr(settings, 'BROADCAST', {})
+    return {
+        'batch_size': config.get('BATCH_SIZE', 100),
+        'email_rate_per_minute': config.get('EMAIL_RATE_PER_MINUTE', 600),
+        'sms_rate_per_minute': config.get('SMS_RATE_PER_MINUTE', 300),
+        'insert_batch_size': config.get('INSERT_BATCH_SIZE', 1000),
+    }
+
+
+def rate_limit_wait(tenant_id, channel, count, per_minute):
+    """
+    Reserve ``count`` sends in the tenant's current one-minute window for
+    ``channel``. Returns 0 when they fit, otherwise the seconds until the
+    next window (nothing is reserved then).
+    """
+    now = time.time()
+    key = f"broadcast:rate:{tenant_id}:{channel}:{int(now // 60)}"
+    cache.add(key, 0, 120)
+    try:
+        used = cache.incr(key, count)
+    except ValueError:
+        cache.set(key, count, 120)
+        used = count
+    if used - count >= per_minute:
+        cache.decr(key, count)
+        return int(60 - now % 60) + 1
+    return 0
+
+
+def _full_name(first_name, middle_name, last_name):
+    return " ".join(filter(None, (first_name, middle_name, last_name)))
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BroadcastEngine:
+    """
+    Fans one announcement out to a set of students (and their guardians).
+
+    * Students come from one ``values_list`` query and guardians from one
+      more; opted-out users come from one preference query.
+    * In-app notifications are written with ``bulk_create``; socket pushes
+      (which ``post_save`` would have sent) are queued.
+    * Emails and SMS are queued in batches; each batch is sent over one
+      SMTP connection and throttled per tenant (see ``BROADCAST``).
+    """
+
+    def __init__(self, tenant, sender, title, message, notification_type="ANNOUNCEMENT",
+                 priority="MEDIUM", action_url="", action_text="", include_guardians=False,
+                 send_email=True, send_sms=False, guardian_subject=None, guardian_message=None):
+        self.tenant = tenant
+        self.sender = sender
+        self.title = title
+        self.message = message
+        self.notification_type = notification_type
+        self.priority = priority
+        self.action_url = action_url
+        self.action_text = action_text
+        self.include_guardians = include_guardians
+        self.send_email = send_email
+        self.send_sms = send_sms
+        self.guardian_subject = guardian_subject or title
+        # ``{student}`` is replaced with the student's name
+        self.guardian_message = guardian_message or message
+        self.options = broadcast_options()
+
+    # ------------------------------------------------------------------
+    # Recipients
+    # ------------------------------------------------------------------
+    def resolve(self, students):
+        """``(students, guardians)`` as lists of plain dicts"""
+        rows = list(students.order_by().values_list(
+            'id', 'user_id', 'first_name', 'middle_name', 'last_name', 'personal_email', 'mobile_primary'
+        ))
+        resolved = [
+            {
+                'id': student_id,
+                'user_id': user_id,
+                'name': _full_name(first_name, middle_name, last_name),
+                'email': email,
+                'phone': phone,
+            }
+            for student_id, user_id, first_name, middle_name, last_name, email, phone in rows
+        ]
+
+        guardians = []
+        if self.include_guardians and resolved:
+            names = {student['id']: student['name'] for student in resolved}
+            guardians = [
+                {'student_id': student_id, 'student_name': names[student_id], 'email': email, 'phone': phone}
+                for student_id, email, phone in Guardian.objects.filter(
+                    student_id__in=students.order_by().values('id')
+                ).values_list('student_id', 'email', 'phone_primary')
+            ]
+        return resolved, guardians
+
+    @staticmethod
+    def opted_out(user_ids, field):
+        """Users among ``user_ids`` who disabled the channel ``field``"""
+        return set(
+            CommunicationPreference.objects.filter(user_id__in=user_ids, **{field: False})
+            .values_list('user_id', flat=True)
+        )
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+    def create_notifications(self, students):
+        user_ids = [student['user_id'] for student in students if student['user_id']]
+        blocked = self.opted_out(user_ids, 'in_app_enabled')
+        notifications = [
+            Notification(
+                tenant=self.tenant,
+                recipient_id=user_id,
+                title=self.title,
+                message=self.message,
+                notification_type=self.notification_type,
+                priority=self.priority,
+                action_url=self.action_url,
+                action_text=self.action_text,
+            )
+            for user_id in user_ids if user_id not in blocked
+        ]
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications, batch_size=self.options['insert_batch_size'])
+        # bulk_create sends no post_save, so drop the recipients' cached headers here
+        invalidate_users(notification.recipient_id for notification in notifications)
+        return notifications
+
+    def email_messages(self, students, guardians):
+        user_ids = [student['user_id'] for student in students if student['user_id']]
+        blocked = self.opted_out(user_ids, 'email_enabled') if user_ids else set()
+        messages = [
+            {'to': student['email'], 'subject': self.title, 'body': self.message, 'student_id': str(student['id'])}
+            for student in students
+            if student['email'] and student['user_id'] not in blocked
+        ]
+        messages.extend(
+            {
+                'to': guardian['email'],
+                'subject': self.guardian_subject,
+                'body': self.guardian_message.replace('{student}', guardian['student_name']),
+                'student_id': None,
+            }
+            for guardian in guardians if guardian['email']
+        )
+        return messages
+
+    def sms_messages(self, students, guardians):
+        user_ids = [student['user_id'] for student in students if student['user_id']]
+        blocked = self.opted_out(user_ids, 'sms_enabled') if user_ids else set()
+        numbers = [
+            student['phone'] for student in students
+            if student['phone'] and student['user_id'] not in blocked
+        ]
+        numbers.extend(guardian['phone'] for guardian in guardians if guardian['phone'])
+        return numbers
+
+    def _spread(self, per_minute):
+        """Countdown between consecutive batches so they arrive at the tenant's rate"""
+        return 60.0 * self.options['batch_size'] / max(per_minute, 1)
+
+    def enqueue(self, notifications, emails, sms_numbers):
+        from apps.core.tasks import deliver_broadcast_emails, deliver_broadcast_sms, push_notifications
+
+        tenant_id = str(self.tenant.id)
+        sender_id = str(self.sender.id) if self.sender else None
+        batch_size = self.options['batch_size']
+
+        notification_ids = [str(notification.id) for notification in notifications]
+        for batch in _chunks(notification_ids, self.options['insert_batch_size']):
+            push_notifications.delay(tenant_id, batch)
+
+        spread = self._spread(self.options['email_rate_per_minute'])
+        for index, batch in enumerate(_chunks(emails, batch_size)):
+            deliver_broadcast_emails.apply_async(
+                args=[tenant_id, batch],
+                kwargs={'sender_id': sender_id, 'priority': self.priority},
+                countdown=int(index * spread),
+            )
+
+        spread = self._spread(self.options['sms_rate_per_minute'])
+        sms_text = self.message if len(self.message) <= 160 else self.message[:157] + "..."
+        for index, batch in enumerate(_chunks(sms_numbers, batch_size)):
+            deliver_broadcast_sms.apply_async(
+                args=[tenant_id, batch, sms_text],
+                kwargs={'sender_id': sender_id, 'priority': self.priority},
+                countdown=int(index * spread),
+            )
+
+    def run(self, students) -> Dict:
+        """Notify ``students`` (a Student queryset); returns queued counts"""
+        students, guardians = self.resolve(students)
+        notifications = self.create_notifications(students)
+        emails = self.email_messages(students, guardians) if self.send_email else []
+        sms_numbers = self.sms_messages(students, guardians) if self.send_sms else []
+
+        # Workers must not pick up notifications before they are committed
+        transaction.on_commit(lambda: self.enqueue(notifications, emails, sms_numbers))
+
+        return {
+            'total_students': len(students),
+            'total_guardians': len(guardians),
+            'students_notified': len(notifications),
+            'emails_queued': len(emails),
+            'guardian_emails_queued': sum(1 for email in emails if email['student_id'] is None),
+            'sms_queued': len(sms_numbers),
+            'errors': [],
+        }
+
+
+def deliver_emails(tenant, messages: List[Dict], sender=None, priority="MEDIUM") -> Dict:
+    """
+    Send a batch of broadcast emails over one SMTP connection and record
+    them as communications in one bulk insert
+    """
+    from django.core.mail import EmailMultiAlternatives, get_connection
+    from apps.core.services.notification_service import NotificationService
+
+    reply_to = [sender.email] if sender else [getattr(settings, 'DEFAULT_REPLY_TO', settings.DEFAULT_FROM_EMAIL)]
+    headers = {
+        'X-Priority': NotificationService._get_priority_header(priority),
+        'X-Notification-Type': 'SYSTEM',
+        'X-Template-Code': 'BROADCAST',
+    }
+
+    sent = failed = 0
+    statuses = []
+    connection = get_connection()
+    connection.open()
+    try:
+        for item in messages:
+            email = EmailMultiAlternatives(
+                subject=item['subject'],
+                body=item['body'],
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[item['to']],
+                reply_to=reply_to,
+                headers=headers,
+                connection=connection,
+            )
+            try:
+                ok = email.send(fail_silently=False) > 0
+                error = ""
+            except Exception as exc:
+                ok, error = False, str(exc)
+                logger.warning(f"Broadcast email to {item['to']} failed: {exc}")
+            sent += ok
+            failed += not ok
+            statuses.append((item, "SENT" if ok else "FAILED", error))
+    finally:
+        connection.close()
+
+    record_communications(tenant, "EMAIL", statuses, sender, priority)
+    return {'sent': sent, 'failed': failed}
+
+
+def deliver_sms(tenant, numbers: Iterable[str], message: str, sender=None, priority="MEDIUM") -> Dict:
+    """
+    Send a batch of broadcast SMS. No gateway is integrated yet (see
+    ``NotificationService.send_sms_notification``), so sends are logged.
+    """
+    statuses = []
+    for number in numbers:
+        logger.info(f"SMS would be sent to {number}: {message}")
+        statuses.append(({'to': number, 'subject': "SMS Notification", 'body': message, 'student_id': None}, "SENT", ""))
+    record_communications(tenant, "SMS", statuses, sender, priority)
+    return {'sent': len(statuses), 'failed': 0}
+
+
+def record_communications(tenant, channel_type, statuses, sender=None, priority="MEDIUM") -> int:
+    """Bulk-create ``Communication`` rows for ``(message, status, error)`` triples"""
+    from django.contrib.contenttypes.models import ContentType
+    from apps.communications.models import Communication, CommunicationChannel
+
+    channel = CommunicationChannel.objects.filter(channel_type=channel_type, is_active=True).first()
+    if not channel or not statuses:
+        if not channel:
+            logger.warning(f"No active channel found for type: {channel_type}")
+        return 0
+
+    student_type = ContentType.objects.get_for_model(Student)
+    communications = []
+    for item, status, error in statuses:
+        communication = Communication(
+            tenant=tenant,
+            title=item['subject'],
+            subject=item['subject'],
+            content=item['body'],
+            channel=channel,
+            sender=sender,
+            status=status,
+            priority=priority,
+            error_message=error,
+        )
+        if item.get('student_id'):
+            communication.recipient_type = student_type
+            communication.recipient_id = item['student_id']
+        elif channel_type == "EMAIL":
+            communication.external_recipient_email = item['to']
+        else:
+            communication.external_recipient_phone = item['to']
+        communications.append(communication)
+
+    Communication.objects.bulk_create(communications, batch_size=500)
+    return len(communications)
+
+
+def push_to_sockets(notification_ids: List[str]) -> int:
+    """Send the websocket events ``post_save`` sends for single notifications"""
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return 0
+
+    pushed = 0
+    for recipient_id, title, message, action_url in Notification.objects.filter(
+        id__in=notification_ids
+    ).values_list('recipient_id', 'title', 'message', 'action_url'):
+        async_to_sync(channel_layer.group_send)(
+            f"user_{recipient_id}",
+            {
+                "type": "notification_message",
+                "message": message,
+                "title": title,
+                "action_url": action_url or "#",
+            }
+        )
+        pushed += 1
+    return pushed
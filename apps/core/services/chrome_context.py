@@ -0,0 +1,211 @@
+"""
+Header and sidebar ("chrome") data shared by every HTML page
+
+The global context processors hand templates lazy values from
+``ChromeContext``: nothing is queried until a template reads a value, each
+value is computed at most once per request, and per-user values are cached
+across requests under a per-user generation that Notification and
+Communication writes bump (see ``invalidate_users``).
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils.functional import SimpleLazyObject
+
+logger = logging.getLogger(__name__)
+
+
+def chrome_options():
+    config = getattr(settings, 'CHROME_CONTEXT', {})
+    return {
+        'user_ttl': config.get('USER_TTL', 300),
+        'tenant_ttl': config.get('TENANT_TTL', 300),
+        'header_size': config.get('HEADER_NOTIFICATIONS', 5),
+    }
+
+
+# Module flags shown in the sidebar, as (name, permission)
+MODULE_PERMISSIONS = (
+    ('academics', 'academics.view_course'),
+    ('finance', 'finance.view_finance'),
+    ('library', 'library.view_book'),
+    ('reports', 'reports.view_report'),
+    ('settings', 'settings.change_settings'),
+    ('inventory', 'inventory.view_item'),
+)
+
+
+def _schema_name():
+    return getattr(connection, 'schema_name', 'public')
+
+
+def _generation_key(schema_name, user_id):
+    return f"chrome:generation:{schema_name}:{user_id}"
+
+
+def invalidate_users(user_ids, schema_name=None):
+    """Drop the cached chrome values of ``user_ids`` (in the current schema)"""
+    schema_name = schema_name or _schema_name()
+    for user_id in {str(user_id) for user_id in user_ids if user_id}:
+        key = _generation_key(schema_name, user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def invalidate_user(user_id, schema_name=None):
+    invalidate_users([user_id], schema_name)
+
+
+class ChromeContext:
+    """
+    Per-request accessor for chrome values.
+
+    ``user_value``/``tenant_value`` read a value from the shared cache (keyed
+    by user generation, or by tenant with a short TTL) and compute it on a
+    miss; ``lazy`` wraps either for templates. Use ``for_request`` so all
+    context processors share one instance.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.user = getattr(request, 'user', None)
+        self.tenant = getattr(request, 'tenant', None)
+        self.schema_name = _schema_name()
+        self.options = chrome_options()
+        self._values = {}
+        self._generation = None
+
+    @classmethod
+    def for_request(cls, request):
+        chrome = getattr(request, '_chrome_context', None)
+        if chrome is None:
+            chrome = request._chrome_context = cls(request)
+        return chrome
+
+    @property
+    def user_id(self):
+        return str(self.user.pk) if self.user is not None and self.user.is_authenticated else None
+
+    def _memoized(self, name, compute):
+        if name not in self._values:
+            self._values[name] = compute()
+        return self._values[name]
+
+    def _cached(self, key, compute, ttl):
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.set(key, value, ttl)
+        return value
+
+    def generation(self):
+        if self._generation is None:
+            self._generation = cache.get(_generation_key(self.schema_name, self.user_id), 0)
+        return self._generation
+
+    def user_value(self, name):
+        def compute():
+            key = f"chrome:user:{self.schema_name}:{self.user_id}:{self.generation()}:{name}"
+            return self._cached(key, getattr(self, f'_load_{name}'), self.options['user_ttl'])
+        return self._memoized(name, compute)
+
+    def tenant_value(self, name):
+        def compute():
+            key = f"chrome:tenant:{self.schema_name}:{name}"
+            return self._cached(key, getattr(self, f'_load_{name}'), self.options['tenant_ttl'])
+        return self._memoized(name, compute)
+
+    def request_value(self, name):
+        return self._memoized(name, getattr(self, f'_load_{name}'))
+
+    def lazy(self, name, scope='user', fallback=None):
+        """
+        Template value computed on first use. Errors fall back to
+        ``fallback`` so a failing header query never breaks the page.
+        """
+        getter = getattr(self, f'{scope}_value')
+
+        def evaluate():
+            try:
+                return getter(name)
+            except Exception as exc:
+                logger.warning(f"Chrome value '{name}' unavailable: {exc}")
+                return fallback
+        return SimpleLazyObject(evaluate)
+
+    # ------------------------------------------------------------------
+    # Per-request values
+    # ------------------------------------------------------------------
+    def _load_permissions(self):
+        # The auth backend caches role and user permissions itself
+        return self.user.get_all_permissions()
+
+    def _load_can_access(self):
+        superuser = self.user.is_active and self.user.is_superuser
+        permissions = self.request_value('permissions')
+        return {
+            name: superuser or permission in permissions
+            for name, permission in MODULE_PERMISSIONS
+        }
+
+    # ------------------------------------------------------------------
+    # Per-user values
+    # ------------------------------------------------------------------
+    def _notifications(self):
+        from apps.communications.models import Notification
+        return Notification.objects.filter(recipient_id=self.user.pk)
+
+    def _load_unread_notification_count(self):
+        return self._notifications().filter(is_read=False).count()
+
+    def _load_header_notifications(self):
+        return list(self._notifications().order_by('-created_at')[:self.options['header_size']])
+
+    def _communications(self):
+        from django.contrib.contenttypes.models import ContentType
+        from apps.communications.models import Communication
+        return Communication.objects.filter(
+            recipient_type=ContentType.objects.get_for_model(self.user),
+            recipient_id=self.user.pk,
+            channel__channel_type__in=['IN_APP', 'PUSH'],
+        )
+
+    def _load_unread_communication_count(self):
+        return self._communications().exclude(status='READ').count()
+
+    def _load_header_communications(self):
+        return list(
+            self._communications().select_related('sender')
+            .order_by('status', '-created_at')[:self.options['header_size']]
+        )
+
+    # ------------------------------------------------------------------
+    # Per-tenant values
+    # ------------------------------------------------------------------
+    def _load_user_count(self):
+        return self.tenant.get_user_count()
+
+    def _load_system_broadcasts(self):
+        from django.db.models import Q
+        from django.utils import timezone
+        from django_tenants.utils import get_public_schema_name, schema_context
+        from apps.tenants.models import SystemNotification
+
+        with schema_context(get_public_schema_name()):
+            return list(
+                SystemNotification.objects.filter(
+                    Q(target_tenant=self.tenant) | Q(target_tenant__isnull=True),
+                    is_active=True
+                ).filter(
+                    Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
+                )
+            )
+
+    def _load_cart_items_count(self):  # per request
+        from apps.store.models import Cart
+        return Cart.objects.filter(user=self.user).count()
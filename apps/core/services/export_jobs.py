@@ -0,0 +1,300 @@
+"""
+Background export jobs
+
+An export request returns a job id at once; a Celery worker streams the
+file into storage. Jobs are deduplicated per (tenant, user, export type,
+format, filters) - definitions may scope rows to the requesting user - and
+a finished file is handed out again, to that user only, until
+``RESULT_TTL`` expires, so repeating an identical export is instant. Jobs
+are ``ExportJob`` rows, so the web process and the workers share them
+whatever the cache backend.
+"""
+
+import hashlib
+import json
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.utils.text import slugify
+
+from apps.core.services.streaming_export import StreamingExport
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {'csv': 'csv', 'excel': 'xlsx'}
+
+
+def yes_no(value):
+    return 'Yes' if value else 'No'
+
+
+def date_text(value, fmt='%Y-%m-%d'):
+    return value.strftime(fmt) if value else ''
+
+
+def datetime_text(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def choice_display(model, field):
+    """Formatter mapping stored choice values to their labels"""
+    labels = {key: str(label) for key, label in model._meta.get_field(field).flatchoices}
+    return lambda value: labels.get(value, value or '')
+
+
+class ExportDefinition:
+    """
+    One exportable dataset.
+
+    ``columns`` are ``(header, field)`` or ``(header, field, formatter)``;
+    ``field`` may be a tuple of fields whose values are all passed to the
+    formatter. Fields (annotations included) are read with ``values_list``
+    so rows never become model instances. ``filter_keys`` are the filters
+    accepted from requests; anything else is dropped before jobs are
+    deduplicated.
+    """
+
+    title = "Export"
+    columns = []
+    filter_keys = ()
+
+    def __init__(self, tenant, user=None):
+        self.tenant = tenant
+        self.user = user
+
+    def clean_filters(self, filters):
+        return {
+            key: str(value) for key, value in sorted((filters or {}).items())
+            if key in self.filter_keys and value not in (None, '')
+        }
+
+    def get_columns(self, filters):
+        return self.columns
+
+    def get_queryset(self, filters):
+        raise NotImplementedError("Subclasses must implement get_queryset")
+
+    def get_filename(self, extension):
+        return f"{slugify(self.title)}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+    def build(self, filters):
+        """``StreamingExport`` of the dataset, with formatters precompiled"""
+        columns = self.get_columns(filters)
+        fields, readers = [], []
+        for column in columns:
+            names = column[1] if isinstance(column[1], tuple) else (column[1],)
+            formatter = column[2] if len(column) > 2 else None
+            start = len(fields)
+            fields.extend(names)
+            readers.append((start, start + len(names), formatter, isinstance(column[1], tuple)))
+
+        def transform(row):
+            values = []
+            for start, end, formatter, many in readers:
+                if many:
+                    values.append(formatter(*row[start:end]))
+                elif formatter:
+                    values.append(formatter(row[start]))
+                else:
+                    values.append(row[start])
+            return values
+
+        return StreamingExport(
+            self.get_queryset(filters),
+            fields,
+            headers=[column[0] for column in columns],
+            transform=transform,
+        )
+
+
+class ExportJobService:
+    """Requests, runs and looks up export jobs (job state lives in ``ExportJob`` rows)"""
+
+    @staticmethod
+    def options():
+        config = getattr(settings, 'EXPORT_JOBS', {})
+        return {
+            'types': config.get('TYPES', {}),
+            'result_ttl': config.get('RESULT_TTL', 3600),
+            'storage_prefix': config.get('STORAGE_PREFIX', 'exports'),
+        }
+
+    @classmethod
+    def definition(cls, export_type, tenant, user=None):
+        path = cls.options()['types'].get(export_type)
+        if not path:
+            raise ValueError(f"Unknown export type '{export_type}'")
+        return import_string(path)(tenant, user)
+
+    @staticmethod
+    def dedupe_key(tenant_id, user_id, export_type, export_format, filters):
+        digest = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+        return f"exports:{tenant_id}:{user_id or '-'}:{export_type}:{export_format}:{digest}"
+
+    @staticmethod
+    def get(job_id):
+        from apps.core.models import ExportJob
+
+        try:
+            return ExportJob.objects.filter(id=job_id).first()
+        except (ValueError, ValidationError):
+            return None
+
+    @classmethod
+    def get_for(cls, job_id, tenant, user):
+        """The job (as data) if it belongs to ``tenant`` and was requested by ``user``, else None"""
+        job = cls.get(job_id)
+        if job is None or job.tenant_id != str(tenant.id):
+            return None
+        if job.user_id is None or job.user_id != str(getattr(user, 'id', None)):
+            return None
+        return job.as_dict()
+
+    @staticmethod
+    def reusable(job, now, ttl):
+        """
+        Whether an identical request may be answered with ``job``: it is
+        pending or running and was requested within ``ttl`` seconds, or it
+        finished successfully within ``ttl`` seconds
+        """
+        if job is None:
+            return False
+        if job.status in job.ACTIVE_STATUSES:
+            return (now - job.requested_at).total_seconds() < ttl
+        return (
+            job.status == job.Status.SUCCESS
+            and job.finished_at is not None
+            and (now - job.finished_at).total_seconds() < ttl
+        )
+
+    @classmethod
+    def request(cls, tenant, export_type, export_format, filters=None, user=None):
+        """
+        Job for this export: a running or finished identical one when there
+        is one, otherwise a new job queued on Celery. Raises ValueError for
+        unknown types or formats.
+        """
+        from apps.core.models import ExportJob
+        from apps.core.tasks import run_export_job
+
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format '{export_format}'")
+        filters = cls.definition(export_type, tenant, user).clean_filters(filters)
+        ttl = cls.options()['result_ttl']
+        key = cls.dedupe_key(tenant.id, user.id if user else None, export_type, export_format, filters)
+        now = timezone.now()
+
+        existing = ExportJob.objects.filter(dedupe_key=key).exclude(
+            status=ExportJob.Status.FAILURE
+        ).order_by('-requested_at').first()
+        if cls.reusable(existing, now, ttl) and (
+            existing.status != ExportJob.Status.SUCCESS or default_storage.exists(existing.file)
+        ):
+            return dict(existing.as_dict(), reused=True)
+
+        # A job that never finished within the TTL (lost worker) no longer
+        # blocks identical requests
+        ExportJob.objects.filter(
+            dedupe_key=key, status__in=ExportJob.ACTIVE_STATUSES, requested_at__lte=now - timedelta(seconds=ttl)
+        ).update(status=ExportJob.Status.FAILURE, error='Expired before it finished', finished_at=now)
+
+        try:
+            with transaction.atomic():
+                job = ExportJob.objects.create(
+                    tenant_id=str(tenant.id),
+                    user_id=str(user.id) if user else None,
+                    export_type=export_type,
+                    export_format=export_format,
+                    filters=filters,
+                    dedupe_key=key,
+                    requested_at=now,
+                )
+        except IntegrityError:
+            # An identical request won the race
+            existing = ExportJob.objects.filter(
+                dedupe_key=key, status__in=ExportJob.ACTIVE_STATUSES
+            ).first()
+            if existing is None:
+                raise
+            return dict(existing.as_dict(), reused=True)
+
+        job_id = job.id.hex
+        transaction.on_commit(lambda: run_export_job.apply_async(args=[job_id], task_id=job_id))
+        return dict(job.as_dict(), reused=False)
+
+    @classmethod
+    def run(cls, job, tenant, user=None):
+        """Stream the ``ExportJob``'s export into storage and mark it finished"""
+        options = cls.options()
+        job.status = job.Status.RUNNING
+        job.save(update_fields=['status'])
+
+        try:
+            definition = cls.definition(job.export_type, tenant, user)
+            export = definition.build(job.filters)
+            extension = EXPORT_FORMATS[job.export_format]
+            filename = definition.get_filename(extension)
+
+            with tempfile.TemporaryFile() as fh:
+                if job.export_format == 'csv':
+                    rows = export.write_csv(fh)
+                else:
+                    rows = export.write_xlsx(fh, sheet_name=definition.title[:31])
+                fh.seek(0)
+                path = default_storage.save(
+                    f"{options['storage_prefix']}/{tenant.schema_name}/{job.id.hex}/{filename}",
+                    File(fh),
+                )
+        except Exception as exc:
+            job.status = job.Status.FAILURE
+            job.error = str(exc)
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at'])
+            raise
+
+        job.status = job.Status.SUCCESS
+        job.file = path
+        job.filename = filename
+        job.rows = rows
+        # Identical requests reuse the file for a full TTL from now
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'file', 'filename', 'rows', 'finished_at'])
+        logger.info(f"Export job {job.id.hex} ({job.export_type}) wrote {rows} rows to {path}")
+        return job.as_dict()
+
+    @classmethod
+    def purge(cls, now=None):
+        """
+        Delete stored export files, and finished jobs, older than the result
+        TTL; returns the number of files removed
+        """
+        from apps.core.models import ExportJob
+
+        options = cls.options()
+        now = now or timezone.now()
+        ExportJob.objects.filter(finished_at__lt=now - timedelta(seconds=options['result_ttl'])).delete()
+        prefix = options['storage_prefix']
+        removed = 0
+        if not default_storage.exists(prefix):
+            return removed
+
+        for schema_name in default_storage.listdir(prefix)[0]:
+            for job_id in default_storage.listdir(f"{prefix}/{schema_name}")[0]:
+                directory = f"{prefix}/{schema_name}/{job_id}"
+                for filename in default_storage.listdir(directory)[1]:
+                    path = f"{directory}/{filename}"
+                    modified = default_storage.get_modified_time(path)
+                    if timezone.is_naive(modified):
+                        modified = timezone.make_aware(modified)
+                    if (now - modified).total_seconds() > options['result_ttl']:
+                        default_storage.delete(path)
+                        removed += 1
+        return removed
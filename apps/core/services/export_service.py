@@ -1,67 +1,40 @@
-import csv
-import json
-from django.http import HttpResponse
-from django.utils import timezone
 import logging
 
+from apps.core.services.streaming_export import StreamingExport
+
 logger = logging.getLogger(__name__)
 
 class ExportService:
     """
     Service for handling data exports
+
+    With ``fields`` the queryset is streamed as ``values_list(*fields)``
+    tuples and ``row_callback`` (optional) maps each tuple to a row;
+    without, ``row_callback`` receives each object, iterated in chunks.
     """
-    
+
     @staticmethod
-    def export_to_csv(queryset, filename, headers, row_callback):
+    def export_to_csv(queryset, filename, headers, row_callback=None, fields=None):
         """
-        Export queryset to CSV response
+        Export queryset to a streamed CSV response
         """
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(headers)
-        
-        for obj in queryset:
-            writer.writerow(row_callback(obj))
-            
-        return response
+        export = StreamingExport(queryset, fields, headers=headers, transform=row_callback)
+        return export.csv_response(f"{filename}.csv")
 
     @staticmethod
-    def export_to_excel(queryset, filename, headers, row_callback):
+    def export_to_excel(queryset, filename, headers, row_callback=None, fields=None):
         """
         Export queryset to Excel response
         """
         try:
-            import openpyxl
+            import openpyxl  # noqa: F401
         except ImportError:
+            from django.http import HttpResponse
             logger.error("openpyxl not installed")
             return HttpResponse("Excel export not available", status=501)
 
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Export"
-        
-        # Write headers
-        for col_idx, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col_idx, value=header)
-            
-        # Write data
-        for row_idx, obj in enumerate(queryset, 2):
-            row_data = row_callback(obj)
-            for col_idx, value in enumerate(row_data, 1):
-                # Handle timezone aware datetimes for Excel
-                if hasattr(value, 'tzinfo'):
-                    value = value.replace(tzinfo=None)
-                ws.cell(row=row_idx, column=col_idx, value=value)
-                
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-        wb.save(response)
-        
-        return response
+        export = StreamingExport(queryset, fields, headers=headers, transform=row_callback)
+        return export.xlsx_response(f"{filename}.xlsx")
 
     @staticmethod
     def export_to_json(queryset, filename, serializer_class, many=True):
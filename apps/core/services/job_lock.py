@@ -0,0 +1,31 @@
+"""
+Locks shared by web processes and Celery workers
+
+A lock is a ``JobLock`` row, so it is seen by every process whatever the
+cache backend (the default ``LocMemCache`` is per process). A view
+``acquire``s it before queuing a job and the task ``release``s it when the
+job ends; a lock left behind by a lost worker lapses after its timeout.
+"""
+
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.core.models import JobLock
+
+
+def acquire(key, timeout):
+    """Take the lock ``key`` for ``timeout`` seconds; False when it is held"""
+    now = timezone.now()
+    JobLock.objects.filter(key=key, expires_at__lte=now).delete()
+    try:
+        with transaction.atomic():
+            JobLock.objects.create(key=key, acquired_at=now, expires_at=now + timedelta(seconds=timeout))
+    except IntegrityError:
+        return False
+    return True
+
+
+def release(key):
+    JobLock.objects.filter(key=key).delete()
@@ -16,6 +16,7 @@ from django.db import transaction
 from django.contrib.contenttypes.models import ContentType
 
 # Import local modules
+from apps.core.services.chrome_context import invalidate_user
 from apps.core.services.audit_service import AuditService
 from apps.communications.models import (
     Communication, CommunicationChannel, CommunicationTemplate,
@@ -889,11 +890,15 @@ class NotificationService:
         sender: User,
         notification_type: str = "ANNOUNCEMENT",
         include_guardians: bool = False,
-        tenant=None
+        tenant=None,
+        send_sms: bool = False
     ) -> Dict:
         """
         Broadcast notification to all students in a class
         
+        In-app notifications are created in bulk; emails (and SMS) are
+        queued on Celery in rate-limited batches (see BroadcastEngine).
+        
         Args:
             school_class: Target class
             title: Notification title
@@ -902,97 +907,94 @@ class NotificationService:
             notification_type: Type of notification
             include_guardians: Whether to include guardians
             tenant: Tenant object
+            send_sms: Whether to also queue SMS
             
         Returns:
             Dict with broadcast results
         """
+        students = Student.objects.filter(
+            tenant=tenant,
+            current_class=school_class,
+            status="ACTIVE"
+        )
+        return NotificationService._broadcast(
+            students,
+            title=title,
+            message=message,
+            sender=sender,
+            notification_type=notification_type,
+            include_guardians=include_guardians,
+            tenant=tenant,
+            send_sms=send_sms,
+            action_url=f"/classes/{school_class.id}/",
+            action_text="View Class",
+            guardian_subject=f"Class Announcement: {title}",
+            guardian_message=f"Message for {{student}}'s class:\n\n{message}",
+            resource_type='ClassBroadcast',
+            audit_data={'class_id': str(school_class.id), 'class_name': school_class.name},
+            success_message=_('Class broadcast completed successfully')
+        )
+    
+    @staticmethod
+    def broadcast_to_school(
+        title: str,
+        message: str,
+        sender: User,
+        notification_type: str = "ANNOUNCEMENT",
+        include_guardians: bool = False,
+        tenant=None,
+        send_sms: bool = False
+    ) -> Dict:
+        """
+        Broadcast notification to every active student of the tenant
+        (and optionally their guardians); see broadcast_to_class
+        """
+        students = Student.objects.filter(tenant=tenant, status="ACTIVE")
+        return NotificationService._broadcast(
+            students,
+            title=title,
+            message=message,
+            sender=sender,
+            notification_type=notification_type,
+            include_guardians=include_guardians,
+            tenant=tenant,
+            send_sms=send_sms,
+            guardian_subject=f"School Announcement: {title}",
+            guardian_message=f"Message for {{student}}'s school:\n\n{message}",
+            resource_type='SchoolBroadcast',
+            audit_data={},
+            success_message=_('School broadcast completed successfully')
+        )
+    
+    @staticmethod
+    def _broadcast(students, title, message, sender, tenant, resource_type, audit_data,
+                   success_message, **options) -> Dict:
+        """Run a BroadcastEngine over ``students`` and audit it"""
+        from apps.core.services.broadcast_service import BroadcastEngine
+        
         try:
-            students = Student.objects.filter(
-                tenant=tenant,
-                current_class=school_class,
-                status="ACTIVE"
-            ).select_related('user')
-            
-            results = {
-                'students_notified': 0,
-                'guardians_notified': 0,
-                'total_students': students.count(),
-                'errors': []
-            }
-            
-            # Notify each student
-            for student in students:
-                try:
-                    # In-app notification to student
-                    if hasattr(student, 'user') and student.user:
-                        notification = NotificationService.send_in_app_notification(
-                            recipient=student.user,
-                            title=title,
-                            message=message,
-                            notification_type=notification_type,
-                            sender=sender,
-                            action_url=f"/classes/{school_class.id}/",
-                            action_text="View Class",
-                            tenant=tenant
-                        )
-                        if notification:
-                            results['students_notified'] += 1
-                    
-                    # Email to student
-                    if student.personal_email:
-                        email_result = NotificationService.send_email_notification(
-                            recipient=student,
-                            subject=title,
-                            message=message,
-                            sender=sender,
-                            tenant=tenant
-                        )
-                    
-                    # Notify guardians if requested
-                    if include_guardians:
-                        for guardian in student.guardians.all():
-                            if guardian.email:
-                                guardian_result = NotificationService.send_email_notification(
-                                    recipient=guardian.email,
-                                    subject=f"Class Announcement: {title}",
-                                    message=f"Message for {student.full_name}'s class:\n\n{message}",
-                                    sender=sender,
-                                    tenant=tenant
-                                )
-                                if guardian_result.get('success'):
-                                    results['guardians_notified'] += 1
-                                    
-                except Exception as e:
-                    results['errors'].append({
-                        'student': str(student),
-                        'error': str(e)
-                    })
-                    logger.error(f"Error notifying student {student}: {str(e)}")
+            engine = BroadcastEngine(tenant, sender, title, message, **options)
+            results = engine.run(students)
             
             # Create audit log
             AuditService.create_audit_entry(
                 action='CREATE',
-                resource_type='ClassBroadcast',
+                resource_type=resource_type,
                 user=sender,
                 tenant=tenant,
                 request=None,
                 severity='INFO',
-                extra_data={
-                    'class_id': str(school_class.id),
-                    'class_name': school_class.name,
-                    'title': title,
-                    'results': results
-                }
+                extra_data=dict(audit_data, title=title, results=results)
             )
             
             return {
                 'success': True,
                 'results': results,
-                'message': _('Class broadcast completed successfully')
+                'message': success_message
             }
             
         except Exception as e:
-            logger.error(f"Class broadcast error: {str(e)}", exc_info=True)
+            logger.error(f"Broadcast error: {str(e)}", exc_info=True)
             return {
                 'success': False,
                 'error': str(e),
@@ -1185,6 +1187,7 @@ class NotificationService:
             is_read=True,
             read_at=timezone.now()
         )
+        invalidate_user(user.pk)
         return updated
     
     @staticmethod
@@ -0,0 +1,160 @@
+# apps/core/services/tenant_cache.py
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+_MISSING = object()
+_NOT_FOUND = '__tenant_not_found__'
+
+
+class TenantResolutionCache:
+    """
+    Two-level cache used by TenantMiddleware to resolve a tenant without
+    hitting the database on every request.
+
+    Level 1 is an in-process LRU with a short TTL, level 2 is the shared
+    Django cache. Negative results are cached as well, so strategies that
+    fall through (session, path, ...) stay cheap. Shared keys embed a
+    generation number that is bumped whenever a Tenant or Domain changes.
+    """
+
+    GENERATION_KEY = 'tenant_resolution:generation'
+
+    def __init__(self, max_entries=1024, local_ttl=30, shared_ttl=300):
+        self.max_entries = max_entries
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'invalidations': 0}
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'TENANT_RESOLUTION_CACHE', {})
+        return cls(
+            max_entries=config.get('MAX_ENTRIES', 1024),
+            local_ttl=config.get('LOCAL_TTL', 30),
+            shared_ttl=config.get('SHARED_TTL', getattr(settings, 'TENANT_CACHE_TIMEOUT', 300)),
+        )
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'TENANT_RESOLUTION_CACHE', {}).get('ENABLED', True)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def resolve(self, kind: str, value: Any, loader: Callable[[], Optional[Any]]):
+        """
+        Return the tenant cached under (kind, value), calling ``loader`` on a
+        miss. ``loader`` must return a Tenant or None.
+        """
+        if value in (None, ''):
+            return None
+        if not self.enabled:
+            return loader()
+
+        key = f'{kind}:{value}'
+        tenant = self._get_local(key)
+        if tenant is not _MISSING:
+            self._incr('local_hits')
+            return self._detach(tenant)
+
+        shared_key = self._shared_key(key)
+        tenant = self._get_shared(shared_key)
+        if tenant is not _MISSING:
+            self._incr('shared_hits')
+            self._set_local(key, tenant)
+            return self._detach(tenant)
+
+        self._incr('misses')
+        tenant = loader()
+        stored = tenant if tenant is not None else _NOT_FOUND
+        self._set_local(key, stored)
+        try:
+            cache.set(shared_key, stored, self.shared_ttl)
+        except Exception:
+            pass
+        return self._detach(stored)
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, tenant = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return tenant
+
+    def _set_local(self, key, tenant):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.local_ttl, tenant)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, shared_key):
+        try:
+            return cache.get(shared_key, _MISSING)
+        except Exception:
+            return _MISSING
+
+    def _shared_key(self, key):
+        return f'tenant_resolution:{self._generation()}:{key}'
+
+    def _generation(self):
+        try:
+            return cache.get_or_set(self.GENERATION_KEY, 1, None)
+        except Exception:
+            return 0
+
+    @staticmethod
+    def _detach(tenant):
+        """Hand out a copy so request code never mutates the cached instance."""
+        if tenant is None or tenant == _NOT_FOUND:
+            return None
+        return copy.copy(tenant)
+
+    # ------------------------------------------------------------------
+    # Invalidation & stats
+    # ------------------------------------------------------------------
+    def invalidate(self):
+        """Drop every cached resolution, locally and in the shared cache."""
+        with self._lock:
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+        try:
+            cache.incr(self.GENERATION_KEY)
+        except ValueError:
+            cache.set(self.GENERATION_KEY, 2, None)
+        except Exception:
+            pass
+
+    def _incr(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_entries'] = len(self._entries)
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['local_hits'] + stats['shared_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for counter in ('local_hits', 'shared_hits', 'misses', 'invalidations'):
+                self._stats[counter] = 0
+
+
+tenant_resolution_cache = TenantResolutionCache.from_settings()
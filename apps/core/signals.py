@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.core.services.tenant_cache import tenant_resolution_cache
+from apps.tenants.models import Tenant, Domain
+
+
+# ---------------------------------------------------------
+# Invalidate tenant resolution cache
+# ---------------------------------------------------------
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def invalidate_tenant_resolution_cache(sender, instance, **kwargs):
+    """Drop cached host/slug/id -> tenant resolutions when tenants or domains change"""
+    tenant_resolution_cache.invalidate()
@@ -0,0 +1,121 @@
+"""
+Background tasks for core operations using Celery
+"""
+
+import logging
+
+from celery import shared_task
+from django_tenants.utils import schema_context
+
+from apps.core.utils.tenant import tenant_context
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, acks_late=True)
+def run_export_job(self, job_id):
+    """
+    Produce the file of an export job queued by ExportJobService.request
+
+    Args:
+        job_id: Export job id (also the Celery task id)
+
+    Returns:
+        The finished job, or None when it no longer exists
+    """
+    from django.contrib.auth import get_user_model
+    from apps.core.services.export_jobs import ExportJobService
+    from apps.tenants.models import Tenant
+
+    job = ExportJobService.get(job_id)
+    if job is None:
+        logger.warning(f"Export job {job_id} no longer exists")
+        return None
+    if job.status not in job.ACTIVE_STATUSES:
+        # Redelivered after it finished (acks_late), or expired meanwhile
+        return job.as_dict()
+
+    self.update_state(state='PROGRESS', meta={'status': f"Exporting {job.export_type}"})
+    tenant = Tenant.objects.get(id=job.tenant_id)
+    user = get_user_model().objects.filter(id=job.user_id).first() if job.user_id else None
+
+    try:
+        with schema_context(tenant.schema_name), tenant_context(tenant):
+            return ExportJobService.run(job, tenant, user)
+    except Exception as exc:
+        logger.error(f"Export job {job_id} failed: {exc}", exc_info=True)
+        raise
+
+
+@shared_task
+def purge_export_files_task():
+    """Periodic (Celery beat) removal of export files past their TTL"""
+    from apps.core.services.export_jobs import ExportJobService
+
+    removed = ExportJobService.purge()
+    logger.info(f"Purged {removed} expired export files")
+    return removed
+
+
+def _broadcast_context(tenant_id, sender_id):
+    from django.contrib.auth import get_user_model
+    from apps.tenants.models import Tenant
+
+    tenant = Tenant.objects.get(id=tenant_id)
+    sender = get_user_model().objects.filter(id=sender_id).first() if sender_id else None
+    return tenant, sender
+
+
+@shared_task(bind=True, max_retries=None, acks_late=True)
+def deliver_broadcast_emails(self, tenant_id, messages, sender_id=None, priority="MEDIUM"):
+    """
+    Send one batch of broadcast emails over a single SMTP connection,
+    waiting for the tenant's next rate-limit window when it is full
+
+    Args:
+        tenant_id: Tenant sending the broadcast
+        messages: ``[{'to', 'subject', 'body', 'student_id'}]``
+        sender_id: User recorded as sender
+        priority: Notification priority
+
+    Returns:
+        ``{'sent': n, 'failed': n}``
+    """
+    from apps.core.services.broadcast_service import broadcast_options, deliver_emails, rate_limit_wait
+
+    wait = rate_limit_wait(tenant_id, 'email', len(messages), broadcast_options()['email_rate_per_minute'])
+    if wait:
+        raise self.retry(countdown=wait)
+
+    tenant, sender = _broadcast_context(tenant_id, sender_id)
+    with schema_context(tenant.schema_name), tenant_context(tenant):
+        return deliver_emails(tenant, messages, sender=sender, priority=priority)
+
+
+@shared_task(bind=True, max_retries=None, acks_late=True)
+def deliver_broadcast_sms(self, tenant_id, numbers, message, sender_id=None, priority="MEDIUM"):
+    """
+    Send one batch of broadcast SMS within the tenant's rate limit
+
+    Returns:
+        ``{'sent': n, 'failed': n}``
+    """
+    from apps.core.services.broadcast_service import broadcast_options, deliver_sms, rate_limit_wait
+
+    wait = rate_limit_wait(tenant_id, 'sms', len(numbers), broadcast_options()['sms_rate_per_minute'])
+    if wait:
+        raise self.retry(countdown=wait)
+
+    tenant, sender = _broadcast_context(tenant_id, sender_id)
+    with schema_context(tenant.schema_name), tenant_context(tenant):
+        return deliver_sms(tenant, numbers, message, sender=sender, priority=priority)
+
+
+@shared_task
+def push_notifications(tenant_id, notification_ids):
+    """Websocket events for bulk-created in-app notifications"""
+    from apps.core.services.broadcast_service import push_to_sockets
+
+    tenant, _ = _broadcast_context(tenant_id, None)
+    with schema_context(tenant.schema_name), tenant_context(tenant):
+        return push_to_sockets(notification_ids)
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.core.services.chrome_context import ChromeContext, invalidate_user
+
+
+class CountingChrome(ChromeContext):
+    loads = 0
+
+    def _load_counter(self):
+        CountingChrome.loads += 1
+        return CountingChrome.loads
+
+
+class ChromeContextTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        CountingChrome.loads = 0
+        self.user = SimpleNamespace(pk='user-1', is_authenticated=True)
+
+    def _request(self):
+        return SimpleNamespace(user=self.user, tenant=None)
+
+    def test_values_are_lazy_and_memoized_per_request(self):
+        chrome = CountingChrome.for_request(self._request())
+        value = chrome.lazy('counter')
+        self.assertEqual(CountingChrome.loads, 0)
+        self.assertEqual(value, 1)
+        self.assertEqual(chrome.user_value('counter'), 1)
+        self.assertEqual(CountingChrome.loads, 1)
+
+    def test_user_values_are_cached_until_invalidated(self):
+        self.assertEqual(CountingChrome(self._request()).user_value('counter'), 1)
+        self.assertEqual(CountingChrome(self._request()).user_value('counter'), 1)
+        invalidate_user(self.user.pk)
+        self.assertEqual(CountingChrome(self._request()).user_value('counter'), 2)
+
+    def test_errors_fall_back(self):
+        chrome = ChromeContext(self._request())
+        self.assertEqual(list(chrome.lazy('missing', fallback=[])), [])
@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase
+
+from apps.core.services.export_jobs import ExportDefinition, ExportJobService
+
+
+class RowsExport(ExportDefinition):
+    filter_keys = ('class_id', 'status')
+    columns = [
+        ('Name', ('first_name', 'last_name'), lambda first, last: f"{first} {last}"),
+        ('Present', 'present', lambda value: 'Yes' if value else 'No'),
+        ('Date', 'date'),
+    ]
+
+    def get_queryset(self, filters):
+        return [{'first_name': 'Asha', 'last_name': 'Rao', 'present': True, 'date': '2025-03-01'}]
+
+
+class ExportJobTests(SimpleTestCase):
+    def test_build_applies_column_formatters(self):
+        export = RowsExport(tenant=None).build({})
+
+        self.assertEqual(export.headers, ['Name', 'Present', 'Date'])
+        self.assertEqual(export.fields, ['first_name', 'last_name', 'present', 'date'])
+        self.assertEqual(list(export.rows()), [['Asha Rao', 'Yes', '2025-03-01']])
+
+    def test_identical_filters_share_a_dedupe_key(self):
+        definition = RowsExport(tenant=None)
+        first = definition.clean_filters({'status': 'PRESENT', 'class_id': 7, 'page': 2})
+        second = definition.clean_filters({'class_id': '7', 'status': 'PRESENT', 'search': ''})
+
+        self.assertEqual(first, {'class_id': '7', 'status': 'PRESENT'})
+        self.assertEqual(
+            ExportJobService.dedupe_key('t1', 'u1', 'attendance', 'csv', first),
+            ExportJobService.dedupe_key('t1', 'u1', 'attendance', 'csv', second),
+        )
+        self.assertNotEqual(
+            ExportJobService.dedupe_key('t1', 'u1', 'attendance', 'csv', first),
+            ExportJobService.dedupe_key('t1', 'u1', 'attendance', 'excel', first),
+        )
+        self.assertNotEqual(
+            ExportJobService.dedupe_key('t1', 'u1', 'attendance', 'csv', first),
+            ExportJobService.dedupe_key('t1', 'u2', 'attendance', 'csv', first),
+        )
+
+    def test_only_recent_active_or_successful_jobs_are_reused(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from apps.core.models import ExportJob
+
+        now = timezone.now()
+        old = now - timedelta(seconds=7200)
+
+        self.assertTrue(ExportJobService.reusable(ExportJob(status='PENDING', requested_at=now), now, 3600))
+        self.assertFalse(ExportJobService.reusable(ExportJob(status='RUNNING', requested_at=old), now, 3600))
+        self.assertTrue(ExportJobService.reusable(
+            ExportJob(status='SUCCESS', requested_at=old, finished_at=now - timedelta(seconds=60)), now, 3600
+        ))
+        self.assertFalse(ExportJobService.reusable(ExportJob(status='SUCCESS', requested_at=old, finished_at=old), now, 3600))
+        self.assertFalse(ExportJobService.reusable(ExportJob(status='FAILURE', requested_at=now), now, 3600))
+        self.assertFalse(ExportJobService.reusable(None, now, 3600))
@@ -0,0 +1,30 @@
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from apps.communications.models import Notification
+
+
+class DataSignatureTests(SimpleTestCase):
+    def _notification(self, **kwargs):
+        return Notification(title="Exam schedule", message="Published", **kwargs)
+
+    def test_bulk_signatures_match_single(self):
+        notifications = [self._notification(), self._notification()]
+        Notification.calculate_signatures(notifications)
+        for notification in notifications:
+            self.assertEqual(notification.data_signature, notification.calculate_signature())
+        self.assertNotEqual(notifications[0].data_signature, notifications[1].data_signature)
+
+    def test_signature_ignores_write_timestamps(self):
+        notification = self._notification()
+        signature = notification.calculate_signature()
+        notification.created_at = notification.updated_at = timezone.now()
+        notification.data_signature = signature
+        self.assertEqual(notification.calculate_signature(), signature)
+        self.assertTrue(notification.verify_integrity())
+
+    def test_signature_covers_field_values(self):
+        notification = self._notification()
+        signature = notification.calculate_signature()
+        notification.title = "Changed"
+        self.assertNotEqual(notification.calculate_signature(), signature)
@@ -0,0 +1,24 @@
+from datetime import date
+
+from django.db.models import Case, F, IntegerField
+from django.test import SimpleTestCase
+
+from apps.core.utils.overdue import by_due_date, days_overdue
+
+
+class OverdueHelperTests(SimpleTestCase):
+    def test_days_overdue(self):
+        today = date(2025, 3, 10)
+        self.assertEqual(days_overdue(today, date(2025, 3, 1)), 9)
+        self.assertEqual(days_overdue(today, today), 0)
+        self.assertEqual(days_overdue(today, date(2025, 3, 20)), 0)
+
+    def test_by_due_date_maps_each_date(self):
+        today = date(2025, 3, 10)
+        due_dates = [date(2025, 3, 1), date(2025, 2, 28)]
+        expression = by_due_date(due_dates, lambda d: days_overdue(today, d), IntegerField(), F('overdue_days'))
+
+        self.assertIsInstance(expression, Case)
+        values = [when.result.value for when in expression.cases]
+        self.assertEqual(values, [9, 10])
+        self.assertEqual(expression.default, F('overdue_days'))
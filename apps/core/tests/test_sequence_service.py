@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.core.services.sequence_service import SequenceService
+
+
+class SequenceServiceBlockTests(SimpleTestCase):
+    def setUp(self):
+        self.tenant = SimpleNamespace(id='t1')
+        self.counter = 0
+        self.allocations = []
+
+        def allocate(tenant, prefix, model, field, count=1):
+            self.allocations.append(count)
+            first = self.counter + 1
+            self.counter += count
+            return range(first, first + count)
+
+        patcher = mock.patch.object(SequenceService, 'allocate', side_effect=allocate)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_single_numbers_allocate_one_each(self):
+        self.assertEqual(SequenceService.next_number(self.tenant, 'INV-2025-', None, 'n'), 'INV-2025-00001')
+        self.assertEqual(SequenceService.next_number(self.tenant, 'INV-2025-', None, 'n', width=3), 'INV-2025-002')
+        self.assertEqual(self.allocations, [1, 1])
+
+    def test_preallocated_block_is_refilled_lazily(self):
+        with SequenceService.preallocate(self.tenant, 'ADM-', None, 'n', block_size=2):
+            numbers = [SequenceService.next_number(self.tenant, 'ADM-', None, 'n', width=4) for _ in range(3)]
+        self.assertEqual(numbers, ['ADM-0001', 'ADM-0002', 'ADM-0003'])
+        self.assertEqual(self.allocations, [2, 2])
+
+        # Leftovers of the block are discarded once it is closed
+        self.assertEqual(SequenceService.next_number(self.tenant, 'ADM-', None, 'n', width=4), 'ADM-0005')
+
+    def test_block_only_applies_to_its_series_and_tenant(self):
+        other = SimpleNamespace(id='t2')
+        with SequenceService.preallocate(self.tenant, 'ADM-', None, 'n', block_size=10):
+            SequenceService.next_number(other, 'ADM-', None, 'n')
+            SequenceService.next_number(self.tenant, 'PAY-', None, 'n')
+        self.assertEqual(self.allocations, [1, 1])
+
+    def test_reserve_numbers_formats_one_allocation(self):
+        numbers = SequenceService.reserve_numbers(self.tenant, 'MS-', None, 'n', 3, width=6)
+        self.assertEqual(numbers, ['MS-000001', 'MS-000002', 'MS-000003'])
+        self.assertEqual(self.allocations, [3])
+        self.assertEqual(SequenceService.reserve_numbers(self.tenant, 'MS-', None, 'n', 0), [])
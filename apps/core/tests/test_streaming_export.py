@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from apps.core.services.streaming_export import StreamingExport
+
+
+class StreamingExportTests(SimpleTestCase):
+    def test_csv_streams_dict_rows_by_field(self):
+        data = [
+            {'first_name': 'Asha', 'last_name': 'Rao', 'status': 'PRESENT'},
+            {'first_name': 'Ravi', 'last_name': None, 'status': 'ABSENT'},
+        ]
+        export = StreamingExport(data, ['first_name', 'last_name', 'status'], headers=['First', 'Last', 'Status'])
+        response = export.csv_response('attendance.csv')
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            b''.join(response.streaming_content).decode(),
+            'First,Last,Status\r\nAsha,Rao,PRESENT\r\nRavi,,ABSENT\r\n'
+        )
+
+    def test_objects_and_transform(self):
+        data = [SimpleNamespace(name='Asha', total=lambda: 3)]
+        export = StreamingExport(data, ['name', 'total'], transform=lambda row: [row[0].upper(), row[1] * 2])
+
+        self.assertEqual(export.headers, ['name', 'total'])
+        self.assertEqual(list(export.rows()), [['ASHA', 6]])
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.core.services.tenant_cache import TenantResolutionCache
+
+
+class TenantResolutionCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.resolver = TenantResolutionCache(max_entries=2, local_ttl=30, shared_ttl=60)
+        self.calls = 0
+
+    def _loader(self, result):
+        def load():
+            self.calls += 1
+            return result
+        return load
+
+    def test_hit_after_first_lookup(self):
+        self.assertEqual(self.resolver.resolve('slug', 'alpha', self._loader('tenant-a')), 'tenant-a')
+        self.assertEqual(self.resolver.resolve('slug', 'alpha', self._loader('tenant-a')), 'tenant-a')
+        self.assertEqual(self.calls, 1)
+        stats = self.resolver.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['local_hits'], 1)
+
+    def test_negative_results_are_cached(self):
+        self.assertIsNone(self.resolver.resolve('slug', 'missing', self._loader(None)))
+        self.assertIsNone(self.resolver.resolve('slug', 'missing', self._loader(None)))
+        self.assertEqual(self.calls, 1)
+
+    def test_shared_layer_serves_evicted_entries(self):
+        for slug in ('a', 'b', 'c'):
+            self.resolver.resolve('slug', slug, self._loader(slug))
+        # 'a' was evicted from the 2-entry LRU but is still in the shared cache
+        self.assertEqual(self.resolver.resolve('slug', 'a', self._loader('a')), 'a')
+        self.assertEqual(self.calls, 3)
+        self.assertEqual(self.resolver.stats()['shared_hits'], 1)
+
+    def test_invalidate_forces_reload(self):
+        self.resolver.resolve('host', 'school.example.com', self._loader('old'))
+        self.resolver.invalidate()
+        self.assertEqual(self.resolver.resolve('host', 'school.example.com', self._loader('new')), 'new')
+        self.assertEqual(self.calls, 2)
@@ -0,0 +1,23 @@
+# apps/core/utils/overdue.py
+from django.db.models import Case, Value, When
+
+
+def days_overdue(today, due_date):
+    """Whole days ``due_date`` lies before ``today`` (0 when not yet due)"""
+    return max((today - due_date).days, 0)
+
+
+def by_due_date(due_dates, value_for, output_field, default):
+    """
+    ``CASE`` expression mapping every due date to ``value_for(due_date)``.
+
+    Overdue days and day-based fines depend only on the due date, so one
+    ``UPDATE`` can store per-row values without database-specific date
+    arithmetic. Rows with other due dates get ``default`` (usually ``F()``
+    of the column being updated).
+    """
+    return Case(
+        *[When(due_date=due_date, then=Value(value_for(due_date))) for due_date in due_dates],
+        default=default,
+        output_field=output_field,
+    )
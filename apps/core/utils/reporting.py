@@ -1,117 +1,53 @@
-import csv
-import io
-import pandas as pd
 from datetime import datetime
-from django.http import HttpResponse
-from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill
 from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import TableStyle
 
-class ReportGenerator:
-    """Utility class to generate reports in various formats."""
-
-    @staticmethod
-    def _get_value(obj, field):
-        """Helper to get value from object or dictionary."""
-        if isinstance(obj, dict):
-            val = obj.get(field, "")
-        else:
-            val = getattr(obj, field, "")
-            if callable(val):
-                val = val()
-        return val if val is not None else ""
-
-    @staticmethod
-    def generate_csv(data, columns, filename=None):
-        """Generate a CSV response from data (queryset or list)."""
-        if not filename:
-            filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        elif not filename.endswith('.csv'):
-            filename += '.csv'
+from apps.core.services.streaming_export import StreamingExport
 
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
 
-        writer = csv.writer(response)
-        writer.writerow(columns)
-
-        for obj in data:
-            row = [ReportGenerator._get_value(obj, col) for col in columns]
-            writer.writerow(row)
+class ReportGenerator:
+    """
+    Utility class to generate reports in various formats.
 
-        return response
+    ``data`` is a queryset (streamed through ``values_list``) or a list of
+    dicts/objects. ``columns`` are the header titles; ``fields`` are the
+    keys read for them and default to ``columns``.
+    """
 
     @staticmethod
-    def generate_excel(data, columns, filename=None, sheet_name="Report"):
-        """Generate an Excel response from data."""
+    def _filename(filename, extension):
         if not filename:
-            filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        elif not filename.endswith('.xlsx'):
-            filename += '.xlsx'
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = sheet_name
-
-        # Header style
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-        alignment = Alignment(horizontal="center", vertical="center")
-
-        # Write headers
-        for col_num, column_title in enumerate(columns, 1):
-            cell = ws.cell(row=1, column=col_num, value=column_title)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = alignment
-
-        # Write data
-        for row_num, obj in enumerate(data, 2):
-            for col_num, col in enumerate(columns, 1):
-                val = ReportGenerator._get_value(obj, col)
-                ws.cell(row=row_num, column=col_num, value=str(val))
-
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        wb.save(response)
-        return response
+            return f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+        if not filename.endswith(f'.{extension}'):
+            return f"{filename}.{extension}"
+        return filename
 
     @staticmethod
-    def generate_pdf(data, columns, filename=None, title="Report Summary"):
-        """Generate a PDF response using ReportLab."""
-        if not filename:
-            filename = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        elif not filename.endswith('.pdf'):
-            filename += '.pdf'
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-
-        styles = getSampleStyleSheet()
-        title_style = styles['Title']
-        normal_style = styles['Normal']
-
-        # Add Title
-        elements.append(Paragraph(title, title_style))
-        elements.append(Spacer(1, 12))
+    def generate_csv(data, columns, filename=None, fields=None):
+        """Generate a streamed CSV response from data (queryset or list)."""
+        export = StreamingExport(data, fields or columns, headers=columns)
+        return export.csv_response(ReportGenerator._filename(filename, 'csv'))
 
-        # Add Timestamp
-        elements.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", normal_style))
-        elements.append(Spacer(1, 24))
-
-        # Table Data
-        table_data = [columns]
-        for obj in data:
-            row = [str(ReportGenerator._get_value(obj, col)) for col in columns]
-            table_data.append(row)
+    @staticmethod
+    def generate_excel(data, columns, filename=None, sheet_name="Report", fields=None):
+        """Generate an Excel response from data using a write-only workbook."""
+        header_style = {
+            'font': Font(bold=True, color="FFFFFF"),
+            'fill': PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid"),
+            'alignment': Alignment(horizontal="center", vertical="center"),
+        }
+        export = StreamingExport(data, fields or columns, headers=columns)
+        return export.xlsx_response(
+            ReportGenerator._filename(filename, 'xlsx'),
+            sheet_name=sheet_name,
+            header_style=header_style,
+        )
 
-        # Create Table
-        t = Table(table_data)
-        t.setStyle(TableStyle([
+    @staticmethod
+    def generate_pdf(data, columns, filename=None, title="Report Summary", fields=None):
+        """Generate a PDF response using ReportLab, one table per page-sized chunk of rows."""
+        style = TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -119,13 +55,6 @@ class ReportGenerator:
             ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
             ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
             ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-
-        elements.append(t)
-        doc.build(elements)
-
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response.write(buffer.getvalue())
-        buffer.close()
-        return response
+        ])
+        export = StreamingExport(data, fields or columns, headers=columns)
+        return export.pdf_response(ReportGenerator._filename(filename, 'pdf'), title, style)
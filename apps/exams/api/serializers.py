@@ -182,3 +182,6 @@ class ResultStatisticsSerializer(TenantAwareSerializer):
     class Meta:
         model = ResultStatistics
         fields = '__all__'
+
+class RecomputeResultsSerializer(serializers.Serializer):
+    create_missing = serializers.BooleanField(default=True)
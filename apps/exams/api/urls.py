@@ -3,7 +3,7 @@ from apps.exams.api.views import (
     ExamTypeListCreateAPIView, ExamTypeDetailAPIView,
     ExamListCreateAPIView, ExamDetailAPIView,
     ExamSubjectListCreateAPIView, ExamSubjectDetailAPIView,
-    ExamResultListCreateAPIView, ExamResultDetailAPIView,
+    ExamResultListCreateAPIView, ExamResultDetailAPIView, ExamRecomputeResultsAPIView,
     SubjectResultListCreateAPIView, SubjectResultDetailAPIView,
     MarkSheetListCreateAPIView, MarkSheetDetailAPIView,
     CompartmentExamListCreateAPIView, CompartmentExamDetailAPIView,
@@ -24,6 +24,7 @@ urlpatterns = [
     # Exams
     path('', ExamListCreateAPIView.as_view(), name='exam-list'),
     path('<uuid:pk>/', ExamDetailAPIView.as_view(), name='exam-detail'),
+    path('<uuid:pk>/recompute-results/', ExamRecomputeResultsAPIView.as_view(), name='exam-recompute-results'),
 
     # Exam Subjects
     path('subjects/', ExamSubjectListCreateAPIView.as_view(), name='examsubject-list'),
@@ -1,7 +1,8 @@
 from rest_framework import status
 from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
 from apps.core.api.views import (
-    BaseListCreateAPIView, BaseRetrieveUpdateDestroyAPIView
+    BaseAPIView, BaseListCreateAPIView, BaseRetrieveUpdateDestroyAPIView
 )
 from apps.exams.models import (
     ExamType, Exam, ExamSubject, ExamResult, SubjectResult,
@@ -10,7 +11,7 @@ from apps.exams.models import (
 from apps.exams.api.serializers import (
     ExamTypeSerializer, ExamSerializer, ExamSubjectSerializer,
     ExamResultSerializer, SubjectResultSerializer, MarkSheetSerializer,
-    CompartmentExamSerializer, ResultStatisticsSerializer
+    CompartmentExamSerializer, ResultStatisticsSerializer, RecomputeResultsSerializer
 )
 
 # ============================================================================
@@ -63,6 +64,25 @@ class ExamSubjectDetailAPIView(BaseRetrieveUpdateDestroyAPIView):
 # EXAM RESULT VIEWS
 # ============================================================================
 
+class ExamRecomputeResultsAPIView(BaseAPIView):
+    """
+    POST /api/v1/exams/<pk>/recompute-results/
+    Recalculate totals, percentages, grades, ranks and statistics for every
+    result of the exam. Pass ``{"create_missing": false}`` to skip creating
+    results for students of the class that have none yet.
+    """
+    roles_required = ['admin', 'principal', 'teacher']
+
+    def post(self, request, pk):
+        from apps.exams.results import recompute_exam_results
+
+        options = RecomputeResultsSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        exam = get_object_or_404(Exam, pk=pk)
+        summary = recompute_exam_results(exam, create_missing=options.validated_data['create_missing'])
+        return Response(summary, status=status.HTTP_200_OK)
+
+
 class ExamResultListCreateAPIView(BaseListCreateAPIView):
     model = ExamResult
     serializer_class = ExamResultSerializer
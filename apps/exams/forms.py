@@ -1,6 +1,7 @@
 from django import forms
 from apps.core.forms import TenantAwareModelForm
-from .models import ExamType, Exam, GradingSystem, ExamSubject, Grade
+from apps.academics.models import GradingSystem
+from .models import ExamType, Exam, ExamSubject, Grade
 
 class ExamTypeForm(TenantAwareModelForm):
     class Meta:
@@ -0,0 +1,243 @@
+"""
+Batch mark sheet generation for a whole exam, fanned out as Celery subtasks
+"""
+
+import io
+import logging
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Prefetch
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.core.services.sequence_service import SequenceService
+from apps.exams import marksheet_worker
+from apps.exams.marksheet_generator import MARKSHEET_TEMPLATE, MarksheetGenerator, load_branding
+from apps.exams.models import ExamResult, MarkSheet, SubjectResult
+from apps.students.models import Guardian
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ('zip', 'pdf')
+
+
+class MarksheetBatch:
+    """
+    Renders the mark sheets of an exam (optionally one class or section).
+
+    The work is split in three steps, each run by a Celery task (see
+    ``apps.exams.tasks``) so chunks are converted in parallel by separate
+    worker processes:
+
+    * ``prepare`` creates missing ``MarkSheet`` rows in one bulk insert with
+      one sequence allocation for their numbers, and splits the batch's
+      results into chunks.
+    * ``render_chunk`` loads one chunk's students, guardians and subject
+      results with a fixed number of queries, renders it with branding and
+      the compiled template loaded once, and stores each PDF as a part file.
+    * ``merge`` packs the parts into a ZIP of one PDF per student or a single
+      merged PDF in class/section/roll order, stores it in default storage
+      and removes the parts.
+    """
+
+    def __init__(self, exam, class_id=None, section_id=None, output='zip', user=None,
+                 batch_id=None, chunk_size=None):
+        if output not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported mark sheet output '{output}'")
+        config = getattr(settings, 'MARKSHEET_BATCH', {})
+        self.exam = exam
+        self.tenant = exam.tenant
+        self.class_id = class_id
+        self.section_id = section_id
+        self.output = output
+        self.user = user
+        self.batch_id = batch_id
+        self.chunk_size = chunk_size or config.get('CHUNK_SIZE', 10)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def queryset(self):
+        """The batch's results in class/section/roll order"""
+        queryset = ExamResult.objects.filter(exam=self.exam)
+        if self.class_id:
+            queryset = queryset.filter(student__current_class_id=self.class_id)
+        if self.section_id:
+            queryset = queryset.filter(student__section_id=self.section_id)
+        return queryset.order_by('student__current_class__name', 'student__section__name', 'student__roll_number')
+
+    def results(self, result_ids):
+        """``{result_id: ExamResult}`` with everything the template reads, in four queries"""
+        queryset = ExamResult.objects.filter(exam=self.exam, pk__in=result_ids).select_related(
+            'tenant',
+            'exam__academic_year',
+            'student__current_class',
+            'student__section',
+            'overall_grade',
+        ).prefetch_related(
+            Prefetch('student__guardians', queryset=Guardian.objects.order_by('pk')),
+            Prefetch(
+                'subject_results',
+                queryset=SubjectResult.objects.select_related('exam_subject__subject', 'grade')
+            ),
+        )
+        return {str(result.pk): result for result in queryset}
+
+    def ensure_mark_sheets(self, results):
+        """``{exam_result_id: MarkSheet}``, creating missing ones in one bulk insert"""
+        mark_sheets = {
+            mark_sheet.exam_result_id: mark_sheet
+            for mark_sheet in MarkSheet.objects.filter(exam_result__exam=self.exam)
+        }
+        missing = [result for result in results if result.pk not in mark_sheets]
+        if not missing:
+            return mark_sheets
+
+        with transaction.atomic():
+            numbers = SequenceService.reserve_numbers(
+                self.tenant,
+                MarkSheet.mark_sheet_number_prefix(self.tenant),
+                MarkSheet,
+                'mark_sheet_number',
+                len(missing),
+                width=6,
+            )
+            created = []
+            for result, number in zip(missing, numbers):
+                mark_sheet = MarkSheet(
+                    tenant=self.tenant,
+                    exam_result=result,
+                    mark_sheet_number=number,
+                    issued_by=self.user,
+                    is_issued=True,
+                )
+                mark_sheet.generate_verification_code()
+                created.append(mark_sheet)
+            MarkSheet.objects.bulk_create(created, batch_size=500)
+
+        mark_sheets.update((mark_sheet.exam_result_id, mark_sheet) for mark_sheet in created)
+        return mark_sheets
+
+    def prepare(self):
+        """
+        Create missing mark sheets; returns the chunks to render as
+        ``[(start, [result_id, ...]), ...]`` (``start`` is the position of
+        the chunk's first result in the batch)
+        """
+        results = list(self.queryset())
+        self.ensure_mark_sheets(results)
+        result_ids = [str(result.pk) for result in results]
+        return [
+            (start, result_ids[start:start + self.chunk_size])
+            for start in range(0, len(result_ids), self.chunk_size)
+        ]
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+    @staticmethod
+    def file_name(result):
+        student = result.student
+        return f"Mark_Sheet_{student.admission_number or student.roll_number}_{slugify(student.full_name)}.pdf"
+
+    def storage_path(self):
+        stamp = timezone.now().strftime('%Y%m%d%H%M%S')
+        return f"marksheets/{self.tenant.schema_name}/{self.exam.pk}/{slugify(self.exam.name)}-{stamp}.{self.output}"
+
+    def part_path(self, position):
+        return f"marksheets/{self.tenant.schema_name}/{self.exam.pk}/parts/{self.batch_id}/{position:06d}.pdf"
+
+    def render_chunk(self, start, result_ids):
+        """
+        Render one chunk and store each PDF as a part file; returns
+        ``[position, result_id, file_name, part_path]`` rows, ``part_path``
+        None for mark sheets that failed
+        """
+        results = self.results(result_ids)
+        mark_sheets = {
+            str(mark_sheet.exam_result_id): mark_sheet
+            for mark_sheet in MarkSheet.objects.filter(exam_result_id__in=result_ids)
+        }
+        branding = load_branding(self.tenant)
+        template = get_template(MARKSHEET_TEMPLATE)
+
+        parts = []
+        for position, result_id in enumerate(result_ids, start):
+            result = results.get(result_id)
+            if result is None:
+                continue
+            path = None
+            try:
+                html = MarksheetGenerator(
+                    result,
+                    branding=branding,
+                    mark_sheet=mark_sheets.get(result_id),
+                    subject_results=result.subject_results.all(),
+                ).render_html(template)
+                pdf = marksheet_worker.render_pdf(html)
+                if pdf is not None:
+                    path = default_storage.save(self.part_path(position), ContentFile(pdf))
+            except Exception as exc:
+                logger.error(f"Mark sheet for result {result_id} failed: {exc}", exc_info=True)
+            parts.append([position, result_id, self.file_name(result), path])
+        return parts
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _read(path):
+        with default_storage.open(path, 'rb') as fh:
+            return fh.read()
+
+    def _write_zip(self, parts, fh):
+        # PDFs are already compressed
+        with zipfile.ZipFile(fh, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for _, _, name, path in parts:
+                archive.writestr(name, self._read(path))
+
+    def _write_merged(self, parts, fh):
+        from pypdf import PdfWriter
+
+        writer = PdfWriter()
+        for _, _, _, path in parts:
+            writer.append(io.BytesIO(self._read(path)))
+        writer.write(fh)
+
+    def merge(self, chunks):
+        """
+        Store the output built from the ``render_chunk`` rows of every chunk
+        and delete the parts; returns a summary dict
+        """
+        rows = sorted(row for chunk in chunks for row in chunk)
+        rendered = [row for row in rows if row[3]]
+        failed = [row[1] for row in rows if not row[3]]
+
+        path = None
+        if rendered:
+            write = self._write_zip if self.output == 'zip' else self._write_merged
+            with tempfile.TemporaryFile() as fh:
+                write(rendered, fh)
+                fh.seek(0)
+                path = default_storage.save(self.storage_path(), File(fh))
+        for row in rendered:
+            default_storage.delete(row[3])
+
+        logger.info(
+            f"Rendered {len(rendered)} of {len(rows)} mark sheets "
+            f"for exam {self.exam.pk} into {path}"
+        )
+        return {
+            'exam': str(self.exam.pk),
+            'total': len(rows),
+            'rendered': len(rendered),
+            'failed': failed,
+            'file': path,
+        }
@@ -6,32 +6,77 @@ from apps.students.models import Student
 from apps.exams.models import ExamResult, SubjectResult, MarkSheet
 from apps.core.utils.tenant import get_current_tenant
 
+MARKSHEET_TEMPLATE = 'exams/pdf/mark_sheet_pdf.html'
+
+
+def load_branding(tenant):
+    """
+    Tenant configuration, address, logo path and verification domain used
+    on every marksheet (a batch loads these once).
+    """
+    # Explicitly fetch configuration to ensure fresh data
+    from apps.tenants.models import TenantConfiguration, TenantAddress
+    try:
+        config = TenantConfiguration.objects.get(tenant=tenant)
+    except TenantConfiguration.DoesNotExist:
+        config = None
+        
+    # Explicitly fetch address
+    try:
+        address = TenantAddress.objects.get(tenant=tenant)
+    except TenantAddress.DoesNotExist:
+        address = None
+
+    # Resolve logo path for PDF
+    logo_path = None
+    if config and config.logo:
+        try:
+            logo_path = config.logo.path
+        except NotImplementedError:
+            # Fallback for storage backends that don't support path (like S3)
+            # But for local dev (Windows user), path should work.
+            pass
+
+    domain = tenant.domains.first()
+    return {
+        'tenant_config': config,
+        'tenant_address': address,
+        'logo_path': logo_path,
+        'verify_domain': domain.domain if domain else None,
+    }
+
 class MarksheetGenerator:
     """
     A class to generate PDF marksheets using HTML templates.
     Follows the pattern of StudentIDCardGenerator but adapted for complex documents (PDFs).
     """
-    def __init__(self, exam_result, request=None):
+    def __init__(self, exam_result, request=None, branding=None, mark_sheet=None, subject_results=None):
         self.result = exam_result
         self.student = exam_result.student
         self.exam = exam_result.exam
         self.request = request
         self.tenant = exam_result.tenant
+        # Batches pass these in, loaded once or prefetched for every result
+        self.branding = branding
+        self.mark_sheet = mark_sheet
+        self.subject_results = subject_results
 
     def _get_context(self):
         """Prepare context data for the template."""
         # Ensure MarkSheet exists
-        mark_sheet, created = MarkSheet.objects.get_or_create(
-            exam_result=self.result,
-            defaults={
-                'tenant': self.tenant,
-                'issued_by': self.request.user if self.request and self.request.user.is_authenticated else None,
-                'is_issued': True
-            }
-        )
+        mark_sheet = self.mark_sheet
+        if mark_sheet is None:
+            mark_sheet, created = MarkSheet.objects.get_or_create(
+                exam_result=self.result,
+                defaults={
+                    'tenant': self.tenant,
+                    'issued_by': self.request.user if self.request and self.request.user.is_authenticated else None,
+                    'is_issued': True
+                }
+            )
 
-        # Get parent details
-        guardians = self.student.guardians.all()
+        # Get parent details (uses the prefetch cache when batched)
+        guardians = list(self.student.guardians.all())
         mother_name = "-"
         father_name = "-"
         
@@ -41,41 +86,24 @@ class MarksheetGenerator:
             elif guardian.relation == 'FATHER':
                 father_name = guardian.full_name
                 
-        if father_name == "-" and guardians.exists():
-            father_name = guardians.first().full_name
+        if father_name == "-" and guardians:
+            father_name = guardians[0].full_name
 
-        # Prepare context
-        # Explicitly fetch configuration to ensure fresh data
-        from apps.tenants.models import TenantConfiguration, TenantAddress
-        try:
-            config = TenantConfiguration.objects.get(tenant=self.tenant)
-        except TenantConfiguration.DoesNotExist:
-            config = None
-            
-        # Explicitly fetch address
-        try:
-            address = TenantAddress.objects.get(tenant=self.tenant)
-        except TenantAddress.DoesNotExist:
-            address = None
-
-        # Resolve logo path for PDF
-        logo_path = None
-        if config and config.logo:
-            try:
-                logo_path = config.logo.path
-            except NotImplementedError:
-                # Fallback for storage backends that don't support path (like S3)
-                # But for local dev (Windows user), path should work.
-                pass
+        if self.branding is None:
+            self.branding = load_branding(self.tenant)
+
+        subject_results = self.subject_results
+        if subject_results is None:
+            subject_results = SubjectResult.objects.filter(exam_result=self.result).select_related('exam_subject__subject', 'grade')
 
         return {
             'result': self.result,
             'mark_sheet': mark_sheet,
-            'subject_results': SubjectResult.objects.filter(exam_result=self.result).select_related('exam_subject__subject', 'grade'),
+            'subject_results': subject_results,
             'tenant': self.tenant,
-            'tenant_config': config,
-            'tenant_address': address, # Added address object
-            'logo_path': logo_path,
+            'tenant_config': self.branding['tenant_config'],
+            'tenant_address': self.branding['tenant_address'], # Added address object
+            'logo_path': self.branding['logo_path'],
             'request': self.request,
             'mother_name': mother_name,
             'father_name': father_name,
@@ -90,8 +118,10 @@ class MarksheetGenerator:
         
         # Data for QR code (Validation URL or Code)
         # Using verification URL if domain is available, else just the code info
-        if self.tenant.domains.exists():
-            domain = self.tenant.domains.first().domain
+        if self.branding is None:
+            self.branding = load_branding(self.tenant)
+        domain = self.branding['verify_domain']
+        if domain:
             qr_data = f"https://{domain}/verify-result/{mark_sheet.verification_code}/"
         else:
             qr_data = f"VERIFY:{mark_sheet.verification_code}|ROLL:{self.student.roll_number}"
@@ -112,15 +142,21 @@ class MarksheetGenerator:
         img_str = base64.b64encode(buffer.getvalue()).decode()
         return f"data:image/png;base64,{img_str}"
 
-    def generate_pdf(self):
-        """Generates the PDF bytes."""
+    def render_html(self, template=None):
+        """Marksheet HTML; batches pass the template compiled once per batch."""
         context = self._get_context()
         
         # Add QR code to context
         mark_sheet = context['mark_sheet']
         context['qr_code_base64'] = self._generate_qr_code(mark_sheet)
         
-        html = render_to_string('exams/pdf/mark_sheet_pdf.html', context)
+        if template is not None:
+            return template.render(context)
+        return render_to_string(MARKSHEET_TEMPLATE, context)
+
+    def generate_pdf(self):
+        """Generates the PDF bytes."""
+        html = self.render_html()
         
         pdf_buffer = io.BytesIO()
         pisa_status = pisa.CreatePDF(html, dest=pdf_buffer)
@@ -0,0 +1,17 @@
+"""
+HTML to PDF conversion for batch mark sheet rendering (xhtml2pdf), used by
+the per-chunk Celery tasks
+"""
+
+import io
+
+
+def render_pdf(html):
+    """PDF bytes of one mark sheet's HTML, or None when xhtml2pdf fails"""
+    from xhtml2pdf import pisa
+
+    buffer = io.BytesIO()
+    status = pisa.CreatePDF(html, dest=buffer)
+    if status.err:
+        return None
+    return buffer.getvalue()
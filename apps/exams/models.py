@@ -13,7 +13,9 @@ from encrypted_model_fields.fields import EncryptedCharField
 
 # Import core base models
 from apps.core.models import BaseModel, UUIDModel, TimeStampedModel
-from apps.academics.models import Subject, SchoolClass, Section, AcademicYear, GradingSystem, Grade
+from apps.core.services.sequence_service import SequenceService
+from apps.academics.models import Subject, SchoolClass, Section, AcademicYear, Grade
+from apps.academics.services.grading_scale import grading_scales
 from apps.students.models import Student
 
 
@@ -223,12 +225,17 @@ class Exam(BaseModel):
                 self.status = "COMPLETED"
         
         # Set published timestamp
-        if self.is_published and not self.published_at:
+        publishing = self.is_published and not self.published_at
+        if publishing:
             self.published_at = timezone.now()
             
         self.full_clean()
         super().save(*args, **kwargs)
 
+        if publishing:
+            from apps.exams.results import rank_exam
+            rank_exam(self)
+
     def get_absolute_url(self):
         return reverse('exams:exam_detail', kwargs={'pk': self.pk}) 
 
@@ -451,43 +458,12 @@ class ExamResult(BaseModel):
         """Determine grade based on percentage"""
         if not self.percentage:
             return None
-            
-        grading_system = GradingSystem.objects.filter(is_default=True).first()
-        if not grading_system:
-            return None
-            
-        grade = Grade.objects.filter(
-            grading_system=grading_system,
-            min_percentage__lte=self.percentage,
-            max_percentage__gte=self.percentage
-        ).first()
-        
-        return grade
+        return grading_scales.grade_for(self.percentage)
 
     def update_rank(self):
         """Update rank based on percentage"""
-        if not self.percentage:
-            return
-            
-        # Get all results for this exam ordered by percentage descending
-        results = ExamResult.objects.filter(
-            exam=self.exam,
-            percentage__isnull=False
-        ).order_by('-percentage', 'student__roll_number')
-        
-        current_rank = 0
-        last_percentage = None
-        rank_increment = 0
-        
-        for result in results:
-            rank_increment += 1
-            if result.percentage != last_percentage:
-                current_rank = rank_increment
-                last_percentage = result.percentage
-                
-            result.rank = current_rank
-            result.total_students = results.count()
-            result.save(update_fields=['rank', 'total_students'])
+        from apps.exams.results import rank_exam
+        rank_exam(self.exam)
 
     def clean(self):
         """Validate result data"""
@@ -521,11 +497,9 @@ class ExamResult(BaseModel):
         if self.is_published and not self.published_at:
             self.published_at = timezone.now()
             
+        # Ranks are computed per exam in one pass (apps.exams.results.rank_exam)
+        # on publish, and after the commit of later writes (exams.signals)
         super().save(*args, **kwargs)
-        
-        # Update rank after save
-        if self.percentage is not None:
-            self.update_rank()
 
 
 class SubjectResult(BaseModel):
@@ -653,15 +627,7 @@ class SubjectResult(BaseModel):
 
     def determine_grade(self):
         """Determine grade based on subject percentage"""
-        grading_system = GradingSystem.objects.filter(is_default=True).first()
-        if not grading_system:
-            return None
-            
-        return Grade.objects.filter(
-            grading_system=grading_system,
-            min_percentage__lte=self.percentage,
-            max_percentage__gte=self.percentage
-        ).first()
+        return grading_scales.grade_for(self.percentage)
 
 
 class MarkSheet(BaseModel):
@@ -755,21 +721,14 @@ class MarkSheet(BaseModel):
             
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def mark_sheet_number_prefix(tenant):
+        return f"MS-{timezone.now().year}-{tenant.schema_name.upper()}-"
+
     def generate_mark_sheet_number(self):
         """Generate unique mark sheet number"""
-        prefix = f"MS-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_sheet = MarkSheet.objects.filter(
-            mark_sheet_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('mark_sheet_number').last()
-        
-        if last_sheet:
-            last_number = int(last_sheet.mark_sheet_number.split('-')[-1])
-            new_number = last_number + 1
-        else:
-            new_number = 1
-            
-        return f"{prefix}{new_number:06d}"
+        prefix = self.mark_sheet_number_prefix(self.tenant)
+        return SequenceService.next_number(self.tenant, prefix, MarkSheet, 'mark_sheet_number', width=6)
 
     def verify_mark_sheet(self, user):
         """Verify mark sheet"""
@@ -964,31 +923,38 @@ class ResultStatistics(BaseModel):
 
     def calculate_statistics(self):
         """Calculate comprehensive result statistics"""
-        results = ExamResult.objects.filter(exam=self.exam)
-        
-        self.total_students = results.count()
-        self.appeared_students = results.exclude(result_status="ABSENT").count()
-        self.passed_students = results.filter(result_status="PASS").count()
-        self.failed_students = results.filter(result_status="FAIL").count()
+        results = ExamResult.objects.filter(exam=self.exam).order_by()
+        totals = results.aggregate(
+            total=models.Count('id'),
+            appeared=models.Count('id', filter=~models.Q(result_status="ABSENT")),
+            passed=models.Count('id', filter=models.Q(result_status="PASS")),
+            failed=models.Count('id', filter=models.Q(result_status="FAIL")),
+            average=models.Avg('percentage'),
+            highest=models.Max('percentage'),
+            lowest=models.Min('percentage'),
+        )
+
+        self.total_students = totals['total']
+        self.appeared_students = totals['appeared']
+        self.passed_students = totals['passed']
+        self.failed_students = totals['failed']
         
         # Calculate percentages
         if self.appeared_students > 0:
             self.pass_percentage = (self.passed_students / self.appeared_students) * 100
         
         # Calculate average, highest, lowest percentages
-        valid_results = results.filter(percentage__isnull=False)
-        if valid_results.exists():
-            self.average_percentage = valid_results.aggregate(
-                avg=models.Avg('percentage')
-            )['avg'] or 0
-            
-            self.highest_percentage = valid_results.aggregate(
-                max=models.Max('percentage')
-            )['max'] or 0
-            
-            self.lowest_percentage = valid_results.aggregate(
-                min=models.Min('percentage')
-            )['min'] or 0
+        if totals['average'] is not None:
+            self.average_percentage = totals['average']
+            self.highest_percentage = totals['highest']
+            self.lowest_percentage = totals['lowest']
+
+        self.grade_distribution = {
+            row['overall_grade__grade']: row['count']
+            for row in results.filter(overall_grade__isnull=False).values(
+                'overall_grade__grade'
+            ).annotate(count=models.Count('id'))
+        }
         
         self.save()
 
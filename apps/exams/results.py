@@ -0,0 +1,150 @@
+"""
+Set-based exam result recomputation, ranking and statistics
+"""
+
+import logging
+import threading
+from decimal import Decimal
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F, Sum, Window
+from django.db.models.functions import Rank
+from django.utils import timezone
+
+from apps.academics.services.grading_scale import grading_scales
+from apps.exams.models import Exam, ExamResult, ResultStatistics, SubjectResult
+from apps.students.models import Student
+
+logger = logging.getLogger(__name__)
+
+TWO_PLACES = Decimal('0.01')
+
+# Exams re-ranked by the on_commit callbacks of the latest commit
+_reranked = threading.local()
+
+
+def rank_exam(exam):
+    """
+    Rank an exam's results with ``RANK() OVER (ORDER BY percentage DESC)``
+    and store rank and ``total_students`` in one bulk update. Results
+    without a percentage are left unranked. Returns the number ranked.
+    """
+    ranked = list(
+        ExamResult.objects.filter(exam=exam, percentage__isnull=False)
+        .annotate(position=Window(expression=Rank(), order_by=F('percentage').desc()))
+        .order_by()
+        .values_list('id', 'position')
+    )
+    total = len(ranked)
+    rows = [
+        ExamResult(id=result_id, rank=position, total_students=total)
+        for result_id, position in ranked
+    ]
+
+    with transaction.atomic():
+        ExamResult.objects.bulk_update(rows, ['rank', 'total_students'], batch_size=500)
+        ExamResult.objects.filter(exam=exam, percentage__isnull=True).exclude(rank__isnull=True).update(
+            rank=None, updated_at=timezone.now()
+        )
+    return total
+
+
+def update_statistics(exam):
+    """Recalculate the exam's ``ResultStatistics`` (two aggregate queries)"""
+    stats, _ = ResultStatistics.objects.get_or_create(exam=exam, defaults={'tenant': exam.tenant})
+    stats.calculate_statistics()
+    return stats
+
+
+def recompute_exam_results(exam, create_missing=True):
+    """
+    Recalculate every result of ``exam`` in a handful of queries:
+    subject totals in one grouped query, percentages, grades and pass/fail
+    in memory with one bulk update, then ranks and statistics.
+    Returns a summary dict.
+    """
+    scale = grading_scales.get()
+    subject_totals = dict(
+        SubjectResult.objects.filter(exam_result__exam=exam)
+        .order_by()
+        .values('exam_result')
+        .annotate(total=Sum('total_marks_obtained'))
+        .values_list('exam_result', 'total')
+    )
+
+    with transaction.atomic():
+        created = 0
+        if create_missing:
+            existing = set(ExamResult.objects.filter(exam=exam).values_list('student_id', flat=True))
+            missing = [
+                ExamResult(exam=exam, student_id=student_id, tenant=exam.tenant, total_max_marks=exam.total_marks)
+                for student_id in Student.objects.filter(
+                    current_class=exam.class_name, is_active=True
+                ).values_list('id', flat=True)
+                if student_id not in existing
+            ]
+            ExamResult.objects.bulk_create(missing, batch_size=500)
+            created = len(missing)
+
+        results = list(ExamResult.objects.filter(exam=exam))
+        for result in results:
+            # Same derivation as ExamResult.save
+            result.total_marks_obtained = subject_totals.get(result.id) or 0
+            result.total_max_marks = exam.total_marks
+            if result.total_marks_obtained and result.total_max_marks:
+                result.percentage = result.calculate_percentage().quantize(TWO_PLACES)
+            if result.percentage is not None:
+                grade = scale.grade_for(result.percentage) if result.percentage else None
+                if grade:
+                    result.overall_grade = grade
+                    result.grade_point = grade.grade_point
+                result.result_status = "PASS" if result.percentage >= exam.pass_percentage else "FAIL"
+            result.updated_at = timezone.now()
+
+        ExamResult.objects.bulk_update(
+            results,
+            ['total_marks_obtained', 'total_max_marks', 'percentage', 'overall_grade',
+             'grade_point', 'result_status', 'updated_at'],
+            batch_size=500,
+        )
+        ranked = rank_exam(exam)
+        stats = update_statistics(exam)
+
+    logger.info(f"Recomputed {len(results)} results for exam {exam.pk} ({created} created, {ranked} ranked)")
+    return {
+        'exam': str(exam.pk),
+        'results': len(results),
+        'created': created,
+        'ranked': ranked,
+        'statistics': stats.get_performance_summary(),
+    }
+
+
+def schedule_rerank(exam_id, recompute=False):
+    """
+    Re-rank ``exam_id`` once the current transaction commits, if the exam
+    is published. Every result write schedules a callback; the first one
+    run after the commit does the work and the rest skip the exam, so a
+    request that saves many results ranks each exam once. ``recompute``
+    (subject result writes) re-derives result totals first.
+    """
+    _reranked.exams = {}
+    transaction.on_commit(partial(_rerank_published, exam_id, recompute))
+
+
+def _rerank_published(exam_id, recompute):
+    done = getattr(_reranked, 'exams', None)
+    if done is None:
+        done = _reranked.exams = {}
+    if done.get(exam_id) or (exam_id in done and not recompute):
+        return
+    done[exam_id] = recompute
+
+    exam = Exam.objects.filter(pk=exam_id, is_published=True).first()
+    if exam is None:
+        return
+    if recompute:
+        recompute_exam_results(exam, create_missing=False)
+    else:
+        rank_exam(exam)
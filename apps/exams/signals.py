@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.academics.models import Grade, GradingSystem
+from apps.academics.services.grading_scale import grading_scales
+from apps.exams.models import ExamResult, SubjectResult
+from apps.exams.results import schedule_rerank
+
+
+# ---------------------------------------------------------
+# Invalidate cached grading scales
+# ---------------------------------------------------------
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+@receiver(post_save, sender=GradingSystem)
+@receiver(post_delete, sender=GradingSystem)
+def invalidate_grading_scales(sender, instance, **kwargs):
+    """Drop cached grading scales of the current schema once the change commits"""
+    transaction.on_commit(grading_scales.invalidate)
+
+
+# ---------------------------------------------------------
+# Keep ranks of published exams current
+# ---------------------------------------------------------
+@receiver(post_save, sender=ExamResult)
+@receiver(post_delete, sender=ExamResult)
+def rerank_on_result_change(sender, instance, **kwargs):
+    schedule_rerank(instance.exam_id)
+
+
+@receiver(post_save, sender=SubjectResult)
+@receiver(post_delete, sender=SubjectResult)
+def rerank_on_subject_result_change(sender, instance, **kwargs):
+    schedule_rerank(instance.exam_subject.exam_id, recompute=True)
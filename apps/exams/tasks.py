@@ -0,0 +1,148 @@
+"""
+Background tasks for exam operations using Celery
+"""
+
+import logging
+
+from celery import chord, shared_task
+from django_tenants.utils import schema_context
+
+from apps.core.services import job_lock
+from apps.core.utils.tenant import tenant_context
+
+logger = logging.getLogger(__name__)
+
+
+def marksheet_batch_lock_key(tenant_id, exam_id):
+    return f"exams:marksheet_batch:{tenant_id}:{exam_id}"
+
+
+def marksheet_batch_owner(tenant_id, user_id):
+    """Recorded in every state of a batch task so views can check who may read it"""
+    return {'tenant_id': str(tenant_id), 'user_id': str(user_id) if user_id else None}
+
+
+def _marksheet_batch(tenant_id, exam_id, class_id=None, section_id=None, output='zip', user_id=None,
+                     batch_id=None):
+    """``MarksheetBatch`` described by a batch task's arguments (call inside the tenant's schema)"""
+    from django.contrib.auth import get_user_model
+    from apps.exams.marksheet_batch import MarksheetBatch
+    from apps.exams.models import Exam
+
+    user = get_user_model().objects.filter(id=user_id).first() if user_id else None
+    return MarksheetBatch(
+        exam=Exam.objects.get(id=exam_id),
+        class_id=class_id,
+        section_id=section_id,
+        output=output,
+        user=user,
+        batch_id=batch_id,
+    )
+
+
+@shared_task(bind=True, acks_late=True)
+def generate_marksheets_task(self, tenant_id, exam_id, class_id=None, section_id=None, output='zip', user_id=None):
+    """
+    Render the mark sheets of an exam into one ZIP or merged PDF
+
+    Creates missing mark sheets, then replaces itself with a chord of one
+    ``render_marksheet_chunk_task`` per chunk and ``merge_marksheets_task``,
+    so chunks render in parallel on any worker and the merged summary
+    becomes this task's result.
+
+    Args:
+        tenant_id: Tenant owning the exam
+        exam_id: Exam to render
+        class_id: Only students of this class
+        section_id: Only students of this section
+        output: ``zip`` (one PDF per student) or ``pdf`` (merged)
+        user_id: User recorded as issuer of new mark sheets
+
+    Returns:
+        Batch summary from MarksheetBatch.merge, including the stored file
+        path and the requesting tenant and user
+    """
+    from apps.tenants.models import Tenant
+
+    params = {
+        'tenant_id': tenant_id,
+        'exam_id': exam_id,
+        'class_id': class_id,
+        'section_id': section_id,
+        'output': output,
+        'user_id': user_id,
+        'batch_id': self.request.id,
+    }
+    try:
+        tenant = Tenant.objects.get(id=tenant_id)
+        with schema_context(tenant.schema_name), tenant_context(tenant):
+            batch = _marksheet_batch(**params)
+            chunks = batch.prepare()
+            if not chunks:
+                job_lock.release(marksheet_batch_lock_key(tenant_id, exam_id))
+                return dict(batch.merge([]), **marksheet_batch_owner(tenant_id, user_id))
+    except Exception as exc:
+        logger.error(f"Mark sheet batch failed for exam {exam_id}: {exc}", exc_info=True)
+        job_lock.release(marksheet_batch_lock_key(tenant_id, exam_id))
+        raise
+
+    total = sum(len(result_ids) for _, result_ids in chunks)
+    self.update_state(
+        state='PROGRESS',
+        meta={
+            **marksheet_batch_owner(tenant_id, user_id),
+            'total': total,
+            'chunks': len(chunks),
+            'status': f'Rendering {total} mark sheets in {len(chunks)} chunks',
+        }
+    )
+    header = [
+        render_marksheet_chunk_task.s(start=start, result_ids=result_ids, **params)
+        for start, result_ids in chunks
+    ]
+    body = merge_marksheets_task.s(**params).on_error(
+        marksheet_batch_failed.s(tenant_id=tenant_id, exam_id=exam_id)
+    )
+    return self.replace(chord(header, body))
+
+
+@shared_task(acks_late=True)
+def render_marksheet_chunk_task(tenant_id, exam_id, start, result_ids, **params):
+    """
+    Render one chunk of a mark sheet batch into part files
+
+    Returns:
+        ``[position, result_id, file_name, part_path]`` rows (see MarksheetBatch.render_chunk)
+    """
+    from apps.tenants.models import Tenant
+
+    tenant = Tenant.objects.get(id=tenant_id)
+    with schema_context(tenant.schema_name), tenant_context(tenant):
+        batch = _marksheet_batch(tenant_id, exam_id, **params)
+        return batch.render_chunk(start, result_ids)
+
+
+@shared_task(acks_late=True)
+def merge_marksheets_task(chunks, tenant_id, exam_id, **params):
+    """
+    Chord callback of a mark sheet batch: store the ZIP or merged PDF
+
+    Returns:
+        Batch summary from MarksheetBatch.merge
+    """
+    from apps.tenants.models import Tenant
+
+    try:
+        tenant = Tenant.objects.get(id=tenant_id)
+        with schema_context(tenant.schema_name), tenant_context(tenant):
+            batch = _marksheet_batch(tenant_id, exam_id, **params)
+            return dict(batch.merge(chunks), **marksheet_batch_owner(tenant_id, params.get('user_id')))
+    finally:
+        job_lock.release(marksheet_batch_lock_key(tenant_id, exam_id))
+
+
+@shared_task
+def marksheet_batch_failed(request, exc, traceback, tenant_id, exam_id):
+    """Errback of a mark sheet batch whose chunks failed: release its lock"""
+    logger.error(f"Mark sheet batch {request.id} failed for exam {exam_id}: {exc}")
+    job_lock.release(marksheet_batch_lock_key(tenant_id, exam_id))
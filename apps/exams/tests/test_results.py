@@ -0,0 +1,141 @@
+from django.test import TestCase
+from django.utils import timezone
+from django_tenants.utils import schema_context
+
+from apps.academics.models import AcademicYear, SchoolClass, Section
+from apps.exams.models import Exam, ExamResult, ExamType
+from apps.exams.results import rank_exam, recompute_exam_results
+from apps.students.models import Student
+from apps.tenants.models import Tenant
+
+
+class ExamResultsTest(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(
+            schema_name='test_exam_results',
+            name='Test Exam Results Tenant',
+            status='active',
+            subscription_ends_at=timezone.now() + timezone.timedelta(days=365)
+        )
+        today = timezone.now().date()
+
+        with schema_context(self.tenant.schema_name):
+            self.academic_year = AcademicYear.objects.create(
+                name="2024-2025",
+                code="2024-25",
+                start_date=today,
+                end_date=today + timezone.timedelta(days=365),
+                is_current=True,
+                tenant=self.tenant
+            )
+            self.school_class = SchoolClass.objects.create(
+                name="Class 1",
+                numeric_name=1,
+                code="C1",
+                level="PRIMARY",
+                order=1,
+                tenant=self.tenant
+            )
+            self.section = Section.objects.create(
+                class_name=self.school_class,
+                name="A",
+                code="A",
+                tenant=self.tenant
+            )
+            self.students = [self.create_student(number) for number in range(1, 5)]
+            self.exam = Exam.objects.create(
+                tenant=self.tenant,
+                name="Mid Term",
+                code="MT-C1",
+                exam_type=ExamType.objects.create(
+                    name="Mid Term", code="MT", weightage=50, tenant=self.tenant
+                ),
+                academic_year=self.academic_year,
+                class_name=self.school_class,
+                start_date=today,
+                end_date=today + timezone.timedelta(days=5),
+                total_marks=100,
+            )
+
+    def create_student(self, number):
+        return Student.objects.create(
+            tenant=self.tenant,
+            admission_number=f"TEST00{number}",
+            first_name="Test",
+            last_name=f"Student {number}",
+            personal_email=f"test.student{number}@example.com",
+            status="ACTIVE",
+            date_of_birth=timezone.make_aware(timezone.datetime(2005, 1, 1)).date(),
+            academic_year=self.academic_year,
+            gender="M",
+            mobile_primary=f"+91999999999{number}",
+            reg_no=f"REG-TEST00{number}",
+            current_class=self.school_class,
+            section=self.section
+        )
+
+    def create_result(self, student, marks=None, **kwargs):
+        return ExamResult.objects.create(
+            tenant=self.tenant,
+            exam=self.exam,
+            student=student,
+            total_marks_obtained=marks,
+            total_max_marks=100 if marks is not None else None,
+            **kwargs
+        )
+
+    def test_ties_share_a_rank_and_the_next_rank_is_skipped(self):
+        """Results are ranked with RANK() semantics"""
+        with schema_context(self.tenant.schema_name):
+            results = [self.create_result(student, marks) for student, marks in zip(self.students, (90, 90, 80, 70))]
+
+            self.assertEqual(rank_exam(self.exam), 4)
+
+            ranks = [ExamResult.objects.get(pk=result.pk).rank for result in results]
+            self.assertEqual(ranks, [1, 1, 3, 4])
+            self.assertEqual(
+                set(ExamResult.objects.filter(exam=self.exam).values_list('total_students', flat=True)), {4}
+            )
+
+    def test_results_without_percentage_are_unranked(self):
+        """A result whose percentage is cleared loses its previous rank"""
+        with schema_context(self.tenant.schema_name):
+            self.create_result(self.students[0], 80)
+            absent = self.create_result(self.students[1], rank=2)
+
+            self.assertEqual(rank_exam(self.exam), 1)
+
+            absent.refresh_from_db()
+            self.assertIsNone(absent.rank)
+
+    def test_recompute_creates_missing_results(self):
+        """Students of the exam's class without a result get one unless disabled"""
+        with schema_context(self.tenant.schema_name):
+            self.create_result(self.students[0], 80)
+
+            summary = recompute_exam_results(self.exam, create_missing=False)
+            self.assertEqual(summary['created'], 0)
+            self.assertEqual(ExamResult.objects.filter(exam=self.exam).count(), 1)
+
+            summary = recompute_exam_results(self.exam)
+            self.assertEqual(summary['created'], 3)
+            self.assertEqual(
+                set(ExamResult.objects.filter(exam=self.exam).values_list('student_id', flat=True)),
+                {student.id for student in self.students}
+            )
+
+    def test_published_exam_is_reranked_after_result_edits(self):
+        """Editing a result of a published exam re-ranks it once the write commits"""
+        with schema_context(self.tenant.schema_name):
+            first = self.create_result(self.students[0], 90)
+            second = self.create_result(self.students[1], 80)
+            self.exam.is_published = True
+            self.exam.save()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                second.total_marks_obtained = 95
+                second.save()
+
+            first.refresh_from_db()
+            second.refresh_from_db()
+            self.assertEqual((first.rank, second.rank), (2, 1))
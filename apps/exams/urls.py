@@ -43,6 +43,9 @@ urlpatterns = [
         path('', login_required(views.ExamResultListView.as_view()), name='result_list'),
         path('<uuid:pk>/', login_required(views.ExamResultDetailView.as_view()), name='result_detail'),
         path('<uuid:pk>/PDF/', login_required(views.MarkSheetPDFView.as_view()), name='result_pdf'),
+        path('exam/<uuid:pk>/PDF/', login_required(views.MarkSheetBatchView.as_view()), name='result_pdf_batch'),
+        path('PDF/status/<str:task_id>/', login_required(views.MarkSheetBatchStatusView.as_view()), name='result_pdf_batch_status'),
+        path('PDF/download/<str:task_id>/', login_required(views.MarkSheetBatchDownloadView.as_view()), name='result_pdf_batch_download'),
         path('verify/', views.MarkSheetVerificationView.as_view(), name='verify_result'),
         path('generate/<uuid:pk>/', login_required(views.GenerateResultsView.as_view()), name='generate_results'),
     ])),
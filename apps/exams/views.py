@@ -5,13 +5,12 @@ from django.utils.translation import gettext_lazy as _
 from django.views.generic import TemplateView
 from django.db.models import Count, Sum, Avg, Max, Min
 from django.views import View
-from django.db import models
 from apps.core.views import BaseListView, BaseCreateView, BaseUpdateView, BaseDeleteView, BaseDetailView
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from apps.core.utils.tenant import get_current_tenant
-from .models import ExamType, Exam, GradingSystem, Grade, ExamResult, SubjectResult, MarkSheet, ResultStatistics
+from apps.academics.models import GradingSystem
+from .models import ExamType, Exam, Grade, ExamResult, MarkSheet
 from .forms import ExamTypeForm, ExamForm, GradingSystemForm, GradeForm
-from apps.students.models import Student
 from django.template.loader import render_to_string
 from django.http import HttpResponse
 import io
@@ -187,35 +186,131 @@ class GenerateResultsView(PermissionRequiredMixin, View):
 
     def post(self, request, pk):
         exam = get_object_or_404(Exam, pk=pk)
-        students = Student.objects.filter(current_class=exam.class_name, is_active=True)
+
+        # Totals, grades, ranks and statistics for the whole exam in one pass
+        from apps.exams.results import recompute_exam_results
+        summary = recompute_exam_results(exam)
         
-        results_count = 0
-        for student in students:
-            # Create or get ExamResult
-            result, created = ExamResult.objects.get_or_create(
-                exam=exam,
-                student=student,
-                defaults={'total_max_marks': exam.total_marks}
+        messages.success(request, _(f"Successfully generated/updated results for {summary['results']} students."))
+        return redirect('exams:result_list')
+
+
+class MarkSheetBatchView(PermissionRequiredMixin, View):
+    """
+    Queue rendering of all mark sheets of an exam (optionally one class or
+    section) into a ZIP or merged PDF
+    """
+    permission_required = 'exams.view_examresult'
+
+    def post(self, request, pk):
+        from django.conf import settings
+        from django.urls import reverse
+        from apps.core.services import job_lock
+        from apps.exams.marksheet_batch import OUTPUT_FORMATS
+        from apps.exams.tasks import generate_marksheets_task, marksheet_batch_lock_key
+
+        exam = get_object_or_404(Exam, pk=pk)
+        output = request.POST.get('output', 'zip')
+        if output not in OUTPUT_FORMATS:
+            messages.error(request, _("Invalid mark sheet output format."))
+            return redirect('exams:result_list')
+
+        tenant = get_current_tenant()
+        lock_key = marksheet_batch_lock_key(tenant.id, exam.pk)
+        lock_timeout = getattr(settings, 'MARKSHEET_BATCH', {}).get('LOCK_TIMEOUT', 3600)
+        if not job_lock.acquire(lock_key, lock_timeout):
+            messages.info(request, _(f"Mark sheets for {exam.name} are already being generated."))
+            return redirect('exams:result_list')
+
+        try:
+            result = generate_marksheets_task.delay(
+                tenant_id=str(tenant.id),
+                exam_id=str(exam.pk),
+                class_id=request.POST.get('class_id') or None,
+                section_id=request.POST.get('section_id') or None,
+                output=output,
+                user_id=str(request.user.id),
             )
-            
-            # Calculate total marks from subject results
-            subject_marks = SubjectResult.objects.filter(exam_result=result).aggregate(
-                total=models.Sum('total_marks_obtained')
-            )['total'] or 0
-            
-            result.total_marks_obtained = subject_marks
-            result.total_max_marks = exam.total_marks
-            result.save() # This triggers rank update and grade determination
-            results_count += 1
-            
-        # Update statistics
-        stats, created = ResultStatistics.objects.get_or_create(exam=exam)
-        stats.calculate_statistics()
-        
-        messages.success(request, _(f"Successfully generated/updated results for {results_count} students."))
+        except Exception as e:
+            job_lock.release(lock_key)
+            messages.error(request, _(f"Error generating mark sheets: {str(e)}"))
+            return redirect('exams:result_list')
+
+        messages.success(request, _(
+            f"Mark sheet generation for {exam.name} has started. "
+            f"Track it at {reverse('exams:result_pdf_batch_status', args=[result.id])}."
+        ))
         return redirect('exams:result_list')
 
 
+def marksheet_batch_data(request, result):
+    """
+    Progress or summary a mark sheet batch task recorded, or None unless the
+    current user queued it in the current tenant
+    """
+    from apps.exams.tasks import marksheet_batch_owner
+
+    if result.state == 'PROGRESS':
+        data = result.info
+    elif result.successful():
+        data = result.result
+    else:
+        return None
+    owner = marksheet_batch_owner(get_current_tenant().id, request.user.id)
+    if not isinstance(data, dict) or any(data.get(key) != value for key, value in owner.items()):
+        return None
+    return data
+
+
+class MarkSheetBatchStatusView(PermissionRequiredMixin, View):
+    permission_required = 'exams.view_examresult'
+
+    def get(self, request, task_id):
+        from celery.result import AsyncResult
+        from django.http import Http404, JsonResponse
+        from django.urls import reverse
+
+        result = AsyncResult(task_id)
+        data = {'task_id': task_id, 'state': result.state}
+        if result.state == 'PROGRESS' or result.successful():
+            batch = marksheet_batch_data(request, result)
+            if batch is None:
+                raise Http404
+            if result.state == 'PROGRESS':
+                data.update(batch)
+            else:
+                data['result'] = batch
+                if batch.get('file'):
+                    data['download_url'] = reverse('exams:result_pdf_batch_download', args=[task_id])
+        elif result.failed():
+            # Failures carry no owner to check, so no details either
+            data['error'] = str(_("Mark sheet generation failed."))
+        return JsonResponse(data)
+
+
+class MarkSheetBatchDownloadView(PermissionRequiredMixin, View):
+    """
+    Stream a finished batch's ZIP or merged PDF from storage
+    """
+    permission_required = 'exams.view_examresult'
+
+    def get(self, request, task_id):
+        import os
+        from celery.result import AsyncResult
+        from django.core.files.storage import default_storage
+        from django.http import FileResponse, Http404
+
+        result = AsyncResult(task_id)
+        batch = marksheet_batch_data(request, result) if result.successful() else None
+        path = batch.get('file') if batch else None
+        # Only files of the current tenant's batches
+        if not path or not path.startswith(f"marksheets/{get_current_tenant().schema_name}/"):
+            raise Http404
+        if not default_storage.exists(path):
+            raise Http404
+        return FileResponse(default_storage.open(path, 'rb'), as_attachment=True, filename=os.path.basename(path))
+
+
 class MarkSheetPDFView(PermissionRequiredMixin, View):
     """
     Generate and download mark sheet as PDF
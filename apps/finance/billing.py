@@ -0,0 +1,214 @@
+"""
+Set-based monthly invoice generation and overdue sweeping
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.services.sequence_service import SequenceService
+from apps.core.utils.overdue import by_due_date, days_overdue
+from apps.finance.models import FeeStructure, Invoice, InvoiceItem, TaxConfiguration
+from apps.students.models import Student
+
+logger = logging.getLogger(__name__)
+
+
+class MonthlyInvoiceEngine:
+    """
+    Generates one invoice per active student for a billing period.
+
+    Instead of per-student queries and saves, every chunk of students is
+    billed with a fixed number of statements:
+
+    * fee structures are loaded once and grouped by (class, academic year);
+    * invoices that already exist for the period are fetched in one query,
+      which also makes re-runs (and resumed Celery jobs) idempotent;
+    * invoice numbers for the chunk come from one sequence allocation;
+    * invoices and items are ``bulk_create``d with tax and totals computed
+      in memory exactly as ``InvoiceItem.save``/``Invoice.calculate_totals``
+      and ``Invoice.save`` would.
+
+    Each chunk commits on its own so a run never holds one long transaction.
+    """
+
+    def __init__(self, tenant, billing_date, due_date, chunk_size=500, user=None):
+        self.tenant = tenant
+        self.billing_period = billing_date.strftime('%B %Y')
+        self.due_date = due_date
+        self.issue_date = timezone.now().date()
+        self.chunk_size = chunk_size
+        self.user = user
+        self._fees = None
+        self._tax_percentage = None
+
+    # ------------------------------------------------------------------
+    # Preloading
+    # ------------------------------------------------------------------
+    @property
+    def fees(self):
+        """Monthly fee structures grouped by (class_id, academic_year_id)"""
+        if self._fees is None:
+            grouped = defaultdict(list)
+            for fee in FeeStructure.objects.filter(tenant=self.tenant, frequency='MONTHLY'):
+                grouped[(fee.class_name_id, fee.academic_year_id)].append(fee)
+            self._fees = dict(grouped)
+        return self._fees
+
+    @property
+    def tax_percentage(self):
+        if self._tax_percentage is None:
+            config = TaxConfiguration.objects.filter(tenant=self.tenant, is_active=True).first()
+            self._tax_percentage = config.total_tax_percentage if config else Decimal('0')
+        return self._tax_percentage
+
+    def students(self, after=None):
+        """Billable students ordered by id, optionally after a resume cursor"""
+        queryset = Student.objects.filter(
+            status='ACTIVE', tenant=self.tenant
+        ).order_by('id').values_list('id', 'current_class_id', 'academic_year_id')
+        if after:
+            queryset = queryset.filter(id__gt=after)
+        return queryset
+
+    def billed_student_ids(self, student_ids):
+        return set(Invoice.objects.filter(
+            tenant=self.tenant,
+            billing_period=self.billing_period,
+            student_id__in=student_ids
+        ).values_list('student_id', flat=True))
+
+    def reserve_invoice_numbers(self, count):
+        """Reserve ``count`` invoice numbers with one sequence allocation"""
+        prefix = f"INV-{timezone.now().year}-"
+        return SequenceService.reserve_numbers(self.tenant, prefix, Invoice, 'invoice_number', count, width=5)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def build_invoice(self, student_id, academic_year_id, fees, invoice_number):
+        invoice = Invoice(
+            tenant=self.tenant,
+            student_id=student_id,
+            academic_year_id=academic_year_id,
+            billing_period=self.billing_period,
+            due_date=self.due_date,
+            issue_date=self.issue_date,
+            invoice_number=invoice_number,
+            created_by=self.user,
+            updated_by=self.user,
+        )
+        items = []
+        for fee in fees:
+            tax_amount = round((fee.amount * self.tax_percentage) / 100, 2) if self.tax_percentage else Decimal('0')
+            items.append(InvoiceItem(
+                tenant=self.tenant,
+                invoice=invoice,
+                fee_structure=fee,
+                amount=fee.amount,
+                tax_amount=tax_amount,
+                description=f"{fee.name} - {self.billing_period}",
+                created_by=self.user,
+                updated_by=self.user,
+            ))
+
+        # Same arithmetic as Invoice.calculate_totals() + Invoice.save()
+        invoice.subtotal = sum((item.amount for item in items), Decimal('0'))
+        invoice.total_tax = sum((item.tax_amount for item in items), Decimal('0'))
+        invoice.total_discount = Decimal('0')
+        invoice.total_amount = invoice.subtotal - invoice.total_discount + invoice.total_tax + invoice.late_fee
+        invoice.due_amount = invoice.total_amount - invoice.paid_amount
+        invoice.status = 'ISSUED'
+        if invoice.due_date < self.issue_date and invoice.due_amount > 0:
+            invoice.is_overdue = True
+            invoice.overdue_days = (self.issue_date - invoice.due_date).days
+            invoice.status = 'OVERDUE'
+        return invoice, items
+
+    def bill_chunk(self, chunk):
+        """Create invoices for one chunk of (id, class_id, academic_year_id); returns count"""
+        billed = self.billed_student_ids([student_id for student_id, _, _ in chunk])
+        billable = [
+            (student_id, academic_year_id, self.fees[(class_id, academic_year_id)])
+            for student_id, class_id, academic_year_id in chunk
+            if student_id not in billed and (class_id, academic_year_id) in self.fees
+        ]
+        if not billable:
+            return 0
+
+        with transaction.atomic():
+            numbers = self.reserve_invoice_numbers(len(billable))
+            invoices, items = [], []
+            for (student_id, academic_year_id, fees), number in zip(billable, numbers):
+                invoice, invoice_items = self.build_invoice(student_id, academic_year_id, fees, number)
+                invoices.append(invoice)
+                items.extend(invoice_items)
+
+            Invoice.objects.bulk_create(invoices, batch_size=self.chunk_size)
+            InvoiceItem.objects.bulk_create(items, batch_size=self.chunk_size * 4)
+        return len(invoices)
+
+    def run(self, after=None, progress_callback=None):
+        """
+        Bill every student (after the ``after`` cursor); ``progress_callback``
+        receives ``processed``, ``total``, ``created`` and the cursor after
+        each committed chunk. Returns a summary dict.
+        """
+        students = list(self.students(after))
+        total = len(students)
+        created = processed = 0
+        cursor = after
+
+        for start in range(0, total, self.chunk_size):
+            chunk = students[start:start + self.chunk_size]
+            created += self.bill_chunk(chunk)
+            processed += len(chunk)
+            cursor = chunk[-1][0]
+            if progress_callback:
+                progress_callback(processed=processed, total=total, created=created, cursor=cursor)
+
+        logger.info(f"Generated {created} invoices for {self.billing_period} ({total} students checked)")
+        return {
+            'billing_period': self.billing_period,
+            'students_checked': total,
+            'invoices_created': created,
+            'cursor': str(cursor) if cursor else None,
+        }
+
+
+CLOSED_INVOICE_STATUSES = ('DRAFT', 'PAID', 'CANCELLED', 'REFUNDED')
+
+
+def sweep_overdue_invoices(tenant, today=None):
+    """
+    Flag the tenant's past-due unpaid invoices OVERDUE and refresh their
+    ``overdue_days`` in one UPDATE (the same state ``Invoice.save`` derives).
+    Returns the ids of invoices that became overdue in this sweep.
+    """
+    today = today or timezone.now().date()
+    past_due = Invoice.objects.filter(
+        tenant=tenant,
+        due_date__lt=today,
+        due_amount__gt=0
+    ).exclude(status__in=CLOSED_INVOICE_STATUSES)
+
+    with transaction.atomic():
+        newly_overdue = list(past_due.exclude(status='OVERDUE').values_list('id', flat=True))
+        due_dates = list(past_due.order_by().values_list('due_date', flat=True).distinct())
+        if due_dates:
+            past_due.update(
+                status='OVERDUE',
+                is_overdue=True,
+                overdue_days=by_due_date(
+                    due_dates,
+                    lambda due_date: days_overdue(today, due_date),
+                    models.PositiveIntegerField(),
+                    F('overdue_days'),
+                ),
+                updated_at=timezone.now(),
+            )
+    return newly_overdue
@@ -15,6 +15,7 @@ from decimal import Decimal
 from django.utils.translation import gettext_lazy as _
 
 from apps.core.models import BaseModel
+from apps.core.services.sequence_service import SequenceService
 
 
 
@@ -912,24 +913,8 @@ class Invoice(BaseModel):
 
     def generate_invoice_number(self):
         """Generate unique invoice number"""
-        # Default prefix
         prefix = f"INV-{timezone.now().year}-"
-        
-        last_invoice = Invoice.objects.filter(
-            invoice_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('invoice_number').last()
-        
-        if last_invoice:
-            try:
-                last_num = int(last_invoice.invoice_number.split('-')[-1])
-                new_num = last_num + 1
-            except (ValueError, IndexError):
-                new_num = 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        return SequenceService.next_number(self.tenant, prefix, Invoice, 'invoice_number', width=5)
 
 
 
@@ -1589,34 +1574,9 @@ class Payment(BaseModel):
 
 
     def generate_payment_number(self):
-
         """Generate unique payment number"""
-
         prefix = f"PAY-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-
-        last_payment = Payment.objects.filter(
-
-            payment_number__startswith=prefix,
-
-            tenant=self.tenant
-
-        ).order_by('payment_number').last()
-
-        
-
-        if last_payment:
-
-            last_num = int(last_payment.payment_number.split('-')[-1])
-
-            new_num = last_num + 1
-
-        else:
-
-            new_num = 1
-
-            
-
-        return f"{prefix}{new_num:05d}"
+        return SequenceService.next_number(self.tenant, prefix, Payment, 'payment_number', width=5)
 
 
 
@@ -1891,34 +1851,9 @@ class Refund(BaseModel):
 
 
     def generate_refund_number(self):
-
         """Generate unique refund number"""
-
         prefix = f"REF-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-
-        last_refund = Refund.objects.filter(
-
-            refund_number__startswith=prefix,
-
-            tenant=self.tenant
-
-        ).order_by('refund_number').last()
-
-        
-
-        if last_refund:
-
-            last_num = int(last_refund.refund_number.split('-')[-1])
-
-            new_num = last_num + 1
-
-        else:
-
-            new_num = 1
-
-            
-
-        return f"{prefix}{new_num:05d}"
+        return SequenceService.next_number(self.tenant, prefix, Refund, 'refund_number', width=5)
 
 
 
@@ -2393,34 +2328,9 @@ class Expense(BaseModel):
 
 
     def generate_expense_number(self):
-
         """Generate unique expense number"""
-
         prefix = f"EXP-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-
-        last_expense = Expense.objects.filter(
-
-            expense_number__startswith=prefix,
-
-            tenant=self.tenant
-
-        ).order_by('expense_number').last()
-
-        
-
-        if last_expense:
-
-            last_num = int(last_expense.expense_number.split('-')[-1])
-
-            new_num = last_num + 1
-
-        else:
-
-            new_num = 1
-
-            
-
-        return f"{prefix}{new_num:05d}"
+        return SequenceService.next_number(self.tenant, prefix, Expense, 'expense_number', width=5)
 
 
 
@@ -3943,32 +3853,9 @@ class FinancialTransaction(BaseModel):
 
 
     def generate_transaction_number(self):
-
         """Generate unique transaction number"""
-
         prefix = f"TRN-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-
-        last_transaction = FinancialTransaction.objects.filter(
-
-            transaction_number__startswith=prefix,
-
-            tenant=self.tenant
-
-        ).order_by('transaction_number').last()
-
-        
-
-        if last_transaction:
-
-            last_num = int(last_transaction.transaction_number.split('-')[-1])
-
-            new_num = last_num + 1
-
-        else:
-
-            new_num = 1
-
-        return f"{prefix}{new_num:05d}"
+        return SequenceService.next_number(self.tenant, prefix, FinancialTransaction, 'transaction_number', width=5)
 
 class BankAccount(BaseModel):
 
@@ -1,8 +1,12 @@
 from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.dispatch import Signal, receiver
 from .models import Payment
 from apps.communications.models import Notification
 
+# Sent by the overdue sweep per tenant with lists of newly overdue ids:
+# tenant, invoices, book_issues, fines
+overdue_detected = Signal()
+
 @receiver(post_save, sender=Payment)
 def payment_notification(sender, instance, created, **kwargs):
     """
@@ -0,0 +1,142 @@
+"""
+Background tasks for finance operations using Celery
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django_tenants.utils import schema_context
+
+from apps.core.services import job_lock
+from apps.core.utils.tenant import tenant_context
+
+logger = logging.getLogger(__name__)
+
+
+def invoice_run_lock_key(tenant_id, billing_month):
+    return f"finance:invoice_run:{tenant_id}:{billing_month}"
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60, acks_late=True)
+def generate_monthly_invoices_task(self, tenant_id, billing_month, due_date, user_id=None, after=None):
+    """
+    Generate the monthly invoices of one tenant in committed chunks
+
+    Args:
+        tenant_id: Tenant to bill
+        billing_month: Billing month as ``YYYY-MM``
+        due_date: Due date as ``YYYY-MM-DD``
+        user_id: User recorded as creator of the invoices
+        after: Student id cursor to resume after (set on retries)
+
+    Returns:
+        Billing summary from MonthlyInvoiceEngine
+    """
+    from django.contrib.auth import get_user_model
+    from apps.finance.billing import MonthlyInvoiceEngine
+    from apps.tenants.models import Tenant
+
+    options = getattr(settings, 'INVOICE_GENERATION', {})
+    lock_key = invoice_run_lock_key(tenant_id, billing_month)
+    progress = {'cursor': after}
+
+    def report(processed, total, created, cursor):
+        progress['cursor'] = str(cursor)
+        self.update_state(
+            state='PROGRESS',
+            meta={
+                'current': processed,
+                'total': total,
+                'created': created,
+                'status': f'Billed {processed} of {total} students',
+            }
+        )
+
+    try:
+        tenant = Tenant.objects.get(id=tenant_id)
+        user = get_user_model().objects.filter(id=user_id).first() if user_id else None
+
+        with schema_context(tenant.schema_name), tenant_context(tenant):
+            engine = MonthlyInvoiceEngine(
+                tenant=tenant,
+                billing_date=datetime.strptime(billing_month, '%Y-%m').date(),
+                due_date=datetime.strptime(due_date, '%Y-%m-%d').date(),
+                chunk_size=options.get('CHUNK_SIZE', 500),
+                user=user,
+            )
+            result = engine.run(after=after, progress_callback=report)
+
+        job_lock.release(lock_key)
+        return result
+
+    except Exception as exc:
+        logger.error(f"Monthly invoice generation failed for tenant {tenant_id}: {exc}", exc_info=True)
+        if self.request.retries >= self.max_retries:
+            job_lock.release(lock_key)
+            raise
+        # Committed chunks are kept; resume after the last one
+        raise self.retry(exc=exc, kwargs={
+            'tenant_id': tenant_id,
+            'billing_month': billing_month,
+            'due_date': due_date,
+            'user_id': user_id,
+            'after': progress['cursor'],
+        })
+
+
+def overdue_sweep_cursor_key(tenant_id):
+    return f"finance:overdue_sweep:last:{tenant_id}"
+
+
+@shared_task(bind=True, acks_late=True)
+def sweep_overdue_task(self, schema_name=None):
+    """
+    Periodic (Celery beat) sweep of overdue invoices, book issues and fines
+
+    Every tenant is swept with set-based UPDATEs in short transactions, and
+    ``overdue_detected`` is sent with the ids that became overdue so the
+    reminder pipeline only has to look at those.
+
+    Args:
+        schema_name: Sweep only this tenant schema
+
+    Returns:
+        ``{schema_name: {'invoices': [...], 'book_issues': [...], 'fines': [...]}}``
+    """
+    from django.utils import timezone
+    from apps.finance.billing import sweep_overdue_invoices
+    from apps.finance.signals import overdue_detected
+    from apps.library.overdue import overdue_fine_ids, sweep_overdue_book_issues
+    from apps.tenants.models import Tenant
+
+    today = timezone.now().date()
+    tenants = Tenant.objects.exclude(schema_name='public')
+    if schema_name:
+        tenants = tenants.filter(schema_name=schema_name)
+
+    summary = {}
+    for tenant in tenants:
+        cursor_key = overdue_sweep_cursor_key(tenant.id)
+        since = cache.get(cursor_key) or today - timedelta(days=1)
+        try:
+            with schema_context(tenant.schema_name), tenant_context(tenant):
+                detected = {
+                    'invoices': sweep_overdue_invoices(tenant, today),
+                    'book_issues': sweep_overdue_book_issues(tenant, today),
+                    'fines': overdue_fine_ids(tenant, since, today),
+                }
+                overdue_detected.send(sender=Tenant, tenant=tenant, **detected)
+        except Exception as exc:
+            logger.error(f"Overdue sweep failed for tenant {tenant.schema_name}: {exc}", exc_info=True)
+            continue
+
+        cache.set(cursor_key, today, None)
+        summary[tenant.schema_name] = {key: [str(pk) for pk in ids] for key, ids in detected.items()}
+        logger.info(
+            f"Overdue sweep for {tenant.schema_name}: "
+            + ", ".join(f"{len(ids)} {key}" for key, ids in detected.items())
+        )
+    return summary
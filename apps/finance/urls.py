@@ -161,6 +161,7 @@ urlpatterns = [
 
     # ==================== UTILITIES ====================
     path('generate-invoices/', login_required(views.GenerateMonthlyInvoicesView.as_view()), name='generate_invoices'),
+    path('generate-invoices/status/<str:task_id>/', login_required(views.GenerateMonthlyInvoicesStatusView.as_view()), name='generate_invoices_status'),
     path('send-reminders/', login_required(views.SendPaymentRemindersView.as_view()), name='send_reminders'),
 
     # ==================== STUDENT / PARENT PORTAL ====================
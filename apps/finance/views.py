@@ -773,78 +773,60 @@ class GenerateMonthlyInvoicesView(BaseView):
             return render(request, 'finance/utils/generate_invoices.html')
 
         try:
-            # Parse dates
-            from datetime import datetime
             billing_date = datetime.strptime(billing_month_str, '%Y-%m').date()
-            due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
-            billing_period = billing_date.strftime('%B %Y')
-
-            # Get active students
-            from apps.students.models import Student
-            students = Student.objects.filter(
-                status='ACTIVE',
-                tenant=self.request.tenant
-            ).select_related('current_class', 'academic_year')
+            datetime.strptime(due_date_str, '%Y-%m-%d')
+        except ValueError:
+            messages.error(request, _("Invalid billing month or due date."))
+            return render(request, 'finance/utils/generate_invoices.html')
 
-            invoices_created = 0
-            
-            with transaction.atomic():
-                for student in students:
-                    # Find applicable monthly fees for the student's class
-                    # For simplicity, we assume fees are linked to the student's current academic year
-                    fees = FeeStructure.objects.filter(
-                        tenant=self.request.tenant,
-                        class_name=student.current_class,
-                        academic_year=student.academic_year,
-                        frequency='MONTHLY' # Correct field name from model
-                    )
+        from django.conf import settings
+        from apps.core.services import job_lock
+        from apps.finance.tasks import generate_monthly_invoices_task, invoice_run_lock_key
 
-                    if not fees.exists():
-                        continue
-
-                    # Check if invoice already exists for this period
-                    if Invoice.objects.filter(
-                        student=student, 
-                        billing_period=billing_period,
-                        tenant=self.request.tenant
-                    ).exists():
-                        continue
-
-                    # Create Invoice
-                    invoice = Invoice.objects.create(
-                        tenant=self.request.tenant,
-                        student=student,
-                        academic_year=student.academic_year,
-                        billing_period=billing_period,
-                        due_date=due_date,
-                        issue_date=timezone.now().date(),
-                        status='ISSUED' # Auto-issue monthly invoices
-                    )
+        billing_period = billing_date.strftime('%B %Y')
+        tenant = self.request.tenant
+        lock_key = invoice_run_lock_key(tenant.id, billing_month_str)
+        lock_timeout = getattr(settings, 'INVOICE_GENERATION', {}).get('LOCK_TIMEOUT', 3600)
 
-                    # Add Items
-                    for fee in fees:
-                        invoice.add_invoice_item(
-                            fee_structure=fee,
-                            amount=fee.amount,
-                            description=f"{fee.name} - {billing_period}"
-                        )
-                    
-                    invoices_created += 1
-
-            if invoices_created > 0:
-                messages.success(request, _(f"Successfully generated {invoices_created} invoices for {billing_period}."))
-            else:
-                messages.info(request, _(f"No new invoices were generated for {billing_period}."))
-                
+        if not job_lock.acquire(lock_key, lock_timeout):
+            messages.info(request, _(f"Invoice generation for {billing_period} is already running."))
             return redirect('finance:invoice_list')
 
+        try:
+            result = generate_monthly_invoices_task.delay(
+                tenant_id=str(tenant.id),
+                billing_month=billing_month_str,
+                due_date=due_date_str,
+                user_id=str(request.user.id),
+            )
         except Exception as e:
-            messages.error(request, _(f"Error generating invoices: {str(e)}"))
-            import logging
-            logger = logging.getLogger(__name__)
+            job_lock.release(lock_key)
             logger.error(f"Invoice generation error: {e}", exc_info=True)
+            messages.error(request, _(f"Error generating invoices: {str(e)}"))
             return render(request, 'finance/utils/generate_invoices.html')
 
+        messages.success(request, _(
+            f"Invoice generation for {billing_period} has started. "
+            f"Track it at {reverse('finance:generate_invoices_status', args=[result.id])}."
+        ))
+        return redirect('finance:invoice_list')
+
+
+class GenerateMonthlyInvoicesStatusView(BaseView):
+    permission_required = 'finance.add_invoice'
+
+    def get(self, request, task_id):
+        from celery.result import AsyncResult
+
+        result = AsyncResult(task_id)
+        data = {'task_id': task_id, 'state': result.state}
+        if result.state == 'PROGRESS':
+            data.update(result.info or {})
+        elif result.successful():
+            data['result'] = result.result
+        elif result.failed():
+            data['error'] = str(result.result)
+        return JsonResponse(data)
 
 
 class SendPaymentRemindersView(BaseView):
@@ -885,20 +867,10 @@ class SendPaymentRemindersView(BaseView):
 
     def post(self, request): 
         # Logic to send reminders
-        # 1. auto-update statuses first
-        current_date = timezone.now().date()
-        potential_overdue = Invoice.objects.filter(
-            tenant=self.request.tenant,
-            due_date__lt=current_date,
-            due_amount__gt=0
-        ).exclude(status='OVERDUE')
-        
-        updated_count = 0
-        for inv in potential_overdue:
-            inv.status = 'OVERDUE'
-            inv.save() # This triggers is_overdue check in model
-            updated_count += 1
-            
+        # 1. auto-update statuses first (set-based, same sweep as the nightly job)
+        from apps.finance.billing import sweep_overdue_invoices
+        updated_count = len(sweep_overdue_invoices(self.request.tenant))
+
         # 2. Get all overdue
         overdue_invoices = Invoice.objects.filter(
             tenant=self.request.tenant,
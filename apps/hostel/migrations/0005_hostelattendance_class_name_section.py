@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:00
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def mark_current_class(apps, schema_editor):
+    """Existing rows take the student's current class and section"""
+    HostelAttendance = apps.get_model('hostel', 'HostelAttendance')
+    Student = apps.get_model('students', 'Student')
+    student = Student.objects.filter(pk=OuterRef('student_id'))
+    HostelAttendance.objects.update(
+        class_name_id=Subquery(student.values('current_class_id')[:1]),
+        section_id=Subquery(student.values('section_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0003_alter_classteacher_start_date_and_more'),
+        ('students', '0004_alter_student_status'),
+        ('hostel', '0004_alter_hostelallocation_allocation_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hostelattendance',
+            name='class_name',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hostel_attendances', to='academics.schoolclass', verbose_name='Class'),
+        ),
+        migrations.AddField(
+            model_name='hostelattendance',
+            name='section',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hostel_attendances', to='academics.section', verbose_name='Section'),
+        ),
+        migrations.RunPython(mark_current_class, migrations.RunPython.noop),
+    ]
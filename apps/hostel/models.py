@@ -323,6 +323,26 @@ class HostelAttendance(BaseModel):
         related_name="marked_hostel_attendances",
         verbose_name=_("Marked By")
     )
+    # Student's class and section when the row was marked: the attendance
+    # rollup buckets the row by these, so promotions don't move old counts
+    class_name = models.ForeignKey(
+        "academics.SchoolClass",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="hostel_attendances",
+        verbose_name=_("Class")
+    )
+    section = models.ForeignKey(
+        "academics.Section",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="hostel_attendances",
+        verbose_name=_("Section")
+    )
 
     class Meta:
         db_table = "hostel_attendance"
@@ -334,6 +354,19 @@ class HostelAttendance(BaseModel):
     def __str__(self):
         return f"{self.student} - {self.date} - {self.status}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._marked_student_id = instance.__dict__.get('student_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.student_id and (self._state.adding or self.student_id != getattr(self, '_marked_student_id', None)):
+            self.class_name_id = self.student.current_class_id
+            self.section_id = self.student.section_id
+            self._marked_student_id = self.student_id
+        super().save(*args, **kwargs)
+
 
 class LeaveApplication(BaseModel):
     """
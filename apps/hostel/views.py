@@ -177,6 +177,7 @@ class HostelImportView(BaseImportView):
             raise Exception("Code is required")
             
         Hostel.objects.update_or_create(
+            validate=True,
             tenant=tenant,
             code=code,
             defaults={
@@ -243,6 +244,7 @@ class RoomImportView(BaseImportView):
             raise Exception(f"Hostel with code {hostel_code} not found")
             
         Room.objects.update_or_create(
+            validate=True,
             tenant=tenant,
             hostel=hostel,
             room_number=room_number,
@@ -313,6 +315,7 @@ class HostelAllocationImportView(BaseImportView):
             raise Exception("Hostel or Room not found")
 
         HostelAllocation.objects.update_or_create(
+             validate=True,
              tenant=tenant,
              student=student,
              defaults={
@@ -493,6 +496,7 @@ class MessMenuItemImportView(BaseImportView):
             category, _ = MessMenuCategory.objects.get_or_create(tenant=tenant, name=category_name)
             
         MessMenuItem.objects.update_or_create(
+             validate=True,
              tenant=tenant,
              name=name,
              defaults={
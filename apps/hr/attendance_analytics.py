@@ -0,0 +1,182 @@
+"""
+Monthly staff attendance analytics
+
+Per-staff status counts and the staff x day status grid for one month, each
+computed with a single grouped query and cached per tenant and month.
+"""
+
+import calendar
+import logging
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Staff, StaffAttendance
+
+logger = logging.getLogger(__name__)
+
+
+def analytics_options():
+    config = getattr(settings, 'STAFF_ATTENDANCE_ANALYTICS', {})
+    return {
+        'current_month_ttl': config.get('CURRENT_MONTH_TTL', 300),
+    }
+
+
+# Counted columns as (name, statuses); LATE also counts as present
+STATUS_COUNTS = (
+    ('present', ('PRESENT', 'LATE')),
+    ('absent', ('ABSENT',)),
+    ('late', ('LATE',)),
+    ('leave', ('LEAVE',)),
+    ('half_day', ('HALF_DAY',)),
+)
+
+# One-letter codes shown in the calendar grid
+STATUS_CODES = {
+    'PRESENT': 'P',
+    'ABSENT': 'A',
+    'LATE': 'L',
+    'HALF_DAY': 'H',
+    'HOLIDAY': 'HO',
+    'LEAVE': 'LV',
+    'WEEKLY_OFF': 'WO',
+}
+
+
+def _schema():
+    return getattr(connection, 'schema_name', None) or 'public'
+
+
+def _generation_key(tenant_id, month, schema_name=None):
+    return f"hr:attendance:{schema_name or _schema()}:{tenant_id}:{month:%Y-%m}:gen"
+
+
+def invalidate(tenant_id, target_date, schema_name=None):
+    """
+    Drop the cached analytics of the month containing ``target_date``. The
+    ``StaffAttendance`` signals call this; bulk writes should call it too.
+    """
+    key = _generation_key(tenant_id, target_date, schema_name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+    except Exception as e:
+        logger.warning(f"Could not invalidate staff attendance analytics {key}: {str(e)}")
+
+
+def percentage(part, total):
+    return round(part / total * 100, 1) if total > 0 else 0.0
+
+
+class StaffAttendanceAnalytics:
+    """
+    Attendance of a tenant's active staff for the month containing ``month``.
+
+    ``summary()`` and ``matrix()`` cache only plain data keyed by staff id;
+    staff records are loaded fresh with one query. Months that have ended are
+    cached without expiry (edits still invalidate them through the month
+    generation), the current month for ``CURRENT_MONTH_TTL`` seconds.
+    """
+
+    def __init__(self, tenant, month):
+        self.tenant = tenant
+        self.start_date = month.replace(day=1)
+        self.days_in_month = calendar.monthrange(month.year, month.month)[1]
+        self.end_date = self.start_date.replace(day=self.days_in_month)
+        self.options = analytics_options()
+
+    # ------------------------------------------------------------------
+    # Caching
+    # ------------------------------------------------------------------
+    @property
+    def is_closed(self):
+        return self.end_date < timezone.localdate()
+
+    def _key(self, name):
+        generation = cache.get(_generation_key(self.tenant.id, self.start_date)) or 1
+        return f"hr:attendance:{_schema()}:{self.tenant.id}:{self.start_date:%Y-%m}:{generation}:{name}"
+
+    def _cached(self, name, compute):
+        key = self._key(name)
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.set(key, value, None if self.is_closed else self.options['current_month_ttl'])
+        return value
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def records(self):
+        return StaffAttendance.objects.filter(
+            tenant=self.tenant, date__range=[self.start_date, self.end_date]
+        )
+
+    def counts(self):
+        """``{staff_id: {'present': n, ..., 'total': n}}`` for staff with marked days"""
+        def compute():
+            annotations = {
+                name: Count('id', filter=Q(status__in=statuses)) for name, statuses in STATUS_COUNTS
+            }
+            rows = self.records().order_by().values('staff').annotate(total=Count('id'), **annotations)
+            return {row.pop('staff'): row for row in rows}
+        return self._cached('counts', compute)
+
+    def statuses(self):
+        """``{staff_id: {day: status}}`` from a single query"""
+        def compute():
+            grid = {}
+            for staff_id, day, status in self.records().order_by().values_list('staff', 'date', 'status'):
+                grid.setdefault(staff_id, {})[day.day] = status
+            return grid
+        return self._cached('statuses', compute)
+
+    def staff(self, staff_ids):
+        """Active staff among ``staff_ids``, in the default staff ordering"""
+        return Staff.objects.filter(
+            tenant=self.tenant, is_active=True, employment_status='ACTIVE', id__in=staff_ids
+        ).select_related('user', 'department')
+
+    # ------------------------------------------------------------------
+    # Report rows
+    # ------------------------------------------------------------------
+    def summary(self):
+        """One row of status counts per active staff member with marked days"""
+        counts = self.counts()
+        rows = []
+        for staff in self.staff(counts):
+            row = dict(counts[staff.id], staff=staff)
+            row.update(
+                present_days=row['present'],
+                absent_days=row['absent'],
+                leave_days=row['leave'],
+                total_days=row['total'],
+                attendance_percentage=percentage(row['present'], row['total']),
+            )
+            rows.append(row)
+        return rows
+
+    @property
+    def days(self):
+        return [date(self.start_date.year, self.start_date.month, day) for day in range(1, self.days_in_month + 1)]
+
+    def matrix(self):
+        """One row per active staff member with a cell (status, code) for every day"""
+        grid = self.statuses()
+        rows = []
+        for staff in self.staff(grid):
+            marked = grid[staff.id]
+            rows.append({
+                'staff': staff,
+                'cells': [
+                    {'status': marked.get(day), 'code': STATUS_CODES.get(marked.get(day), '')}
+                    for day in range(1, self.days_in_month + 1)
+                ],
+            })
+        return rows
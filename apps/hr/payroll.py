@@ -0,0 +1,356 @@
+"""
+Set-based monthly payroll computation and processing
+"""
+
+import calendar
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.hr.models import (
+    Holiday, LeaveApplication, PFESIConfig, Payroll, SalaryStructure, Staff,
+    StaffAttendance, TaxConfig, WorkSchedule,
+)
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+
+PRESENT_STATUSES = {'PRESENT', 'LATE'}
+OFF_STATUSES = {'HOLIDAY', 'WEEKLY_OFF'}
+
+# Payroll fields rewritten when a draft is recomputed
+RECOMPUTED_FIELDS = [
+    'basic_salary', 'allowances', 'deductions', 'total_earnings', 'total_deductions',
+    'net_salary', 'working_days', 'present_days', 'leave_days', 'absent_days',
+    'pay_date', 'processed_by', 'updated_by', 'updated_at', 'data_signature',
+]
+
+
+def payroll_options():
+    config = getattr(settings, 'PAYROLL', {})
+    return {
+        'working_weekdays': config.get('WORKING_WEEKDAYS', [0, 1, 2, 3, 4, 5]),
+        'unmarked_as_present': config.get('UNMARKED_AS_PRESENT', False),
+        'esi_wage_limit': Decimal(str(config.get('ESI_WAGE_LIMIT', 21000))),
+        'batch_size': config.get('BATCH_SIZE', 500),
+    }
+
+
+def _money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _decimal(value, default='0'):
+    return Decimal(str(value)) if value not in (None, '') else Decimal(default)
+
+
+def slab_tax(slabs, amount):
+    """
+    Tax on ``amount`` for ``TaxConfig.slabs``: slabs with ``rate`` (percent)
+    are applied progressively to the part of ``amount`` within
+    ``min``..``max``; a slab with a flat ``amount`` is charged when
+    ``amount`` falls within it (professional tax style)
+    """
+    tax = Decimal('0')
+    for slab in slabs or []:
+        low = _decimal(slab.get('min', slab.get('from')))
+        high = slab.get('max', slab.get('to'))
+        high = _decimal(high) if high not in (None, '') else None
+        if 'amount' in slab:
+            if amount >= low and (high is None or amount <= high):
+                return _decimal(slab['amount'])
+            continue
+        if amount > low:
+            taxable = (min(amount, high) if high is not None else amount) - low
+            tax += taxable * _decimal(slab.get('rate')) / 100
+    return tax
+
+
+class MonthlyPayrollEngine:
+    """
+    Computes one month's payroll for all active staff.
+
+    Inputs are read in a fixed number of queries, whatever the staff count:
+    staff with their salary structures, the month's attendance as
+    ``(staff, date, status)`` tuples, approved leave overlapping the month,
+    the month's holidays and the active tax and PF/ESI configurations.
+    Each staff member's month is then classified day by day in memory:
+
+    * working days are the schedule's weekdays from the joining date to the
+      month end, less holidays and days marked holiday/weekly off;
+    * present/late days count in full, half days as half;
+    * leave days are days marked on leave or covered by approved leave
+      (leave is paid);
+    * other working days are absent (unmarked days too, unless
+      ``PAYROLL['UNMARKED_AS_PRESENT']``).
+
+    Earnings are prorated by payable days over working days. PF is taken on
+    earned basic, ESI on gross (up to ``ESI_WAGE_LIMIT``), and each active
+    tax config on gross: income tax slabs are annual, others monthly.
+    Missing payrolls are ``bulk_create``d and existing drafts recomputed
+    with ``bulk_update``; processed or later payrolls are left alone.
+    """
+
+    def __init__(self, tenant, month, user=None, pay_date=None):
+        self.tenant = tenant
+        self.month_start = month.replace(day=1)
+        self.month_end = self.month_start.replace(
+            day=calendar.monthrange(self.month_start.year, self.month_start.month)[1]
+        )
+        self.user = user
+        self.pay_date = pay_date or timezone.now().date()
+        self.today = timezone.localdate()
+        self.options = payroll_options()
+
+    # ------------------------------------------------------------------
+    # Preloading
+    # ------------------------------------------------------------------
+    def staff(self):
+        return list(
+            Staff.objects.filter(
+                tenant=self.tenant, is_active=True, employment_status='ACTIVE',
+                joining_date__lte=self.month_end,
+            ).order_by('id').only('id', 'tenant', 'basic_salary', 'joining_date')
+        )
+
+    def salary_structures(self, staff_ids):
+        structures = SalaryStructure.objects.filter(
+            tenant=self.tenant, staff_id__in=staff_ids, is_active=True,
+            effective_from__lte=self.month_end,
+        ).filter(Q(effective_to__isnull=True) | Q(effective_to__gte=self.month_start))
+        return {structure.staff_id: structure.components or {} for structure in structures}
+
+    def attendance(self, staff_ids):
+        days = defaultdict(dict)
+        for staff_id, day, status in StaffAttendance.objects.filter(
+            tenant=self.tenant, staff_id__in=staff_ids,
+            date__range=(self.month_start, self.month_end),
+        ).values_list('staff_id', 'date', 'status'):
+            days[staff_id][day] = status
+        return days
+
+    def leave_days(self, staff_ids):
+        days = defaultdict(set)
+        for staff_id, start, end in LeaveApplication.objects.filter(
+            tenant=self.tenant, staff_id__in=staff_ids, status='APPROVED',
+            start_date__lte=self.month_end, end_date__gte=self.month_start,
+        ).values_list('staff_id', 'start_date', 'end_date'):
+            day = max(start, self.month_start)
+            while day <= min(end, self.month_end):
+                days[staff_id].add(day)
+                day += timedelta(days=1)
+        return days
+
+    def holidays(self):
+        holidays = set()
+        for day, recurring in Holiday.objects.filter(tenant=self.tenant).filter(
+            Q(date__range=(self.month_start, self.month_end))
+            | Q(is_recurring=True, date__month=self.month_start.month)
+        ).values_list('date', 'is_recurring'):
+            if recurring:
+                try:
+                    day = day.replace(year=self.month_start.year)
+                except ValueError:  # 29 February
+                    continue
+            holidays.add(day)
+        return holidays
+
+    def working_weekdays(self):
+        schedule = WorkSchedule.objects.filter(tenant=self.tenant, is_default=True).first()
+        if schedule and schedule.working_days:
+            return {int(day) for day in schedule.working_days}
+        return set(self.options['working_weekdays'])
+
+    def statutory(self):
+        pf_esi = PFESIConfig.objects.filter(tenant=self.tenant, is_active=True).first()
+        taxes = list(
+            TaxConfig.objects.filter(tenant=self.tenant, is_active=True).values_list('name', 'tax_type', 'slabs')
+        )
+        return pf_esi, taxes
+
+    # ------------------------------------------------------------------
+    # Computation
+    # ------------------------------------------------------------------
+    def calendar_days(self, weekdays, holidays):
+        """The month's scheduled working days, before per-staff adjustments"""
+        days = []
+        day = self.month_start
+        while day <= self.month_end:
+            if day.weekday() in weekdays and day not in holidays:
+                days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    def attendance_summary(self, staff, calendar_days, marked, on_leave):
+        """``(working, present, half, leave, absent)`` day counts of one staff member"""
+        working = present = half = leave = absent = 0
+        for day in calendar_days:
+            if day < staff.joining_date:
+                continue
+            status = marked.get(day)
+            if status in OFF_STATUSES:
+                continue
+            working += 1
+            if status in PRESENT_STATUSES:
+                present += 1
+            elif status == 'HALF_DAY':
+                half += 1
+            elif status == 'LEAVE' or day in on_leave:
+                leave += 1
+            elif status is None and (day > self.today or self.options['unmarked_as_present']):
+                # Days still ahead in a month run early are paid, not docked
+                present += 1
+            else:
+                absent += 1
+        return working, present, half, leave, absent
+
+    @staticmethod
+    def split_components(components, staff_basic):
+        """``(basic, allowances, fixed deductions)`` from structure components"""
+        basic = None
+        allowances, deductions = {}, {}
+        for name, amount in components.items():
+            amount = _decimal(amount)
+            if name.lower() in ('basic', 'basic_salary'):
+                basic = amount
+            elif amount >= 0:
+                allowances[name] = amount
+            else:
+                deductions[name] = -amount
+        if basic is None:
+            basic = _decimal(staff_basic)
+        return basic, allowances, deductions
+
+    def build_payroll(self, staff, components, summary, pf_esi, taxes):
+        working, present, half, leave, absent = summary
+        basic, allowances, deductions = self.split_components(components, staff.basic_salary)
+
+        payable = Decimal(present) + Decimal(leave) + Decimal(half) / 2
+        factor = payable / working if working else Decimal('1')
+
+        earned_basic = _money(basic * factor)
+        earned_allowances = {name: _money(amount * factor) for name, amount in allowances.items()}
+        gross = earned_basic + sum(earned_allowances.values(), Decimal('0'))
+
+        deductions = {name: _money(amount) for name, amount in deductions.items()}
+        if pf_esi:
+            pf = _money(earned_basic * pf_esi.pf_employee_contribution / 100)
+            if pf:
+                deductions['PF'] = pf
+            if gross <= self.options['esi_wage_limit']:
+                esi = _money(gross * pf_esi.esi_employee_contribution / 100)
+                if esi:
+                    deductions['ESI'] = esi
+        for name, tax_type, slabs in taxes:
+            if tax_type == 'INCOME_TAX':
+                tax = _money(slab_tax(slabs, gross * 12) / 12)
+            else:
+                tax = _money(slab_tax(slabs, gross))
+            if tax:
+                deductions[name] = tax
+
+        total_deductions = sum(deductions.values(), Decimal('0'))
+        return Payroll(
+            tenant_id=staff.tenant_id,
+            staff_id=staff.id,
+            salary_month=self.month_start,
+            pay_date=self.pay_date,
+            basic_salary=_money(basic),
+            allowances={name: str(amount) for name, amount in earned_allowances.items()},
+            deductions={name: str(amount) for name, amount in deductions.items()},
+            total_earnings=gross,
+            total_deductions=total_deductions,
+            net_salary=gross - total_deductions,
+            working_days=working,
+            present_days=present + half,
+            leave_days=leave,
+            absent_days=absent,
+            status='DRAFT',
+            created_by=self.user,
+            updated_by=self.user,
+            processed_by=self.user,
+        )
+
+    def run(self):
+        """Create or recompute the month's draft payrolls; returns counts"""
+        staff = self.staff()
+        staff_ids = [member.id for member in staff]
+        existing = {
+            payroll.staff_id: payroll
+            for payroll in Payroll.objects.filter(
+                tenant=self.tenant, staff_id__in=staff_ids, salary_month=self.month_start
+            ).only('id', 'staff_id', 'status')
+        }
+        pending = [
+            member for member in staff
+            if member.id not in existing or existing[member.id].status == 'DRAFT'
+        ]
+        pending_ids = [member.id for member in pending]
+
+        structures = self.salary_structures(pending_ids)
+        attendance = self.attendance(pending_ids)
+        leave_days = self.leave_days(pending_ids)
+        calendar_days = self.calendar_days(self.working_weekdays(), self.holidays())
+        pf_esi, taxes = self.statutory()
+
+        created, updated = [], []
+        now = timezone.now()
+        for member in pending:
+            summary = self.attendance_summary(
+                member, calendar_days, attendance.get(member.id, {}), leave_days.get(member.id, set())
+            )
+            payroll = self.build_payroll(member, structures.get(member.id, {}), summary, pf_esi, taxes)
+            draft = existing.get(member.id)
+            if draft is None:
+                created.append(payroll)
+            else:
+                payroll.id = draft.id
+                payroll.updated_at = now
+                updated.append(payroll)
+
+        # bulk_create signs new rows; recomputed drafts need a fresh signature
+        Payroll.calculate_signatures(updated)
+        batch_size = self.options['batch_size']
+        with transaction.atomic():
+            Payroll.objects.bulk_create(created, batch_size=batch_size)
+            Payroll.objects.bulk_update(updated, RECOMPUTED_FIELDS, batch_size=batch_size)
+
+        logger.info(
+            f"Payroll {self.month_start:%Y-%m} for tenant {self.tenant}: "
+            f"{len(created)} created, {len(updated)} drafts recomputed"
+        )
+        return {
+            'created': len(created),
+            'updated': len(updated),
+            'skipped': len(staff) - len(pending),
+            'total_net': sum((payroll.net_salary for payroll in created + updated), Decimal('0')),
+        }
+
+
+def process_payrolls(tenant, month, payroll_ids, user=None):
+    """
+    Move the selected draft payrolls of ``month`` to PROCESSED with one
+    UPDATE; returns ``(count, total net salary)`` of the rows moved
+    """
+    month = month.replace(day=1)
+    with transaction.atomic():
+        rows = list(
+            Payroll.objects.select_for_update().filter(
+                tenant=tenant, salary_month=month, status='DRAFT', id__in=payroll_ids
+            ).values_list('id', 'net_salary')
+        )
+        if rows:
+            Payroll.objects.filter(id__in=[payroll_id for payroll_id, _ in rows]).update(
+                status='PROCESSED',
+                processed_by=user,
+                updated_by=user,
+                updated_at=timezone.now(),
+            )
+    return len(rows), sum((net for _, net in rows), Decimal('0'))
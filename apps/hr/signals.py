@@ -0,0 +1,28 @@
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import attendance_analytics
+from .models import StaffAttendance
+
+
+# ---------------------------------------------------------
+# Keep the monthly attendance analytics fresh
+# ---------------------------------------------------------
+@receiver(post_init, sender=StaffAttendance)
+def remember_attendance_date(sender, instance, **kwargs):
+    """Remember the loaded date so moving a row invalidates its old month too"""
+    instance._analytics_date = instance.__dict__.get('date')
+
+
+@receiver(post_save, sender=StaffAttendance)
+@receiver(post_delete, sender=StaffAttendance)
+def invalidate_attendance_analytics(sender, instance, **kwargs):
+    schema_name = getattr(connection, 'schema_name', None)
+    dates = {instance.date, getattr(instance, '_analytics_date', None)} - {None}
+    instance._analytics_date = instance.date
+
+    def invalidate():
+        for target_date in dates:
+            attendance_analytics.invalidate(instance.tenant_id, target_date, schema_name)
+    transaction.on_commit(invalidate)
@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from apps.hr import attendance_analytics
+from apps.hr.attendance_analytics import StaffAttendanceAnalytics
+
+
+class CountingAnalytics(StaffAttendanceAnalytics):
+    loads = 0
+
+    def counts(self):
+        def compute():
+            CountingAnalytics.loads += 1
+            return {'staff-1': {'present': CountingAnalytics.loads}}
+        return self._cached('counts', compute)
+
+
+class StaffAttendanceAnalyticsTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        CountingAnalytics.loads = 0
+        self.tenant = SimpleNamespace(id='tenant-1')
+
+    def test_month_bounds(self):
+        analytics = StaffAttendanceAnalytics(self.tenant, date(2024, 2, 17))
+        self.assertEqual(analytics.start_date, date(2024, 2, 1))
+        self.assertEqual(analytics.end_date, date(2024, 2, 29))
+        self.assertEqual(len(analytics.days), 29)
+
+    def test_only_past_months_are_closed(self):
+        today = timezone.localdate()
+        self.assertFalse(StaffAttendanceAnalytics(self.tenant, today).is_closed)
+        last_month = today.replace(day=1) - timedelta(days=1)
+        self.assertTrue(StaffAttendanceAnalytics(self.tenant, last_month).is_closed)
+
+    def test_counts_are_cached_until_the_month_is_invalidated(self):
+        month = date(2024, 3, 1)
+        self.assertEqual(CountingAnalytics(self.tenant, month).counts()['staff-1']['present'], 1)
+        self.assertEqual(CountingAnalytics(self.tenant, month).counts()['staff-1']['present'], 1)
+
+        attendance_analytics.invalidate(self.tenant.id, date(2024, 4, 2))
+        self.assertEqual(CountingAnalytics(self.tenant, month).counts()['staff-1']['present'], 1)
+
+        attendance_analytics.invalidate(self.tenant.id, date(2024, 3, 20))
+        self.assertEqual(CountingAnalytics(self.tenant, month).counts()['staff-1']['present'], 2)
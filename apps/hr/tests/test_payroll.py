@@ -0,0 +1,56 @@
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from apps.hr.payroll import MonthlyPayrollEngine, slab_tax
+
+
+class SlabTaxTests(SimpleTestCase):
+    def test_rate_slabs_are_progressive(self):
+        slabs = [
+            {'min': 0, 'max': 250000, 'rate': 0},
+            {'min': 250000, 'max': 500000, 'rate': 5},
+            {'min': 500000, 'rate': 20},
+        ]
+        self.assertEqual(slab_tax(slabs, Decimal('600000')), Decimal('32500'))
+
+    def test_flat_slab_matches_range(self):
+        slabs = [{'min': 0, 'max': 15000, 'amount': 0}, {'min': 15000, 'amount': 200}]
+        self.assertEqual(slab_tax(slabs, Decimal('30000')), Decimal('200'))
+
+
+class AttendanceSummaryTests(SimpleTestCase):
+    def setUp(self):
+        self.engine = MonthlyPayrollEngine(tenant=None, month=date(2026, 3, 15))
+        # 2-6 March 2026 is Monday-Friday
+        self.days = self.engine.calendar_days({0, 1, 2, 3, 4}, holidays={date(2026, 3, 6)})[:4]
+
+    def test_days_are_classified_from_attendance_and_leave(self):
+        staff = SimpleNamespace(joining_date=date(2020, 1, 1))
+        marked = {date(2026, 3, 2): 'PRESENT', date(2026, 3, 3): 'HALF_DAY', date(2026, 3, 4): 'ABSENT'}
+        summary = self.engine.attendance_summary(staff, self.days, marked, on_leave={date(2026, 3, 4)})
+        # working, present, half, leave, absent (5 March is unmarked)
+        self.assertEqual(summary, (4, 1, 1, 1, 1))
+
+    def test_days_before_joining_are_not_working_days(self):
+        staff = SimpleNamespace(joining_date=date(2026, 3, 4))
+        summary = self.engine.attendance_summary(staff, self.days, {}, on_leave=set())
+        self.assertEqual(summary, (2, 0, 0, 0, 2))
+
+    def test_future_unmarked_days_are_not_absences(self):
+        staff = SimpleNamespace(joining_date=date(2020, 1, 1))
+        self.engine.today = date(2026, 3, 3)
+        marked = {date(2026, 3, 2): 'PRESENT'}
+        summary = self.engine.attendance_summary(staff, self.days, marked, on_leave=set())
+        # 3 March (today) is unmarked and absent; 4-5 March have not happened yet
+        self.assertEqual(summary, (4, 3, 0, 0, 1))
+
+    def test_components_split_into_basic_allowances_and_deductions(self):
+        basic, allowances, deductions = MonthlyPayrollEngine.split_components(
+            {'Basic': 30000, 'HRA': 12000, 'Loan': -2000}, staff_basic=None
+        )
+        self.assertEqual(basic, Decimal('30000'))
+        self.assertEqual(allowances, {'HRA': Decimal('12000')})
+        self.assertEqual(deductions, {'Loan': Decimal('2000')})
@@ -5,6 +5,7 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from apps.core.models import BaseModel
+from apps.core.services.sequence_service import SequenceService
 
 
 class Library(BaseModel):
@@ -104,6 +105,10 @@ class Library(BaseModel):
             issued_copies__gt=0
         ).aggregate(total=models.Sum('issued_copies'))['total'] or 0
 
+    def fine_for(self, overdue_days):
+        """Overdue fine for ``overdue_days`` days, capped at ``max_fine_amount``"""
+        return min(overdue_days * self.fine_per_day, self.max_fine_amount)
+
     def is_open(self):
         """Check if library is currently open"""
         now = timezone.now()
@@ -723,22 +728,11 @@ class BookIssue(BaseModel):
     def generate_issue_number(self):
         """Generate unique issue number"""
         prefix = f"LIB-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_issue = BookIssue.objects.filter(
-            issue_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('issue_number').last()
-        
-        if last_issue:
-            last_num = int(last_issue.issue_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        return SequenceService.next_number(self.tenant, prefix, BookIssue, 'issue_number', width=5)
 
     @property
     def is_overdue(self):
-        return self.status == "ISSUED" and timezone.now().date() > self.due_date
+        return self.status in ("ISSUED", "OVERDUE") and timezone.now().date() > self.due_date
 
     @property
     def overdue_days(self):
@@ -749,11 +743,13 @@ class BookIssue(BaseModel):
     @property
     def calculated_fine(self):
         """Calculate fine based on overdue days"""
+        if self.status == "OVERDUE":
+            # Kept current by the overdue sweep (apps.library.overdue)
+            return self.fine_amount
         if self.is_overdue:
             library = Library.objects.filter(tenant=self.tenant, is_active=True).first()
             if library:
-                fine = self.overdue_days * library.fine_per_day
-                return min(fine, library.max_fine_amount)
+                return library.fine_for(self.overdue_days)
         return 0
 
     @property
@@ -762,7 +758,12 @@ class BookIssue(BaseModel):
 
     def calculate_fine(self):
         """Calculate and update fine amount"""
-        self.fine_amount = self.calculated_fine
+        fine = 0
+        if self.is_overdue:
+            library = Library.objects.filter(tenant=self.tenant, is_active=True).first()
+            if library:
+                fine = library.fine_for(self.overdue_days)
+        self.fine_amount = fine
         self.save()
 
     def renew(self, renewed_by):
@@ -778,17 +779,22 @@ class BookIssue(BaseModel):
             self.renewal_count += 1
             self.last_renewal_date = timezone.now().date()
             self.issued_by = renewed_by
+            if self.status == "OVERDUE" and not self.is_overdue:
+                # The overdue sweep only revisits past-due issues; reopen the
+                # issue and drop the unpaid fine accrued on the old due date
+                self.status = "ISSUED"
+                self.fine_amount = self.fine_paid + self.fine_waived
             self.save()
 
     def return_book(self, received_by, condition_notes=""):
         """Return the book"""
+        # Calculate final fine while the issue is still open
+        self.calculate_fine()
+
         self.status = "RETURNED"
         self.actual_return_date = timezone.now().date()
         self.received_by = received_by
         self.return_notes = condition_notes
-        
-        # Calculate final fine
-        self.calculate_fine()
         self.save()
         
         # Update book copy status
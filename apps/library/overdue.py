@@ -0,0 +1,52 @@
+"""
+Set-based overdue sweeping for book issues and library fines
+"""
+
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.utils.overdue import by_due_date, days_overdue
+from apps.library.models import BookIssue, Fine, Library
+
+
+def sweep_overdue_book_issues(tenant, today=None):
+    """
+    Mark the tenant's past-due open book issues OVERDUE and store their
+    current fine in one UPDATE (one ``Library`` lookup per tenant instead of
+    one per issue read). Returns the ids of issues that became overdue.
+    """
+    today = today or timezone.now().date()
+    library = Library.objects.filter(tenant=tenant, is_active=True).first()
+    past_due = BookIssue.objects.filter(
+        tenant=tenant,
+        status__in=('ISSUED', 'OVERDUE'),
+        due_date__lt=today
+    )
+
+    with transaction.atomic():
+        newly_overdue = list(past_due.filter(status='ISSUED').values_list('id', flat=True))
+        due_dates = list(past_due.order_by().values_list('due_date', flat=True).distinct())
+        if due_dates:
+            changes = {'status': 'OVERDUE', 'updated_at': timezone.now()}
+            if library:
+                changes['fine_amount'] = by_due_date(
+                    due_dates,
+                    lambda due_date: library.fine_for(days_overdue(today, due_date)),
+                    models.DecimalField(max_digits=8, decimal_places=2),
+                    F('fine_amount'),
+                )
+            past_due.update(**changes)
+    return newly_overdue
+
+
+def overdue_fine_ids(tenant, since, today=None):
+    """Ids of pending fines whose due date passed in ``[since, today)``"""
+    today = today or timezone.now().date()
+    return list(Fine.objects.filter(
+        tenant=tenant,
+        status='PENDING',
+        due_date__gte=since,
+        due_date__lt=today
+    ).values_list('id', flat=True))
+
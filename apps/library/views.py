@@ -26,11 +26,11 @@ class LibraryDashboardView(BaseTemplateView):
         
         # Stats
         context['total_books'] = Book.objects.filter(tenant=tenant, is_active=True).count()
-        context['issued_books'] = BookIssue.objects.filter(tenant=tenant, status='ISSUED').count()
-        # Mocking overdue check date. Actual overdue check should compare with verification date.
+        # Open issues are ISSUED, or OVERDUE once the overdue sweep has flagged them
+        context['issued_books'] = BookIssue.objects.filter(tenant=tenant, status__in=['ISSUED', 'OVERDUE']).count()
         context['overdue_books'] = BookIssue.objects.filter(
             tenant=tenant, 
-            status='ISSUED', 
+            status__in=['ISSUED', 'OVERDUE'], 
             due_date__lt=timezone.now().date()
         ).count()
         
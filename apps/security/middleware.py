@@ -0,0 +1,45 @@
+import logging
+
+from django.http import HttpResponseForbidden
+from django.utils.deprecation import MiddlewareMixin
+
+from .threat_matcher import screening_options, threat_matchers
+
+logger = logging.getLogger(__name__)
+
+
+class ThreatScreeningMiddleware(MiddlewareMixin):
+    """
+    Screen each request (client IP, host, URL, referer) against the tenant's
+    compiled threat indicators. Matches are logged and attached to the
+    request as ``threat_matches``; matches at a ``BLOCK_CONFIDENCE`` level
+    are refused with 403.
+    """
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self.options = screening_options()
+
+    def process_request(self, request):
+        tenant = getattr(request, 'tenant', None)
+        if not self.options['enabled'] or tenant is None:
+            return None
+        if request.path.startswith(self.options['skip_paths']):
+            return None
+
+        try:
+            matches = threat_matchers.get(tenant.id).screen_request(request)
+        except Exception as e:
+            logger.warning(f"Threat screening skipped: {str(e)}")
+            return None
+        if not matches:
+            return None
+
+        request.threat_matches = matches
+        logger.warning(
+            f"Request {request.method} {request.path} matched threat indicators: "
+            + ', '.join(f"{match.indicator} ({match.threat_type}, {match.confidence_level})" for match in matches)
+        )
+        if any(match.confidence_level in self.options['block_confidence'] for match in matches):
+            return HttpResponseForbidden("Request blocked by threat intelligence")
+        return None
@@ -6,6 +6,7 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
 from apps.core.models import BaseModel
+from .threat_matcher import ip_table, parse_ip, threat_matchers
 
 
 class SecurityPolicy(BaseModel):
@@ -327,11 +328,12 @@ class AccessControlPolicy(BaseModel):
     def is_access_allowed(self, request):
         """Check if access is allowed based on policy"""
         # Check IP address
-        client_ip = self.get_client_ip(request)
-        if client_ip in self.ip_blacklist:
+        # Lists may hold addresses and CIDR ranges; compiled tables are shared
+        client_ip = parse_ip(self.get_client_ip(request))
+        if client_ip in ip_table(self.ip_blacklist):
             return False, "IP address blocked"
         
-        if self.ip_whitelist and client_ip not in self.ip_whitelist:
+        if self.ip_whitelist and client_ip not in ip_table(self.ip_whitelist):
             return False, "IP address not in whitelist"
         
         # Check time-based access
@@ -955,19 +957,23 @@ class ThreatIntelligence(BaseModel):
         return True
 
     def check_match(self, value):
-        """Check if value matches this threat indicator"""
+        """
+        Check if value matches this threat indicator. Use ``find_matches`` to
+        check a value against the whole feed.
+        """
         if self.indicator_type == "IP_ADDRESS":
-            return value == self.indicator
-        elif self.indicator_type == "DOMAIN":
-            return self.indicator in value
-        elif self.indicator_type == "URL":
-            return self.indicator in value
-        elif self.indicator_type == "HASH":
-            return value.lower() == self.indicator.lower()
-        elif self.indicator_type == "EMAIL":
-            return value == self.indicator
+            return value in ip_table([self.indicator])
+        elif self.indicator_type in ("DOMAIN", "URL"):
+            return self.indicator.strip().lower() in value.lower()
+        elif self.indicator_type in ("HASH", "EMAIL"):
+            return value.strip().lower() == self.indicator.strip().lower()
         return False
 
+    @classmethod
+    def find_matches(cls, value, tenant, indicator_types=None):
+        """Active indicators of ``tenant`` matching ``value``, from the compiled matcher"""
+        return threat_matchers.get(tenant.id).match(value, indicator_types)
+
 
 class SecurityScan(BaseModel):
     """
@@ -0,0 +1,16 @@
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ThreatIntelligence
+from .threat_matcher import threat_matchers
+
+
+# ---------------------------------------------------------
+# Recompile a tenant's threat matcher when its indicators change
+# ---------------------------------------------------------
+@receiver(post_save, sender=ThreatIntelligence)
+@receiver(post_delete, sender=ThreatIntelligence)
+def invalidate_threat_matcher(sender, instance, **kwargs):
+    schema_name = getattr(connection, 'schema_name', None)
+    transaction.on_commit(lambda: threat_matchers.invalidate(instance.tenant_id, schema_name))
@@ -0,0 +1,89 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.security.threat_matcher import (
+    IPPrefixTable, SubstringAutomaton, ThreatIndicator, ThreatMatcher, ThreatMatcherRegistry,
+)
+
+
+def indicator(value, indicator_type, confidence='HIGH'):
+    return ThreatIndicator(value, value, indicator_type, 'OTHER', 'HIGH', confidence)
+
+
+class IPPrefixTableTests(SimpleTestCase):
+    def test_addresses_and_ranges(self):
+        table = IPPrefixTable(['10.0.0.0/8', '192.168.1.7', '2001:db8::/32', 'not-an-ip'])
+        self.assertIn('10.20.30.40', table)
+        self.assertIn(' 192.168.1.7 ', table)
+        self.assertNotIn('192.168.1.8', table)
+        self.assertIn('2001:db8::1', table)
+        self.assertIn('::ffff:10.1.1.1', table)
+        self.assertNotIn('garbage', table)
+        self.assertNotIn(None, table)
+        self.assertEqual(len(table), 3)
+
+    def test_nested_ranges(self):
+        table = IPPrefixTable()
+        table.add('10.0.0.0/8', 'wide')
+        table.add('10.1.0.0/16', 'narrow')
+        self.assertEqual(table.lookup('10.1.2.3'), ('narrow', 'wide'))
+        self.assertEqual(table.longest_match('10.1.2.3'), ('narrow',))
+        self.assertEqual(table.lookup('10.2.0.1'), ('wide',))
+
+
+class SubstringAutomatonTests(SimpleTestCase):
+    def test_finds_overlapping_patterns(self):
+        automaton = SubstringAutomaton((word, word) for word in ['he', 'she', 'his', 'hers'])
+        self.assertEqual(sorted(automaton.iter_matches('ushers')), ['he', 'hers', 'she'])
+        self.assertEqual(list(automaton.iter_matches('nothing')), [])
+
+    def test_patterns_added_after_a_search(self):
+        automaton = SubstringAutomaton([('abc', 1)])
+        self.assertEqual(list(automaton.iter_matches('xabcx')), [1])
+        automaton.add('bc', 2)
+        self.assertEqual(sorted(automaton.iter_matches('xabcx')), [1, 2])
+
+
+class ThreatMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.matcher = ThreatMatcher([
+            indicator('203.0.113.0/24', 'IP_ADDRESS'),
+            indicator('evil.example', 'DOMAIN'),
+            indicator('/wp-login.php', 'URL'),
+            indicator('D41D8CD98F00B204E9800998ECF8427E', 'HASH'),
+            indicator('phish@bad.example', 'EMAIL'),
+        ])
+
+    def test_each_indicator_type(self):
+        match = self.matcher.match
+        self.assertEqual([m.indicator_type for m in match('203.0.113.9')], ['IP_ADDRESS'])
+        self.assertEqual([m.indicator_type for m in match('cdn.EVIL.example')], ['DOMAIN'])
+        self.assertEqual([m.indicator_type for m in match('https://x.test/wp-login.php')], ['URL'])
+        self.assertEqual([m.indicator_type for m in match('d41d8cd98f00b204e9800998ecf8427e')], ['HASH'])
+        self.assertEqual([m.indicator_type for m in match('Phish@bad.example')], ['EMAIL'])
+        self.assertEqual(match('https://evil.example/wp-login.php', indicator_types=['URL'])[0].indicator_type, 'URL')
+        self.assertEqual(match('198.51.100.1'), [])
+        self.assertEqual(match(''), [])
+
+    def test_nested_ip_ranges_all_match(self):
+        matcher = ThreatMatcher([
+            indicator('10.0.0.0/8', 'IP_ADDRESS', confidence='CONFIRMED'),
+            indicator('10.1.0.0/16', 'IP_ADDRESS', confidence='LOW'),
+        ])
+        self.assertEqual(
+            [m.confidence_level for m in matcher.match('10.1.2.3')], ['LOW', 'CONFIRMED']
+        )
+
+
+class ThreatMatcherRegistryTests(SimpleTestCase):
+    def test_matcher_is_rebuilt_after_max_age(self):
+        registry = ThreatMatcherRegistry(check_interval=30, max_age=60)
+        with mock.patch.object(registry, '_version', return_value=1), \
+                mock.patch.object(registry, '_build', side_effect=lambda tenant_id: ThreatMatcher()) as build:
+            first = registry.get('t1', schema_name='alpha')
+            self.assertIs(registry.get('t1', schema_name='alpha'), first)
+            with mock.patch('apps.security.threat_matcher.time.monotonic', return_value=time.monotonic() + 61):
+                self.assertIsNot(registry.get('t1', schema_name='alpha'), first)
+        self.assertEqual(build.call_count, 2)
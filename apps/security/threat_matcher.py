@@ -0,0 +1,386 @@
+"""
+Compiled matching of requests and values against threat indicators
+
+``ThreatMatcher`` compiles a tenant's active ``ThreatIntelligence`` rows
+once: IP and CIDR indicators into an ``IPPrefixTable``, hashes and emails
+into a dict, and domain and URL indicators into a ``SubstringAutomaton``
+(Aho-Corasick), so a lookup costs the same with ten indicators or 100k.
+``threat_matchers`` keeps one compiled matcher per tenant and rebuilds it
+only when the indicator set changes.
+"""
+
+import ipaddress
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def screening_options():
+    config = getattr(settings, 'THREAT_SCREENING', {})
+    return {
+        'enabled': config.get('ENABLED', True),
+        'check_interval': config.get('CHECK_INTERVAL', 30),
+        'max_age': config.get('MAX_AGE', 300),
+        'block_confidence': set(config.get('BLOCK_CONFIDENCE', ['HIGH', 'CONFIRMED'])),
+        'skip_paths': tuple(config.get('SKIP_PATHS', ['/static/', '/media/'])),
+    }
+
+
+ThreatIndicator = namedtuple(
+    'ThreatIndicator',
+    'id indicator indicator_type threat_type severity confidence_level',
+)
+
+INDICATOR_FIELDS = ThreatIndicator._fields
+
+
+def parse_ip(value):
+    """``ip_address`` for ``value`` (IPv4-mapped IPv6 unwrapped), or None"""
+    if value is None:
+        return None
+    if isinstance(value, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+        address = value
+    else:
+        try:
+            address = ipaddress.ip_address(str(value).strip())
+        except ValueError:
+            return None
+    if address.version == 6 and address.ipv4_mapped:
+        return address.ipv4_mapped
+    return address
+
+
+class IPPrefixTable:
+    """
+    IP addresses and CIDR ranges with prefix lookups.
+
+    Networks are stored per IP version in one dict per prefix length, keyed
+    by the network bits; a lookup probes each prefix length in use with a
+    single dict access - the same answer as walking a radix tree, in at most
+    33 (IPv4) or 129 (IPv6) hash probes and usually a few. ``lookup``
+    returns the values of every range containing an address (nested ranges
+    included), ``longest_match`` those of the most specific one only.
+    """
+
+    def __init__(self, networks=()):
+        self._tables = {4: {}, 6: {}}
+        self._lengths = {4: (), 6: ()}
+        self._size = 0
+        for network in networks:
+            try:
+                self.add(network)
+            except ValueError:
+                logger.warning(f"Ignoring invalid IP address or range '{network}'")
+
+    def add(self, network, value=True):
+        """Add an address or CIDR range (host bits are ignored); raises ValueError"""
+        network = ipaddress.ip_network(str(network).strip(), strict=False)
+        if network.version == 6 and network.network_address.ipv4_mapped and network.prefixlen >= 96:
+            network = ipaddress.ip_network(
+                f"{network.network_address.ipv4_mapped}/{network.prefixlen - 96}"
+            )
+        version, length = network.version, network.prefixlen
+        table = self._tables[version].setdefault(length, {})
+        key = int(network.network_address) >> (network.max_prefixlen - length)
+        if key in table:
+            table[key] += (value,)
+        else:
+            table[key] = (value,)
+            self._size += 1
+        self._lengths[version] = tuple(sorted(self._tables[version], reverse=True))
+
+    def _probes(self, address):
+        """Values of each range containing ``address``, longest prefix first"""
+        address = parse_ip(address)
+        if address is None:
+            return
+        tables = self._tables[address.version]
+        number, bits = int(address), address.max_prefixlen
+        for length in self._lengths[address.version]:
+            values = tables[length].get(number >> (bits - length))
+            if values is not None:
+                yield values
+
+    def lookup(self, address):
+        """Values of every range containing ``address``, most specific first, or ()"""
+        matches = ()
+        for values in self._probes(address):
+            matches += values
+        return matches
+
+    def longest_match(self, address):
+        """Values of the most specific range containing ``address``, or ()"""
+        return next(self._probes(address), ())
+
+    def __contains__(self, address):
+        return bool(self.longest_match(address))
+
+    def __len__(self):
+        return self._size
+
+
+@lru_cache(maxsize=256)
+def _compiled_ip_table(networks):
+    return IPPrefixTable(networks)
+
+
+def ip_table(networks):
+    """Shared ``IPPrefixTable`` for a list of addresses/ranges (e.g. a policy field)"""
+    return _compiled_ip_table(tuple(str(network) for network in networks or ()))
+
+
+class SubstringAutomaton:
+    """
+    Aho-Corasick automaton finding every added pattern that occurs in a text
+    in one pass over the text, whatever the number of patterns.
+
+    Patterns are added first; the failure links are built lazily on the
+    first search after the last ``add``.
+    """
+
+    def __init__(self, patterns=()):
+        self._goto = [{}]
+        self._fail = [0]
+        self._values = [()]  # values of the pattern ending at each node
+        self._out = [()]  # ... plus those of its suffixes, set by build()
+        self._built = True
+        for pattern, value in patterns:
+            self.add(pattern, value)
+
+    def add(self, pattern, value):
+        if not pattern:
+            return
+        goto = self._goto
+        node = 0
+        for char in pattern:
+            child = goto[node].get(char)
+            if child is None:
+                child = len(goto)
+                goto[node][char] = child
+                goto.append({})
+                self._fail.append(0)
+                self._values.append(())
+            node = child
+        self._values[node] += (value,)
+        self._built = False
+
+    def build(self):
+        goto, fail, values = self._goto, self._fail, self._values
+        out = self._out = list(values)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                out[child] = values[child] + out[fail[child]]
+                queue.append(child)
+        self._built = True
+
+    def iter_matches(self, text):
+        """Values of all patterns occurring in ``text`` (repeats included)"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                yield from out[node]
+
+
+class ThreatMatcher:
+    """
+    Compiled form of a set of ``ThreatIndicator`` tuples. ``match`` applies
+    the per-type rules of ``ThreatIntelligence.check_match`` to a value
+    against every indicator at once.
+    """
+
+    SUBSTRING_TYPES = ('DOMAIN', 'URL')
+    EXACT_TYPES = ('HASH', 'EMAIL')
+
+    def __init__(self, indicators=(), expires_at=None):
+        self.ips = IPPrefixTable()
+        self.exact = {}
+        self.substrings = SubstringAutomaton()
+        self.expires_at = expires_at
+        self.size = 0
+        for indicator in indicators:
+            self.add(indicator)
+        self.substrings.build()
+
+    def add(self, indicator):
+        value = (indicator.indicator or '').strip()
+        if not value:
+            return
+        if indicator.indicator_type == 'IP_ADDRESS':
+            try:
+                self.ips.add(value, indicator)
+            except ValueError:
+                logger.warning(f"Ignoring invalid IP indicator '{value}'")
+                return
+        elif indicator.indicator_type in self.EXACT_TYPES:
+            key = value.lower()
+            self.exact[key] = self.exact.get(key, ()) + (indicator,)
+        elif indicator.indicator_type in self.SUBSTRING_TYPES:
+            self.substrings.add(value.lower(), indicator)
+        else:
+            return
+        self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def match_ip(self, value):
+        return list(self.ips.lookup(value))
+
+    def match_exact(self, value):
+        return list(self.exact.get(str(value).strip().lower(), ()))
+
+    def match_text(self, value):
+        """Domain and URL indicators contained in ``value``, each once"""
+        return list(dict.fromkeys(self.substrings.iter_matches(str(value).lower())))
+
+    def match(self, value, indicator_types=None):
+        """Indicators ``value`` matches, optionally only of ``indicator_types``"""
+        if not value:
+            return []
+        matches = self.match_ip(value) + self.match_exact(value) + self.match_text(value)
+        if indicator_types:
+            matches = [match for match in matches if match.indicator_type in indicator_types]
+        return matches
+
+    def screen_request(self, request):
+        """Indicators matched by the client IP, host, URL or referer of ``request``"""
+        from apps.core.services.audit_service import AuditService
+
+        matches = self.match_ip(AuditService.get_client_ip(request))
+        meta = request.META
+        host = meta.get('HTTP_HOST', '')
+        texts = [f"{request.scheme}://{host}{request.get_full_path()}", meta.get('HTTP_REFERER', '')]
+        for text in filter(None, texts):
+            matches.extend(self.match_text(text))
+        return list(dict.fromkeys(matches))
+
+
+class ThreatMatcherRegistry:
+    """
+    One compiled ``ThreatMatcher`` per tenant, held in-process.
+
+    Entries carry a per-tenant version from the shared cache, bumped by the
+    ``ThreatIntelligence`` signals; a process notices a change on its next
+    check, at most ``check_interval`` seconds later, and only then
+    recompiles. A matcher also expires when its earliest ``valid_until``
+    passes, and is recompiled after ``max_age`` seconds whatever the
+    version, so a bump that never reaches a process (a per-process cache
+    backend such as ``LocMemCache``) is still picked up within that time.
+    """
+
+    def __init__(self, check_interval=30, max_age=300):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = screening_options()
+        return cls(check_interval=options['check_interval'], max_age=options['max_age'])
+
+    @staticmethod
+    def _schema(schema_name=None):
+        return schema_name or getattr(connection, 'schema_name', 'public')
+
+    @staticmethod
+    def _version_key(schema_name, tenant_id):
+        return f'threat_matcher:{schema_name}:{tenant_id}:version'
+
+    def _version(self, key):
+        try:
+            return cache.get_or_set(key, 1, None)
+        except Exception:
+            return 0
+
+    @staticmethod
+    def load(tenant_id):
+        """Active, unexpired indicators of a tenant and the earliest expiry among them"""
+        from django.db.models import Min, Q
+        from apps.security.models import ThreatIntelligence
+
+        now = timezone.now()
+        queryset = ThreatIntelligence.objects.for_tenant(tenant_id).filter(
+            Q(valid_until__isnull=True) | Q(valid_until__gt=now), is_active=True
+        )
+        expires_at = queryset.aggregate(expires_at=Min('valid_until'))['expires_at']
+        rows = queryset.order_by().values_list(*INDICATOR_FIELDS).iterator(chunk_size=5000)
+        return (ThreatIndicator(*row) for row in rows), expires_at
+
+    def _build(self, tenant_id):
+        indicators, expires_at = self.load(tenant_id)
+        return ThreatMatcher(indicators, expires_at=expires_at)
+
+    def _fresh(self, entry, version):
+        _, built_at, entry_version, matcher = entry
+        expired = matcher.expires_at is not None and matcher.expires_at <= timezone.now()
+        too_old = time.monotonic() - built_at >= self.max_age
+        return entry_version == version and not expired and not too_old
+
+    def get(self, tenant_id, schema_name=None):
+        """Compiled matcher of tenant ``tenant_id``"""
+        schema_name = self._schema(schema_name)
+        key = (schema_name, str(tenant_id))
+        now = time.monotonic()
+
+        entry = self._entries.get(key)
+        if entry is not None and now - entry[0] < self.check_interval and now - entry[1] < self.max_age:
+            return entry[3]
+
+        version = self._version(self._version_key(schema_name, tenant_id))
+        if entry is not None and self._fresh(entry, version):
+            with self._lock:
+                self._entries[key] = (now, entry[1], version, entry[3])
+            return entry[3]
+
+        with self._build_lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._fresh(entry, version):
+                return entry[3]
+            started = time.monotonic()
+            matcher = self._build(tenant_id)
+            logger.info(
+                f"Compiled {len(matcher)} threat indicators for {schema_name}/{tenant_id} "
+                f"in {(time.monotonic() - started) * 1000:.0f} ms"
+            )
+            built_at = time.monotonic()
+            with self._lock:
+                self._entries[key] = (built_at, built_at, version, matcher)
+        return matcher
+
+    def invalidate(self, tenant_id, schema_name=None):
+        schema_name = self._schema(schema_name)
+        with self._lock:
+            self._entries.pop((schema_name, str(tenant_id)), None)
+        key = self._version_key(schema_name, tenant_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+        except Exception:
+            pass
+
+
+threat_matchers = ThreatMatcherRegistry.from_settings()
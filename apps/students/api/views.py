@@ -1001,6 +1001,7 @@ class StudentExportAPIView(ExportAPIView):
     """
     model = Student
     serializer_class = StudentExportSerializer
+    export_type = 'students'
     
     def get_export_filename(self):
         """Get export filename"""
@@ -0,0 +1,151 @@
+"""
+Background export definitions for students (see ExportJobService)
+"""
+
+from datetime import datetime
+
+from django.db.models import Case, CharField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from apps.core.services.export_jobs import (
+    ExportDefinition, choice_display, date_text, datetime_text, yes_no
+)
+from apps.students.models import Guardian, Student, StudentAddress
+from apps.students.services import StudentService
+
+
+def apply_student_filters(queryset, filters):
+    """Apply export filters to a student queryset"""
+    q_objects = Q()
+
+    if filters.get('status'):
+        q_objects &= Q(status=filters['status'])
+    if filters.get('class_id'):
+        q_objects &= Q(current_class_id=filters['class_id'])
+    if filters.get('section_id'):
+        q_objects &= Q(section_id=filters['section_id'])
+    if filters.get('academic_year_id'):
+        q_objects &= Q(academic_year_id=filters['academic_year_id'])
+    if filters.get('category'):
+        q_objects &= Q(category=filters['category'])
+    if filters.get('gender'):
+        q_objects &= Q(gender=filters['gender'])
+
+    # Date range filters
+    for key, lookup in (('created_from', 'created_at__date__gte'), ('created_to', 'created_at__date__lte')):
+        if filters.get(key):
+            try:
+                q_objects &= Q(**{lookup: datetime.strptime(filters[key], '%Y-%m-%d').date()})
+            except ValueError:
+                pass
+
+    return queryset.filter(q_objects)
+
+
+def _full_name(first_name, middle_name, last_name):
+    return " ".join(filter(None, (first_name, middle_name, last_name)))
+
+
+def _age(date_of_birth):
+    if not date_of_birth:
+        return ''
+    today = timezone.now().date()
+    return today.year - date_of_birth.year - (
+        (today.month, today.day) < (date_of_birth.month, date_of_birth.day)
+    )
+
+
+def _optional_part(field, prefix=', '):
+    return Case(
+        When(**{field: ''}, then=Value('')),
+        default=Concat(Value(prefix), field),
+        output_field=CharField(),
+    )
+
+
+class StudentExport(ExportDefinition):
+    """
+    Students visible to the requesting user. ``type=basic`` exports the
+    short layout; otherwise the full layout of the student export API,
+    with primary guardian and current address read through subqueries.
+    """
+
+    title = "Students Export"
+    filter_keys = (
+        'type', 'status', 'class_id', 'section_id', 'academic_year_id',
+        'category', 'gender', 'created_from', 'created_to',
+    )
+
+    def get_columns(self, filters):
+        display = {
+            field: choice_display(Student, field)
+            for field in ('gender', 'admission_type', 'category', 'religion', 'status')
+        }
+        full_name = ('first_name', 'middle_name', 'last_name')
+
+        if filters.get('type') == 'basic':
+            return [
+                ('Admission Number', 'admission_number'),
+                ('Full Name', full_name, _full_name),
+                ('Date of Birth', 'date_of_birth', date_text),
+                ('Gender', 'gender', display['gender']),
+                ('Email', 'personal_email'),
+                ('Phone', 'mobile_primary'),
+                ('Class', 'current_class__name'),
+                ('Section', 'section__name'),
+                ('Status', 'status', display['status']),
+                ('Category', 'category', display['category']),
+            ]
+
+        return [
+            ('Admission Number', 'admission_number'),
+            ('Roll Number', 'roll_number'),
+            ('Full Name', full_name, _full_name),
+            ('First Name', 'first_name'),
+            ('Middle Name', 'middle_name'),
+            ('Last Name', 'last_name'),
+            ('Date of Birth', 'date_of_birth', date_text),
+            ('Age', 'date_of_birth', _age),
+            ('Gender', 'gender', display['gender']),
+            ('Blood Group', 'blood_group'),
+            ('Personal Email', 'personal_email'),
+            ('Institutional Email', 'institutional_email'),
+            ('Primary Mobile', 'mobile_primary'),
+            ('Secondary Mobile', 'mobile_secondary'),
+            ('Current Class', 'current_class__name'),
+            ('Section', 'section__name'),
+            ('Admission Type', 'admission_type', display['admission_type']),
+            ('Enrollment Date', 'enrollment_date', date_text),
+            ('Category', 'category', display['category']),
+            ('Religion', 'religion', display['religion']),
+            ('Is Minority', 'is_minority', yes_no),
+            ('Physically Challenged', 'is_physically_challenged', yes_no),
+            ('Status', 'status', display['status']),
+            ('Guardian Name', 'export_guardian_name'),
+            ('Guardian Phone', 'export_guardian_phone'),
+            ('Address', 'export_address'),
+            ('Created Date', 'created_at', datetime_text),
+        ]
+
+    def get_queryset(self, filters):
+        queryset = apply_student_filters(StudentService.get_secure_queryset(self.user, self.tenant), filters)
+
+        if filters.get('type') != 'basic':
+            guardian = Guardian.objects.filter(student=OuterRef('pk'), is_primary=True)
+            address = StudentAddress.objects.filter(student=OuterRef('pk'), is_current=True).annotate(
+                text=Concat(
+                    'address_line1',
+                    _optional_part('address_line2'),
+                    _optional_part('landmark', ', Landmark: '),
+                    Value(', '), 'city', Value(', '), 'state', Value(' - '), 'pincode',
+                    Value(', '), 'country',
+                    output_field=CharField(),
+                )
+            )
+            queryset = queryset.annotate(
+                export_guardian_name=Subquery(guardian.values('full_name')[:1]),
+                export_guardian_phone=Subquery(guardian.values('phone_primary')[:1]),
+                export_address=Subquery(address.values('text')[:1]),
+            )
+        return queryset.order_by('admission_number')
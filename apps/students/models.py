@@ -14,6 +14,7 @@ from encrypted_model_fields.fields import EncryptedCharField, EncryptedTextField
 
 # Import core base models
 from apps.core.models import BaseModel, UUIDModel, TimeStampedModel, SoftDeleteModel
+from apps.core.services.sequence_service import SequenceService
 
 # Phone regex for validation
 phone_regex = RegexValidator(
@@ -590,21 +591,15 @@ Best regards,
         self.full_clean()
         super().save(*args, **kwargs)
 
+    @staticmethod
+    def admission_number_prefix(tenant):
+        """Series prefix of this year's admission numbers"""
+        return f"ADM-{timezone.now().year}-{tenant.schema_name.upper()}-"
+
     def generate_admission_number(self):
         """Generate unique admission number"""
-        prefix = f"ADM-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_student = Student.objects.filter(
-            admission_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('admission_number').last()
-        
-        if last_student:
-            last_number = int(last_student.admission_number.split('-')[-1])
-            new_number = last_number + 1
-        else:
-            new_number = 1
-            
-        return f"{prefix}{new_number:04d}"
+        prefix = Student.admission_number_prefix(self.tenant)
+        return SequenceService.next_number(self.tenant, prefix, Student, 'admission_number', width=4)
 
     def generate_roll_number(self):
         """Generate incremental roll number based on class/section"""
@@ -1,7 +1,6 @@
 
 
 import logging
-import re
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any, Union
@@ -17,6 +16,7 @@ from django.core.cache import cache
 from ..models import Student, Guardian, StudentAddress, StudentDocument, StudentAcademicHistory
 from apps.academics.models import AcademicYear, SchoolClass, Section, Stream
 from apps.core.services.audit_service import AuditService
+from apps.core.services.sequence_service import SequenceService
 from apps.core.services.notification_service import NotificationService
 
 logger = logging.getLogger(__name__)
@@ -148,40 +148,9 @@ class StudentService:
             # Get tenant code (first 3 letters)
             tenant_code = tenant.schema_name[:3].upper() if hasattr(tenant, 'schema_name') else "SCH"
             
-            # Get last admission number for this tenant and academic year
-            last_student = Student.objects.filter(
-                tenant=tenant,
-                admission_number__isnull=False
-            ).exclude(admission_number='').order_by('-admission_number').first()
-            
-            if last_student and last_student.admission_number:
-                # Extract number from last admission number
-                match = re.search(r'\d+', last_student.admission_number)
-                if match:
-                    last_number = int(match.group())
-                    new_number = last_number + 1
-                else:
-                    new_number = 1
-            else:
-                new_number = 1
-            
-            # Format number with leading zeros
-            formatted_number = f"{new_number:05d}"
-            
-            # Construct admission number
-            admission_number = f"{tenant_code}/{prefix}/{formatted_number}"
-            
-            # Ensure uniqueness
-            counter = 1
-            original_number = admission_number
-            while Student.objects.filter(
-                tenant=tenant,
-                admission_number=admission_number
-            ).exists():
-                admission_number = f"{original_number}-{counter}"
-                counter += 1
-            
-            return admission_number
+            return SequenceService.next_number(
+                tenant, f"{tenant_code}/{prefix}/", Student, 'admission_number', width=5
+            )
             
         except Exception as e:
             logger.error(f"Error generating admission number: {str(e)}", exc_info=True)
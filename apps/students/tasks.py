@@ -13,13 +13,13 @@ from celery import shared_task
 from django.utils import timezone
 from django.core.files.base import ContentFile
 from django.db import transaction
-from django.db.models import Q
 from django.contrib.auth import get_user_model
 
 # Import models and services
 from .models import Student, Guardian, StudentDocument, StudentAcademicHistory
 from .services import StudentService, GuardianService, DocumentService, StudentImportService
 from apps.core.services.audit_service import AuditService
+from apps.core.services.sequence_service import SequenceService
 from apps.core.services.notification_service import NotificationService
 from apps.academics.models import AcademicYear, SchoolClass, Section
 
@@ -69,33 +69,35 @@ def process_bulk_upload_async(self, upload_data: Dict) -> Dict:
         )
         
         # Process based on file type
-        if file_type.lower() == 'csv':
-            result = _process_csv_upload(
-                file_content=file_content,
-                file_name=file_name,
-                tenant=tenant,
-                academic_year=academic_year,
-                update_existing=update_existing,
-                skip_errors=skip_errors,
-                user=user,
-                send_welcome_email=send_welcome_email
-            )
-        elif file_type.lower() in ['xls', 'xlsx']:
-            result = _process_excel_upload(
-                file_content=file_content,
-                file_name=file_name,
-                tenant=tenant,
-                academic_year=academic_year,
-                update_existing=update_existing,
-                skip_errors=skip_errors,
-                user=user,
-                send_welcome_email=send_welcome_email
-            )
-        else:
-            result = {
-                'success': False,
-                'error': f'Unsupported file type: {file_type}'
-            }
+        # Admission numbers are drawn from pre-allocated blocks during the import
+        with SequenceService.preallocate(tenant, Student.admission_number_prefix(tenant), Student, 'admission_number'):
+            if file_type.lower() == 'csv':
+                result = _process_csv_upload(
+                    file_content=file_content,
+                    file_name=file_name,
+                    tenant=tenant,
+                    academic_year=academic_year,
+                    update_existing=update_existing,
+                    skip_errors=skip_errors,
+                    user=user,
+                    send_welcome_email=send_welcome_email
+                )
+            elif file_type.lower() in ['xls', 'xlsx']:
+                result = _process_excel_upload(
+                    file_content=file_content,
+                    file_name=file_name,
+                    tenant=tenant,
+                    academic_year=academic_year,
+                    update_existing=update_existing,
+                    skip_errors=skip_errors,
+                    user=user,
+                    send_welcome_email=send_welcome_email
+                )
+            else:
+                result = {
+                    'success': False,
+                    'error': f'Unsupported file type: {file_type}'
+                }
         
         # Create audit log
         AuditService.create_audit_entry(
@@ -460,12 +462,12 @@ def _process_student_row(row_dict, row_number, tenant, academic_year, update_exi
                 for key, value in student_data.items():
                     if key != 'tenant':
                         setattr(existing_student, key, value)
-                existing_student.save()
+                existing_student.save(validate=True)
                 student = existing_student
                 result['action'] = 'updated'
             else:
                 # Create new student
-                student = Student.objects.create(**student_data)
+                student = Student.objects.create(validate=True, **student_data)
                 result['action'] = 'created'
             
             # Generate admission number if not present
@@ -587,6 +589,7 @@ def _process_guardian_info(student, guardian_data, tenant):
                 if not existing_guardian:
                     # Create new guardian
                     guardian = Guardian.objects.create(
+                        validate=True,
                         tenant=tenant,
                         first_name=data.get('first_name', ''),
                         last_name=data.get('last_name', ''),
@@ -793,68 +796,26 @@ Best regards,
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def export_student_data_async(self, export_params: Dict) -> Dict:
     """
-    Export student data asynchronously
+    Queue a student export as a background export job
     
     Args:
         export_params: Dictionary containing export parameters
         
     Returns:
-        Dictionary with export results
+        The export job (see ExportJobService); the file is produced by
+        ``run_export_job`` and identical requests reuse it
     """
     try:
-        # Extract parameters
+        from apps.core.services.export_jobs import ExportJobService
+        from apps.tenants.models import Tenant
+
         export_format = export_params.get('format', 'csv')
-        export_type = export_params.get('type', 'basic')
-        filters = export_params.get('filters', {})
-        tenant_id = export_params.get('tenant_id')
-        user_id = export_params.get('user_id')
-        
-        # Get related objects
-        from django.apps import apps
-        Tenant = apps.get_model('core', 'Tenant')
-        
-        tenant = Tenant.objects.get(id=tenant_id)
-        user = User.objects.get(id=user_id) if user_id else None
-        
-        # Update task status
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current': 0,
-                'total': 100,
-                'status': 'Preparing export...'
-            }
-        )
-        
-        # Get filtered students
-        students = StudentService.get_secure_queryset(user, tenant)
-        
-        # Apply filters
-        if filters:
-            students = _apply_export_filters(students, filters)
-        
-        # Update task status
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                'current': 50,
-                'total': 100,
-                'status': f'Processing {students.count()} students...'
-            }
-        )
-        
-        # Generate export file
-        if export_format == 'csv':
-            result = _generate_csv_export(students, export_type)
-        elif export_format == 'excel':
-            result = _generate_excel_export(students, export_type)
-        else:
-            result = {
-                'success': False,
-                'error': f'Unsupported export format: {export_format}'
-            }
-        
-        # Create audit log
+        filters = dict(export_params.get('filters', {}), type=export_params.get('type', 'basic'))
+        tenant = Tenant.objects.get(id=export_params.get('tenant_id'))
+        user = User.objects.get(id=export_params['user_id']) if export_params.get('user_id') else None
+
+        job = ExportJobService.request(tenant, 'students', export_format, filters, user)
+
         AuditService.create_audit_entry(
             action='EXPORT',
             resource_type='Student',
@@ -864,16 +825,19 @@ def export_student_data_async(self, export_params: Dict) -> Dict:
             severity='INFO',
             extra_data={
                 'task_id': self.request.id,
+                'job_id': job['job_id'],
                 'operation': 'data_export',
                 'format': export_format,
-                'type': export_type,
-                'student_count': students.count(),
-                'filters': filters
+                'filters': job['filters'],
             }
         )
-        
-        return result
-        
+        return job
+
+    except ValueError as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
     except Exception as e:
         logger.error(f"Error in export task: {str(e)}", exc_info=True)
         
@@ -888,244 +852,6 @@ def export_student_data_async(self, export_params: Dict) -> Dict:
             }
 
 
-def _apply_export_filters(queryset, filters):
-    """Apply filters to student queryset"""
-    q_objects = Q()
-    
-    # Status filter
-    if filters.get('status'):
-        q_objects &= Q(status=filters['status'])
-    
-    # Class filter
-    if filters.get('class_id'):
-        q_objects &= Q(current_class_id=filters['class_id'])
-    
-    # Section filter
-    if filters.get('section_id'):
-        q_objects &= Q(section_id=filters['section_id'])
-    
-    # Academic year filter
-    if filters.get('academic_year_id'):
-        q_objects &= Q(academic_year_id=filters['academic_year_id'])
-    
-    # Category filter
-    if filters.get('category'):
-        q_objects &= Q(category=filters['category'])
-    
-    # Gender filter
-    if filters.get('gender'):
-        q_objects &= Q(gender=filters['gender'])
-    
-    # Date range filters
-    if filters.get('created_from'):
-        try:
-            date_from = datetime.strptime(filters['created_from'], '%Y-%m-%d').date()
-            q_objects &= Q(created_at__date__gte=date_from)
-        except ValueError:
-            pass
-    
-    if filters.get('created_to'):
-        try:
-            date_to = datetime.strptime(filters['created_to'], '%Y-%m-%d').date()
-            q_objects &= Q(created_at__date__lte=date_to)
-        except ValueError:
-            pass
-    
-    return queryset.filter(q_objects).distinct()
-
-
-def _generate_csv_export(students, export_type):
-    """Generate CSV export"""
-    try:
-        import csv
-        from django.http import HttpResponse
-        
-        # Create response
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        response['Content-Disposition'] = f'attachment; filename="students_export_{timestamp}.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write headers based on export type
-        if export_type == 'detailed':
-            headers = [
-                'Admission Number', 'Full Name', 'Date of Birth', 'Gender',
-                'Email', 'Phone', 'Class', 'Section', 'Stream', 'Academic Year',
-                'Status', 'Category', 'Blood Group', 'Nationality', 'Religion',
-                'Caste', 'Admission Date', 'Created At', 'Updated At'
-            ]
-        else:
-            headers = [
-                'Admission Number', 'Full Name', 'Date of Birth', 'Gender',
-                'Email', 'Phone', 'Class', 'Section', 'Status', 'Category'
-            ]
-        
-        writer.writerow(headers)
-        
-        # Write data
-        for student in students.select_related('current_class', 'section', 'stream', 'academic_year'):
-            if export_type == 'detailed':
-                row = [
-                    student.admission_number,
-                    student.full_name,
-                    student.date_of_birth,
-                    student.get_gender_display(),
-                    student.personal_email,
-                    student.mobile_primary,
-                    student.current_class.name if student.current_class else '',
-                    student.section.name if student.section else '',
-                    student.stream.name if student.stream else '',
-                    student.academic_year.name if student.academic_year else '',
-                    student.get_status_display(),
-                    student.get_category_display(),
-                    student.blood_group or '',
-                    student.nationality or '',
-                    student.religion or '',
-                    student.caste or '',
-                    student.admission_date or '',
-                    student.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    student.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-                ]
-            else:
-                row = [
-                    student.admission_number,
-                    student.full_name,
-                    student.date_of_birth,
-                    student.get_gender_display(),
-                    student.personal_email,
-                    student.mobile_primary,
-                    student.current_class.name if student.current_class else '',
-                    student.section.name if student.section else '',
-                    student.get_status_display(),
-                    student.get_category_display()
-                ]
-            
-            writer.writerow(row)
-        
-        return {
-            'success': True,
-            'content': response.content,
-            'content_type': 'text/csv',
-            'filename': f"students_export_{timestamp}.csv"
-        }
-        
-    except Exception as e:
-        logger.error(f"Error generating CSV export: {str(e)}", exc_info=True)
-        return {
-            'success': False,
-            'error': str(e)
-        }
-
-
-def _generate_excel_export(students, export_type):
-    """Generate Excel export"""
-    try:
-        import openpyxl
-        from openpyxl import Workbook
-        
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Students"
-        
-        # Write headers based on export type
-        if export_type == 'detailed':
-            headers = [
-                'Admission Number', 'Full Name', 'Date of Birth', 'Gender',
-                'Email', 'Phone', 'Class', 'Section', 'Stream', 'Academic Year',
-                'Status', 'Category', 'Blood Group', 'Nationality', 'Religion',
-                'Caste', 'Admission Date', 'Created At', 'Updated At'
-            ]
-        else:
-            headers = [
-                'Admission Number', 'Full Name', 'Date of Birth', 'Gender',
-                'Email', 'Phone', 'Class', 'Section', 'Status', 'Category'
-            ]
-        
-        # Write headers with formatting
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.font = openpyxl.styles.Font(bold=True)
-            cell.fill = openpyxl.styles.PatternFill(
-                start_color="CCCCCC",
-                end_color="CCCCCC",
-                fill_type="solid"
-            )
-        
-        # Write data
-        for row_idx, student in enumerate(
-            students.select_related('current_class', 'section', 'stream', 'academic_year'),
-            start=2
-        ):
-            if export_type == 'detailed':
-                ws.cell(row=row_idx, column=1, value=student.admission_number)
-                ws.cell(row=row_idx, column=2, value=student.full_name)
-                ws.cell(row=row_idx, column=3, value=str(student.date_of_birth))
-                ws.cell(row=row_idx, column=4, value=student.get_gender_display())
-                ws.cell(row=row_idx, column=5, value=student.personal_email)
-                ws.cell(row=row_idx, column=6, value=student.mobile_primary)
-                ws.cell(row=row_idx, column=7, value=student.current_class.name if student.current_class else '')
-                ws.cell(row=row_idx, column=8, value=student.section.name if student.section else '')
-                ws.cell(row=row_idx, column=9, value=student.stream.name if student.stream else '')
-                ws.cell(row=row_idx, column=10, value=student.academic_year.name if student.academic_year else '')
-                ws.cell(row=row_idx, column=11, value=student.get_status_display())
-                ws.cell(row=row_idx, column=12, value=student.get_category_display())
-                ws.cell(row=row_idx, column=13, value=student.blood_group or '')
-                ws.cell(row=row_idx, column=14, value=student.nationality or '')
-                ws.cell(row=row_idx, column=15, value=student.religion or '')
-                ws.cell(row=row_idx, column=16, value=student.caste or '')
-                ws.cell(row=row_idx, column=17, value=str(student.admission_date) if student.admission_date else '')
-                ws.cell(row=row_idx, column=18, value=student.created_at.strftime('%Y-%m-%d %H:%M:%S'))
-                ws.cell(row=row_idx, column=19, value=student.updated_at.strftime('%Y-%m-%d %H:%M:%S'))
-            else:
-                ws.cell(row=row_idx, column=1, value=student.admission_number)
-                ws.cell(row=row_idx, column=2, value=student.full_name)
-                ws.cell(row=row_idx, column=3, value=str(student.date_of_birth))
-                ws.cell(row=row_idx, column=4, value=student.get_gender_display())
-                ws.cell(row=row_idx, column=5, value=student.personal_email)
-                ws.cell(row=row_idx, column=6, value=student.mobile_primary)
-                ws.cell(row=row_idx, column=7, value=student.current_class.name if student.current_class else '')
-                ws.cell(row=row_idx, column=8, value=student.section.name if student.section else '')
-                ws.cell(row=row_idx, column=9, value=student.get_status_display())
-                ws.cell(row=row_idx, column=10, value=student.get_category_display())
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 30)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Save to BytesIO
-        import io
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        
-        return {
-            'success': True,
-            'content': output.getvalue(),
-            'content_type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            'filename': f"students_export_{timestamp}.xlsx"
-        }
-        
-    except Exception as e:
-        logger.error(f"Error generating Excel export: {str(e)}", exc_info=True)
-        return {
-            'success': False,
-            'error': str(e)
-        }
-
-
 @shared_task
 def sync_student_user_accounts(tenant_id: int) -> Dict:
     """
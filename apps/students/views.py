@@ -1325,7 +1325,7 @@ class StudentBulkUploadView(BaseTemplateView):
                             for key, value in student_data.items():
                                 if key != 'tenant':
                                     setattr(existing_student, key, value)
-                            existing_student.save()
+                            existing_student.save(validate=True)
                             updated_count += 1
                             
                             # Log individual update
@@ -1337,7 +1337,7 @@ class StudentBulkUploadView(BaseTemplateView):
                             )
                         else:
                             # Create new
-                            student = Student.objects.create(**student_data)
+                            student = Student.objects.create(validate=True, **student_data)
                             created_count += 1
                             existing_students[personal_email] = student
                             
@@ -1599,20 +1599,20 @@ class StudentExportView(BaseView):
         format_type = request.GET.get('format', 'csv')
         queryset = self.get_filtered_queryset(request)
         
-        data = queryset.values(
+        fields = [
             'admission_number', 'first_name', 'last_name', 
             'current_class__name', 'section__name', 'academic_year__name', 'status', 'created_at'
-        )
+        ]
         columns = ['Admission No', 'First Name', 'Last Name', 'Class', 'Section', 'Academic Year', 'Status', 'Admission Date']
         filename = f"student_report_{timezone.now().strftime('%Y%m%d')}"
         title = "Student Progress & Enrollment Report"
 
         if format_type == 'excel':
-            return ReportGenerator.generate_excel(list(data), columns, filename=filename)
+            return ReportGenerator.generate_excel(queryset, columns, filename=filename, fields=fields)
         elif format_type == 'pdf':
-            return ReportGenerator.generate_pdf(list(data), columns, filename=filename, title=title)
+            return ReportGenerator.generate_pdf(queryset, columns, filename=filename, title=title, fields=fields)
         else:
-            return ReportGenerator.generate_csv(list(data), columns, filename=filename)
+            return ReportGenerator.generate_csv(queryset, columns, filename=filename, fields=fields)
     
     def get_filtered_queryset(self, request):
         queryset = Student.get_secure_queryset(request.user)
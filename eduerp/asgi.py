@@ -72,6 +72,7 @@ class TenantASGIContextMiddleware:
 
 # Import routing from apps
 from apps.communications.routing import websocket_urlpatterns
+from apps.attendance.routing import websocket_urlpatterns as attendance_websocket_urlpatterns
 
 application = ProtocolTypeRouter({
     "http": django_http_app,
@@ -79,7 +80,7 @@ application = ProtocolTypeRouter({
         TenantASGIContextMiddleware(
             AuthMiddlewareStack(
                 URLRouter(
-                    websocket_urlpatterns
+                    websocket_urlpatterns + attendance_websocket_urlpatterns
                 )
             )
         )
@@ -8,6 +8,7 @@ import os
 from pathlib import Path
 from datetime import timedelta
 import environ
+from celery.schedules import crontab
 
 APP_VERSION = "1.0.0"
 API_VERSION = "v1"
@@ -149,6 +150,7 @@ MIDDLEWARE = [
     # Custom tenant middleware
     "apps.core.middleware.tenant.TenantMiddleware",
     "apps.core.middleware.tenant.TenantContextMiddleware",
+    "apps.security.middleware.ThreatScreeningMiddleware",
     # 'apps.core.middleware.security.SecurityHeadersMiddleware',
     "apps.core.middleware.audit_middleware.SafeAuditMiddleware",
 ]
@@ -176,6 +178,17 @@ AUDIT_LOG_SETTINGS = {
     "AUTO_CLEANUP": True,
     "EXPORT_FORMATS": ["PDF", "CSV", "JSON"],
     "MAX_EXPORT_RECORDS": 10000,
+    # How SafeAuditMiddleware writes entries: "sync" (one INSERT per request)
+    # or "async" (bounded queue flushed with bulk_create by a background thread)
+    "SINK": {
+        "MODE": env("AUDIT_SINK_MODE", default="async"),
+        "QUEUE_SIZE": 10000,
+        "BATCH_SIZE": 200,
+        "FLUSH_INTERVAL": 2.0,  # seconds
+        "OVERFLOW": "spill",  # block, drop_oldest or spill
+        "SPILL_PATH": str(BASE_DIR / "logs" / "audit_spill.jsonl"),
+        "BLOCK_TIMEOUT": 1.0,  # seconds, only for "block"
+    },
 }
 
 
@@ -204,7 +217,6 @@ TEMPLATES = [
                 "django.template.context_processors.static",
                 "apps.core.context_processors.tenant_context",
                 "apps.core.context_processors.user_permissions",
-                "apps.core.context_processors.user_permissions",
                 "apps.core.context_processors.system_settings",
                 "apps.communications.context_processors.unread_count",
                 # OR use combined:
@@ -490,6 +502,16 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    "sweep-overdue": {
+        "task": "apps.finance.tasks.sweep_overdue_task",
+        "schedule": crontab(hour=0, minute=15),
+    },
+    "purge-export-files": {
+        "task": "apps.core.tasks.purge_export_files_task",
+        "schedule": crontab(minute=30),
+    },
+}
 
 # File upload limits
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
@@ -499,6 +521,95 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 TENANT_LIMIT_SET_CACHE = True
 TENANT_CACHE_TIMEOUT = 300  # 5 minutes
 
+# Host/header/JWT/slug -> tenant resolution cache used by TenantMiddleware
+TENANT_RESOLUTION_CACHE = {
+    "ENABLED": env.bool("TENANT_RESOLUTION_CACHE_ENABLED", default=True),
+    "MAX_ENTRIES": 1024,
+    "LOCAL_TTL": 30,  # seconds, in-process LRU
+    "SHARED_TTL": TENANT_CACHE_TIMEOUT,  # seconds, shared Django cache
+}
+
+# Per-tenant, per-date attendance dashboard statistics
+# (invalidated on every attendance write; the timeout only bounds roster drift)
+ATTENDANCE_STATS_CACHE = {
+    "TIMEOUT": 300,  # seconds
+}
+
+MODEL_SAVE = {
+    # When True BaseModel.save() runs full_clean() (unique checks included)
+    # on every save; by default only call sites passing validate=True are
+    # validated (forms and serializers validate their own input)
+    "VALIDATE": env.bool("MODEL_SAVE_VALIDATE", default=False),
+}
+
+ROLE_PERMISSION_CACHE = {
+    "CHECK_INTERVAL": 30,  # seconds between shared version checks per process
+    "SHARED_TTL": 3600,  # seconds role and user permission sets stay in the shared cache and in-process
+}
+
+CHROME_CONTEXT = {
+    "USER_TTL": 300,  # seconds per-user header values (unread counts, latest items) are cached
+    "TENANT_TTL": 300,  # seconds tenant user counts and system broadcasts are cached
+    "HEADER_NOTIFICATIONS": 5,  # notifications listed in the header dropdown
+}
+
+GRADING_SCALE_CACHE = {
+    "CHECK_INTERVAL": 30,  # seconds between shared generation checks per process
+    "MAX_AGE": 300,  # seconds a process keeps a scale before reloading it regardless
+}
+
+EXPORTS = {
+    "CHUNK_SIZE": 2000,  # rows fetched per database round trip when streaming
+    "PDF_ROWS_PER_TABLE": 250,  # rows per ReportLab table in PDF exports
+}
+
+BROADCAST = {
+    "BATCH_SIZE": 100,  # emails / SMS per Celery delivery task (one SMTP connection)
+    "EMAIL_RATE_PER_MINUTE": env.int("BROADCAST_EMAIL_RATE_PER_MINUTE", default=600),  # per tenant
+    "SMS_RATE_PER_MINUTE": env.int("BROADCAST_SMS_RATE_PER_MINUTE", default=300),  # per tenant
+    "INSERT_BATCH_SIZE": 1000,  # in-app notifications per INSERT
+}
+
+EXPORT_JOBS = {
+    "RESULT_TTL": 3600,  # seconds a finished export is reused for identical requests
+    "STORAGE_PREFIX": "exports",  # default storage directory, per tenant schema and job
+    "TYPES": {
+        "attendance": "apps.attendance.exports.StudentAttendanceExport",
+        "students": "apps.students.exports.StudentExport",
+    },
+}
+
+MARKSHEET_BATCH = {
+    "CHUNK_SIZE": 10,  # mark sheets rendered per Celery subtask
+    "LOCK_TIMEOUT": 3600,  # seconds an exam's batch blocks a second one
+}
+
+INVOICE_GENERATION = {
+    "CHUNK_SIZE": 500,  # students billed per committed chunk
+    "LOCK_TIMEOUT": 3600,  # seconds a tenant/month run blocks a second one
+}
+
+PAYROLL = {
+    "WORKING_WEEKDAYS": [0, 1, 2, 3, 4, 5],  # Monday-Saturday, when no default WorkSchedule exists
+    "UNMARKED_AS_PRESENT": False,  # working days without a StaffAttendance row count as absent
+    "ESI_WAGE_LIMIT": 21000,  # monthly gross above which ESI is not deducted
+    "BATCH_SIZE": 500,  # payroll rows per INSERT/UPDATE
+}
+
+THREAT_SCREENING = {
+    "ENABLED": env.bool("THREAT_SCREENING_ENABLED", default=True),
+    "CHECK_INTERVAL": 30,  # seconds between indicator-set version checks per process
+    "MAX_AGE": 300,  # seconds a process keeps a compiled matcher before rebuilding it regardless
+    "BLOCK_CONFIDENCE": ["HIGH", "CONFIRMED"],  # lower-confidence matches are only logged
+    "SKIP_PATHS": ["/static/", "/media/"],
+}
+
+STAFF_ATTENDANCE_ANALYTICS = {
+    # Seconds the current month's report stays cached; closed months are
+    # cached until an attendance edit in that month invalidates them
+    "CURRENT_MONTH_TTL": 300,
+}
+
 # Encryption key for encrypted model fields
 FIELD_ENCRYPTION_KEY = env("FIELD_ENCRYPTION_KEY")
 # Default tenant configuration
@@ -581,6 +692,24 @@ DEEPFACE_SETTINGS = {
     # Performance
     'GPU_ENABLED': False,  # Set True if you have CUDA
     'BATCH_SIZE': 10,
+    
+    # Per-tenant memory-mapped embedding store
+    'EMBEDDING_STORE_ROOT': env("FACE_EMBEDDING_STORE_ROOT", default=str(BASE_DIR / "face_embeddings")),
+    'STORE_REFRESH_INTERVAL': 5,  # seconds between checks for a newer store version
+    
+    # Enrollment training (see apps.attendance.services.face_training)
+    'TRAINING': {
+        'CHUNK_SIZE': 32,      # photos embedded per Celery subtask / checkpoint
+        'LOCK_TIMEOUT': 6 * 60 * 60,  # seconds a queued/running training blocks another
+    },
+    
+    # Real-time (WebSocket) recognition executor
+    'REALTIME': {
+        'WORKERS': 2,          # decode/detect threads per ASGI process
+        'MAX_BATCH': 16,       # frames embedded together in one model call
+        'BATCH_WINDOW': 0.03,  # seconds to wait for more cameras to join a batch
+        'MAX_PENDING': 64,     # cameras waiting before new frames are rejected
+    },
 }
 
 # Cache Configuration (Using Local Memory - install django-redis for production)
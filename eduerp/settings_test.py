@@ -25,3 +25,6 @@ PASSWORD_HASHERS = [
 
 # Disable celery for tests
 CELERY_TASK_ALWAYS_EAGER = True
+
+# Write audit entries inline so they are visible inside test transactions
+AUDIT_LOG_SETTINGS = {**AUDIT_LOG_SETTINGS, "SINK": {**AUDIT_LOG_SETTINGS["SINK"], "MODE": "sync"}}